@@ -0,0 +1,99 @@
+"""Store the normalized trend keyword so live-trend dedupe can run in SQL."""
+
+from __future__ import annotations
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0008_trend_normalized_keyword"
+down_revision = "0007_trend_examples"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of services.trend_ingestion.service.normalize_text at this revision.
+_STOPWORDS = {"the", "and", "a", "of", "to", "in"}
+_EMOJI_RE = re.compile(r"[\U00010000-\U0010FFFF]", flags=re.UNICODE)
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def _normalize_text(text: str) -> str:
+    text = _EMOJI_RE.sub("", text).lower()
+    words = [word for word in re.split(r"\W+", text) if word and word not in _STOPWORDS]
+    return " ".join(words)
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        column.get("name") == column_name
+        for column in inspector.get_columns(table_name)
+    )
+
+
+def _has_index(table_name: str, index_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        index.get("name") == index_name for index in inspector.get_indexes(table_name)
+    )
+
+
+def _backfill_normalized_keywords() -> None:
+    bind = op.get_bind()
+    trendsignal = sa.table(
+        "trendsignal",
+        sa.column("id", sa.Integer()),
+        sa.column("keyword", sa.String()),
+        sa.column("normalized_keyword", sa.String()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(trendsignal.c.id, trendsignal.c.keyword)
+            .where(
+                trendsignal.c.id > last_id,
+                trendsignal.c.normalized_keyword.is_(None),
+            )
+            .order_by(trendsignal.c.id)
+            .limit(_BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            trendsignal.update()
+            .where(trendsignal.c.id == sa.bindparam("row_id"))
+            .values(normalized_keyword=sa.bindparam("value")),
+            [
+                {"row_id": row.id, "value": _normalize_text(row.keyword or "")}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    if not _has_column("trendsignal", "normalized_keyword"):
+        with op.batch_alter_table("trendsignal") as batch_op:
+            batch_op.add_column(
+                sa.Column("normalized_keyword", sa.String(), nullable=True)
+            )
+    _backfill_normalized_keywords()
+    if not _has_index("trendsignal", "ix_trendsignal_normalized_keyword"):
+        op.create_index(
+            "ix_trendsignal_normalized_keyword", "trendsignal", ["normalized_keyword"]
+        )
+
+
+def downgrade() -> None:
+    if _has_index("trendsignal", "ix_trendsignal_normalized_keyword"):
+        op.drop_index("ix_trendsignal_normalized_keyword", table_name="trendsignal")
+    if _has_column("trendsignal", "normalized_keyword"):
+        with op.batch_alter_table("trendsignal") as batch_op:
+            batch_op.drop_column("normalized_keyword")
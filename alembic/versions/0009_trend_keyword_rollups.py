@@ -0,0 +1,123 @@
+"""Add portable hourly/daily trend keyword rollups and backfill them."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0009_trend_keyword_rollups"
+down_revision = "0008_trend_normalized_keyword"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH_SIZE = 5000
+
+
+def _has_table(table_name: str) -> bool:
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def _bucket(value, granularity: str):
+    hour = value.replace(minute=0, second=0, microsecond=0)
+    return hour.replace(hour=0) if granularity == "day" else hour
+
+
+def _backfill(rollup: sa.Table) -> None:
+    bind = op.get_bind()
+    trendsignal = sa.table(
+        "trendsignal",
+        sa.column("id", sa.Integer()),
+        sa.column("source", sa.String()),
+        sa.column("keyword", sa.String()),
+        sa.column("normalized_keyword", sa.String()),
+        sa.column("category", sa.String()),
+        sa.column("engagement_score", sa.Integer()),
+        sa.column("timestamp", sa.DateTime()),
+        sa.column("metadata_json", sa.JSON()),
+    )
+    totals: dict[tuple, dict] = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(trendsignal)
+            .where(trendsignal.c.id > last_id)
+            .order_by(trendsignal.c.id)
+            .limit(_BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            keyword = row.normalized_keyword or row.keyword
+            if not keyword or row.timestamp is None:
+                continue
+            score = max(0, int(row.engagement_score or 0))
+            for granularity in ("hour", "day"):
+                key = (granularity, _bucket(row.timestamp, granularity), keyword, row.source, row.category)
+                entry = totals.setdefault(
+                    key,
+                    {
+                        "granularity": key[0],
+                        "bucket_start": key[1],
+                        "keyword": key[2],
+                        "source": key[3],
+                        "category": key[4],
+                        "signal_count": 0,
+                        "engagement_total": 0,
+                        "max_engagement": -1,
+                        "last_seen_at": row.timestamp,
+                        "metadata_json": None,
+                    },
+                )
+                entry["signal_count"] += 1
+                entry["engagement_total"] += max(1, score)
+                if score >= entry["max_engagement"]:
+                    entry["max_engagement"] = score
+                    entry["metadata_json"] = row.metadata_json
+                entry["last_seen_at"] = max(entry["last_seen_at"], row.timestamp)
+    values = list(totals.values())
+    for start in range(0, len(values), _BACKFILL_BATCH_SIZE):
+        op.bulk_insert(rollup, values[start : start + _BACKFILL_BATCH_SIZE])
+
+
+def upgrade() -> None:
+    if _has_table("trendkeywordrollup"):
+        return
+    rollup = op.create_table(
+        "trendkeywordrollup",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("keyword", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("signal_count", sa.Integer(), nullable=False),
+        sa.Column("engagement_total", sa.Integer(), nullable=False),
+        sa.Column("max_engagement", sa.Integer(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.Column("metadata_json", sa.JSON(), nullable=True),
+        sa.UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "keyword",
+            "source",
+            "category",
+            name="uq_trendkeywordrollup_bucket",
+        ),
+    )
+    op.create_index(
+        "ix_trendkeywordrollup_granularity", "trendkeywordrollup", ["granularity"]
+    )
+    op.create_index(
+        "ix_trendkeywordrollup_bucket_start", "trendkeywordrollup", ["bucket_start"]
+    )
+    op.create_index("ix_trendkeywordrollup_keyword", "trendkeywordrollup", ["keyword"])
+    if _has_table("trendsignal"):
+        _backfill(rollup)
+
+
+def downgrade() -> None:
+    if _has_table("trendkeywordrollup"):
+        op.drop_table("trendkeywordrollup")
@@ -0,0 +1,52 @@
+"""Materialize Stripe subscription state for local plan-tier lookups."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0010_billing_subscriptions"
+down_revision = "0009_trend_keyword_rollups"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    if _has_table("billingsubscription"):
+        return
+    op.create_table(
+        "billingsubscription",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("stripe_customer_id", sa.String(), nullable=True),
+        sa.Column("stripe_subscription_id", sa.String(), nullable=True),
+        sa.Column("product_id", sa.String(), nullable=True),
+        sa.Column("plan_tier", sa.String(), nullable=False, server_default="free"),
+        sa.Column("status", sa.String(), nullable=False, server_default="active"),
+        sa.Column("current_period_end", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_billingsubscription_user_id", "billingsubscription", ["user_id"], unique=True
+    )
+    op.create_index(
+        "ix_billingsubscription_stripe_customer_id",
+        "billingsubscription",
+        ["stripe_customer_id"],
+    )
+    op.create_index(
+        "ix_billingsubscription_stripe_subscription_id",
+        "billingsubscription",
+        ["stripe_subscription_id"],
+    )
+
+
+def downgrade() -> None:
+    if _has_table("billingsubscription"):
+        op.drop_table("billingsubscription")
@@ -0,0 +1,236 @@
+"""Dedupe trend signals per source, keyword and hour for bulk upserts."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0011_trend_signal_bucket_dedupe"
+down_revision = "0010_billing_subscriptions"
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "uq_trendsignal_source_keyword_bucket"
+_BACKFILL_BATCH_SIZE = 5000
+_ROLLUP_KEY_BATCH_SIZE = 200
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        column.get("name") == column_name
+        for column in inspector.get_columns(table_name)
+    )
+
+
+def _has_index(table_name: str, index_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        index.get("name") == index_name for index in inspector.get_indexes(table_name)
+    )
+
+
+def _bucket(value, granularity: str):
+    # Frozen copy of services.common.trend_rollups.bucket_start.
+    hour = value.replace(minute=0, second=0, microsecond=0)
+    return hour.replace(hour=0) if granularity == "day" else hour
+
+
+_trendsignal = sa.table(
+    "trendsignal",
+    sa.column("id", sa.Integer()),
+    sa.column("source", sa.String()),
+    sa.column("keyword", sa.String()),
+    sa.column("normalized_keyword", sa.String()),
+    sa.column("category", sa.String()),
+    sa.column("engagement_score", sa.Integer()),
+    sa.column("timestamp", sa.DateTime()),
+    sa.column("bucket_start", sa.DateTime()),
+    sa.column("metadata_json", sa.JSON()),
+)
+
+_rollup = sa.table(
+    "trendkeywordrollup",
+    sa.column("granularity", sa.String()),
+    sa.column("bucket_start", sa.DateTime()),
+    sa.column("keyword", sa.String()),
+    sa.column("source", sa.String()),
+    sa.column("category", sa.String()),
+    sa.column("signal_count", sa.Integer()),
+    sa.column("engagement_total", sa.Integer()),
+    sa.column("max_engagement", sa.Integer()),
+    sa.column("last_seen_at", sa.DateTime()),
+    sa.column("metadata_json", sa.JSON()),
+)
+
+
+def _aggregate(rows) -> list[dict]:
+    # Frozen copy of the 0009 rollup backfill aggregation.
+    totals: dict[tuple, dict] = {}
+    for row in rows:
+        keyword = row.normalized_keyword or row.keyword
+        if not keyword or row.timestamp is None:
+            continue
+        score = max(0, int(row.engagement_score or 0))
+        for granularity in ("hour", "day"):
+            key = (granularity, _bucket(row.timestamp, granularity), keyword, row.source, row.category)
+            entry = totals.setdefault(
+                key,
+                {
+                    "granularity": key[0],
+                    "bucket_start": key[1],
+                    "keyword": key[2],
+                    "source": key[3],
+                    "category": key[4],
+                    "signal_count": 0,
+                    "engagement_total": 0,
+                    "max_engagement": -1,
+                    "last_seen_at": row.timestamp,
+                    "metadata_json": None,
+                },
+            )
+            entry["signal_count"] += 1
+            entry["engagement_total"] += max(1, score)
+            if score >= entry["max_engagement"]:
+                entry["max_engagement"] = score
+                entry["metadata_json"] = row.metadata_json
+            entry["last_seen_at"] = max(entry["last_seen_at"], row.timestamp)
+    return list(totals.values())
+
+
+def _rebuild_rollups(days: set[tuple]) -> None:
+    """Re-aggregate the 0009 rollups of each ``(source, keyword, day)`` from raw rows.
+
+    The backfilled rollups still count the duplicates deleted above, so the
+    hourly and daily buckets of every affected day are dropped and rebuilt.
+    """
+    if not days or not inspect(op.get_bind()).has_table("trendkeywordrollup"):
+        return
+    bind = op.get_bind()
+    raw_keyword = sa.func.coalesce(
+        _trendsignal.c.normalized_keyword, _trendsignal.c.keyword
+    )
+    keys = sorted(days)
+    for start in range(0, len(keys), _ROLLUP_KEY_BATCH_SIZE):
+        batch = keys[start : start + _ROLLUP_KEY_BATCH_SIZE]
+        bind.execute(
+            _rollup.delete().where(
+                sa.or_(
+                    *(
+                        sa.and_(
+                            _rollup.c.source == source,
+                            _rollup.c.keyword == keyword,
+                            _rollup.c.bucket_start >= day,
+                            _rollup.c.bucket_start < day + timedelta(days=1),
+                        )
+                        for source, keyword, day in batch
+                    )
+                )
+            )
+        )
+        rows = bind.execute(
+            sa.select(_trendsignal).where(
+                sa.or_(
+                    *(
+                        sa.and_(
+                            _trendsignal.c.source == source,
+                            raw_keyword == keyword,
+                            _trendsignal.c.timestamp >= day,
+                            _trendsignal.c.timestamp < day + timedelta(days=1),
+                        )
+                        for source, keyword, day in batch
+                    )
+                )
+            )
+        ).all()
+        values = _aggregate(rows)
+        if values:
+            bind.execute(_rollup.insert(), values)
+
+
+def _backfill_and_dedupe() -> None:
+    """Stamp ``bucket_start`` and keep only the newest row per bucket key."""
+    bind = op.get_bind()
+    newest: dict[tuple, tuple] = {}
+    stale_ids: list[int] = []
+    stale_days: set[tuple] = set()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                _trendsignal.c.id,
+                _trendsignal.c.source,
+                _trendsignal.c.normalized_keyword,
+                _trendsignal.c.timestamp,
+            )
+            .where(_trendsignal.c.id > last_id)
+            .order_by(_trendsignal.c.id)
+            .limit(_BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates = []
+        for row in rows:
+            if row.timestamp is None:
+                continue
+            bucket = _bucket(row.timestamp, "hour")
+            updates.append({"row_id": row.id, "value": bucket})
+            if row.normalized_keyword is None:
+                continue
+            key = (row.source, row.normalized_keyword, bucket)
+            candidate = (row.timestamp, row.id)
+            current = newest.get(key)
+            if current is None:
+                newest[key] = candidate
+                continue
+            if candidate > current:
+                stale_ids.append(current[1])
+                newest[key] = candidate
+            else:
+                stale_ids.append(row.id)
+            stale_days.add((row.source, row.normalized_keyword, _bucket(bucket, "day")))
+        if updates:
+            bind.execute(
+                _trendsignal.update()
+                .where(_trendsignal.c.id == sa.bindparam("row_id"))
+                .values(bucket_start=sa.bindparam("value")),
+                updates,
+            )
+    for start in range(0, len(stale_ids), _BACKFILL_BATCH_SIZE):
+        bind.execute(
+            _trendsignal.delete().where(
+                _trendsignal.c.id.in_(stale_ids[start : start + _BACKFILL_BATCH_SIZE])
+            )
+        )
+    _rebuild_rollups(stale_days)
+
+
+def upgrade() -> None:
+    if not _has_column("trendsignal", "bucket_start"):
+        with op.batch_alter_table("trendsignal") as batch_op:
+            batch_op.add_column(sa.Column("bucket_start", sa.DateTime(), nullable=True))
+    if not _has_index("trendsignal", _INDEX_NAME):
+        _backfill_and_dedupe()
+        op.create_index(
+            _INDEX_NAME,
+            "trendsignal",
+            ["source", "normalized_keyword", "bucket_start"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    if _has_index("trendsignal", _INDEX_NAME):
+        op.drop_index(_INDEX_NAME, table_name="trendsignal")
+    if _has_column("trendsignal", "bucket_start"):
+        with op.batch_alter_table("trendsignal") as batch_op:
+            batch_op.drop_column("bucket_start")
@@ -0,0 +1,49 @@
+"""Add hourly/daily analytics event rollups kept after raw-event retention."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0012_analytics_event_rollups"
+down_revision = "0011_trend_signal_bucket_dedupe"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    if _has_table("analyticseventrollup"):
+        return
+    op.create_table(
+        "analyticseventrollup",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "path",
+            "event_type",
+            name="uq_analyticseventrollup_bucket",
+        ),
+    )
+    op.create_index(
+        "ix_analyticseventrollup_granularity", "analyticseventrollup", ["granularity"]
+    )
+    op.create_index(
+        "ix_analyticseventrollup_bucket_start", "analyticseventrollup", ["bucket_start"]
+    )
+
+
+def downgrade() -> None:
+    if _has_table("analyticseventrollup"):
+        op.drop_table("analyticseventrollup")
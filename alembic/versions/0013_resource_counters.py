@@ -0,0 +1,53 @@
+"""Add maintained per-owner resource counters and backfill them."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0013_resource_counters"
+down_revision = "0012_analytics_event_rollups"
+branch_labels = None
+depends_on = None
+
+# Counted tables carry no owner yet; their totals live under user_id 0.
+_BACKFILL = {
+    "listings": "listing",
+    "ab_tests": "abtest",
+    "images": "product",
+    "ideas": "idea",
+}
+
+
+def _has_table(table_name: str) -> bool:
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    if _has_table("resourcecounter"):
+        return
+    op.create_table(
+        "resourcecounter",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("resource", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint(
+            "user_id", "resource", name="uq_resourcecounter_owner_resource"
+        ),
+    )
+    op.create_index("ix_resourcecounter_user_id", "resourcecounter", ["user_id"])
+    for resource, table in _BACKFILL.items():
+        if _has_table(table):
+            op.execute(
+                "INSERT INTO resourcecounter (user_id, resource, count, updated_at) "
+                f"SELECT 0, '{resource}', COUNT(*), CURRENT_TIMESTAMP FROM {table}"
+            )
+
+
+def downgrade() -> None:
+    if _has_table("resourcecounter"):
+        op.drop_table("resourcecounter")
@@ -0,0 +1,33 @@
+"""Add the fencing-token table that guards leader writes."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0014_lease_fences"
+down_revision = "0013_resource_counters"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    if _has_table("leasefence"):
+        return
+    op.create_table(
+        "leasefence",
+        sa.Column("name", sa.String(), primary_key=True, nullable=False),
+        sa.Column("fencing_token", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    if _has_table("leasefence"):
+        op.drop_table("leasefence")
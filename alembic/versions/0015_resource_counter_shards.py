@@ -0,0 +1,54 @@
+"""Spread each resource counter over shard rows."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0015_resource_counter_shards"
+down_revision = "0014_lease_fences"
+branch_labels = None
+depends_on = None
+
+_OLD_CONSTRAINT = "uq_resourcecounter_owner_resource"
+_NEW_CONSTRAINT = "uq_resourcecounter_owner_resource_shard"
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        column.get("name") == column_name
+        for column in inspector.get_columns(table_name)
+    )
+
+
+def upgrade() -> None:
+    if _has_column("resourcecounter", "shard"):
+        return
+    # Existing totals stay on shard 0.
+    with op.batch_alter_table("resourcecounter") as batch_op:
+        batch_op.add_column(
+            sa.Column("shard", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.drop_constraint(_OLD_CONSTRAINT, type_="unique")
+        batch_op.create_unique_constraint(_NEW_CONSTRAINT, ["user_id", "resource", "shard"])
+
+
+def downgrade() -> None:
+    if not _has_column("resourcecounter", "shard"):
+        return
+    op.execute(
+        "UPDATE resourcecounter SET count = ("
+        "SELECT SUM(c.count) FROM resourcecounter AS c "
+        "WHERE c.user_id = resourcecounter.user_id AND c.resource = resourcecounter.resource"
+        ") WHERE shard = 0"
+    )
+    op.execute("DELETE FROM resourcecounter WHERE shard <> 0")
+    with op.batch_alter_table("resourcecounter") as batch_op:
+        batch_op.drop_constraint(_NEW_CONSTRAINT, type_="unique")
+        batch_op.create_unique_constraint(_OLD_CONSTRAINT, ["user_id", "resource"])
+        batch_op.drop_column("shard")
@@ -0,0 +1,76 @@
+"""Backfill ``normalized_keyword`` on trend signals written through Core."""
+
+from __future__ import annotations
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = "0016_trend_normalized_backfill"
+down_revision = "0015_resource_counter_shards"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of services.common.text.normalize_text at this revision.
+_STOPWORDS = {"the", "and", "a", "of", "to", "in"}
+_EMOJI_RE = re.compile(r"[\U00010000-\U0010FFFF]", flags=re.UNICODE)
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def _normalize_text(text: str) -> str:
+    text = _EMOJI_RE.sub("", text).lower()
+    words = [word for word in re.split(r"\W+", text) if word and word not in _STOPWORDS]
+    return " ".join(words)
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return False
+    return any(
+        column.get("name") == column_name
+        for column in inspector.get_columns(table_name)
+    )
+
+
+def upgrade() -> None:
+    if not _has_column("trendsignal", "normalized_keyword"):
+        return
+    bind = op.get_bind()
+    trendsignal = sa.table(
+        "trendsignal",
+        sa.column("id", sa.Integer()),
+        sa.column("keyword", sa.String()),
+        sa.column("normalized_keyword", sa.String()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(trendsignal.c.id, trendsignal.c.keyword)
+            .where(
+                trendsignal.c.id > last_id,
+                trendsignal.c.normalized_keyword.is_(None),
+            )
+            .order_by(trendsignal.c.id)
+            .limit(_BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            trendsignal.update()
+            .where(trendsignal.c.id == sa.bindparam("row_id"))
+            .values(normalized_keyword=sa.bindparam("value")),
+            [
+                {"row_id": row.id, "value": _normalize_text(row.keyword or "")}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # Backfilled keys match what the ORM hook writes; nothing to undo.
+    pass
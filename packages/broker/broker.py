@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+from contextlib import suppress
 from typing import Any, Awaitable, Callable
 
 from redis.asyncio import Redis, from_url
 from redis.exceptions import ResponseError
 
 
+logger = logging.getLogger(__name__)
+
 MessageHandler = Callable[[dict[str, Any]], Awaitable[None]]
 
 
@@ -25,8 +29,43 @@ def _decode_message(message: dict[str, str]) -> dict[str, Any]:
     return decoded
 
 
+async def _autoclaim(
+    redis: Redis,
+    stream: str,
+    group: str,
+    consumer: str,
+    min_idle_ms: int,
+    start_id: str,
+    count: int,
+) -> tuple[str, list[tuple[str, dict[str, str] | None]]]:
+    """Claim entries idle for ``min_idle_ms``; return the next cursor and them."""
+    response = await redis.xautoclaim(
+        stream, group, consumer, min_idle_ms, start_id=start_id, count=count
+    )
+    # Redis 6.2 returns [cursor, entries]; 7.0 appends the deleted ids.
+    return str(response[0]), list(response[1])
+
+
+async def _delivery_count(redis: Redis, stream: str, group: str, message_id: str) -> int:
+    pending = await redis.xpending_range(stream, group, min=message_id, max=message_id, count=1)
+    return int(pending[0]["times_delivered"]) if pending else 0
+
+
 class EventBroker:
-    """Minimal Redis Streams publisher/consumer with JSON payload support."""
+    """Redis Streams publisher/consumer with JSON payload support.
+
+    ``consume`` reads up to ``batch_size`` entries per ``XREADGROUP``, runs at
+    most ``concurrency`` handlers at once and acknowledges finished entries
+    with one multi-id ``XACK`` per loop. Entries left pending by a crashed
+    consumer for longer than ``claim_idle_ms`` are taken over with
+    ``XAUTOCLAIM``; ``None`` disables recovery. While a handler runs, its
+    entry is re-claimed with ``XCLAIM ... JUSTID`` every half idle window so
+    neither this nor another consumer takes it over mid-run.
+
+    A claimed entry already delivered ``max_deliveries`` times is moved to
+    ``<stream>:dead`` with its source id and delivery count, then
+    acknowledged, so a poison message stops cycling; ``None`` retries forever.
+    """
 
     def __init__(
         self,
@@ -34,12 +73,22 @@ class EventBroker:
         redis: Redis | None = None,
         *,
         block_ms: int = 1000,
+        batch_size: int = 10,
+        concurrency: int = 10,
+        claim_idle_ms: int | None = 60000,
+        max_deliveries: int | None = 5,
     ) -> None:
         if not url and redis is None:
             raise ValueError("url or redis instance required")
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size and concurrency must be positive")
         self._url = url
         self._redis = redis
         self._block_ms = block_ms
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._claim_idle_ms = claim_idle_ms
+        self._max_deliveries = max_deliveries
 
     async def _conn(self) -> Redis:
         if self._redis is None:
@@ -57,6 +106,9 @@ class EventBroker:
         group: str,
         consumer: str,
         handler: MessageHandler,
+        *,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
     ) -> None:
         redis = await self._conn()
         try:
@@ -65,22 +117,135 @@ class EventBroker:
             if "BUSYGROUP" not in str(exc):
                 raise
 
-        while True:
-            entries = await redis.xreadgroup(
-                group,
-                consumer,
-                {stream: ">"},
-                count=1,
-                block=self._block_ms,
+        batch_size = batch_size or self._batch_size
+        concurrency = concurrency or self._concurrency
+        loop = asyncio.get_running_loop()
+        in_flight: set[asyncio.Task[None]] = set()
+        in_flight_ids: set[str] = set()
+        done_ids: list[str] = []
+        claim_cursor = "0-0"
+        # Recover on startup, then at most once per idle window.
+        next_claim_at = loop.time()
+        next_heartbeat_at = loop.time()
+
+        async def run(message_id: str, payload: dict[str, str]) -> None:
+            try:
+                await handler(_decode_message(payload))
+            except Exception:
+                # Left pending so XAUTOCLAIM can redeliver it.
+                logger.exception("Handler failed for %s entry %s", stream, message_id)
+                return
+            finally:
+                in_flight_ids.discard(message_id)
+            done_ids.append(message_id)
+
+        def dispatch(messages: list[tuple[str, dict[str, str] | None]]) -> None:
+            for message_id, payload in messages:
+                in_flight_ids.add(message_id)
+                task = asyncio.create_task(run(message_id, payload))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+        async def dead_letter(message_id: str, payload: dict[str, str], deliveries: int) -> None:
+            await redis.xadd(
+                f"{stream}:dead",
+                {
+                    **payload,
+                    "_source_id": json.dumps(message_id),
+                    "_deliveries": json.dumps(deliveries),
+                },
+            )
+            done_ids.append(message_id)
+            logger.error(
+                "Moved %s entry %s to %s:dead after %d deliveries",
+                stream,
+                message_id,
+                stream,
+                deliveries,
             )
-            if not entries:
-                await asyncio.sleep(0)
-                continue
-
-            for _stream_name, messages in entries:
-                for message_id, payload in messages:
-                    await handler(_decode_message(payload))
-                    await redis.xack(stream, group, message_id)
+
+        async def recover(
+            claimed: list[tuple[str, dict[str, str] | None]],
+        ) -> list[tuple[str, dict[str, str]]]:
+            runnable = []
+            for message_id, payload in claimed:
+                if message_id in in_flight_ids:
+                    continue
+                if not payload:
+                    # Entries trimmed from the stream come back without a payload.
+                    done_ids.append(message_id)
+                    continue
+                if self._max_deliveries is not None:
+                    deliveries = await _delivery_count(redis, stream, group, message_id)
+                    if deliveries > self._max_deliveries:
+                        await dead_letter(message_id, payload, deliveries - 1)
+                        continue
+                runnable.append((message_id, payload))
+            return runnable
+
+        async def ack() -> None:
+            if done_ids:
+                ids = list(done_ids)
+                done_ids.clear()
+                await redis.xack(stream, group, *ids)
+
+        try:
+            while True:
+                await ack()
+                free = concurrency - len(in_flight)
+                if free <= 0:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                count = min(batch_size, free)
+
+                if (
+                    self._claim_idle_ms is not None
+                    and in_flight_ids
+                    and loop.time() >= next_heartbeat_at
+                ):
+                    # Reset the idle time of running entries without counting a delivery.
+                    await redis.xclaim(
+                        stream, group, consumer, 0, list(in_flight_ids), justid=True
+                    )
+                    next_heartbeat_at = loop.time() + self._claim_idle_ms / 2000
+
+                if self._claim_idle_ms is not None and loop.time() >= next_claim_at:
+                    claim_cursor, claimed = await _autoclaim(
+                        redis, stream, group, consumer, self._claim_idle_ms, claim_cursor, count
+                    )
+                    if claim_cursor == "0-0":
+                        next_claim_at = loop.time() + max(self._claim_idle_ms, 1000) / 1000
+                    runnable = await recover(claimed)
+                    if runnable:
+                        dispatch(runnable)
+                        continue
+
+                # Do not hold finished acks behind a long blocking read.
+                entries = await redis.xreadgroup(
+                    group,
+                    consumer,
+                    {stream: ">"},
+                    count=count,
+                    block=None if in_flight else self._block_ms,
+                )
+                messages = [message for _stream, batch in entries or [] for message in batch]
+                if messages:
+                    dispatch(messages)
+                elif in_flight:
+                    await asyncio.wait(
+                        in_flight,
+                        timeout=self._block_ms / 1000,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                else:
+                    await asyncio.sleep(0)
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            with suppress(Exception):
+                await ack()
 
     async def close(self) -> None:
         if self._redis is not None:
@@ -0,0 +1,23 @@
+"""Fill ``BillingSubscription`` from Stripe before the first deploy that reads it.
+
+``get_user_plan_tier`` only reads the local table, so run this once after
+``alembic upgrade`` reaches ``0010_billing_subscriptions`` and before serving
+traffic; otherwise paying users resolve to the free tier until the
+reconciler's first pass.
+"""
+from __future__ import annotations
+
+import asyncio
+
+from services.billing.service import STUB_MODE, reconcile_subscriptions
+
+
+def main() -> None:
+    if STUB_MODE:
+        raise SystemExit("Set STRIPE_SECRET_KEY and BILLING_STUB_MODE=false to backfill.")
+    changed = asyncio.run(reconcile_subscriptions())
+    print(f"Backfilled {changed} billing subscription rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark `EventBroker.consume` throughput per orchestrator stage.
+
+Publishes ``--messages`` entries to each orchestrator stream and drains them
+with a handler that sleeps ``--handler-ms`` to stand in for the downstream
+HTTP call, once with the previous one-at-a-time settings (batch 1,
+concurrency 1) and once with ``--batch-size``/``--concurrency``. Uses
+``fakeredis`` when it is installed, otherwise the Redis at ``--redis-url``.
+Run from the repository root:
+
+    python scripts/benchmark_event_broker.py --messages 500 --handler-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from contextlib import suppress
+from pathlib import Path
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from packages.broker import EventBroker  # noqa: E402
+from services.orchestrator import workers  # noqa: E402
+
+STAGES = (
+    workers.TREND_SIGNALS_STREAM,
+    workers.IDEAS_READY_STREAM,
+    workers.IMAGES_READY_STREAM,
+    workers.PRODUCTS_READY_STREAM,
+)
+
+
+def _redis_client(url: str):
+    try:
+        from fakeredis import aioredis
+    except ModuleNotFoundError:
+        from redis.asyncio import from_url
+
+        return from_url(url, decode_responses=True), "redis"
+    return aioredis.FakeRedis(decode_responses=True), "fakeredis"
+
+
+async def _drain(
+    redis, stream: str, messages: int, handler_ms: float, batch_size: int, concurrency: int
+) -> float:
+    broker = EventBroker(
+        redis=redis, block_ms=50, batch_size=batch_size, concurrency=concurrency
+    )
+    # Fresh stream per run so earlier runs do not leave pending entries behind.
+    stream = f"bench:{stream}:{uuid4().hex[:8]}"
+    for index in range(messages):
+        await broker.publish(stream, {"user_id": 1, "n": index})
+
+    handled = 0
+    finished = asyncio.Event()
+
+    async def handler(_message: dict) -> None:
+        nonlocal handled
+        await asyncio.sleep(handler_ms / 1000)
+        handled += 1
+        if handled >= messages:
+            finished.set()
+
+    started = time.perf_counter()
+    task = asyncio.create_task(broker.consume(stream, "bench", "bench-1", handler))
+    await finished.wait()
+    elapsed = time.perf_counter() - started
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+    await redis.delete(stream)
+    return messages / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--handler-ms", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=workers.CONSUMER_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=workers.CONSUMER_CONCURRENCY)
+    parser.add_argument("--redis-url", default=workers.REDIS_URL)
+    args = parser.parse_args()
+
+    redis, backend = _redis_client(args.redis_url)
+    print(
+        f"backend={backend} messages={args.messages} handler_ms={args.handler_ms} "
+        f"batch_size={args.batch_size} concurrency={args.concurrency}"
+    )
+    for stage in STAGES:
+        serial = await _drain(redis, stage, args.messages, args.handler_ms, 1, 1)
+        batched = await _drain(
+            redis, stage, args.messages, args.handler_ms, args.batch_size, args.concurrency
+        )
+        print(
+            f"{stage:<16} serial={serial:9.1f} msg/s  batched={batched:9.1f} msg/s  "
+            f"speedup={batched / serial:5.1f}x"
+        )
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Benchmark the compiled keyword matcher against per-term classification.
+
+Generates ``--count`` synthetic keywords from the ingestion vocabularies,
+classifies each one (category, POD signal, strong POD signal and noise for
+every weak source and the RSS fallback) with the original per-term checks
+and with ``service.keyword_matcher``, verifies the results are identical
+and prints keywords per second for both. Run from the repository root:
+
+    python scripts/benchmark_keyword_classifier.py --count 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.trend_ingestion import service  # noqa: E402
+
+CASES = ((None, None), ("rss_fallback", None), ("selector_fallback", "amazon"))
+FILLER = ("retro", "funny", "vintage", "cozy", "custom", "minimalist", "summer", "2026")
+
+
+def _contains_term(keyword: str, term: str) -> bool:
+    if " " in term:
+        return f" {term} " in f" {keyword} "
+    return term in keyword.split()
+
+
+def _strong(keyword: str) -> bool:
+    return any(_contains_term(keyword, term) for term in service.STRONG_POD_TERMS)
+
+
+def _noise(keyword: str, method: str | None, source: str | None) -> bool:
+    words = keyword.split()
+    if not words:
+        return True
+    compact = "".join(words)
+    if any(marker in keyword for marker in service.NON_POD_KEYWORD_MARKERS):
+        return True
+    if re.fullmatch(r"[a-f0-9]{6,8}", compact):
+        return True
+    if re.fullmatch(r"[a-z]*\d+[a-z\d]*", compact) and len(words) <= 2:
+        return True
+    if any(word in service.NAVIGATION_OR_TECH_TOKENS for word in words):
+        return True
+    if len(words) == 1 and words[0] in service.TEXT_FALLBACK_STOPWORDS:
+        return True
+    if method == "rss_fallback":
+        if any(term in words for term in service.RSS_NEWS_NOISE_TERMS):
+            return True
+        if not _strong(keyword):
+            return True
+    if source in service.WEAK_PUBLIC_SOURCES_REQUIRE_POD:
+        if not _strong(keyword):
+            return True
+    return False
+
+
+def _categorize(keyword: str) -> str:
+    for category, keys in service.CATEGORIES.items():
+        if any(key in keyword for key in keys):
+            return category
+    return "other"
+
+
+def per_term(keyword: str) -> tuple:
+    return (
+        _categorize(keyword),
+        any(_contains_term(keyword, term) for term in service.POD_ORIENTED_TERMS),
+        _strong(keyword),
+        *(_noise(keyword, method, source) for method, source in CASES),
+    )
+
+
+def compiled(keyword: str) -> tuple:
+    traits = service.keyword_matcher.classify(keyword)
+    return (
+        traits.category,
+        traits.pod_signal,
+        traits.strong_pod_signal,
+        *(
+            traits.is_noise(
+                method=method,
+                requires_pod=source in service.WEAK_PUBLIC_SOURCES_REQUIRE_POD,
+            )
+            for method, source in CASES
+        ),
+    )
+
+
+def keywords(count: int, seed: int) -> list[str]:
+    vocabulary = sorted(
+        {
+            *FILLER,
+            *(key for keys in service.CATEGORIES.values() for key in keys),
+            *service.POD_ORIENTED_TERMS,
+            *service.NON_POD_KEYWORD_MARKERS,
+            *service.NAVIGATION_OR_TECH_TOKENS,
+        }
+    )
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(vocabulary, k=rng.randint(2, 6))) for _ in range(count)]
+
+
+def timed(classify, corpus: list[str]) -> tuple[list[tuple], float]:
+    started = time.perf_counter()
+    results = [classify(keyword) for keyword in corpus]
+    return results, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=14)
+    args = parser.parse_args()
+
+    corpus = keywords(max(1, args.count), args.seed)
+    baseline, baseline_elapsed = timed(per_term, corpus)
+    matched, matched_elapsed = timed(compiled, corpus)
+    mismatches = [kw for kw, a, b in zip(corpus, baseline, matched) if a != b]
+
+    print(f"keywords={len(corpus)}")
+    for label, elapsed in (("per-term", baseline_elapsed), ("compiled", matched_elapsed)):
+        print(f"{label:<10}{elapsed:>8.3f}s{len(corpus) / elapsed:>14,.0f} kw/s")
+    print(f"speedup   {baseline_elapsed / matched_elapsed:>8.2f}x")
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} classifications differ, e.g. {mismatches[:3]}")
+    print("classifications identical")
+
+
+if __name__ == "__main__":
+    main()
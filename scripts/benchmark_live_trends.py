@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Benchmark `get_live_trends` against a seeded TrendSignal table.
+
+Seeds ``--signals`` rows (1M by default) into the database named by
+``DATABASE_URL`` and times the SQL window-function path next to the previous
+load-everything-into-Python path. Run from the repository root:
+
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python scripts/benchmark_live_trends.py
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import select  # noqa: E402
+
+from services.common import database  # noqa: E402
+from services.common.time import utcnow  # noqa: E402
+from services.models import TrendSignal  # noqa: E402
+from services.trend_ingestion.service import get_live_trends, normalize_text  # noqa: E402
+
+SOURCES = ("tiktok", "instagram", "etsy", "amazon", "pinterest", "google_trends_rss")
+CATEGORIES = ("animals", "apparel", "drinkware", "home_decor", "bags", "gifts", "other")
+WORDS = (
+    "funny cat dog mom retro mug vintage poster minimalist wall art cozy hoodie "
+    "teacher gift pickleball tote boho sticker coffee lover plant mama"
+).split()
+
+
+async def seed(total: int, batch_size: int, lookback_hours: int, seed_value: int) -> None:
+    await database.init_db()
+    rng = random.Random(seed_value)
+    now = utcnow()
+    table = TrendSignal.__table__
+    inserted = 0
+    while inserted < total:
+        rows = []
+        for _ in range(min(batch_size, total - inserted)):
+            keyword = " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+            rows.append(
+                {
+                    "source": rng.choice(SOURCES),
+                    "keyword": keyword.title() if rng.random() < 0.3 else keyword,
+                    "normalized_keyword": normalize_text(keyword),
+                    "timestamp": now
+                    - timedelta(minutes=rng.randint(0, lookback_hours * 60 * 2)),
+                    "engagement_score": rng.randint(0, 100_000),
+                    "category": rng.choice(CATEGORIES),
+                    "metadata_json": {"method": "selector_fallback"},
+                }
+            )
+        async with database.engine.begin() as conn:
+            await conn.execute(insert(table), rows)
+        inserted += len(rows)
+    print(f"seeded {inserted} signals")
+
+
+async def legacy_live_trends(lookback_hours: int, per_group_limit: int) -> int:
+    """Previous implementation: load the window, dedupe and page in Python."""
+    cutoff = utcnow() - timedelta(hours=lookback_hours)
+    async with database.get_session() as session:
+        rows = (
+            await session.exec(select(TrendSignal).where(TrendSignal.timestamp >= cutoff))
+        ).all()
+    deduped: dict[tuple[str, str, str], TrendSignal] = {}
+    for row in rows:
+        key = (row.category, row.source, normalize_text(row.keyword))
+        existing = deduped.get(key)
+        if existing is None or row.engagement_score > existing.engagement_score:
+            deduped[key] = row
+    ordered = sorted(deduped.values(), key=lambda row: row.engagement_score, reverse=True)
+    grouped: dict[str, list[TrendSignal]] = {}
+    for row in ordered:
+        items = grouped.setdefault(row.category, [])
+        if len(items) < per_group_limit:
+            items.append(row)
+    return sum(len(items) for items in grouped.values())
+
+
+async def _time(label: str, runs: int, factory) -> None:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await factory()
+        samples.append(time.perf_counter() - started)
+    print(
+        f"{label:<28} median={statistics.median(samples) * 1000:9.1f}ms "
+        f"min={min(samples) * 1000:9.1f}ms runs={runs}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--lookback-hours", type=int, default=24 * 14)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        await seed(args.signals, args.batch_size, args.lookback_hours, args.seed)
+
+    for sort_by in ("engagement_score", "timestamp", "keyword"):
+        await _time(
+            f"sql sort_by={sort_by}",
+            args.runs,
+            lambda sort_by=sort_by: get_live_trends(
+                lookback_hours=args.lookback_hours,
+                per_group_limit=5,
+                sort_by=sort_by,
+                include_meta=True,
+            ),
+        )
+    if not args.skip_legacy:
+        await _time(
+            "legacy python path",
+            args.runs,
+            lambda: legacy_live_trends(args.lookback_hours, 5),
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark batch signal normalization against per-signal normalization.
+
+Builds ``--count`` raw scraped signals (mixed sources, string metrics,
+market examples and repeated keywords, as a refresh produces), normalizes
+them with ``normalize_signal`` one dict at a time and with
+``normalize_signal_batch``, checks the outputs are identical under a pinned
+clock and prints signals per second for both. Run from the repository root:
+
+    python scripts/benchmark_signal_normalization.py --count 50000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.trend_ingestion import service  # noqa: E402
+
+WORDS = (
+    "Funny", "Cat", "Mom", "Retro", "Mug", "Vintage", "Poster", "Wall", "Art",
+    "Hoodie", "Teacher", "Gift", "Tote", "Sticker", "Coffee", "Shirt", "Dog",
+    "Custom", "Boho", "Nursery", "Pickleball", "Tumbler", "😀",
+)
+SOURCES = ("etsy", "amazon", "tiktok", "pinterest", "instagram")
+METRICS = ("1.2k", "3,400", "87", "2.5M", "15k", "")
+
+
+def signals(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    titles = [" ".join(rng.choices(WORDS, k=rng.randint(2, 7))) for _ in range(max(1, count // 5))]
+    batch = []
+    for _ in range(count):
+        title = rng.choice(titles)
+        source = rng.choice(SOURCES)
+        batch.append(
+            {
+                "source": source,
+                "keyword": title,
+                "engagement_score": rng.choice(METRICS),
+                "market_examples": [
+                    {
+                        "title": title,
+                        "source": source,
+                        "source_url": f"https://www.{source}.com/listing/{rng.randint(1, 500)}",
+                        "image_url": "/images/preview.jpg",
+                    }
+                ],
+            }
+        )
+    return batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=15)
+    args = parser.parse_args()
+
+    pinned = service.utcnow()
+    service.utcnow = lambda: pinned
+    corpus = signals(max(1, args.count), args.seed)
+
+    started = time.perf_counter()
+    per_signal = [
+        normalized
+        for normalized in (
+            service.normalize_signal(signal, default_method="selector_fallback")
+            for signal in corpus
+        )
+        if normalized
+    ]
+    per_signal_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = service.normalize_signal_batch(corpus, default_method="selector_fallback")
+    batch_elapsed = time.perf_counter() - started
+
+    print(f"signals={len(corpus)} kept={len(batched)}")
+    for label, elapsed in (("per-signal", per_signal_elapsed), ("batch", batch_elapsed)):
+        print(f"{label:<12}{elapsed:>8.3f}s{len(corpus) / elapsed:>14,.0f} sig/s")
+    print(f"speedup     {per_signal_elapsed / batch_elapsed:>8.2f}x")
+    if batched != per_signal:
+        raise SystemExit("batch output differs from per-signal normalization")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark trend ingestion offline from recorded page snapshots.
+
+``--record`` runs one live ``_gather_trends`` and stores every fetched page
+and the RSS feed under ``--snapshot-dir/--version``. Without it, the script
+replays that snapshot set through ``refresh_trends`` ``--runs`` times, with
+no network access, and reports per-stage timings (fetch, extract,
+normalize, persist) and signals per second for each source. Selector
+replay still needs a local Chromium (``python -m playwright install
+chromium``). Run from the repository root:
+
+    python scripts/benchmark_trend_ingestion.py --record --version 2026-10
+    python scripts/benchmark_trend_ingestion.py --version 2026-10 --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench_trends.db")
+
+from services.common import database  # noqa: E402
+from services.trend_ingestion import service, snapshots  # noqa: E402
+from services.trend_ingestion.circuit_breaker import CircuitBreaker  # noqa: E402
+
+STAGES = ("fetch", "extract", "normalize", "persist")
+
+
+async def record(store: snapshots.SnapshotStore) -> None:
+    service.snapshot_store = store
+    signals, meta = await service._gather_trends()
+    manifest = store.manifest()
+    print(
+        f"recorded {len(manifest['entries'])} snapshots into {store.directory} "
+        f"({len(signals)} signals, mode={meta.get('mode')})"
+    )
+
+
+async def replay(store: snapshots.SnapshotStore, runs: int) -> None:
+    if not store.manifest()["entries"]:
+        raise SystemExit(f"No snapshots under {store.directory}; run with --record first")
+    service.snapshot_store = store
+    timings: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    service.stage_observers.append(
+        lambda platform, stage, seconds: timings[platform].__setitem__(
+            stage, timings[platform][stage] + seconds
+        )
+    )
+    await database.init_db()
+    collected: dict[str, int] = defaultdict(int)
+    started = time.perf_counter()
+    for _ in range(runs):
+        # A fresh breaker per run so one replayed failure does not skip later runs.
+        service.scraper_circuit_breaker = CircuitBreaker()
+        status = await service.refresh_trends()
+        for name, diagnostic in status["source_diagnostics"].items():
+            collected[name] += int(diagnostic.get("collected") or 0)
+    elapsed = time.perf_counter() - started
+
+    print(f"snapshot={store.directory} runs={runs} total={elapsed:.2f}s")
+    print(f"{'source':<20}" + "".join(f"{stage + ' ms':>14}" for stage in STAGES) + f"{'signals':>10}{'sig/s':>10}")
+    for name in sorted(set(timings) | set(collected)):
+        stages = timings.get(name, {})
+        busy = sum(stages.get(stage, 0.0) for stage in STAGES)
+        rate = collected[name] / busy if busy else 0.0
+        print(
+            f"{name:<20}"
+            + "".join(f"{stages.get(stage, 0.0) * 1000 / runs:>14.1f}" for stage in STAGES)
+            + f"{collected[name] / runs:>10.1f}{rate:>10.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot-dir", default=snapshots.SNAPSHOT_DIR)
+    parser.add_argument("--version", default=snapshots.SNAPSHOT_VERSION)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    service.STUB_ONLY = False
+    service.ALLOW_STUB_FALLBACK = False
+    service.RSS_FALLBACK_ENABLED = True
+    mode = "record" if args.record else "replay"
+    store = snapshots.SnapshotStore(args.snapshot_dir, args.version, mode)
+    try:
+        if args.record:
+            await record(store)
+        else:
+            await replay(store, max(1, args.runs))
+    finally:
+        await service.browser_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
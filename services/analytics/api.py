@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, Dict
 
@@ -8,8 +9,16 @@ from ..common.observability import register_observability
 from ..models import EventType
 from .middleware import AnalyticsMiddleware
 from .service import get_summary, get_trending_keywords, list_events, log_event
+from .sink import stop_event_sink
 
-app = FastAPI()
+
+@asynccontextmanager
+async def _analytics_lifespan(_: FastAPI):
+    yield
+    await stop_event_sink()
+
+
+app = FastAPI(lifespan=_analytics_lifespan)
 register_observability(app, service_name="analytics")
 app.add_middleware(AnalyticsMiddleware)
 router = APIRouter(prefix="/api/analytics")
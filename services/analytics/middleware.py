@@ -1,7 +1,7 @@
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
-from .service import log_event
+from .sink import enqueue_event
 
 
 class AnalyticsMiddleware(BaseHTTPMiddleware):
@@ -9,5 +9,6 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         response: Response = await call_next(request)
         # Avoid logging analytics endpoints to prevent recursion
         if not request.url.path.startswith(("/analytics", "/api/analytics")):
-            await log_event("page_view", request.url.path)
+            # Buffered; the sink batches writes off the request path.
+            await enqueue_event("page_view", request.url.path)
         return response
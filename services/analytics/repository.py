@@ -1,7 +1,12 @@
+from typing import Any, Dict, Sequence
+
 from sqlmodel import select
+from sqlalchemy import insert
 from sqlalchemy.sql import func, case
 from sqlmodel.ext.asyncio.session import AsyncSession
-from ..models import AnalyticsEvent
+from ..models import AnalyticsEvent, AnalyticsEventRollup
+
+_METRIC_EVENT_TYPES = ("page_view", "click", "conversion")
 
 
 async def create_event(session: AsyncSession, event: AnalyticsEvent) -> AnalyticsEvent:
@@ -11,6 +16,15 @@ async def create_event(session: AsyncSession, event: AnalyticsEvent) -> Analytic
     return event
 
 
+async def create_events(session: AsyncSession, rows: Sequence[Dict[str, Any]]) -> int:
+    """Insert ``rows`` with a single multi-row INSERT and commit."""
+    if not rows:
+        return 0
+    await session.exec(insert(AnalyticsEvent.__table__).values(list(rows)))
+    await session.commit()
+    return len(rows)
+
+
 def _event_query(event_type: str | None = None):
     stmt = select(AnalyticsEvent)
     if event_type:
@@ -26,6 +40,11 @@ async def fetch_events(
 
 
 async def aggregate_metrics(session: AsyncSession):
+    """Per-path view/click/conversion totals over raw events plus rollups.
+
+    Events removed by retention live on as daily ``AnalyticsEventRollup``
+    counts, so totals do not drop when raw rows are archived.
+    """
     stmt = select(
         AnalyticsEvent.path,
         func.sum(
@@ -38,5 +57,29 @@ async def aggregate_metrics(session: AsyncSession):
             case((AnalyticsEvent.event_type == "conversion", 1), else_=0)
         ).label("conversions"),
     ).group_by(AnalyticsEvent.path)
-    result = await session.exec(stmt)
-    return result.all()
+    rollup_stmt = (
+        select(
+            AnalyticsEventRollup.path,
+            *(
+                func.sum(
+                    case(
+                        (
+                            AnalyticsEventRollup.event_type == event_type,
+                            AnalyticsEventRollup.event_count,
+                        ),
+                        else_=0,
+                    )
+                )
+                for event_type in _METRIC_EVENT_TYPES
+            ),
+        )
+        .where(AnalyticsEventRollup.granularity == "day")
+        .group_by(AnalyticsEventRollup.path)
+    )
+    totals: Dict[str, list[int]] = {}
+    for statement in (stmt, rollup_stmt):
+        for path, *counts in (await session.exec(statement)).all():
+            current = totals.setdefault(path, [0, 0, 0])
+            for index, count in enumerate(counts):
+                current[index] += int(count or 0)
+    return [(path, *counts) for path, counts in totals.items()]
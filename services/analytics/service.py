@@ -9,7 +9,8 @@ from sqlmodel import select
 from .repository import aggregate_metrics, create_event, fetch_events
 from ..common.database import get_session
 from ..common.time import utcnow
-from ..models import AnalyticsEvent, EventType, Trend, TrendSignal
+from ..common.trend_rollups import top_rollup_keywords
+from ..models import AnalyticsEvent, EventType, Trend
 
 STRIPE_API_KEY = os.getenv("STRIPE_API_KEY")
 
@@ -44,17 +45,22 @@ async def log_event(
         )
         created = await create_event(session, event)
     if event_type == EventType.conversion:
-        quantity = 1
-        if meta and isinstance(meta, dict):
-            raw = meta.get("quantity") or meta.get("value")
-            try:
-                quantity = max(1, int(raw))
-            except (TypeError, ValueError):
-                quantity = 1
-        asyncio.create_task(_report_conversion_to_stripe(quantity))
+        report_conversion(meta)
     return created
 
 
+def report_conversion(meta: Dict[str, Any] | None = None) -> None:
+    """Schedule a Stripe usage report for one conversion event."""
+    quantity = 1
+    if meta and isinstance(meta, dict):
+        raw = meta.get("quantity") or meta.get("value")
+        try:
+            quantity = max(1, int(raw))
+        except (TypeError, ValueError):
+            quantity = 1
+    asyncio.create_task(_report_conversion_to_stripe(quantity))
+
+
 async def list_events(event_type: EventType | None = None):
     async with get_session() as session:
         return await fetch_events(session, event_type)
@@ -85,33 +91,21 @@ def _normalize_keyword(value: str | None) -> str:
 
 
 async def get_trending_keywords(limit: int = 10, lookback_hours: int = 24 * 7):
-    """Return top keywords from live trend signals with a Trend table fallback."""
+    """Return top keywords from the trend rollups with a Trend table fallback."""
     cutoff = utcnow() - timedelta(hours=max(1, lookback_hours))
-    keyword_scores: dict[str, int] = {}
+    clamped_limit = max(1, min(limit, 50))
 
     async with get_session() as session:
-        stmt = select(TrendSignal.keyword, TrendSignal.engagement_score).where(
-            TrendSignal.timestamp >= cutoff
-        )
-        signal_rows = (await session.exec(stmt)).all()
-
-        for keyword, score in signal_rows:
-            term = _normalize_keyword(keyword)
-            if not term:
-                continue
-            weight = max(1, int(score or 0))
-            keyword_scores[term] = keyword_scores.get(term, 0) + weight
-
-        if not keyword_scores:
+        ranked = await top_rollup_keywords(session, cutoff, clamped_limit)
+        if not ranked:
+            keyword_scores: dict[str, int] = {}
             fallback_stmt = select(Trend.term).where(Trend.created_at >= cutoff)
             trend_rows = (await session.exec(fallback_stmt)).all()
             for term in trend_rows:
                 normalized = _normalize_keyword(term)
                 if normalized:
                     keyword_scores[normalized] = keyword_scores.get(normalized, 0) + 1
-
-    clamped_limit = max(1, min(limit, 50))
-    ranked = sorted(keyword_scores.items(), key=lambda item: (-item[1], item[0]))[
-        :clamped_limit
-    ]
+            ranked = sorted(keyword_scores.items(), key=lambda item: (-item[1], item[0]))[
+                :clamped_limit
+            ]
     return [{"term": term, "clicks": clicks} for term, clicks in ranked]
@@ -0,0 +1,212 @@
+"""Buffered analytics event sink.
+
+``AnalyticsMiddleware`` enqueues page views here instead of awaiting a
+commit per request. A background task drains the bounded queue and writes
+multi-row INSERTs every ``ANALYTICS_SINK_BATCH_SIZE`` events or
+``ANALYTICS_SINK_FLUSH_MS`` milliseconds, whichever comes first. When the
+queue is full, producers wait up to ``ANALYTICS_SINK_ENQUEUE_TIMEOUT_MS``
+for room and then drop the event; both outcomes are counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+from ..common.database import get_session
+from ..common.observability import Counter, Gauge, Histogram
+from ..common.time import utcnow
+from ..models import EventType
+from . import service
+from .repository import create_events
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUE = int(os.getenv("ANALYTICS_SINK_MAX_QUEUE", "10000"))
+BATCH_SIZE = int(os.getenv("ANALYTICS_SINK_BATCH_SIZE", "200"))
+FLUSH_MS = int(os.getenv("ANALYTICS_SINK_FLUSH_MS", "250"))
+ENQUEUE_TIMEOUT_MS = int(os.getenv("ANALYTICS_SINK_ENQUEUE_TIMEOUT_MS", "0"))
+
+SINK_EVENTS = Counter(
+    "pod_analytics_sink_events_total",
+    "Analytics sink events by outcome (queued, backpressured, dropped, written, failed)",
+    labelnames=("outcome",),
+)
+SINK_QUEUE_DEPTH = Gauge(
+    "pod_analytics_sink_queue_depth",
+    "Events waiting in a buffered sink",
+    labelnames=("sink",),
+)
+SINK_FLUSH_LATENCY = Histogram(
+    "pod_analytics_sink_flush_seconds",
+    "Duration of analytics sink batch writes",
+    labelnames=("status",),
+)
+
+_STOP = object()
+
+
+class AnalyticsEventSink:
+    """Bounded in-process queue flushed to ``AnalyticsEvent`` in batches."""
+
+    def __init__(
+        self,
+        *,
+        max_queue: int = MAX_QUEUE,
+        batch_size: int = BATCH_SIZE,
+        flush_ms: int = FLUSH_MS,
+        enqueue_timeout_ms: int = ENQUEUE_TIMEOUT_MS,
+    ) -> None:
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_ms) / 1000
+        self.enqueue_timeout = max(0, enqueue_timeout_ms) / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            if self._loop is not loop:
+                # Queues are bound to the loop that created them.
+                self._queue = asyncio.Queue(maxsize=self.max_queue)
+                self._loop = loop
+            self._task = loop.create_task(self._run())
+        return self._queue  # type: ignore[return-value]
+
+    async def enqueue(
+        self,
+        event_type: EventType | str,
+        path: str,
+        user_id: int | None = None,
+        meta: Dict[str, Any] | None = None,
+    ) -> bool:
+        """Buffer one event; return ``False`` when it had to be dropped."""
+        queue = self._ensure_started()
+        row = {
+            "event_type": EventType(event_type),
+            "path": path,
+            "user_id": user_id,
+            "metadata": meta,
+            "created_at": utcnow(),
+        }
+        try:
+            queue.put_nowait(row)
+        except asyncio.QueueFull:
+            SINK_EVENTS.labels("backpressured").inc()
+            if not self.enqueue_timeout:
+                SINK_EVENTS.labels("dropped").inc()
+                return False
+            try:
+                await asyncio.wait_for(queue.put(row), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                SINK_EVENTS.labels("dropped").inc()
+                return False
+        SINK_EVENTS.labels("queued").inc()
+        SINK_QUEUE_DEPTH.labels("analytics").set(queue.qsize())
+        return True
+
+    async def flush(self) -> None:
+        """Wait until every event enqueued so far has been written."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        self._ensure_started()
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Flush buffered events and stop the background writer."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            batch: List[Dict[str, Any]] = []
+            taken = 1
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            deadline = loop.time() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            try:
+                await self._write(batch)
+            finally:
+                for _ in range(taken):
+                    queue.task_done()
+                SINK_QUEUE_DEPTH.labels("analytics").set(queue.qsize())
+        # Producers may have raced the stop sentinel; write whatever is left.
+        leftover: List[Dict[str, Any]] = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not _STOP:
+                leftover.append(item)
+            queue.task_done()
+        for start in range(0, len(leftover), self.batch_size):
+            await self._write(leftover[start:start + self.batch_size])
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            async with get_session() as session:
+                await create_events(session, batch)
+        except Exception:
+            SINK_FLUSH_LATENCY.labels("error").observe(time.perf_counter() - start)
+            SINK_EVENTS.labels("failed").inc(len(batch))
+            logger.exception("Failed to flush %d analytics events", len(batch))
+            return
+        SINK_FLUSH_LATENCY.labels("ok").observe(time.perf_counter() - start)
+        SINK_EVENTS.labels("written").inc(len(batch))
+        for row in batch:
+            if row["event_type"] == EventType.conversion:
+                service.report_conversion(row["metadata"])
+
+
+event_sink = AnalyticsEventSink()
+
+
+async def enqueue_event(
+    event_type: EventType | str,
+    path: str,
+    user_id: int | None = None,
+    meta: Dict[str, Any] | None = None,
+) -> bool:
+    return await event_sink.enqueue(event_type, path, user_id, meta)
+
+
+async def flush_events() -> None:
+    await event_sink.flush()
+
+
+async def stop_event_sink() -> None:
+    await event_sink.stop()
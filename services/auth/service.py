@@ -14,6 +14,20 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlmodel import delete, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..common.cache import (
+    CACHE_TTL_SESSION,
+    FillGeneration,
+    InMemoryCache,
+    cache_delete,
+    cache_generation,
+    cache_get,
+    cache_key,
+    cache_set,
+    invalidation_listener_live,
+    publish_invalidation,
+    shared_cache_enabled,
+    subscribe_invalidations,
+)
 from ..common.database import get_session
 from ..common.quotas import ensure_quota_state
 from ..common.time import utcnow
@@ -87,8 +101,26 @@ STATE_TTL_MINUTES = int(os.getenv("OAUTH_STATE_TTL_MINUTES", "15"))
 CREDENTIAL_RETENTION_DAYS = int(os.getenv("OAUTH_CREDENTIAL_RETENTION_DAYS", "30"))
 CLEANUP_INTERVAL_MINUTES = int(os.getenv("OAUTH_CLEANUP_INTERVAL_MINUTES", "60"))
 
+SESSION_CACHE_MAX_SIZE = int(os.getenv("SESSION_CACHE_MAX_SIZE", "10000"))
+SESSION_INVALIDATION_NAMESPACE = "session"
+
 _cleanup_scheduler = AsyncIOScheduler()
 
+# token hash -> (user_id, expires_at); entries never outlive the session.
+_session_cache = InMemoryCache(max_size=SESSION_CACHE_MAX_SIZE, name="session")
+# Tombstones for revoked token hashes, so a resolve that read its row before
+# the revoke cannot cache it afterwards. Hashes are never reissued, and a
+# tombstone only has to outlive resolves already in flight.
+_revoked_sessions = InMemoryCache(max_size=SESSION_CACHE_MAX_SIZE, name="session_revoked")
+
+
+def _drop_session(token_hash: str) -> None:
+    _revoked_sessions.set(token_hash, True, ttl=CACHE_TTL_SESSION)
+    _session_cache.delete(token_hash)
+
+
+subscribe_invalidations(SESSION_INVALIDATION_NAMESPACE, _drop_session)
+
 
 def _require_env(var: str) -> str:
     value = os.getenv(var)
@@ -125,8 +157,65 @@ async def create_session(user_id: int, ttl_hours: int = 24) -> tuple[str, dateti
     return token, expires_at
 
 
+async def _cached_session(token_hash: str) -> Optional[int]:
+    # Without the listener, revokes on other workers would not reach this
+    # worker's copy, so the local cache is bypassed.
+    entry = _session_cache.get(token_hash) if invalidation_listener_live() else None
+    if entry is None and shared_cache_enabled():
+        shared = await cache_get(cache_key("session", token_hash))
+        if shared:
+            entry = (int(shared["user_id"]), datetime.fromisoformat(shared["expires_at"]))
+            await _remember_session(token_hash, *entry, share=False)
+    if entry is None:
+        return None
+    user_id, expires_at = entry
+    if expires_at < utcnow():
+        await _forget_session(token_hash)
+        return None
+    return user_id
+
+
+async def _remember_session(
+    token_hash: str,
+    user_id: int,
+    expires_at: datetime,
+    *,
+    share: bool = True,
+    generation: FillGeneration | None = None,
+) -> None:
+    ttl = min(CACHE_TTL_SESSION, (expires_at - utcnow()).total_seconds())
+    if ttl <= 0:
+        return
+    if invalidation_listener_live():
+        _session_cache.set(token_hash, (user_id, expires_at), ttl=ttl)
+    # Checked after the write: _drop_session tombstones before it deletes, so
+    # a revoke racing this write is seen by one side or the other.
+    if _revoked_sessions.get(token_hash) is not None:
+        _session_cache.delete(token_hash)
+        return
+    if share and shared_cache_enabled():
+        await cache_set(
+            cache_key("session", token_hash),
+            {"user_id": user_id, "expires_at": expires_at.isoformat()},
+            ttl=max(1, int(ttl)),
+            generation=generation,
+        )
+
+
+async def _forget_session(token_hash: str) -> None:
+    if shared_cache_enabled():
+        await cache_delete(cache_key("session", token_hash))
+    # Drops the local entry and tells other workers to drop theirs.
+    await publish_invalidation(SESSION_INVALIDATION_NAMESPACE, token_hash)
+
+
 async def resolve_session_token(token: str) -> Optional[int]:
     token_hash = _hash_sha256(token)
+    cached = await _cached_session(token_hash)
+    if cached is not None:
+        return cached
+    # Other workers' revokes bump this, so the shared write below is skipped.
+    generation = await cache_generation(cache_key("session", token_hash))
     async with get_session() as session:
         result = await session.exec(
             select(UserSession).where(UserSession.token_hash == token_hash)
@@ -138,6 +227,9 @@ async def resolve_session_token(token: str) -> Optional[int]:
             await session.delete(record)
             await session.commit()
             return None
+        await _remember_session(
+            token_hash, record.user_id, record.expires_at, generation=generation
+        )
         return record.user_id
 
 
@@ -151,6 +243,7 @@ async def revoke_session(token: str) -> None:
         if record:
             await session.delete(record)
             await session.commit()
+    await _forget_session(token_hash)
 
 
 def _generate_code_verifier() -> str:
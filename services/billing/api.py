@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import logging
+from contextlib import asynccontextmanager
+from datetime import timezone
 from typing import Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Header, Request
@@ -15,13 +17,26 @@ from .service import (
     STUB_MODE,
     get_or_create_customer,
     create_portal_session,
+    get_subscription_state,
     get_user_plan_tier,
+    start_reconciler,
+    stop_reconciler,
 )
 from .webhooks import verify_webhook_signature, process_webhook_event
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def _billing_lifespan(_: FastAPI):
+    start_reconciler()
+    try:
+        yield
+    finally:
+        stop_reconciler()
+
+
+app = FastAPI(lifespan=_billing_lifespan)
 
 
 class SubscriptionResponse(BaseModel):
@@ -90,10 +105,16 @@ async def get_subscription(user_id: int = Depends(require_user_id)):
             ),
         )
 
-        # If not on free tier, try to get subscription details
+        # If not on free tier, add the locally materialized subscription details
         if plan_tier != PlanTier.FREE and not STUB_MODE:
-            # In a full implementation, we would look up cached subscription data
-            pass
+            record = await get_subscription_state(user_id)
+            if record is not None:
+                response.subscription_id = record.stripe_subscription_id
+                response.status = record.status
+                if record.current_period_end is not None:
+                    response.current_period_end = int(
+                        record.current_period_end.replace(tzinfo=timezone.utc).timestamp()
+                    )
 
         return response
 
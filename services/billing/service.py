@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional
 import re
 
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
 try:
     import stripe
 except ModuleNotFoundError:  # pragma: no cover - exercised in minimal local envs
@@ -58,6 +63,18 @@ except ModuleNotFoundError:  # pragma: no cover - exercised in minimal local env
 
     stripe = _StripeFallback()
 
+from ..common.cache import (
+    InMemoryCache,
+    invalidate_tags,
+    publish_invalidation,
+    subscribe_invalidations,
+    user_tag,
+)
+from ..common import database
+from ..common.database import get_session
+from ..common.distributed_lock import DistributedSingleFlight, build_lease_backend
+from ..common.time import utcnow
+from ..models import BillingSubscription
 from .plans import PlanTier, get_plan_limits, get_tier_from_stripe_product
 
 logger = logging.getLogger(__name__)
@@ -71,6 +88,29 @@ STUB_MODE = (
 )
 
 
+PLAN_TIER_CACHE_TTL_SECONDS = int(os.getenv("PLAN_TIER_CACHE_TTL_SECONDS", "30"))
+PLAN_TIER_CACHE_MAX_SIZE = int(os.getenv("PLAN_TIER_CACHE_MAX_SIZE", "10000"))
+RECONCILE_INTERVAL_MINUTES = int(os.getenv("BILLING_RECONCILE_INTERVAL_MINUTES", "30"))
+RECONCILE_LOCK_REDIS_URL = os.getenv(
+    "BILLING_RECONCILE_LOCK_REDIS_URL", os.getenv("REDIS_URL", "")
+)
+ACTIVE_SUBSCRIPTION_STATUSES = {"active"}
+PLAN_TIER_INVALIDATION_NAMESPACE = "plan_tier"
+
+# user id -> plan tier value, read through from BillingSubscription.
+_plan_tier_cache = InMemoryCache(max_size=PLAN_TIER_CACHE_MAX_SIZE, name="plan_tier")
+subscribe_invalidations(PLAN_TIER_INVALIDATION_NAMESPACE, _plan_tier_cache.delete)
+_reconcile_scheduler = AsyncIOScheduler()
+reconcile_flight = DistributedSingleFlight(
+    "billing-reconcile",
+    build_lease_backend(
+        redis_url=RECONCILE_LOCK_REDIS_URL,
+        database_url=database.DATABASE_URL,
+        engine_factory=lambda: database.engine,
+    ),
+)
+
+
 class BillingError(Exception):
     """Billing-related error."""
 
@@ -228,57 +268,103 @@ async def get_subscription_for_customer(customer_id: str) -> Optional[dict]:
         raise BillingError(_format_stripe_error("Failed to get subscription", e)) from e
 
 
+def _effective_tier(record: BillingSubscription | None) -> PlanTier:
+    if record is None or record.status not in ACTIVE_SUBSCRIPTION_STATUSES:
+        return PlanTier.FREE
+    try:
+        return PlanTier(record.plan_tier)
+    except ValueError:
+        return PlanTier.FREE
+
+
+async def get_subscription_state(user_id: int) -> Optional[BillingSubscription]:
+    """Return the locally materialized subscription row for a user."""
+    async with get_session() as session:
+        result = await session.exec(
+            select(BillingSubscription).where(BillingSubscription.user_id == user_id)
+        )
+        return result.first()
+
+
 async def get_user_plan_tier(user_id: int) -> PlanTier:
     """Get the plan tier for a user.
 
-    In a full implementation, this would query the database for the cached
-    subscription info rather than calling Stripe directly.
+    Reads the subscription state that webhooks and the reconciler keep in
+    ``BillingSubscription`` through a short in-process TTL cache; Stripe is
+    never called on this path.
     """
     if STUB_MODE:
         return PlanTier.FREE
 
-    # This is a simplified version - in production, we would query our database
-    # which is updated by webhooks
-    try:
-        # Search for customer by user_id metadata
-        customers = stripe.Customer.search(query=f"metadata['user_id']:'{user_id}'")
-        if not customers.data:
-            return PlanTier.FREE
-
-        customer_id = customers.data[0].id
-        subscription = await get_subscription_for_customer(customer_id)
-
-        if subscription and subscription.get("status") == "active":
-            return PlanTier(subscription["plan_tier"])
+    cached = _plan_tier_cache.get(str(user_id))
+    if cached is not None:
+        return PlanTier(cached)
 
-        return PlanTier.FREE
-    except stripe.error.StripeError as exc:
-        logger.warning(
-            "Falling back to free tier for user %s due to Stripe error: %s",
-            user_id,
-            exc,
-        )
-        return PlanTier.FREE
-    except Exception:
-        # Default to free tier on any unexpected error.
+    try:
+        record = await get_subscription_state(user_id)
+    except Exception as exc:
+        # Default to free tier on any unexpected error, without caching it.
+        logger.warning("Falling back to free tier for user %s: %s", user_id, exc)
         return PlanTier.FREE
 
+    tier = _effective_tier(record)
+    _plan_tier_cache.set(str(user_id), tier.value, ttl=PLAN_TIER_CACHE_TTL_SECONDS)
+    return tier
 
-async def update_user_quotas_from_subscription(
-    user_id: int,
-    subscription_id: str,
-    product_id: str,
-) -> dict:
-    """Update user quotas based on their subscription.
 
-    This is called by webhook handlers when subscription changes.
-    Returns the updated quota limits.
+async def store_subscription_state(
+    user_id: int,
+    *,
+    plan_tier: PlanTier,
+    status: str,
+    customer_id: str | None = None,
+    subscription_id: str | None = None,
+    product_id: str | None = None,
+    current_period_end: datetime | None = None,
+    unless_updated_after: datetime | None = None,
+) -> BillingSubscription | None:
+    """Upsert a user's subscription row and drop cached tiers in every worker.
+
+    With ``unless_updated_after`` the row is left alone, and None returned,
+    when it was written after that time, e.g. by a webhook that arrived after
+    the reconciler's Stripe snapshot was taken.
     """
-    plan_tier = get_tier_from_stripe_product(product_id)
+    for attempt in range(2):
+        async with get_session() as session:
+            query = select(BillingSubscription).where(BillingSubscription.user_id == user_id)
+            if unless_updated_after is not None:
+                query = query.with_for_update()
+            record = (await session.exec(query)).first()
+            if (
+                record is not None
+                and unless_updated_after is not None
+                and record.updated_at > unless_updated_after
+            ):
+                return None
+            record = record or BillingSubscription(user_id=user_id)
+            record.plan_tier = plan_tier.value
+            record.status = status
+            record.stripe_customer_id = customer_id or record.stripe_customer_id
+            record.stripe_subscription_id = subscription_id or record.stripe_subscription_id
+            record.product_id = product_id
+            record.current_period_end = current_period_end
+            record.updated_at = utcnow()
+            session.add(record)
+            try:
+                await session.commit()
+                break
+            except IntegrityError:
+                # A concurrent first write created the row; apply ours on top.
+                await session.rollback()
+                if attempt:
+                    raise
+    await publish_invalidation(PLAN_TIER_INVALIDATION_NAMESPACE, str(user_id))
+    await invalidate_tags(user_tag(user_id))
+    return record
+
+
+def _limits_payload(plan_tier: PlanTier) -> dict:
     limits = get_plan_limits(plan_tier)
-
-    # In a full implementation, this would update the database
-    # For now, return the limits that should be applied
     return {
         "plan_tier": plan_tier.value,
         "monthly_listings": limits.monthly_listings,
@@ -289,6 +375,41 @@ async def update_user_quotas_from_subscription(
     }
 
 
+def _period_end(value: object) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromtimestamp(int(value), tz=timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+async def update_user_quotas_from_subscription(
+    user_id: int,
+    subscription_id: str,
+    product_id: str,
+    *,
+    customer_id: str | None = None,
+    status: str = "active",
+    current_period_end: datetime | None = None,
+) -> dict:
+    """Persist a user's subscription and return the quota limits it grants.
+
+    This is called by webhook handlers when subscription changes.
+    """
+    plan_tier = get_tier_from_stripe_product(product_id)
+    await store_subscription_state(
+        user_id,
+        plan_tier=plan_tier,
+        status=status,
+        customer_id=customer_id,
+        subscription_id=subscription_id,
+        product_id=product_id,
+        current_period_end=current_period_end,
+    )
+    return _limits_payload(plan_tier)
+
+
 async def handle_subscription_created(subscription: dict) -> dict:
     """Handle a new subscription being created."""
     customer_id = subscription.get("customer")
@@ -305,7 +426,12 @@ async def handle_subscription_created(subscription: dict) -> dict:
         raise BillingError("No user_id found in customer metadata")
 
     return await update_user_quotas_from_subscription(
-        user_id, subscription_id, product_id
+        user_id,
+        subscription_id,
+        product_id,
+        customer_id=customer_id,
+        status=subscription.get("status") or "active",
+        current_period_end=_period_end(subscription.get("current_period_end")),
     )
 
 
@@ -325,16 +451,23 @@ async def handle_subscription_deleted(subscription: dict) -> dict:
     if not user_id:
         raise BillingError("No user_id found in customer metadata")
 
-    # Downgrade to free tier
-    limits = get_plan_limits(PlanTier.FREE)
-    return {
-        "plan_tier": PlanTier.FREE.value,
-        "monthly_listings": limits.monthly_listings,
-        "monthly_images": limits.monthly_images,
-        "monthly_ideas": limits.monthly_ideas,
-        "team_seats": limits.team_seats,
-        "priority_support": limits.priority_support,
-    }
+    # Downgrade to free tier, unless the event is for a subscription the
+    # user has already replaced.
+    subscription_id = subscription.get("id")
+    record = await get_subscription_state(user_id)
+    if (
+        record is None
+        or not subscription_id
+        or record.stripe_subscription_id in (None, subscription_id)
+    ):
+        await store_subscription_state(
+            user_id,
+            plan_tier=PlanTier.FREE,
+            status=subscription.get("status") or "canceled",
+            customer_id=customer_id,
+            subscription_id=subscription_id,
+        )
+    return _limits_payload(PlanTier.FREE)
 
 
 async def handle_invoice_paid(invoice: dict) -> dict:
@@ -369,3 +502,174 @@ async def handle_invoice_payment_failed(invoice: dict) -> dict:
         "currency": invoice.get("currency", "usd"),
         "next_payment_attempt": invoice.get("next_payment_attempt"),
     }
+
+
+def _as_dict(obj: Any) -> dict:
+    if isinstance(obj, dict):
+        return obj
+    for attr in ("to_dict_recursive", "to_dict"):
+        method = getattr(obj, attr, None)
+        if callable(method):
+            return method()
+    return dict(obj)
+
+
+def _list_stripe_subscriptions() -> list[dict]:
+    listing = stripe.Subscription.list(status="all", limit=100)
+    return [_as_dict(subscription) for subscription in listing.auto_paging_iter()]
+
+
+def _subscription_snapshot(subscription: dict) -> dict:
+    items = (subscription.get("items") or {}).get("data") or []
+    first_item = items[0] if items else {}
+    product_id = (first_item.get("price") or {}).get("product")
+    status = subscription.get("status") or "canceled"
+    plan_tier = get_tier_from_stripe_product(product_id) if product_id else PlanTier.FREE
+    return {
+        "plan_tier": plan_tier,
+        "status": status,
+        "customer_id": subscription.get("customer"),
+        "subscription_id": subscription.get("id"),
+        "product_id": product_id,
+        "current_period_end": _period_end(
+            subscription.get("current_period_end") or first_item.get("current_period_end")
+        ),
+        "created": int(subscription.get("created") or 0),
+    }
+
+
+def _snapshot_differs(record: BillingSubscription | None, snapshot: dict) -> bool:
+    if record is None:
+        return True
+    return (
+        record.plan_tier != snapshot["plan_tier"].value
+        or record.status != snapshot["status"]
+        or record.stripe_subscription_id != snapshot["subscription_id"]
+        or record.product_id != snapshot["product_id"]
+        or record.current_period_end != snapshot["current_period_end"]
+    )
+
+
+async def reconcile_subscriptions() -> int:
+    """Repair drift between ``BillingSubscription`` and Stripe.
+
+    Runs off the request path: lists every Stripe subscription, keeps the
+    active (else newest) one per user, rewrites rows that disagree, and
+    downgrades active rows whose subscription no longer exists. Rows written
+    after the listing started are newer than the snapshot and are skipped.
+    Only one replica reconciles at a time under the ``billing-reconcile``
+    lease; others wait for it. Returns the number of rows changed.
+    """
+    if STUB_MODE:
+        return 0
+    outcome = await reconcile_flight.run(_reconcile_subscriptions_once)
+    # Backends that cannot publish results leave joined runs without a count.
+    return outcome.value or 0
+
+
+async def _reconcile_subscriptions_once(_lease) -> int:
+    listed_at = utcnow()
+    try:
+        subscriptions = await asyncio.to_thread(_list_stripe_subscriptions)
+    except stripe.error.StripeError as exc:
+        logger.warning("Subscription reconciliation skipped: %s", exc)
+        return 0
+
+    async with get_session() as session:
+        records = (await session.exec(select(BillingSubscription))).all()
+    by_user = {record.user_id: record for record in records}
+    by_customer = {
+        record.stripe_customer_id: record.user_id
+        for record in records
+        if record.stripe_customer_id
+    }
+
+    latest: dict[int, dict] = {}
+    for subscription in subscriptions:
+        snapshot = _subscription_snapshot(subscription)
+        user_id = _user_id_from_metadata(subscription) or by_customer.get(
+            snapshot["customer_id"], 0
+        )
+        if not user_id and snapshot["customer_id"]:
+            try:
+                user_id = await asyncio.to_thread(
+                    _resolve_user_id_for_subscription_event,
+                    subscription,
+                    snapshot["customer_id"],
+                )
+            except BillingError as exc:
+                logger.warning("Could not resolve user for %s: %s", snapshot["subscription_id"], exc)
+                continue
+        if not user_id:
+            continue
+        current = latest.get(user_id)
+        rank = (snapshot["status"] in ACTIVE_SUBSCRIPTION_STATUSES, snapshot["created"])
+        if current is None or rank > (
+            current["status"] in ACTIVE_SUBSCRIPTION_STATUSES,
+            current["created"],
+        ):
+            latest[user_id] = snapshot
+
+    changed = 0
+    for user_id, snapshot in latest.items():
+        if not _snapshot_differs(by_user.get(user_id), snapshot):
+            continue
+        stored = await store_subscription_state(
+            user_id,
+            plan_tier=snapshot["plan_tier"],
+            status=snapshot["status"],
+            customer_id=snapshot["customer_id"],
+            subscription_id=snapshot["subscription_id"],
+            product_id=snapshot["product_id"],
+            current_period_end=snapshot["current_period_end"],
+            unless_updated_after=listed_at,
+        )
+        changed += stored is not None
+    for record in records:
+        if record.user_id in latest or record.status not in ACTIVE_SUBSCRIPTION_STATUSES:
+            continue
+        if record.plan_tier == PlanTier.FREE.value and not record.stripe_subscription_id:
+            continue
+        stored = await store_subscription_state(
+            record.user_id,
+            plan_tier=PlanTier.FREE,
+            status="canceled",
+            customer_id=record.stripe_customer_id,
+            subscription_id=record.stripe_subscription_id,
+            unless_updated_after=listed_at,
+        )
+        changed += stored is not None
+    if changed:
+        logger.info("Reconciled %d billing subscription rows", changed)
+    return changed
+
+
+async def _run_reconciler() -> None:
+    try:
+        await reconcile_subscriptions()
+    except Exception:  # pragma: no cover - logged for the scheduler
+        logger.exception("Billing reconciliation failed")
+
+
+def start_reconciler() -> None:
+    if STUB_MODE or RECONCILE_INTERVAL_MINUTES <= 0:
+        logger.debug("Billing reconciler disabled")
+        return
+    if _reconcile_scheduler.running:
+        return
+    # Run once at startup so rows missing since the last deploy are filled
+    # before the first interval elapses.
+    _reconcile_scheduler.add_job(
+        _run_reconciler,
+        "interval",
+        minutes=RECONCILE_INTERVAL_MINUTES,
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True,
+    )
+    _reconcile_scheduler.start()
+
+
+def stop_reconciler() -> None:
+    if _reconcile_scheduler.running:
+        _reconcile_scheduler.shutdown(wait=False)
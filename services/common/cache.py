@@ -1,7 +1,29 @@
-"""In-memory response cache with TTL support.
+"""Two-tier response cache with TTL support.
 
-Provides a lightweight caching layer for read-heavy endpoints.
-Uses Redis when available, falls back to an in-memory LRU cache.
+Provides a caching layer for read-heavy endpoints. L1 is a lock-protected,
+in-process LRU bounded by ``CACHE_L1_MAX_BYTES`` that evicts expired entries
+from a TTL heap. L2 is Redis, reached through the asyncio client so cache
+calls never block the event loop; without ``REDIS_URL`` only L1 is used.
+Values are stored as compact orjson bytes (stdlib JSON when orjson is not
+installed). While Redis backs L1, every write, delete, tag invalidation
+and clear is published with a version stamp on ``CACHE_INVALIDATION_CHANNEL``
+and every worker evicts the affected L1 copies, so L1 entries can live for
+their full TTL; if the listener is down, L1 copies live at most
+``CACHE_L1_TTL_SECONDS``.
+Hits, misses, evictions and L2 latency are exported as
+``pod_cache_requests_total``, ``pod_cache_evictions_total`` and
+``pod_cache_operation_seconds``; ``pod_cache_l1_bytes`` tracks L1 size.
+
+``cached`` wraps a loader with stampede protection: concurrent misses for a
+key share one computation per process, entries are served stale for
+``CACHE_STALE_TTL_SECONDS`` while one refresh runs in the background, and
+hot entries are refreshed probabilistically before they expire (XFetch).
+Entries may carry tags such as ``trends`` or ``user:{id}``;
+``invalidate_tags`` drops exactly the keys indexed under those tags. Deletes,
+tag invalidations and clears also bump per-key and per-tag generations, in
+Redis and in every worker. A fill records them before its loader runs and
+skips the write if any moved, so a value read before an invalidation is
+never stored after it.
 
 Owner: Backend-Coder (per DEVELOPMENT_PLAN.md Task 2.3.1)
 Reference: BC-08 (Performance & Scalability)
@@ -9,68 +31,609 @@ Reference: BC-08 (Performance & Scalability)
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import heapq
+import itertools
 import json
 import logging
+import math
 import os
+import random
+import sys
+import threading
 import time
 from collections import OrderedDict
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+from uuid import uuid4
+
+from .observability import Counter, Gauge, Histogram
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+try:
+    from redis.exceptions import RedisError, WatchError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    RedisError = WatchError = Exception
 
 logger = logging.getLogger(__name__)
 
-# Try to import Redis; fall back to in-memory cache
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "10000"))
+CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+# L1 lifetime cap while the invalidation listener is not running.
+CACHE_L1_TTL_SECONDS = float(os.getenv("CACHE_L1_TTL_SECONDS", "30"))
+# After a Redis failure, serve from L1 only this long before retrying.
+CACHE_REDIS_RETRY_SECONDS = float(os.getenv("CACHE_REDIS_RETRY_SECONDS", "30"))
+
+CACHE_REQUESTS = Counter(
+    "pod_cache_requests_total",
+    "Cache lookups by cache, tier and result",
+    labelnames=("cache", "tier", "result"),
+)
+CACHE_EVICTIONS = Counter(
+    "pod_cache_evictions_total",
+    "In-process cache entries evicted, by reason",
+    labelnames=("cache", "reason"),
+)
+CACHE_LATENCY = Histogram(
+    "pod_cache_operation_seconds",
+    "Time spent in Redis cache operations",
+    labelnames=("operation",),
+)
+CACHE_L1_BYTES = Gauge(
+    "pod_cache_l1_bytes",
+    "Bytes held by an in-process cache",
+    labelnames=("cache",),
+)
+
+
+def encode(value: Any) -> bytes:
+    """Serialize ``value`` for the cache; non-JSON types fall back to ``str``."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, separators=(",", ":")).encode()
+
+
+def decode(raw: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Try to import Redis; fall back to in-memory cache. The blocking client only
+# runs the invalidation listener thread; cache reads, writes and publishes use
+# the asyncio client.
 _redis_client = None
+_async_redis_client = None
 
 try:
     import redis
+    from redis.asyncio import from_url as async_redis_from_url
 
     REDIS_URL = os.getenv("REDIS_URL")
     if REDIS_URL:
         _redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
         _redis_client.ping()
+        _async_redis_client = async_redis_from_url(
+            REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
         logger.info("Redis cache connected: %s", REDIS_URL)
 except Exception:
     _redis_client = None
+    _async_redis_client = None
     logger.info("Redis not available; using in-memory cache")
 
 
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("expires_at", "value", "size", "tags", "version")
+
+    def __init__(
+        self, expires_at: float, value: Any, size: int, tags: tuple[str, ...], version: int
+    ):
+        self.expires_at = expires_at
+        self.value = value
+        self.size = size
+        self.tags = tags
+        self.version = version
+
+
 class InMemoryCache:
-    """Thread-safe in-memory LRU cache with TTL support."""
+    """Thread-safe in-memory LRU cache with TTL support.
+
+    Bounded by ``max_size`` entries and, when ``max_bytes`` is set, by the
+    summed size of its values (``len`` for bytes and str, a shallow
+    ``sys.getsizeof`` otherwise). Every write first evicts expired entries
+    from a min-heap of expiry times, so dead entries never hold the budget.
+
+    Entries may carry a version stamp. ``invalidate`` only drops entries
+    stamped before the invalidating version and remembers that version as a
+    tombstone, so a value read before the invalidation cannot be stored
+    afterwards. Tombstones are bounded by ``max_size``; the oldest ones are
+    folded into a floor version below which nothing is stored.
+    """
 
-    def __init__(self, max_size: int = 1024):
-        self._store: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+    def __init__(self, max_size: int = 1024, *, max_bytes: int | None = None, name: str = "memory"):
+        self.name = name
+        self._store: OrderedDict[str, _Entry] = OrderedDict()
+        self._expiry: list[tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._tags: dict[str, set[str]] = {}
         self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._tombstones: OrderedDict[str, int] = OrderedDict()
+        self._floor = 0
+        # Invalidation listeners run on a Redis pub/sub thread.
+        self._lock = threading.Lock()
 
-    def get(self, key: str) -> Any | None:
-        entry = self._store.get(key)
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _pop(self, key: str) -> _Entry | None:
+        entry = self._store.pop(key, None)
         if entry is None:
             return None
-        expires_at, value = entry
-        if time.time() > expires_at:
-            del self._store[key]
-            return None
-        # Move to end (most recently used)
-        self._store.move_to_end(key)
-        return value
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
 
-    def set(self, key: str, value: Any, ttl: int = 300) -> None:
-        expires_at = time.time() + ttl
-        self._store[key] = (expires_at, value)
-        self._store.move_to_end(key)
-        # Evict oldest entries if over capacity
-        while len(self._store) > self._max_size:
-            self._store.popitem(last=False)
+    def _evict_expired(self, now: float) -> None:
+        evicted = 0
+        while self._expiry and self._expiry[0][0] < now:
+            expires_at, _, key = heapq.heappop(self._expiry)
+            entry = self._store.get(key)
+            # Heap items for overwritten or deleted keys are skipped lazily.
+            if entry is not None and entry.expires_at == expires_at:
+                self._pop(key)
+                evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.labels(self.name, "expired").inc(evicted)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None and time.time() > entry.expires_at:
+                self._pop(key)
+                CACHE_EVICTIONS.labels(self.name, "expired").inc()
+                entry = None
+            if entry is None:
+                CACHE_REQUESTS.labels(self.name, "l1", "miss").inc()
+                return None
+            # Move to end (most recently used)
+            self._store.move_to_end(key)
+        CACHE_REQUESTS.labels(self.name, "l1", "hit").inc()
+        return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float = 300,
+        tags: Iterable[str] = (),
+        *,
+        version: int | None = None,
+    ) -> None:
+        """Store ``value``; a ``version`` older than a known invalidation is ignored."""
+        size = _sizeof(value)
+        tags = tuple(tags)
+        with self._lock:
+            if version is not None and (
+                version < self._floor or version < self._tombstones.get(key, 0)
+            ):
+                CACHE_EVICTIONS.labels(self.name, "superseded").inc()
+                return
+            now = time.time()
+            self._evict_expired(now)
+            self._pop(key)
+            if self._max_bytes is not None and size > self._max_bytes:
+                CACHE_EVICTIONS.labels(self.name, "oversize").inc()
+                return
+            entry = _Entry(now + ttl, value, size, tags, version or 0)
+            self._store[key] = entry
+            self._bytes += size
+            heapq.heappush(self._expiry, (entry.expires_at, next(self._sequence), key))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            # Evict least recently used entries if over capacity
+            evicted = 0
+            while len(self._store) > self._max_size or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                self._pop(next(iter(self._store)))
+                evicted += 1
+            if len(self._expiry) > 2 * len(self._store) + 64:
+                self._expiry = [
+                    (item.expires_at, next(self._sequence), item_key)
+                    for item_key, item in self._store.items()
+                ]
+                heapq.heapify(self._expiry)
+            nbytes = self._bytes
+        if evicted:
+            CACHE_EVICTIONS.labels(self.name, "capacity").inc(evicted)
+        CACHE_L1_BYTES.labels(self.name).set(nbytes)
 
     def delete(self, key: str) -> None:
-        self._store.pop(key, None)
+        with self._lock:
+            self._pop(key)
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying one of ``tags``; return how many were dropped."""
+        with self._lock:
+            keys = set().union(*(self._tags.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+
+    def invalidate(self, keys: Iterable[str], tags: Iterable[str], version: int) -> int:
+        """Drop ``keys`` and ``tags`` entries stamped before ``version``."""
+        with self._lock:
+            keys = set(keys)
+            for key in keys:
+                if version > self._tombstones.get(key, 0):
+                    self._tombstones[key] = version
+                    self._tombstones.move_to_end(key)
+            while len(self._tombstones) > self._max_size:
+                _, dropped_version = self._tombstones.popitem(last=False)
+                self._floor = max(self._floor, dropped_version)
+            keys.update(*(self._tags.get(tag, ()) for tag in tags))
+            stale = [
+                key
+                for key in keys
+                if key in self._store and self._store[key].version < version
+            ]
+            for key in stale:
+                self._pop(key)
+        if stale:
+            CACHE_EVICTIONS.labels(self.name, "invalidated").inc(len(stale))
+        return len(stale)
+
+    def invalidate_all(self, version: int) -> int:
+        """Drop every entry stamped before ``version`` and refuse older values."""
+        with self._lock:
+            self._floor = max(self._floor, version)
+            for key in [key for key, mark in self._tombstones.items() if mark <= version]:
+                del self._tombstones[key]
+            stale = [key for key, entry in self._store.items() if entry.version < version]
+            for key in stale:
+                self._pop(key)
+        if stale:
+            CACHE_EVICTIONS.labels(self.name, "invalidated").inc(len(stale))
+        return len(stale)
 
     def clear(self) -> None:
-        self._store.clear()
+        with self._lock:
+            self._store.clear()
+            self._expiry.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+
+def _tag_key(tag: str) -> str:
+    return f"pod:tag:{tag}"
+
+
+# Bumped by every L2 write, delete, tag invalidation and clear. Lives outside
+# the ``pod:*`` prefix so ``cache_clear`` never resets it.
+VERSION_KEY = "pod-cache:version"
+# Per-key/tag invalidation counters, also outside ``pod:*``.
+GENERATION_PREFIX = "pod-cache:gen:"
+_CLEAR_GENERATION = "clear"
+# Local generations kept before older ones fold into a floor.
+_LOCAL_GENERATION_LIMIT = 10000
+
+
+def _generation_names(key: str, tags: Iterable[str]) -> tuple[str, ...]:
+    return (_CLEAR_GENERATION, f"key:{key}", *(f"tag:{tag}" for tag in tags))
+
+
+@dataclass(frozen=True)
+class FillGeneration:
+    """Invalidation generations observed when a fill started."""
+
+    names: tuple[str, ...]
+    local: tuple[int, ...]
+    shared: tuple[Any, ...] | None
+
+
+class TwoTierCache:
+    """Encoded values in an ``InMemoryCache`` L1 backed by an async Redis L2.
+
+    Every L2 mutation atomically bumps ``VERSION_KEY`` and publishes the new
+    version with the affected keys on ``INVALIDATION_CHANNEL``; other
+    workers apply it through ``apply_invalidation``. L1 copies are stamped
+    with the version current when they were read, so reordered or late
+    messages neither evict newer copies nor let older reads back in.
+
+    Redis errors switch to L1-only for ``retry_seconds`` instead of failing
+    the request.
+    """
+
+    def __init__(
+        self,
+        l1: InMemoryCache,
+        l2=None,
+        *,
+        l1_ttl: float = CACHE_L1_TTL_SECONDS,
+        retry_seconds: float = CACHE_REDIS_RETRY_SECONDS,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self._l1_ttl = l1_ttl
+        self._retry_seconds = retry_seconds
+        self._disabled_until = 0.0
+        # Touched by the invalidation listener thread as well as the loop.
+        self._generation_lock = threading.Lock()
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._generation_seq = 0
+        self._generation_floor = 0
+
+    @property
+    def shared(self) -> bool:
+        return self.l2 is not None
+
+    def _l2_ready(self) -> bool:
+        return self.l2 is not None and time.monotonic() >= self._disabled_until
+
+    def _l2_failed(self, operation: str, exc: Exception) -> None:
+        logger.warning("Redis cache %s failed, serving from L1 only: %s", operation, exc)
+        self._disabled_until = time.monotonic() + self._retry_seconds
+
+    def _local_ttl(self, ttl: float) -> float:
+        # Without a working invalidation listener, remote writes only reach
+        # this worker once its L1 copy expires.
+        if not self.shared or invalidation_listener_live():
+            return ttl
+        return min(ttl, self._l1_ttl)
+
+    def _bump_local(self, names: Iterable[str]) -> None:
+        with self._generation_lock:
+            for name in names:
+                self._generation_seq += 1
+                self._generations[name] = self._generation_seq
+                self._generations.move_to_end(name)
+            while len(self._generations) > _LOCAL_GENERATION_LIMIT:
+                _, dropped = self._generations.popitem(last=False)
+                self._generation_floor = max(self._generation_floor, dropped)
+
+    def _local_generations(self, names: Iterable[str]) -> tuple[int, ...]:
+        with self._generation_lock:
+            return tuple(self._generations.get(name, self._generation_floor) for name in names)
+
+    @staticmethod
+    def _queue_generation_bumps(pipe, names: Iterable[str]) -> None:
+        for name in names:
+            pipe.incr(GENERATION_PREFIX + name)
+            pipe.expire(GENERATION_PREFIX + name, CACHE_TAG_INDEX_TTL_SECONDS)
+
+    async def generation(self, key: str, tags: Iterable[str] = ()) -> FillGeneration:
+        """Record the generations a later ``set(..., generation=...)`` must match."""
+        names = _generation_names(key, tags)
+        local = self._local_generations(names)
+        shared = None
+        if self._l2_ready():
+            try:
+                shared = tuple(await self.l2.mget([GENERATION_PREFIX + name for name in names]))
+            except (RedisError, OSError) as exc:
+                self._l2_failed("get", exc)
+        return FillGeneration(names, local, shared)
+
+    async def _publish(self, payload: dict[str, Any]) -> None:
+        payload.update(namespace=RESPONSE_INVALIDATION_NAMESPACE, origin=_INSTANCE_ID)
+        try:
+            await self.l2.publish(INVALIDATION_CHANNEL, json.dumps(payload))
+        except (RedisError, OSError) as exc:
+            logger.warning("Failed to publish response cache invalidation: %s", exc)
+
+    def apply_invalidation(self, payload: dict[str, Any]) -> int:
+        """Apply an invalidation published by another worker to L1."""
+        try:
+            version = int(payload.get("version") or 0)
+        except (TypeError, ValueError):
+            return 0
+        if payload.get("clear"):
+            self._bump_local([_CLEAR_GENERATION])
+            return self.l1.invalidate_all(version)
+        self._bump_local(
+            [f"key:{key}" for key in payload.get("keys") or ()]
+            + [f"tag:{tag}" for tag in payload.get("tags") or ()]
+        )
+        return self.l1.invalidate(
+            (str(key) for key in payload.get("keys") or ()),
+            [str(tag) for tag in payload.get("tags") or ()],
+            version,
+        )
+
+    async def get(self, key: str) -> Any | None:
+        raw = self.l1.get(key)
+        if raw is not None:
+            return decode(raw)
+        if not self._l2_ready():
+            return None
+        started = time.perf_counter()
+        try:
+            pipe = self.l2.pipeline(transaction=True)
+            pipe.get(key)
+            pipe.pttl(key)
+            pipe.get(VERSION_KEY)
+            raw, pttl, version = await pipe.execute()
+        except (RedisError, OSError) as exc:
+            self._l2_failed("get", exc)
+            return None
+        finally:
+            CACHE_LATENCY.labels("get").observe(time.perf_counter() - started)
+        if raw is None:
+            CACHE_REQUESTS.labels(self.l1.name, "l2", "miss").inc()
+            return None
+        CACHE_REQUESTS.labels(self.l1.name, "l2", "hit").inc()
+        if pttl and int(pttl) > 0:
+            self.l1.set(
+                key, raw, ttl=self._local_ttl(int(pttl) / 1000), version=int(version or 0)
+            )
+        return decode(raw)
+
+    @staticmethod
+    def _queue_set(pipe, key: str, raw: bytes, ttl: float, tags: tuple[str, ...]) -> None:
+        pipe.incr(VERSION_KEY)
+        pipe.set(key, raw, px=max(1, int(ttl * 1000)))
+        for tag in tags:
+            pipe.sadd(_tag_key(tag), key)
+            # Tag sets only need to outlive their members; stale members
+            # are harmless because deleting a missing key is a no-op.
+            pipe.expire(_tag_key(tag), max(int(ttl), CACHE_TAG_INDEX_TTL_SECONDS))
+
+    async def _set_if_current(
+        self, key: str, raw: bytes, ttl: float, tags: tuple[str, ...], generation: FillGeneration
+    ) -> int | None:
+        keys = [GENERATION_PREFIX + name for name in generation.names]
+        async with self.l2.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(*keys)
+                if tuple(await pipe.mget(keys)) != generation.shared:
+                    return None
+                pipe.multi()
+                self._queue_set(pipe, key, raw, ttl, tags)
+                return (await pipe.execute())[0]
+            except WatchError:
+                return None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        tags: Iterable[str] = (),
+        *,
+        generation: FillGeneration | None = None,
+    ) -> bool:
+        """Store ``value``; return False if ``generation`` moved and nothing was stored."""
+        raw = encode(value)
+        tags = tuple(tags)
+        if generation is not None and self._local_generations(generation.names) != generation.local:
+            return False
+        if not self._l2_ready():
+            self.l1.set(key, raw, ttl=self._local_ttl(ttl), tags=tags)
+            return True
+        started = time.perf_counter()
+        try:
+            if generation is not None and generation.shared is not None:
+                version = await self._set_if_current(key, raw, ttl, tags, generation)
+                if version is None:
+                    return False
+            else:
+                pipe = self.l2.pipeline(transaction=True)
+                self._queue_set(pipe, key, raw, ttl, tags)
+                version = (await pipe.execute())[0]
+        except (RedisError, OSError) as exc:
+            self._l2_failed("set", exc)
+            self.l1.set(key, raw, ttl=self._local_ttl(ttl), tags=tags)
+            return True
+        finally:
+            CACHE_LATENCY.labels("set").observe(time.perf_counter() - started)
+        self.l1.set(key, raw, ttl=self._local_ttl(ttl), tags=tags, version=version)
+        await self._publish({"keys": [key], "version": version})
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        self._bump_local([f"key:{key}"])
+        if not self._l2_ready():
+            return
+        try:
+            pipe = self.l2.pipeline(transaction=True)
+            pipe.incr(VERSION_KEY)
+            pipe.delete(key)
+            self._queue_generation_bumps(pipe, [f"key:{key}"])
+            version = (await pipe.execute())[0]
+        except (RedisError, OSError) as exc:
+            self._l2_failed("delete", exc)
+            return
+        self.l1.invalidate([key], (), version)
+        await self._publish({"keys": [key], "version": version})
+
+    async def delete_tags(self, tags: Iterable[str]) -> int:
+        tags = tuple(tags)
+        dropped = self.l1.delete_tags(tags)
+        self._bump_local(f"tag:{tag}" for tag in tags)
+        if not self._l2_ready() or not tags:
+            return dropped
+        started = time.perf_counter()
+        try:
+            pipe = self.l2.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(_tag_key(tag))
+            keys = sorted(
+                {
+                    member.decode() if isinstance(member, bytes) else member
+                    for members in await pipe.execute()
+                    for member in members
+                }
+            )
+            pipe = self.l2.pipeline(transaction=True)
+            pipe.incr(VERSION_KEY)
+            for start in range(0, len(keys), 500):
+                pipe.delete(*keys[start : start + 500])
+            pipe.delete(*(_tag_key(tag) for tag in tags))
+            self._queue_generation_bumps(pipe, (f"tag:{tag}" for tag in tags))
+            version, *deleted = await pipe.execute()
+            deleted = deleted[: (len(keys) + 499) // 500]
+        except (RedisError, OSError) as exc:
+            self._l2_failed("invalidate", exc)
+            return dropped
+        finally:
+            CACHE_LATENCY.labels("invalidate").observe(time.perf_counter() - started)
+        # L1 copies filled from L2 carry no tags; drop them by key.
+        self.l1.invalidate(keys, tags, version)
+        await self._publish({"keys": keys, "tags": list(tags), "version": version})
+        return sum(deleted)
 
+    async def clear(self) -> None:
+        self.l1.clear()
+        self._bump_local([_CLEAR_GENERATION])
+        if not self._l2_ready():
+            return
+        try:
+            # Only clear keys with our prefix
+            batch = []
+            async for key in self.l2.scan_iter("pod:*"):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await self.l2.delete(*batch)
+                    batch.clear()
+            if batch:
+                await self.l2.delete(*batch)
+            await self.l2.incr(GENERATION_PREFIX + _CLEAR_GENERATION)
+            version = await self.l2.incr(VERSION_KEY)
+        except (RedisError, OSError) as exc:
+            self._l2_failed("clear", exc)
+            return
+        self.l1.invalidate_all(version)
+        await self._publish({"clear": True, "version": version})
 
-# Singleton in-memory cache
-_mem_cache = InMemoryCache()
+
+# Singleton two-tier cache; ``_mem_cache`` is its L1.
+_mem_cache = InMemoryCache(
+    max_size=CACHE_L1_MAX_ENTRIES, max_bytes=CACHE_L1_MAX_BYTES, name="response"
+)
+_response_cache = TwoTierCache(_mem_cache, _async_redis_client)
 
 
 def cache_key(*parts: str) -> str:
@@ -79,52 +642,288 @@ def cache_key(*parts: str) -> str:
     return f"pod:{hashlib.md5(raw.encode()).hexdigest()}"
 
 
-def cache_get(key: str) -> Any | None:
+async def cache_get(key: str) -> Any | None:
     """Get a value from cache."""
-    if _redis_client:
-        try:
-            raw = _redis_client.get(key)
-            if raw is not None:
-                return json.loads(raw)
-        except Exception:
-            pass
-    return _mem_cache.get(key)
+    return await _response_cache.get(key)
 
 
-def cache_set(key: str, value: Any, ttl: int = 300) -> None:
-    """Set a value in cache with TTL (seconds)."""
-    if _redis_client:
-        try:
-            _redis_client.setex(key, ttl, json.dumps(value, default=str))
-            return
-        except Exception:
-            pass
-    _mem_cache.set(key, value, ttl)
+async def cache_set(
+    key: str,
+    value: Any,
+    ttl: int = 300,
+    tags: Iterable[str] = (),
+    *,
+    generation: FillGeneration | None = None,
+) -> bool:
+    """Set a value in cache with TTL (seconds), indexed under ``tags``.
+
+    With ``generation`` from ``cache_generation``, nothing is stored (and
+    False returned) if ``key`` or a tag was invalidated since.
+    """
+    return await _response_cache.set(key, value, ttl, tags=tags, generation=generation)
+
 
+async def cache_generation(key: str, tags: Iterable[str] = ()) -> FillGeneration:
+    """Record ``key``'s and ``tags``' invalidation generations before a fill."""
+    return await _response_cache.generation(key, tags)
 
-def cache_delete(key: str) -> None:
+
+async def cache_delete(key: str) -> None:
     """Delete a value from cache."""
-    if _redis_client:
+    await _response_cache.delete(key)
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """Delete every entry indexed under ``tags``; return how many keys were dropped."""
+    return await _response_cache.delete_tags(tags)
+
+
+def shared_cache_enabled() -> bool:
+    """Return True when values are shared across workers through Redis."""
+    return _response_cache.shared
+
+
+async def cache_clear() -> None:
+    """Clear all cached values."""
+    await _response_cache.clear()
+
+
+# Cross-worker invalidation of process-local caches
+INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "pod:cache:invalidate")
+RESPONSE_INVALIDATION_NAMESPACE = "response"
+_INSTANCE_ID = uuid4().hex
+_invalidation_handlers: dict[str, list[Callable[[str], None]]] = {}
+_invalidation_thread = None
+_invalidation_lock = threading.Lock()
+_listener_degraded_until = 0.0
+
+
+def _dispatch_invalidation(namespace: str, key: str) -> None:
+    for handler in list(_invalidation_handlers.get(namespace, ())):
         try:
-            _redis_client.delete(key)
+            handler(key)
         except Exception:
-            pass
-    _mem_cache.delete(key)
+            logger.exception("Cache invalidation handler failed for %s", namespace)
 
 
-def cache_clear() -> None:
-    """Clear all cached values."""
-    if _redis_client:
+def _on_invalidation_message(message: dict[str, Any]) -> None:
+    try:
+        payload = json.loads(message["data"])
+    except (TypeError, ValueError, KeyError):
+        return
+    if payload.get("origin") == _INSTANCE_ID:
+        return
+    if payload.get("namespace") == RESPONSE_INVALIDATION_NAMESPACE:
+        _response_cache.apply_invalidation(payload)
+        return
+    _dispatch_invalidation(str(payload.get("namespace")), str(payload.get("key")))
+
+
+def _on_listener_error(exc: BaseException, _pubsub, _thread) -> None:
+    """Keep the listener thread alive; redis-py resubscribes on the next read."""
+    global _listener_degraded_until
+    logger.warning("Cache invalidation listener error, dropping L1 responses: %s", exc)
+    # Messages may have been missed while disconnected.
+    _listener_degraded_until = time.monotonic() + CACHE_REDIS_RETRY_SECONDS
+    _response_cache.l1.clear()
+    time.sleep(1.0)
+
+
+def _start_invalidation_listener() -> None:
+    global _invalidation_thread
+    if _redis_client is None or _invalidation_thread is not None:
+        return
+    try:
+        pubsub = _redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: _on_invalidation_message})
+        _invalidation_thread = pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=_on_listener_error
+        )
+    except Exception:
+        logger.warning("Cache invalidation listener unavailable", exc_info=True)
+
+
+def invalidation_listener_live() -> bool:
+    """Return True while this worker is receiving other workers' invalidations."""
+    return (
+        _invalidation_thread is not None
+        and _invalidation_thread.is_alive()
+        and time.monotonic() >= _listener_degraded_until
+    )
+
+
+def subscribe_invalidations(namespace: str, handler: Callable[[str], None]) -> None:
+    """Call ``handler(key)`` whenever any worker publishes an invalidation.
+
+    The Redis listener thread starts on first subscription; without Redis
+    only invalidations published by this process are delivered.
+    """
+    with _invalidation_lock:
+        _invalidation_handlers.setdefault(namespace, []).append(handler)
+        _start_invalidation_listener()
+
+
+async def publish_invalidation(namespace: str, key: str) -> None:
+    """Drop ``key`` from ``namespace`` caches in this and every other worker."""
+    _dispatch_invalidation(namespace, key)
+    if _async_redis_client:
         try:
-            # Only clear keys with our prefix
-            for k in _redis_client.scan_iter("pod:*"):
-                _redis_client.delete(k)
+            await _async_redis_client.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"namespace": namespace, "key": key, "origin": _INSTANCE_ID}),
+            )
         except Exception:
-            pass
-    _mem_cache.clear()
+            logger.warning("Failed to publish cache invalidation for %s", namespace)
+
+
+# The response cache always listens so remote writes evict its L1 copies.
+with _invalidation_lock:
+    _start_invalidation_listener()
+
+
+# ---------------------------------------------------------------------------
+# Stampede protection
+# ---------------------------------------------------------------------------
+
+_ENVELOPE_MARKER = "__pod_cached__"
+_inflight: dict[str, asyncio.Future] = {}
+_background_refreshes: set[asyncio.Task] = set()
+
+
+def _should_refresh_early(envelope: dict[str, Any], now: float, beta: float) -> bool:
+    # XFetch: refresh with a probability that rises as expiry approaches and
+    # with how long the value took to compute.
+    if beta <= 0:
+        return False
+    jitter = -math.log(1.0 - random.random())
+    return now + float(envelope["delta"]) * beta * jitter >= float(envelope["expires_at"])
+
+
+def _claim(key: str) -> asyncio.Future:
+    # Registered synchronously so callers in the same tick see the claim.
+    future = asyncio.get_running_loop().create_future()
+    # Nobody may be waiting; mark failures as retrieved.
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    _inflight[key] = future
+    return future
+
+
+async def _fill(key: str, loader: Callable[[], Awaitable[Any]], **options: Any) -> Any:
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    return await _compute(key, _claim(key), loader, **options)
+
+
+async def _compute(
+    key: str,
+    future: asyncio.Future,
+    loader: Callable[[], Awaitable[Any]],
+    *,
+    ttl: int,
+    stale_ttl: int,
+    tags: tuple[str, ...],
+) -> Any:
+    try:
+        # A value loaded before an invalidation must not be stored after it.
+        generation = await cache_generation(key, tags)
+        started = time.perf_counter()
+        value = await loader()
+        delta = time.perf_counter() - started
+        await cache_set(
+            key,
+            {
+                _ENVELOPE_MARKER: 1,
+                "value": value,
+                "expires_at": time.time() + ttl,
+                "delta": delta,
+            },
+            ttl=ttl + stale_ttl,
+            tags=tags,
+            generation=generation,
+        )
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+def _refresh_in_background(key: str, loader: Callable[[], Awaitable[Any]], **options: Any) -> None:
+    if key in _inflight:
+        return
+    future = _claim(key)
+
+    def _done(task: asyncio.Task) -> None:
+        _background_refreshes.discard(task)
+        if task.cancelled():
+            # Cancelled before ``_compute`` ran; release the claim.
+            future.cancel()
+            if _inflight.get(key) is future:
+                del _inflight[key]
+        elif task.exception() is not None:
+            logger.warning("Background cache refresh failed for %s: %s", key, task.exception())
+
+    task = asyncio.get_running_loop().create_task(_compute(key, future, loader, **options))
+    _background_refreshes.add(task)
+    task.add_done_callback(_done)
+
+
+async def cached(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    *,
+    ttl: int,
+    tags: Iterable[str] = (),
+    stale_ttl: int | None = None,
+    beta: float | None = None,
+) -> Any:
+    """Return ``key`` from cache, computing it with ``loader`` when needed.
+
+    A miss is computed once per process however many requests ask for it. An
+    entry past ``ttl`` but within ``stale_ttl`` is returned immediately while
+    a single background refresh replaces it, and fresh entries are refreshed
+    early with a probability scaled by ``beta`` and their compute time.
+    """
+    options = {
+        "ttl": ttl,
+        "stale_ttl": CACHE_STALE_TTL_SECONDS if stale_ttl is None else stale_ttl,
+        "tags": tuple(tags),
+    }
+    envelope = await cache_get(key)
+    if not isinstance(envelope, dict) or _ENVELOPE_MARKER not in envelope:
+        return await _fill(key, loader, **options)
+    now = time.time()
+    if now >= float(envelope["expires_at"]) or _should_refresh_early(
+        envelope, now, CACHE_EARLY_REFRESH_BETA if beta is None else beta
+    ):
+        _refresh_in_background(key, loader, **options)
+    return envelope["value"]
+
+
+# Tags shared by cached responses
+CACHE_TAG_TRENDS = "trends"
+
+
+def user_tag(user_id: int) -> str:
+    """Tag for cached entries derived from one user's state."""
+    return f"user:{user_id}"
 
 
 # Default TTLs for different data types
 CACHE_TTL_TRENDS = int(os.getenv("CACHE_TTL_TRENDS", "300"))  # 5 min
 CACHE_TTL_IDEAS = int(os.getenv("CACHE_TTL_IDEAS", "600"))  # 10 min
 CACHE_TTL_USER_QUOTA = int(os.getenv("CACHE_TTL_USER_QUOTA", "60"))  # 1 min
+CACHE_TTL_SESSION = int(os.getenv("CACHE_TTL_SESSION", "60"))  # 1 min
+# How long ``cached`` keeps serving an expired entry while it refreshes.
+CACHE_STALE_TTL_SECONDS = int(os.getenv("CACHE_STALE_TTL_SECONDS", "60"))
+# XFetch beta: > 1 refreshes earlier, 0 disables early refresh.
+CACHE_EARLY_REFRESH_BETA = float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1.0"))
+# Minimum lifetime of a Redis tag index set.
+CACHE_TAG_INDEX_TTL_SECONDS = int(os.getenv("CACHE_TAG_INDEX_TTL_SECONDS", "86400"))
@@ -0,0 +1,83 @@
+"""Flush hook that keeps ``ResourceCounter`` rows in step with ORM writes.
+
+After each flush the net insert/delete delta for the counted models is
+added to a random one of ``COUNTER_SHARDS`` rows per owner and resource, on
+the flushing connection, so counters commit or roll back with the rows they
+describe and concurrent inserts rarely wait on the same row lock. Counted
+tables have no owner column yet, so their totals are kept under
+``WORKSPACE_OWNER``.
+
+``services/models`` imports this module, so the hook is registered wherever
+the models are used; it deliberately imports nothing beyond the models.
+Reads and reconciliation live in ``services/common/counters``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from collections import Counter as TallyCounter
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .time import utcnow
+from ..models import ABTest, Idea, Listing, Product, ResourceCounter
+
+COUNTER_SHARDS = max(1, int(os.getenv("COUNTER_SHARDS", "8")))
+
+WORKSPACE_OWNER = 0
+COUNTED_RESOURCES: Dict[type, str] = {
+    Listing: "listings",
+    ABTest: "ab_tests",
+    Product: "images",
+    Idea: "ideas",
+}
+
+
+def _owner(instance: Any) -> int:
+    return getattr(instance, "user_id", None) or WORKSPACE_OWNER
+
+
+def increment_counters(dialect_name: str, rows: list[Dict[str, Any]]):
+    """Upsert that adds each row's ``count`` to its counter shard."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    table = ResourceCounter.__table__
+    stmt = dialect.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "resource", "shard"],
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_counter_deltas(session, flush_context):
+    deltas: TallyCounter = TallyCounter()
+    for instance in session.new:
+        resource = COUNTED_RESOURCES.get(type(instance))
+        if resource:
+            deltas[(_owner(instance), resource)] += 1
+    for instance in session.deleted:
+        resource = COUNTED_RESOURCES.get(type(instance))
+        if resource:
+            deltas[(_owner(instance), resource)] -= 1
+    rows = [
+        {
+            "user_id": owner,
+            "resource": resource,
+            "shard": random.randrange(COUNTER_SHARDS),
+            "count": delta,
+            "updated_at": utcnow(),
+        }
+        for (owner, resource), delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+    connection = session.connection()
+    connection.execute(increment_counters(connection.dialect.name, rows))
@@ -0,0 +1,166 @@
+"""Maintained row counts for dashboard and quota reads.
+
+``ResourceCounter`` keeps up to ``COUNTER_SHARDS`` rows per owner and
+resource (listings, A/B tests, images and ideas); a count is the sum of its
+shards, so reads are one indexed lookup instead of ``SELECT count(*)``. The
+flush hook in ``counter_hook`` keeps them in step with ORM inserts and
+deletes.
+
+Bulk ``DELETE``/``INSERT`` statements and raw SQL bypass the hook;
+``reconcile_counters`` recounts every counted table, fixes drifted counts
+and records the corrections in ``pod_counter_drift_total``. It runs every
+``COUNTER_RECONCILE_INTERVAL_MINUTES`` under a ``DistributedSingleFlight``
+lease, so only one replica recounts at a time: row locks cannot stop two
+runs from both correcting a counter whose rows do not exist yet, and SQLite
+ignores them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import Counter as TallyCounter
+from typing import Dict
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import func
+from sqlmodel import select
+
+from . import database
+from .counter_hook import COUNTED_RESOURCES, WORKSPACE_OWNER, increment_counters
+from .database import get_session
+from .distributed_lock import DistributedSingleFlight, build_lease_backend
+from .observability import Counter
+from .time import utcnow
+from ..models import ResourceCounter
+
+logger = logging.getLogger(__name__)
+
+COUNTER_RECONCILE_INTERVAL_MINUTES = int(
+    os.getenv("COUNTER_RECONCILE_INTERVAL_MINUTES", "60")
+)
+COUNTER_RECONCILE_LOCK_REDIS_URL = os.getenv(
+    "COUNTER_RECONCILE_LOCK_REDIS_URL", os.getenv("REDIS_URL", "")
+)
+
+COUNTER_DRIFT = Counter(
+    "pod_counter_drift_total",
+    "Counter corrections applied by reconciliation",
+    labelnames=("resource",),
+)
+
+_counter_scheduler = AsyncIOScheduler()
+counter_flight = DistributedSingleFlight(
+    "counter-reconcile",
+    build_lease_backend(
+        redis_url=COUNTER_RECONCILE_LOCK_REDIS_URL,
+        database_url=database.DATABASE_URL,
+        engine_factory=lambda: database.engine,
+    ),
+)
+
+
+async def get_counts(
+    *resources: str, user_id: int = WORKSPACE_OWNER
+) -> Dict[str, int]:
+    """Return maintained counts for ``resources``; missing counters read as 0."""
+    counts = dict.fromkeys(resources, 0)
+    async with get_session() as session:
+        result = await session.exec(
+            select(ResourceCounter.resource, func.sum(ResourceCounter.count))
+            .where(
+                ResourceCounter.user_id == user_id,
+                ResourceCounter.resource.in_(resources),
+            )
+            .group_by(ResourceCounter.resource)
+        )
+        counts.update({resource: int(count or 0) for resource, count in result.all()})
+    return counts
+
+
+async def reconcile_counters() -> Dict[str, int]:
+    """Recount counted tables, fix drifted counters; return corrections per resource.
+
+    The resource's counter rows are locked before counting, so an insert
+    committed meanwhile waits and then applies its own increment on top.
+    Corrections are applied as increments, which also compose with a
+    concurrent first insert for an owner that had no counter rows yet.
+    """
+    corrections: Dict[str, int] = {}
+    async with get_session() as session:
+        for model, resource in COUNTED_RESOURCES.items():
+            locked = (
+                await session.exec(
+                    select(ResourceCounter)
+                    .where(ResourceCounter.resource == resource)
+                    .with_for_update()
+                )
+            ).all()
+            stored: TallyCounter = TallyCounter()
+            for row in locked:
+                stored[row.user_id] += row.count
+            owner_column = getattr(model, "user_id", None)
+            if owner_column is not None:
+                result = await session.exec(
+                    select(owner_column, func.count()).group_by(owner_column)
+                )
+                actual = {int(owner or WORKSPACE_OWNER): int(n) for owner, n in result.all()}
+            else:
+                result = await session.exec(select(func.count()).select_from(model))
+                actual = {WORKSPACE_OWNER: int(result.one() or 0)}
+            rows = []
+            drift = 0
+            for owner in sorted(set(actual) | set(stored)):
+                delta = actual.get(owner, 0) - stored[owner]
+                if not delta:
+                    continue
+                drift += abs(delta)
+                rows.append(
+                    {
+                        "user_id": owner,
+                        "resource": resource,
+                        "shard": 0,
+                        "count": delta,
+                        "updated_at": utcnow(),
+                    }
+                )
+            if rows:
+                await session.exec(increment_counters(session.bind.dialect.name, rows))
+            corrections[resource] = drift
+            if drift:
+                COUNTER_DRIFT.labels(resource).inc(drift)
+                logger.warning("Counter %s drifted by %d; corrected", resource, drift)
+        await session.commit()
+    return corrections
+
+
+async def _reconcile_counters_once(_lease) -> Dict[str, int]:
+    return await reconcile_counters()
+
+
+async def _run_reconciliation() -> None:
+    try:
+        await counter_flight.run(_reconcile_counters_once)
+    except Exception:  # pragma: no cover - logged for the scheduler
+        logger.exception("Counter reconciliation failed")
+
+
+def start_counter_reconciler() -> None:
+    if COUNTER_RECONCILE_INTERVAL_MINUTES <= 0:
+        logger.debug("Counter reconciliation disabled via configuration")
+        return
+    if _counter_scheduler.running:
+        return
+    _counter_scheduler.add_job(
+        _run_reconciliation,
+        "interval",
+        minutes=COUNTER_RECONCILE_INTERVAL_MINUTES,
+        max_instances=1,
+        coalesce=True,
+    )
+    _counter_scheduler.start()
+
+
+def stop_counter_reconciler() -> None:
+    if _counter_scheduler.running:
+        _counter_scheduler.shutdown(wait=False)
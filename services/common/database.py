@@ -1,4 +1,4 @@
-"""Database engine, session helper, and slow-query profiling.
+"""Database engine, session helper, slow-query profiling and commit hooks.
 
 Owner: Backend-Coder (per DEVELOPMENT_PLAN.md Task 2.3.2)
 """
@@ -9,8 +9,11 @@ import tempfile
 import time
 import uuid
 from contextlib import asynccontextmanager
+from itertools import chain
+from typing import Awaitable, Callable, Iterable
 
 from sqlalchemy import event
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -108,7 +111,80 @@ async def init_db() -> None:
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+# ---------------------------------------------------------------------------
+# Commit hooks
+# ---------------------------------------------------------------------------
+
+_PENDING_TABLES = "pod_pending_tables"
+_COMMITTED_TABLES = "pod_committed_tables"
+_commit_watchers: dict[str, list[Callable[[set[str]], Awaitable[None]]]] = {}
+
+
+def watch_table_commits(
+    tables: Iterable[str], callback: Callable[[set[str]], Awaitable[None]]
+) -> None:
+    """Await ``callback(changed_tables)`` after commits that write to ``tables``.
+
+    Only writes made through ``get_session`` are reported; callbacks run when
+    the session closes, before control returns to the caller.
+    """
+    for table in tables:
+        _commit_watchers.setdefault(table, []).append(callback)
+
+
+def _mark_tables(session, tables: Iterable[str]) -> None:
+    watched = {table for table in tables if table in _commit_watchers}
+    if watched:
+        session.info.setdefault(_PENDING_TABLES, set()).update(watched)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    _mark_tables(
+        session,
+        (
+            getattr(obj, "__tablename__", None)
+            for obj in chain(session.new, session.dirty, session.deleted)
+        ),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        _mark_tables(orm_execute_state.session, [getattr(table, "name", None)])
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_tables(session):
+    pending = session.info.pop(_PENDING_TABLES, None)
+    if pending:
+        session.info.setdefault(_COMMITTED_TABLES, set()).update(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tables(session):
+    session.info.pop(_PENDING_TABLES, None)
+
+
+async def _notify_commit_watchers(tables: set[str]) -> None:
+    callbacks = {
+        callback for table in tables for callback in _commit_watchers.get(table, ())
+    }
+    for callback in callbacks:
+        try:
+            await callback(tables)
+        except Exception:
+            logger.exception("Commit watcher failed for tables %s", sorted(tables))
+
+
 @asynccontextmanager
 async def get_session() -> AsyncSession:
     async with AsyncSession(engine, expire_on_commit=False) as session:
-        yield session
+        try:
+            yield session
+        finally:
+            committed = session.sync_session.info.pop(_COMMITTED_TABLES, None)
+            if committed:
+                await _notify_commit_watchers(committed)
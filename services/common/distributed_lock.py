@@ -0,0 +1,595 @@
+"""Cluster-wide single-flight execution on top of expiring leases.
+
+``DistributedSingleFlight.run`` lets exactly one caller across every replica
+execute a job at a time. Callers in the same process share one in-flight
+future; callers on other replicas see the lease is taken, wait for it to be
+released and then read the result the leader published.
+
+Leases come from the backends chosen by ``build_lease_backend``:
+
+* ``RedisLeaseBackend`` - ``SET NX PX`` with a per-lock fencing counter,
+  renewed while the job runs and released by compare-and-delete. The leader
+  publishes its result under the lock name for joined callers.
+* ``PostgresAdvisoryLeaseBackend`` - a session-level ``pg_try_advisory_lock``
+  held on a dedicated connection. It has no result channel, so remote
+  callers are told the run finished but get no value.
+* ``LocalLeaseBackend`` - process-local, for SQLite and single-replica setups.
+
+With Redis configured, ``FailoverLeaseBackend`` uses it and drops to the
+database backend for ``LEASE_REDIS_RETRY_SECONDS`` whenever a Redis call
+fails, so jobs keep running through a Redis outage. The two backends do not
+exclude each other while replicas disagree about Redis; fencing still
+orders their writes. Leaders call ``fence_writes`` inside their write
+transaction: it records the lease's fencing token in ``LeaseFence`` and
+refuses the write once a newer token has written, so a leader paused past
+its lease cannot overwrite a newer run. Redis and Postgres both mint tokens
+no smaller than their server clock in milliseconds, so tokens from either
+backend compare correctly as long as the two clocks roughly agree.
+
+``held_leases`` takes several named leases at once without waiting for any
+that another caller holds, e.g. one per trend source.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generic, Iterable, TypeVar
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import LeaseFence
+from .time import utcnow
+
+try:
+    from redis.asyncio import from_url as redis_from_url
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis_from_url = None
+    RedisError = Exception
+
+logger = logging.getLogger(__name__)
+
+# After a Redis failure, take leases from the database backend this long.
+LEASE_REDIS_RETRY_SECONDS = float(os.getenv("LEASE_REDIS_RETRY_SECONDS", "30"))
+
+T = TypeVar("T")
+
+
+class LeaseLost(RuntimeError):
+    """Raised when a leader no longer holds its lease and must not write."""
+
+
+class LeaseUnavailable(RuntimeError):
+    """Raised when the lease backend cannot be reached."""
+
+
+@dataclass
+class Lease:
+    name: str
+    owner: str
+    fencing_token: int
+    backend: "LeaseBackend"
+    handle: Any = None
+    lost: bool = False
+
+    async def ensure_held(self) -> None:
+        """Raise ``LeaseLost`` unless this lease is still the current one."""
+        if self.lost or not await self.backend.check(self):
+            self.lost = True
+            raise LeaseLost(
+                f"Lease {self.name} (token {self.fencing_token}) is no longer held"
+            )
+
+
+class LeaseBackend:
+    """Interface shared by the lease backends."""
+
+    name = "base"
+    # Whether tokens grow across restarts, so ``fence_writes`` can compare them.
+    fenced = True
+
+    async def acquire(self, name: str, ttl_ms: int) -> Lease | None:
+        raise NotImplementedError
+
+    async def check(self, lease: Lease) -> bool:
+        raise NotImplementedError
+
+    async def renew(self, lease: Lease, ttl_ms: int) -> bool:
+        return await self.check(lease)
+
+    async def release(self, lease: Lease) -> None:
+        raise NotImplementedError
+
+    async def is_held(self, name: str) -> bool:
+        raise NotImplementedError
+
+    async def current_token(self, name: str) -> int:
+        return 0
+
+    async def publish_result(self, lease: Lease, payload: Any, ttl_ms: int) -> None:
+        return None
+
+    async def read_result(self, name: str, min_token: int) -> Any | None:
+        return None
+
+
+# KEYS[1] lock, KEYS[2] fencing counter. ARGV: owner, ttl ms.
+# Returns the new fencing token, or 0 when the lock is held. Tokens are at
+# least the server clock in ms, so they keep growing past those recorded in
+# ``LeaseFence`` if Redis loses its data or Postgres leases were used.
+_ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+  local now = redis.call('TIME')
+  local clock = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+  local token = math.max(tonumber(redis.call('GET', KEYS[2]) or '0') + 1, clock)
+  redis.call('SET', KEYS[2], string.format('%d', token))
+  return token
+end
+return 0
+"""
+
+# KEYS[1] lock. ARGV: owner, ttl ms (0 only checks ownership).
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+  return 0
+end
+if tonumber(ARGV[2]) > 0 then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1] result, KEYS[2] fencing counter. ARGV: token, payload, ttl ms.
+# A leader whose token was superseded cannot overwrite a newer result.
+_PUBLISH_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+return 1
+"""
+
+
+class RedisLeaseBackend(LeaseBackend):
+    name = "redis"
+
+    def __init__(self, client, *, prefix: str = "pod:lock:"):
+        self._client = client
+        self._prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+        self._publish = client.register_script(_PUBLISH_SCRIPT)
+
+    def _keys(self, name: str) -> tuple[str, str, str]:
+        base = f"{self._prefix}{name}"
+        return base, f"{base}:fence", f"{base}:result"
+
+    async def acquire(self, name: str, ttl_ms: int) -> Lease | None:
+        lock_key, fence_key, _ = self._keys(name)
+        owner = uuid4().hex
+        token = int(await self._acquire(keys=[lock_key, fence_key], args=[owner, ttl_ms]))
+        if not token:
+            return None
+        return Lease(name=name, owner=owner, fencing_token=token, backend=self)
+
+    async def check(self, lease: Lease) -> bool:
+        return await self.renew(lease, 0)
+
+    async def renew(self, lease: Lease, ttl_ms: int) -> bool:
+        lock_key, _, _ = self._keys(lease.name)
+        return bool(int(await self._renew(keys=[lock_key], args=[lease.owner, ttl_ms])))
+
+    async def release(self, lease: Lease) -> None:
+        lock_key, _, _ = self._keys(lease.name)
+        await self._release(keys=[lock_key], args=[lease.owner])
+
+    async def is_held(self, name: str) -> bool:
+        lock_key, _, _ = self._keys(name)
+        return bool(await self._client.exists(lock_key))
+
+    async def current_token(self, name: str) -> int:
+        _, fence_key, _ = self._keys(name)
+        return int(await self._client.get(fence_key) or 0)
+
+    async def publish_result(self, lease: Lease, payload: Any, ttl_ms: int) -> None:
+        _, fence_key, result_key = self._keys(lease.name)
+        body = json.dumps({"fencing_token": lease.fencing_token, "value": payload}, default=str)
+        await self._publish(keys=[result_key, fence_key], args=[lease.fencing_token, body, ttl_ms])
+
+    async def read_result(self, name: str, min_token: int) -> Any | None:
+        _, _, result_key = self._keys(name)
+        raw = await self._client.get(result_key)
+        if raw is None:
+            return None
+        try:
+            body = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if int(body.get("fencing_token", 0)) < min_token:
+            return None
+        return body.get("value")
+
+
+def advisory_lock_key(name: str) -> int:
+    """Map ``name`` to a stable signed 64-bit advisory lock key."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class PostgresAdvisoryLeaseBackend(LeaseBackend):
+    """Session advisory locks; the lease lives as long as its connection."""
+
+    name = "postgres"
+
+    def __init__(self, engine_factory: Callable[[], Any]):
+        self._engine_factory = engine_factory
+
+    async def _connect(self):
+        conn = await self._engine_factory().connect()
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        return conn
+
+    async def acquire(self, name: str, ttl_ms: int) -> Lease | None:
+        conn = await self._connect()
+        try:
+            key = advisory_lock_key(name)
+            locked = (
+                await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+            ).scalar()
+            if not locked:
+                await conn.close()
+                return None
+            # Clock-based, like Redis tokens, so both backends' tokens compare.
+            token = (
+                await conn.execute(
+                    text("SELECT (extract(epoch FROM clock_timestamp()) * 1000)::bigint")
+                )
+            ).scalar()
+        except BaseException:
+            await conn.close()
+            raise
+        return Lease(
+            name=name, owner=uuid4().hex, fencing_token=int(token), backend=self, handle=conn
+        )
+
+    async def check(self, lease: Lease) -> bool:
+        try:
+            await lease.handle.execute(text("SELECT 1"))
+        except Exception:
+            return False
+        return True
+
+    async def release(self, lease: Lease) -> None:
+        conn = lease.handle
+        try:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": advisory_lock_key(lease.name)}
+            )
+        finally:
+            await conn.close()
+
+    async def is_held(self, name: str) -> bool:
+        key = advisory_lock_key(name)
+        conn = await self._connect()
+        try:
+            free = (
+                await conn.execute(text("SELECT pg_try_advisory_lock_shared(:key)"), {"key": key})
+            ).scalar()
+            if free:
+                await conn.execute(text("SELECT pg_advisory_unlock_shared(:key)"), {"key": key})
+            return not free
+        finally:
+            await conn.close()
+
+
+class LocalLeaseBackend(LeaseBackend):
+    """Process-local leases; coordinates nothing beyond this process.
+
+    Local leases never expire, so there is no newer leader to fence out, and
+    tokens restart with the process; ``fence_writes`` skips them.
+    """
+
+    name = "local"
+    fenced = False
+
+    def __init__(self):
+        self._owners: dict[str, str] = {}
+        self._tokens: dict[str, int] = {}
+
+    async def acquire(self, name: str, ttl_ms: int) -> Lease | None:
+        if name in self._owners:
+            return None
+        owner = uuid4().hex
+        self._owners[name] = owner
+        self._tokens[name] = self._tokens.get(name, 0) + 1
+        return Lease(name=name, owner=owner, fencing_token=self._tokens[name], backend=self)
+
+    async def check(self, lease: Lease) -> bool:
+        return self._owners.get(lease.name) == lease.owner
+
+    async def release(self, lease: Lease) -> None:
+        if self._owners.get(lease.name) == lease.owner:
+            del self._owners[lease.name]
+
+    async def is_held(self, name: str) -> bool:
+        return name in self._owners
+
+    async def current_token(self, name: str) -> int:
+        return self._tokens.get(name, 0)
+
+
+class FailoverLeaseBackend(LeaseBackend):
+    """Redis leases that fall back to ``fallback`` while Redis is unreachable.
+
+    A failed Redis call switches new acquires and lookups to ``fallback`` for
+    ``retry_seconds``. Granted leases keep their own backend, so a lease is
+    always checked, renewed and released where it was taken.
+    """
+
+    def __init__(
+        self,
+        primary: LeaseBackend,
+        fallback: LeaseBackend,
+        *,
+        retry_seconds: float = LEASE_REDIS_RETRY_SECONDS,
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self._retry_seconds = retry_seconds
+        self._disabled_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.primary.name if self._available() else self.fallback.name
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _disable(self, exc: Exception) -> None:
+        logger.warning(
+            "Redis lease backend unavailable, using %s leases: %s", self.fallback.name, exc
+        )
+        self._disabled_until = time.monotonic() + self._retry_seconds
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        if self._available():
+            try:
+                return await getattr(self.primary, method)(*args)
+            except (RedisError, OSError) as exc:
+                self._disable(exc)
+        return await getattr(self.fallback, method)(*args)
+
+    async def acquire(self, name: str, ttl_ms: int) -> Lease | None:
+        return await self._call("acquire", name, ttl_ms)
+
+    async def check(self, lease: Lease) -> bool:
+        return await lease.backend.check(lease)
+
+    async def renew(self, lease: Lease, ttl_ms: int) -> bool:
+        return await lease.backend.renew(lease, ttl_ms)
+
+    async def release(self, lease: Lease) -> None:
+        await lease.backend.release(lease)
+
+    async def is_held(self, name: str) -> bool:
+        return await self._call("is_held", name)
+
+    async def current_token(self, name: str) -> int:
+        return await self._call("current_token", name)
+
+    async def publish_result(self, lease: Lease, payload: Any, ttl_ms: int) -> None:
+        await lease.backend.publish_result(lease, payload, ttl_ms)
+
+    async def read_result(self, name: str, min_token: int) -> Any | None:
+        return await self._call("read_result", name, min_token)
+
+
+def build_lease_backend(
+    *, redis_url: str | None, database_url: str, engine_factory: Callable[[], Any]
+) -> LeaseBackend:
+    """Return Redis (failing over to the database backend), else Postgres, else local."""
+    if database_url.startswith("postgresql"):
+        database_backend: LeaseBackend = PostgresAdvisoryLeaseBackend(engine_factory)
+    else:
+        database_backend = LocalLeaseBackend()
+    if redis_url and redis_from_url is not None:
+        return FailoverLeaseBackend(
+            RedisLeaseBackend(
+                redis_from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            ),
+            database_backend,
+        )
+    return database_backend
+
+
+async def fence_writes(session, lease: Lease) -> None:
+    """Claim ``lease``'s fencing token for ``session``'s transaction.
+
+    Call before writing. The conditional upsert row-locks the lease's
+    ``LeaseFence`` row until commit and only applies when no newer token has
+    written; otherwise it raises ``LeaseLost`` and the caller must roll back.
+    """
+    if not lease.backend.fenced:
+        return
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    table = LeaseFence.__table__
+    stmt = dialect.insert(table).values(
+        name=lease.name, fencing_token=lease.fencing_token, updated_at=utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"fencing_token": stmt.excluded.fencing_token, "updated_at": stmt.excluded.updated_at},
+        where=table.c.fencing_token <= stmt.excluded.fencing_token,
+    )
+    result = await session.exec(stmt)
+    if not result.rowcount:
+        lease.lost = True
+        raise LeaseLost(
+            f"Lease {lease.name} (token {lease.fencing_token}) was superseded by a newer writer"
+        )
+
+
+async def _keep_alive(lease: Lease, ttl_ms: int) -> None:
+    while True:
+        await asyncio.sleep(ttl_ms / 3000)
+        try:
+            renewed = await lease.backend.renew(lease, ttl_ms)
+        except Exception as exc:
+            logger.warning("Failed to renew lease %s: %s", lease.name, exc)
+            continue
+        if not renewed:
+            logger.error("Lost lease %s (token %s)", lease.name, lease.fencing_token)
+            lease.lost = True
+            return
+
+
+async def _release(lease: Lease) -> None:
+    try:
+        await lease.backend.release(lease)
+    except Exception as exc:
+        logger.warning("Failed to release lease %s: %s", lease.name, exc)
+
+
+@asynccontextmanager
+async def held_leases(
+    backend: LeaseBackend, names: Iterable[str], *, ttl_seconds: float = 60.0
+) -> AsyncIterator[Dict[str, Lease]]:
+    """Take every lease in ``names`` that is free and yield them by name.
+
+    Names another caller holds are left out instead of waited for, so two
+    callers never deadlock. The leases are renewed until the block exits and
+    then released. A backend error raises ``LeaseUnavailable`` after
+    releasing whatever was already taken.
+    """
+    ttl_ms = max(1000, int(ttl_seconds * 1000))
+    leases: Dict[str, Lease] = {}
+    renewals: list[asyncio.Task] = []
+    try:
+        for name in dict.fromkeys(names):
+            try:
+                lease = await backend.acquire(name, ttl_ms)
+            except Exception as exc:
+                raise LeaseUnavailable(
+                    f"Lease backend {backend.name} unavailable for {name}"
+                ) from exc
+            if lease is not None:
+                leases[name] = lease
+                renewals.append(asyncio.create_task(_keep_alive(lease, ttl_ms)))
+        yield leases
+    finally:
+        for task in renewals:
+            task.cancel()
+        for lease in leases.values():
+            await _release(lease)
+
+
+@dataclass
+class FlightResult(Generic[T]):
+    value: T | None
+    role: str
+    backend: str
+    fencing_token: int
+
+    def describe(self) -> dict[str, Any]:
+        return {"role": self.role, "backend": self.backend, "fencing_token": self.fencing_token}
+
+
+class DistributedSingleFlight:
+    """Run a job at most once at a time across every replica sharing ``backend``."""
+
+    def __init__(
+        self,
+        name: str,
+        backend: LeaseBackend,
+        *,
+        ttl_seconds: float = 60.0,
+        wait_timeout_seconds: float = 900.0,
+        poll_seconds: float = 1.0,
+        result_ttl_seconds: float = 300.0,
+    ):
+        self.name = name
+        self.backend = backend
+        self.ttl_ms = max(1000, int(ttl_seconds * 1000))
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.result_ttl_ms = max(1000, int(result_ttl_seconds * 1000))
+        self._inflight: asyncio.Future | None = None
+
+    async def run(self, job: Callable[[Lease], Awaitable[T]]) -> FlightResult[T]:
+        """Run ``job`` as leader, or wait for and return the in-flight run."""
+        if self._inflight is not None:
+            joined = await asyncio.shield(self._inflight)
+            return FlightResult(joined.value, "joined", joined.backend, joined.fencing_token)
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; mark failures as retrieved.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight = future
+        try:
+            outcome = await self._lead_or_wait(job)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(outcome)
+            return outcome
+        finally:
+            self._inflight = None
+
+    async def _lead_or_wait(self, job: Callable[[Lease], Awaitable[T]]) -> FlightResult[T]:
+        backend = self.backend
+        try:
+            lease = await backend.acquire(self.name, self.ttl_ms)
+        except Exception as exc:
+            raise LeaseUnavailable(
+                f"Lease backend {backend.name} unavailable for {self.name}"
+            ) from exc
+        if lease is not None:
+            return await self._lead(lease, job)
+        token = await backend.current_token(self.name)
+        logger.info(
+            "%s is running on another replica (token %s); waiting for its result",
+            self.name,
+            token,
+        )
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        while await backend.is_held(self.name):
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for %s on another replica", self.name)
+                break
+            await asyncio.sleep(self.poll_seconds)
+        value = await backend.read_result(self.name, token)
+        return FlightResult(value, "joined", backend.name, token)
+
+    async def _lead(self, lease: Lease, job: Callable[[Lease], Awaitable[T]]) -> FlightResult[T]:
+        backend = lease.backend
+        keep_alive = asyncio.create_task(_keep_alive(lease, self.ttl_ms))
+        try:
+            value = await job(lease)
+            try:
+                await backend.publish_result(lease, value, self.result_ttl_ms)
+            except Exception as exc:
+                logger.warning("Failed to publish %s result: %s", self.name, exc)
+            return FlightResult(value, "leader", backend.name, lease.fencing_token)
+        finally:
+            keep_alive.cancel()
+            await _release(lease)
@@ -12,7 +12,7 @@ from sqlalchemy import text
 from .database import get_session
 from .logging import bind_request_context, clear_request_context, configure_logging
 try:
-    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 except ModuleNotFoundError:  # pragma: no cover - fallback when optional dependency missing
     CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"
 
@@ -34,6 +34,20 @@ except ModuleNotFoundError:  # pragma: no cover - fallback when optional depende
             bucket["count"] += 1
             bucket["sum"] += float(value)
 
+    class _GaugeHandle:
+        def __init__(self, parent, key):
+            self._parent = parent
+            self._key = key
+
+        def set(self, value: float) -> None:
+            self._parent.values[self._key] = float(value)
+
+        def inc(self, amount: float = 1.0) -> None:
+            self._parent.values[self._key] = self._parent.values.get(self._key, 0.0) + amount
+
+        def dec(self, amount: float = 1.0) -> None:
+            self.inc(-amount)
+
     class _BaseMetric:
         def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
             self.name = name
@@ -70,9 +84,24 @@ except ModuleNotFoundError:  # pragma: no cover - fallback when optional depende
             self.values.setdefault(key, {"count": 0, "sum": 0.0})
             return _HistogramHandle(self, key)
 
+    class _FallbackGauge(_BaseMetric):
+        registry: list["_FallbackGauge"] = []
+
+        def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+            super().__init__(name, documentation, labelnames)
+            self.__class__.registry.append(self)
+
+        def labels(self, *label_values: str) -> _GaugeHandle:
+            key = self._label_key(tuple(label_values))
+            self.values.setdefault(key, 0.0)
+            return _GaugeHandle(self, key)
+
     def Counter(name: str, documentation: str, labelnames: tuple[str, ...]):  # type: ignore[override]
         return _FallbackCounter(name, documentation, labelnames)
 
+    def Gauge(name: str, documentation: str, labelnames: tuple[str, ...]):  # type: ignore[override]
+        return _FallbackGauge(name, documentation, labelnames)
+
     def Histogram(name: str, documentation: str, labelnames: tuple[str, ...]):  # type: ignore[override]
         return _FallbackHistogram(name, documentation, labelnames)
 
@@ -84,6 +113,12 @@ except ModuleNotFoundError:  # pragma: no cover - fallback when optional depende
             for labels, value in metric.values.items():
                 label_text = ",".join(f"{k}=\"{v}\"" for k, v in zip(metric.labelnames, labels))
                 lines.append(f"{metric.name}{{{label_text}}} {value}")
+        for metric in _FallbackGauge.registry:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} gauge")
+            for labels, value in metric.values.items():
+                label_text = ",".join(f"{k}=\"{v}\"" for k, v in zip(metric.labelnames, labels))
+                lines.append(f"{metric.name}{{{label_text}}} {value}")
         for metric in _FallbackHistogram.registry:
             lines.append(f"# HELP {metric.name} {metric.documentation}")
             lines.append(f"# TYPE {metric.name} summary")
@@ -200,6 +235,9 @@ async def _database_ready() -> bool:
 
 __all__ = [
     "_database_ready",
+    "Counter",
+    "Gauge",
+    "Histogram",
     "register_observability",
     "REQUEST_COUNTER",
     "REQUEST_LATENCY",
@@ -4,11 +4,14 @@ from __future__ import annotations
 
 import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy import and_, case, or_, update
+from sqlalchemy.exc import IntegrityError
 
 from .database import get_session
 from .time import utcnow
@@ -190,6 +193,166 @@ async def increment_quota(user_id: int, resource_type: str, count: int = 1) -> d
         }
 
 
+@dataclass
+class QuotaReservation:
+    """Quota units consumed up front for a request that may still fail."""
+
+    user_id: int
+    resource_type: str
+    count: int
+    reserved_at: datetime
+
+
+def _month_start(now: datetime) -> datetime:
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _reserve_statement(user_id: int, count: int, now: datetime, limit_clause):
+    """Build the conditional ``UPDATE`` that consumes ``count`` units.
+
+    The monthly window reset and legacy limit sync from ``ensure_quota_state``
+    are folded into the same statement, so the check and the increment see
+    one consistent row and concurrent reservations cannot overshoot.
+    """
+    stale = User.last_reset < _month_start(now)
+    used = case((stale, 0), else_=User.quota_used)
+    legacy_limit = case(
+        *[(User.plan == plan, limit) for plan, limit in LEGACY_PLAN_LIMITS.items()],
+        else_=User.quota_limit,
+    )
+    return (
+        update(User)
+        .where(User.id == user_id, limit_clause(used + count))
+        .values(
+            quota_used=used + count,
+            last_reset=case((stale, now), else_=User.last_reset),
+            quota_limit=legacy_limit,
+        )
+        .returning(User.quota_used, User.plan, User.quota_limit)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _legacy_limit_clause(consumed):
+    return or_(
+        *[
+            User.plan == plan if limit is None else and_(User.plan == plan, consumed <= limit)
+            for plan, limit in LEGACY_PLAN_LIMITS.items()
+        ]
+    )
+
+
+def _billing_limit_clause(limit: Optional[int]):
+    def clause(consumed):
+        condition = User.plan.notin_(LEGACY_PLAN_LIMITS)
+        return condition if limit is None else and_(condition, consumed <= limit)
+
+    return clause
+
+
+async def _try_reserve(user_id: int, count: int, now: datetime, limit_clause):
+    async with get_session() as session:
+        result = await session.exec(_reserve_statement(user_id, count, now, limit_clause))
+        row = result.first()
+        await session.commit()
+    return row
+
+
+async def _ensure_user(user_id: int, now: datetime) -> User:
+    async with get_session() as session:
+        user = await session.get(User, user_id)
+        if user:
+            return user
+        user = User(id=user_id, last_reset=now)
+        ensure_quota_state(user, now)
+        session.add(user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent request created the row first.
+            await session.rollback()
+            user = await session.get(User, user_id)
+        return user
+
+
+def _reservation_details(
+    allowed: bool, used: int, limit: Optional[int], plan_tier: str, status_code: int
+) -> dict:
+    return {
+        "allowed": allowed,
+        "limit": limit,
+        "used": used,
+        "remaining": None if limit is None else max(0, limit - used),
+        "plan_tier": plan_tier,
+        "status_code": status_code,
+    }
+
+
+async def reserve_quota(
+    user_id: int, resource_type: str, count: int = 1
+) -> tuple[Optional[QuotaReservation], dict]:
+    """Atomically check and consume ``count`` units of quota.
+
+    Returns the reservation (``None`` when denied) and the same details dict
+    as ``check_quota``. Legacy plans settle in one conditional
+    ``UPDATE ... RETURNING``; billing plans resolve their limit from the
+    locally stored tier first and then run the same statement. Hand the
+    reservation to ``release_quota`` when the work it paid for fails.
+    """
+    now = utcnow()
+    row = await _try_reserve(user_id, count, now, _legacy_limit_clause)
+    if row is not None:
+        used, plan, limit = row
+        reservation = QuotaReservation(user_id, resource_type, count, now)
+        return reservation, _reservation_details(True, used, limit, plan, 403)
+
+    user = await _ensure_user(user_id, now)
+    if user.plan in LEGACY_PLAN_LIMITS:
+        plan_tier, limit, status_code = user.plan, plan_limit(user.plan), 403
+        row = await _try_reserve(user_id, count, now, _legacy_limit_clause)
+    else:
+        limits = await get_user_quota_limits(user_id)
+        plan_tier, status_code = limits["plan_tier"], 402
+        limit = limits.get(f"monthly_{resource_type}")
+        row = await _try_reserve(user_id, count, now, _billing_limit_clause(limit))
+
+    if row is not None:
+        reservation = QuotaReservation(user_id, resource_type, count, now)
+        return reservation, _reservation_details(True, row[0], limit, plan_tier, status_code)
+
+    async with get_session() as session:
+        current = await session.get(User, user_id)
+        if current and ensure_quota_state(current, now):
+            session.add(current)
+            await session.commit()
+        used = current.quota_used if current else 0
+    return None, _reservation_details(False, used, limit, plan_tier, status_code)
+
+
+async def release_quota(reservation: QuotaReservation) -> None:
+    """Refund a reservation whose request failed.
+
+    Skipped when the monthly window has rolled over since the reservation,
+    because the reset already discarded the units it consumed.
+    """
+    count = reservation.count
+    async with get_session() as session:
+        await session.exec(
+            update(User)
+            .where(
+                User.id == reservation.user_id,
+                User.last_reset <= reservation.reserved_at,
+            )
+            .values(
+                quota_used=case(
+                    (User.quota_used >= count, User.quota_used - count), else_=0
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+
 async def quota_middleware(request: Request, call_next):
     """Middleware to enforce quotas on image generation endpoint."""
     if request.url.path not in {"/images", "/generate"} or request.method.upper() != "POST":
@@ -211,14 +374,17 @@ async def quota_middleware(request: Request, call_next):
         count = 1
     request._body = body_bytes
 
-    allowed, details = await check_quota(user_id, "images", count)
-
-    if not allowed:
+    reservation, details = await reserve_quota(user_id, "images", count)
+    if reservation is None:
         return quota_exceeded_response(details)
 
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception:
+        await release_quota(reservation)
+        raise
 
-    if response.status_code < 400:
-        await increment_quota(user_id, "images", count)
+    if response.status_code >= 400:
+        await release_quota(reservation)
 
     return response
@@ -1,7 +1,9 @@
 """Rate limiting middleware for FastAPI.
 
-Provides per-user and per-IP rate limiting using an in-memory token bucket.
-Falls back to a simple in-memory store when Redis is not available.
+Provides per-user and per-IP rate limiting. When ``RATE_LIMIT_REDIS_URL``
+(default ``REDIS_URL``) is set, every worker shares one GCRA bucket per key
+through an atomic Lua script; otherwise, or while Redis is unreachable, each
+process falls back to its own in-memory token buckets.
 
 Owner: Backend-Coder (per DEVELOPMENT_PLAN.md Task 2.2.1)
 Reference: BC-08 (Performance & Scalability)
@@ -9,8 +11,11 @@ Reference: BC-08 (Performance & Scalability)
 
 from __future__ import annotations
 
+import logging
+import math
 import os
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Callable
 
@@ -19,6 +24,15 @@ from fastapi.responses import JSONResponse
 
 from .auth import optional_user_id
 
+try:
+    from redis.asyncio import from_url as redis_from_url
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis_from_url = None
+    RedisError = Exception
+
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Plan-tier rate limit configuration (requests per minute)
 # ---------------------------------------------------------------------------
@@ -33,6 +47,13 @@ PLAN_RATE_LIMITS: dict[str, int] = {
 # IP-level rate limit for unauthenticated endpoints (requests per minute)
 IP_RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_IP", "60"))
 
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("REDIS_URL", ""))
+# After a Redis failure, stay on the in-process limiter this long before retrying.
+RATE_LIMIT_REDIS_RETRY_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "30"))
+RATE_LIMIT_WINDOW_MS = 60_000
+# Buckets idle this long are full again and can be forgotten.
+STALE_BUCKET_SECONDS = 300
+
 
 @dataclass
 class TokenBucket:
@@ -74,34 +95,115 @@ class RateLimiter:
     """In-memory rate limiter with per-key token buckets."""
 
     def __init__(self):
-        self._buckets: dict[str, TokenBucket] = {}
-        self._cleanup_counter = 0
+        # Ordered by last use, so stale buckets always sit at the front.
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
 
     def check(self, key: str, limit: int) -> tuple[bool, dict[str, int]]:
         """Check rate limit for a key. Creates bucket if needed."""
+        self._cleanup()
         bucket = self._buckets.get(key)
         if bucket is None or bucket.capacity != limit:
             bucket = TokenBucket(capacity=limit)
             self._buckets[key] = bucket
-
-        # Periodic cleanup of old buckets
-        self._cleanup_counter += 1
-        if self._cleanup_counter >= 1000:
-            self._cleanup()
-            self._cleanup_counter = 0
-
+        self._buckets.move_to_end(key)
         return bucket.allow()
 
     def _cleanup(self):
-        """Remove stale buckets older than 5 minutes."""
+        """Drop buckets idle for more than ``STALE_BUCKET_SECONDS``."""
         now = time.monotonic()
-        stale = [k for k, v in self._buckets.items() if now - v.last_refill > 300]
-        for k in stale:
-            del self._buckets[k]
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket.last_refill <= STALE_BUCKET_SECONDS:
+                break
+            del self._buckets[key]
+
+
+# GCRA over integer milliseconds. KEYS[1] holds the bucket's theoretical
+# arrival time and expires once the bucket would be full again, so idle
+# clients cost nothing. ARGV: limit, emission interval (ms per request).
+# Returns {allowed, remaining, retry_after_ms, reset_ms}.
+_GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local period = emission * limit
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+  tat = now
+end
+local new_tat = tat + emission
+if new_tat - now > period then
+  return {0, 0, new_tat - now - period, tat - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((period - (new_tat - now)) / emission), 0, new_tat - now}
+"""
+
+
+class RedisRateLimiter:
+    """Rate limiter shared by every worker through Redis.
+
+    Each check is one ``EVALSHA`` of ``_GCRA_SCRIPT``. Redis errors switch to
+    ``fallback`` for ``RATE_LIMIT_REDIS_RETRY_SECONDS`` instead of failing
+    the request.
+    """
+
+    def __init__(
+        self,
+        client,
+        fallback: RateLimiter,
+        *,
+        prefix: str = "ratelimit:",
+        retry_seconds: float = RATE_LIMIT_REDIS_RETRY_SECONDS,
+    ):
+        self._script = client.register_script(_GCRA_SCRIPT)
+        self._fallback = fallback
+        self._prefix = prefix
+        self._retry_seconds = retry_seconds
+        self._disabled_until = 0.0
+
+    async def check(self, key: str, limit: int) -> tuple[bool, dict[str, int]]:
+        if time.monotonic() < self._disabled_until:
+            return self._fallback.check(key, limit)
+        emission_ms = math.ceil(RATE_LIMIT_WINDOW_MS / max(limit, 1))
+        try:
+            allowed, remaining, retry_ms, reset_ms = await self._script(
+                keys=[f"{self._prefix}{key}"], args=[limit, emission_ms]
+            )
+        except (RedisError, OSError) as exc:
+            logger.warning("Redis rate limiter unavailable, using in-process buckets: %s", exc)
+            self._disabled_until = time.monotonic() + self._retry_seconds
+            return self._fallback.check(key, limit)
+
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(int(remaining)),
+            "X-RateLimit-Reset": str(int(time.time()) + math.ceil(int(reset_ms) / 1000)),
+        }
+        if not int(allowed):
+            headers["Retry-After"] = str(max(1, math.ceil(int(retry_ms) / 1000)))
+            return False, headers
+        return True, headers
 
 
-# Singleton instance
+# Singleton instances
 _limiter = RateLimiter()
+_shared_limiter: RedisRateLimiter | None = None
+if RATE_LIMIT_REDIS_URL and redis_from_url is not None:
+    _shared_limiter = RedisRateLimiter(
+        redis_from_url(
+            RATE_LIMIT_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        ),
+        _limiter,
+    )
+
+
+async def check_rate_limit(key: str, limit: int) -> tuple[bool, dict[str, int]]:
+    """Check ``key`` against the shared limiter, or this process's buckets."""
+    if _shared_limiter is not None:
+        return await _shared_limiter.check(key, limit)
+    return _limiter.check(key, limit)
 
 # Paths excluded from rate limiting
 _EXCLUDED_PATHS = {"/healthz", "/metrics", "/docs", "/openapi.json", "/redoc"}
@@ -141,7 +243,7 @@ def register_rate_limiting(app: FastAPI) -> None:
             limit = IP_RATE_LIMIT
             key = f"ip:{client_ip}"
 
-        allowed, headers = _limiter.check(key, limit)
+        allowed, headers = await check_rate_limit(key, limit)
 
         if not allowed:
             return JSONResponse(
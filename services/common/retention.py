@@ -0,0 +1,283 @@
+"""Retention for raw ``TrendSignal`` and ``AnalyticsEvent`` rows.
+
+Rows older than their table's retention window are archived to gzip
+compressed newline-delimited JSON under ``RETENTION_ARCHIVE_DIR`` and then
+deleted in batches of ``RETENTION_BATCH_SIZE``, one short transaction per
+batch. Analytics events are folded into ``AnalyticsEventRollup`` hourly and
+daily counts in the same transaction that deletes them, so
+``aggregate_metrics`` totals survive. Trend signals need no extra
+downsampling: ``TrendKeywordRollup`` is maintained at write time. Hourly and
+daily rollup rows of both tables expire after ``ROLLUP_HOURLY_RETENTION_DAYS``
+and ``ROLLUP_DAILY_RETENTION_DAYS``.
+
+Only rows a batch's ``DELETE ... RETURNING`` actually removed are folded into
+rollups, and Postgres batches skip rows another run has locked, so
+overlapping runs cannot double count. The scheduled job also runs under a
+``DistributedSingleFlight`` lease so only one replica does the work. It runs
+on its own APScheduler every ``RETENTION_INTERVAL_MINUTES``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from collections import Counter as TallyCounter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import database
+from .database import get_session
+from .distributed_lock import DistributedSingleFlight, build_lease_backend
+from .observability import Counter, Histogram
+from .time import utcnow
+from .trend_rollups import ROLLUP_GRANULARITIES, TREND_SIGNAL_RETENTION_DAYS, bucket_start
+from ..models import AnalyticsEvent, AnalyticsEventRollup, TrendKeywordRollup, TrendSignal
+
+logger = logging.getLogger(__name__)
+
+RETENTION_INTERVAL_MINUTES = int(os.getenv("RETENTION_INTERVAL_MINUTES", "60"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "archive/retention")
+ANALYTICS_EVENT_RETENTION_DAYS = int(os.getenv("ANALYTICS_EVENT_RETENTION_DAYS", "90"))
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "30"))
+ROLLUP_DAILY_RETENTION_DAYS = int(os.getenv("ROLLUP_DAILY_RETENTION_DAYS", "730"))
+RETENTION_LOCK_REDIS_URL = os.getenv("RETENTION_LOCK_REDIS_URL", os.getenv("REDIS_URL", ""))
+
+RETENTION_ROWS = Counter(
+    "pod_retention_rows_total",
+    "Rows archived and deleted by the retention job",
+    labelnames=("table",),
+)
+RETENTION_DURATION = Histogram(
+    "pod_retention_duration_seconds",
+    "Time spent applying retention to one table",
+    labelnames=("table",),
+)
+
+_retention_scheduler = AsyncIOScheduler()
+retention_flight = DistributedSingleFlight(
+    "retention",
+    build_lease_backend(
+        redis_url=RETENTION_LOCK_REDIS_URL,
+        database_url=database.DATABASE_URL,
+        engine_factory=lambda: database.engine,
+    ),
+)
+
+
+@dataclass
+class RetentionReport:
+    table: str
+    cutoff: datetime
+    rows_deleted: int = 0
+    rollups_touched: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    archives: List[str] = field(default_factory=list)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def _append_archive(path: Path, rows: Sequence[Dict[str, Any]]) -> None:
+    # Each batch is appended as its own gzip member; readers such as
+    # ``gzip.open`` and ``zcat`` see one continuous stream.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row, default=_json_default, sort_keys=True))
+            handle.write("\n")
+
+
+async def _upsert_event_rollups(
+    session: AsyncSession, rows: Sequence[Dict[str, Any]]
+) -> int:
+    counts: TallyCounter = TallyCounter()
+    for row in rows:
+        event_type = row["event_type"]
+        event_type = event_type.value if isinstance(event_type, Enum) else str(event_type)
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (granularity, bucket_start(row["created_at"], granularity), row["path"], event_type)
+            counts[key] += 1
+    if not counts:
+        return 0
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    table = AnalyticsEventRollup.__table__
+    stmt = dialect.insert(table).values(
+        [
+            {
+                "granularity": granularity,
+                "bucket_start": bucket,
+                "path": path,
+                "event_type": event_type,
+                "event_count": count,
+            }
+            for (granularity, bucket, path, event_type), count in counts.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["granularity", "bucket_start", "path", "event_type"],
+        set_={"event_count": table.c.event_count + stmt.excluded.event_count},
+    )
+    await session.exec(stmt)
+    return len(counts)
+
+
+async def _retain(
+    model: Any,
+    timestamp_column: str,
+    retention_days: int,
+    *,
+    now: datetime,
+    archive_dir: Path,
+    batch_size: int,
+    granularity: str | None = None,
+) -> RetentionReport:
+    table = model.__table__
+    label = f"{table.name}.{granularity}" if granularity else table.name
+    cutoff = now - timedelta(days=retention_days)
+    report = RetentionReport(table=label, cutoff=cutoff)
+    archive = archive_dir / table.name / f"{label}-{now:%Y%m%dT%H%M%S}.ndjson.gz"
+    expired = table.c[timestamp_column] < cutoff
+    if granularity:
+        expired = expired & (table.c.granularity == granularity)
+    started = time.perf_counter()
+    while True:
+        async with get_session() as session:
+            result = await session.exec(
+                select(*table.c)
+                .where(expired)
+                .order_by(table.c.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = [dict(row._mapping) for row in result.all()]
+            if not rows:
+                break
+            # Archive before deleting so a crash can only duplicate, never lose.
+            await asyncio.to_thread(_append_archive, archive, rows)
+            # Rows a concurrent run already removed are not returned, so they
+            # are never folded into the rollups twice.
+            deleted_ids = set(
+                (
+                    await session.exec(
+                        delete(table)
+                        .where(table.c.id.in_([row["id"] for row in rows]))
+                        .returning(table.c.id)
+                    )
+                ).scalars()
+            )
+            if model is AnalyticsEvent:
+                report.rollups_touched += await _upsert_event_rollups(
+                    session, [row for row in rows if row["id"] in deleted_ids]
+                )
+            await session.commit()
+        report.rows_deleted += len(deleted_ids)
+        report.batches += 1
+        if len(rows) < batch_size:
+            break
+    if report.batches:
+        report.archives.append(str(archive))
+    report.seconds = time.perf_counter() - started
+    RETENTION_ROWS.labels(label).inc(report.rows_deleted)
+    RETENTION_DURATION.labels(label).observe(report.seconds)
+    return report
+
+
+async def apply_retention(
+    now: datetime | None = None,
+    *,
+    archive_dir: str | Path | None = None,
+    batch_size: int | None = None,
+) -> List[RetentionReport]:
+    """Archive, downsample and delete expired rows; return one report per table.
+
+    Rollup tables report once per granularity, e.g. ``trendkeywordrollup.hour``.
+    A retention window of 0 days or less disables that table.
+    """
+    now = now or utcnow()
+    target = Path(archive_dir or RETENTION_ARCHIVE_DIR)
+    size = max(1, batch_size or RETENTION_BATCH_SIZE)
+    reports: List[RetentionReport] = []
+    for model, column, days, granularity in (
+        (TrendSignal, "timestamp", TREND_SIGNAL_RETENTION_DAYS, None),
+        (AnalyticsEvent, "created_at", ANALYTICS_EVENT_RETENTION_DAYS, None),
+        (TrendKeywordRollup, "bucket_start", ROLLUP_HOURLY_RETENTION_DAYS, "hour"),
+        (TrendKeywordRollup, "bucket_start", ROLLUP_DAILY_RETENTION_DAYS, "day"),
+        (AnalyticsEventRollup, "bucket_start", ROLLUP_HOURLY_RETENTION_DAYS, "hour"),
+        (AnalyticsEventRollup, "bucket_start", ROLLUP_DAILY_RETENTION_DAYS, "day"),
+    ):
+        if days <= 0:
+            continue
+        report = await _retain(
+            model,
+            column,
+            days,
+            now=now,
+            archive_dir=target,
+            batch_size=size,
+            granularity=granularity,
+        )
+        logger.info(
+            "Retention %s: %d rows archived and deleted in %d batches (%.2fs), "
+            "%d rollups touched, cutoff %s",
+            report.table,
+            report.rows_deleted,
+            report.batches,
+            report.seconds,
+            report.rollups_touched,
+            report.cutoff.isoformat(),
+        )
+        reports.append(report)
+    return reports
+
+
+async def _apply_retention_once(_lease) -> Dict[str, int]:
+    reports = await apply_retention()
+    return {report.table: report.rows_deleted for report in reports}
+
+
+async def _run_retention() -> None:
+    try:
+        await retention_flight.run(_apply_retention_once)
+    except Exception:  # pragma: no cover - logged for the scheduler
+        logger.exception("Retention run failed")
+
+
+def start_retention_scheduler() -> None:
+    if RETENTION_INTERVAL_MINUTES <= 0:
+        logger.debug("Retention scheduler disabled via configuration")
+        return
+    if _retention_scheduler.running:
+        return
+    _retention_scheduler.add_job(
+        _run_retention,
+        "interval",
+        minutes=RETENTION_INTERVAL_MINUTES,
+        max_instances=1,
+        coalesce=True,
+    )
+    _retention_scheduler.start()
+
+
+def stop_retention_scheduler() -> None:
+    if _retention_scheduler.running:
+        _retention_scheduler.shutdown(wait=False)
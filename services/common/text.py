@@ -0,0 +1,11 @@
+import re
+
+STOPWORDS = {"the", "and", "a", "of", "to", "in"}
+EMOJI_RE = re.compile(r"[\U00010000-\U0010FFFF]", flags=re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text, remove emojis and stopwords."""
+    text = EMOJI_RE.sub("", text).lower()
+    words = [word for word in re.split(r"\W+", text) if word and word not in STOPWORDS]
+    return " ".join(words)
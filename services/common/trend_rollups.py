@@ -0,0 +1,343 @@
+"""Portable hourly/daily keyword rollups for trend signals.
+
+``refresh_trends`` recomputes the touched ``TrendKeywordRollup`` buckets in the
+same transaction that persists raw ``TrendSignal`` rows, so trending-keyword and insight readers
+aggregate O(keywords) rollup rows instead of scanning every raw signal. Works
+on plain PostgreSQL and SQLite; TimescaleDB continuous aggregates are not
+required.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import and_, case, delete, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .database import get_session
+from .time import utcnow
+from ..models import TrendKeywordRollup, TrendSignal
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+REBUILD_BATCH_SIZE = 5000
+# Retention archives and deletes raw signals older than this; rollups outlive them.
+TREND_SIGNAL_RETENTION_DAYS = int(os.getenv("TREND_SIGNAL_RETENTION_DAYS", "30"))
+
+_RollupKey = Tuple[str, datetime, str, str, str]
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate ``value`` to the start of its hour or day bucket."""
+    hour = value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return hour.replace(hour=0)
+    return hour
+
+
+def rollup_window(cutoff: datetime):
+    """Filter covering ``cutoff`` onwards with the fewest rollup rows.
+
+    Hourly buckets cover the partial day after ``cutoff``; daily buckets cover
+    every whole day after that. The window is widened to the start of the
+    hour containing ``cutoff``.
+    """
+    hour_start = bucket_start(cutoff, "hour")
+    day_start = bucket_start(hour_start, "day")
+    if day_start < hour_start:
+        day_start += timedelta(days=1)
+    return or_(
+        and_(
+            TrendKeywordRollup.granularity == "hour",
+            TrendKeywordRollup.bucket_start >= hour_start,
+            TrendKeywordRollup.bucket_start < day_start,
+        ),
+        and_(
+            TrendKeywordRollup.granularity == "day",
+            TrendKeywordRollup.bucket_start >= day_start,
+        ),
+    )
+
+
+def _aggregate(
+    signals: Iterable[TrendSignal], granularities: Sequence[str]
+) -> Dict[_RollupKey, Dict[str, Any]]:
+    totals: Dict[_RollupKey, Dict[str, Any]] = {}
+    for signal in signals:
+        keyword = signal.normalized_keyword or signal.keyword
+        if not keyword:
+            continue
+        score = max(0, int(signal.engagement_score or 0))
+        for granularity in granularities:
+            key = (
+                granularity,
+                bucket_start(signal.timestamp, granularity),
+                keyword,
+                signal.source,
+                signal.category,
+            )
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = {
+                    "granularity": key[0],
+                    "bucket_start": key[1],
+                    "keyword": key[2],
+                    "source": key[3],
+                    "category": key[4],
+                    "signal_count": 1,
+                    # Every signal weighs at least 1 so zero-score mentions count.
+                    "engagement_total": max(1, score),
+                    "max_engagement": score,
+                    "last_seen_at": signal.timestamp,
+                    "metadata_json": signal.metadata_json,
+                }
+                continue
+            entry["signal_count"] += 1
+            entry["engagement_total"] += max(1, score)
+            if score >= entry["max_engagement"]:
+                entry["max_engagement"] = score
+                entry["metadata_json"] = signal.metadata_json
+            entry["last_seen_at"] = max(entry["last_seen_at"], signal.timestamp)
+    return totals
+
+
+async def upsert_trend_rollups(
+    session: AsyncSession,
+    signals: Iterable[TrendSignal],
+    *,
+    granularities: Sequence[str] = ROLLUP_GRANULARITIES,
+) -> int:
+    """Fold ``signals`` into the rollup table without committing.
+
+    Returns the number of rollup rows touched. Callers commit alongside the
+    raw signal inserts so both tables move together.
+    """
+    rows = list(_aggregate(signals, granularities).values())
+    if not rows:
+        return 0
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    table = TrendKeywordRollup.__table__
+    stmt = dialect.insert(table).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["granularity", "bucket_start", "keyword", "source", "category"],
+        set_={
+            "signal_count": table.c.signal_count + excluded.signal_count,
+            "engagement_total": table.c.engagement_total + excluded.engagement_total,
+            "max_engagement": case(
+                (excluded.max_engagement > table.c.max_engagement, excluded.max_engagement),
+                else_=table.c.max_engagement,
+            ),
+            "metadata_json": case(
+                (excluded.max_engagement >= table.c.max_engagement, excluded.metadata_json),
+                else_=table.c.metadata_json,
+            ),
+            "last_seen_at": case(
+                (excluded.last_seen_at > table.c.last_seen_at, excluded.last_seen_at),
+                else_=table.c.last_seen_at,
+            ),
+        },
+    )
+    await session.exec(stmt)
+    return len(rows)
+
+
+async def recompute_trend_rollups(
+    session: AsyncSession, keys: Iterable[Tuple[str, str, datetime]]
+) -> int:
+    """Rebuild the rollups of ``(source, keyword, day)`` from raw rows, uncommitted.
+
+    ``refresh_trends`` replaces a keyword's raw signal within its hour bucket,
+    so adding the new row to the rollups would count the replaced one twice.
+    Instead the hourly and daily buckets of each touched day are dropped and
+    re-aggregated from the raw rows in the same transaction, matching what
+    ``rebuild_trend_rollups`` produces. Returns the number of rollup rows written.
+    """
+    keys = {(source, keyword, bucket_start(day, "day")) for source, keyword, day in keys}
+    if not keys:
+        return 0
+    raw_keyword = func.coalesce(TrendSignal.normalized_keyword, TrendSignal.keyword)
+    await session.exec(
+        delete(TrendKeywordRollup).where(
+            or_(
+                *(
+                    and_(
+                        TrendKeywordRollup.source == source,
+                        TrendKeywordRollup.keyword == keyword,
+                        TrendKeywordRollup.bucket_start >= day,
+                        TrendKeywordRollup.bucket_start < day + timedelta(days=1),
+                    )
+                    for source, keyword, day in keys
+                )
+            )
+        )
+    )
+    rows = (
+        await session.exec(
+            select(TrendSignal).where(
+                or_(
+                    *(
+                        and_(
+                            TrendSignal.source == source,
+                            raw_keyword == keyword,
+                            TrendSignal.timestamp >= day,
+                            TrendSignal.timestamp < day + timedelta(days=1),
+                        )
+                        for source, keyword, day in keys
+                    )
+                )
+            )
+        )
+    ).all()
+    return await upsert_trend_rollups(session, rows)
+
+
+def _first_bucket_after(value: datetime, granularity: str) -> datetime:
+    start = bucket_start(value, granularity)
+    if start < value:
+        start += timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+    return start
+
+
+def _rebuild_starts(since: datetime | None) -> Dict[str, datetime | None]:
+    """Earliest bucket of each granularity that raw signals fully cover."""
+    retained_from = (
+        utcnow() - timedelta(days=TREND_SIGNAL_RETENTION_DAYS)
+        if TREND_SIGNAL_RETENTION_DAYS > 0
+        else None
+    )
+    starts: Dict[str, datetime | None] = {}
+    for granularity in ROLLUP_GRANULARITIES:
+        floors = []
+        if since is not None:
+            floors.append(bucket_start(since, granularity))
+        if retained_from is not None:
+            floors.append(_first_bucket_after(retained_from, granularity))
+        starts[granularity] = max(floors) if floors else None
+    return starts
+
+
+async def rebuild_trend_rollups(since: datetime | None = None) -> int:
+    """Recompute rollups from raw signals at or after ``since`` (all when None).
+
+    Used to backfill after deploys and to repair drift; buckets overlapping
+    ``since`` are rebuilt in full. Buckets starting before the
+    ``TREND_SIGNAL_RETENTION_DAYS`` cutoff are never cleared, since retention
+    has already deleted part of their raw signals.
+    """
+    starts = _rebuild_starts(since)
+    touched = 0
+    async with get_session() as session:
+        await session.exec(
+            delete(TrendKeywordRollup).where(
+                or_(
+                    *(
+                        and_(
+                            TrendKeywordRollup.granularity == granularity,
+                            TrendKeywordRollup.bucket_start >= start,
+                        )
+                        if start is not None
+                        else TrendKeywordRollup.granularity == granularity
+                        for granularity, start in starts.items()
+                    )
+                )
+            )
+        )
+        raw_start = None if None in starts.values() else min(starts.values())
+        last_id = 0
+        while True:
+            stmt = select(TrendSignal).where(TrendSignal.id > last_id)
+            if raw_start is not None:
+                stmt = stmt.where(TrendSignal.timestamp >= raw_start)
+            batch = (
+                await session.exec(stmt.order_by(TrendSignal.id).limit(REBUILD_BATCH_SIZE))
+            ).all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+            # Each signal only feeds the granularities whose buckets were cleared.
+            groups: Dict[Tuple[str, ...], List[TrendSignal]] = defaultdict(list)
+            for row in batch:
+                granularities = tuple(
+                    granularity
+                    for granularity, start in starts.items()
+                    if start is None or row.timestamp >= start
+                )
+                groups[granularities].append(row)
+            for granularities, rows in groups.items():
+                touched += await upsert_trend_rollups(
+                    session, rows, granularities=granularities
+                )
+        await session.commit()
+    return touched
+
+
+async def top_rollup_keywords(
+    session: AsyncSession, cutoff: datetime, limit: int
+) -> List[Tuple[str, int]]:
+    """Return ``(keyword, weight)`` pairs ranked by summed engagement."""
+    weight = func.sum(TrendKeywordRollup.engagement_total).label("weight")
+    result = await session.exec(
+        select(TrendKeywordRollup.keyword, weight)
+        .where(rollup_window(cutoff))
+        .group_by(TrendKeywordRollup.keyword)
+        .order_by(weight.desc(), TrendKeywordRollup.keyword)
+        .limit(limit)
+    )
+    return [(keyword, int(total or 0)) for keyword, total in result.all()]
+
+
+async def top_rollup_signals(
+    session: AsyncSession, cutoff: datetime, limit: int
+) -> List[Any]:
+    """Return the strongest bucket per ``(keyword, source, category)``.
+
+    Rows expose ``keyword``, ``source``, ``category``, ``max_engagement``,
+    ``last_seen_at`` and ``metadata_json`` ordered by engagement then recency.
+    """
+    partition = (
+        TrendKeywordRollup.keyword,
+        TrendKeywordRollup.source,
+        TrendKeywordRollup.category,
+    )
+    strongest = (
+        select(
+            TrendKeywordRollup.keyword,
+            TrendKeywordRollup.source,
+            TrendKeywordRollup.category,
+            TrendKeywordRollup.max_engagement,
+            TrendKeywordRollup.metadata_json,
+            func.max(TrendKeywordRollup.last_seen_at)
+            .over(partition_by=partition)
+            .label("last_seen_at"),
+            func.row_number()
+            .over(
+                partition_by=partition,
+                order_by=(
+                    TrendKeywordRollup.max_engagement.desc(),
+                    TrendKeywordRollup.last_seen_at.desc(),
+                ),
+            )
+            .label("strength_rank"),
+        )
+        .where(rollup_window(cutoff))
+        .subquery("strongest")
+    )
+    result = await session.exec(
+        select(
+            strongest.c.keyword,
+            strongest.c.source,
+            strongest.c.category,
+            strongest.c.max_engagement,
+            strongest.c.last_seen_at,
+            strongest.c.metadata_json,
+        )
+        .where(strongest.c.strength_rank == 1)
+        .order_by(strongest.c.max_engagement.desc(), strongest.c.last_seen_at.desc())
+        .limit(limit)
+    )
+    return list(result.all())
@@ -10,8 +10,11 @@ from sqlmodel import select
 
 from ..billing.plans import get_plan_limits
 from ..billing.service import get_user_plan_tier
+from ..common.cache import CACHE_TAG_TRENDS, CACHE_TTL_TRENDS, CACHE_TTL_USER_QUOTA
+from ..common.counters import get_counts
 from ..common.database import get_session
 from ..common.time import utcnow
+from ..common.trend_rollups import top_rollup_signals
 from ..models import (
     ABTest,
     ABVariant,
@@ -27,14 +30,20 @@ from ..models import (
     SeasonalEvent,
     Store,
     TeamMember,
-    TrendSignal,
+    TrendKeywordRollup,
     UsageLedger,
     User,
     WatchlistItem,
 )
+from .dashboard import DashboardSection, compose, watch_sections
 
 DEFAULT_USER_ID = 1
 DEFAULT_NOW = utcnow
+# Cache lifetime for overview sections without a more specific TTL. Commits
+# to a section's source tables invalidate it sooner.
+CONTROL_CENTER_SECTION_TTL_SECONDS = int(
+    os.getenv("CONTROL_CENTER_SECTION_TTL_SECONDS", "120")
+)
 
 KEYWORD_FIXTURES = [
     {
@@ -503,16 +512,11 @@ def _normalize_user_id(user_id: int | None) -> int:
     return user_id or DEFAULT_USER_ID
 
 
-async def _table_count(model: Any) -> int:
-    async with get_session() as session:
-        result = await session.exec(select(func.count()).select_from(model))
-        return int(result.one() or 0)
-
-
 async def _quota_summary(user_id: int) -> dict[str, Any]:
     async with get_session() as session:
         user = await session.get(User, user_id)
     plan_tier = await get_user_plan_tier(user_id)
+    counts = await get_counts("listings", "ab_tests")
     limits = get_plan_limits(plan_tier)
     display_image_limit = max(limits.monthly_images, 100000)
     used = int(
@@ -546,12 +550,12 @@ async def _quota_summary(user_id: int) -> dict[str, Any]:
             "provenance": _provenance("usage_ledger", estimated=True, confidence=0.7),
         },
         "active_listings": {
-            "used": await _table_count(Listing),
+            "used": counts["listings"],
             "limit": limits.monthly_listings,
             "provenance": _provenance("listing_table", estimated=False, confidence=0.9),
         },
         "ab_tests": {
-            "used": await _table_count(ABTest),
+            "used": counts["ab_tests"],
             "limit": 100,
             "provenance": _provenance("abtest_table", estimated=False, confidence=0.9),
         },
@@ -561,13 +565,7 @@ async def _quota_summary(user_id: int) -> dict[str, Any]:
 async def _trend_rows(limit: int = 100) -> list[dict[str, Any]]:
     cutoff = DEFAULT_NOW() - timedelta(days=30)
     async with get_session() as session:
-        result = await session.exec(
-            select(TrendSignal)
-            .where(TrendSignal.timestamp >= cutoff)
-            .order_by(TrendSignal.engagement_score.desc(), TrendSignal.timestamp.desc())
-            .limit(limit)
-        )
-        rows = result.all()
+        rows = await top_rollup_signals(session, cutoff, limit)
 
     if not rows:
         return [
@@ -593,8 +591,8 @@ async def _trend_rows(limit: int = 100) -> list[dict[str, Any]]:
             "keyword": row.keyword,
             "source": row.source,
             "category": row.category,
-            "engagement_score": row.engagement_score,
-            "timestamp": row.timestamp.isoformat(),
+            "engagement_score": row.max_engagement,
+            "timestamp": row.last_seen_at.isoformat(),
             "metadata": row.metadata_json or {},
             "provenance": (
                 (row.metadata_json or {}).get("provenance")
@@ -711,6 +709,112 @@ def _design_ideas_from_keywords(keywords: list[dict[str, Any]]) -> list[dict[str
     ]
 
 
+async def _recent_drafts(_user_id: int) -> list[dict[str, Any]]:
+    async with get_session() as session:
+        drafts = (
+            await session.exec(
+                select(ListingDraft).order_by(ListingDraft.updated_at.desc()).limit(4)
+            )
+        ).all()
+    return [
+        {
+            "id": draft.id,
+            "title": draft.title,
+            "updated_at": draft.updated_at.isoformat(),
+            "language": draft.language,
+        }
+        for draft in drafts
+    ]
+
+
+async def _recent_notifications(user_id: int) -> list[dict[str, Any]]:
+    async with get_session() as session:
+        notifications = (
+            await session.exec(
+                select(Notification)
+                .where(Notification.user_id == user_id)
+                .order_by(Notification.created_at.desc())
+                .limit(4)
+            )
+        ).all()
+    return [
+        {
+            "id": item.id,
+            "message": item.message,
+            "type": item.type,
+            "created_at": item.created_at.isoformat(),
+            "read_status": item.read_status,
+        }
+        for item in notifications
+    ]
+
+
+async def _recent_tests(_user_id: int) -> list[dict[str, Any]]:
+    async with get_session() as session:
+        tests = (
+            await session.exec(
+                select(ABTest).order_by(ABTest.created_at.desc()).limit(5)
+            )
+        ).all()
+    return [
+        {"name": test.name, "status": getattr(test, "status", "running")}
+        for test in tests
+    ]
+
+
+async def _overview_trend_rows(_user_id: int) -> list[dict[str, Any]]:
+    return await _trend_rows()
+
+
+# Independent overview widgets, loaded concurrently and cached per section.
+OVERVIEW_SECTIONS = (
+    DashboardSection(
+        "trends",
+        _overview_trend_rows,
+        ttl=CACHE_TTL_TRENDS,
+        tables=(TrendKeywordRollup.__tablename__,),
+        tags=(CACHE_TAG_TRENDS,),
+        per_user=False,
+    ),
+    DashboardSection(
+        "quota",
+        _quota_summary,
+        ttl=CACHE_TTL_USER_QUOTA,
+        # Quota usage (``user``) and counters change on every reservation or
+        # insert, so they refresh on the TTL; plan changes invalidate the
+        # user's tag.
+        tables=(Listing.__tablename__, ABTest.__tablename__),
+    ),
+    DashboardSection(
+        "recent_drafts",
+        _recent_drafts,
+        ttl=CONTROL_CENTER_SECTION_TTL_SECONDS,
+        tables=(ListingDraft.__tablename__,),
+        per_user=False,
+    ),
+    DashboardSection(
+        "notifications",
+        _recent_notifications,
+        ttl=CONTROL_CENTER_SECTION_TTL_SECONDS,
+        tables=(Notification.__tablename__,),
+    ),
+    DashboardSection(
+        "ab_tests",
+        _recent_tests,
+        ttl=CONTROL_CENTER_SECTION_TTL_SECONDS,
+        tables=(ABTest.__tablename__,),
+        per_user=False,
+    ),
+    DashboardSection(
+        "integration_status",
+        _integration_status,
+        ttl=CONTROL_CENTER_SECTION_TTL_SECONDS,
+        tables=(OAuthCredential.__tablename__,),
+    ),
+)
+watch_sections(OVERVIEW_SECTIONS)
+
+
 async def get_overview_dashboard(
     user_id: int | None = None,
     *,
@@ -734,38 +838,20 @@ async def get_overview_dashboard(
         category=category,
         search=search,
     )
-    rows = await _trend_rows()
+    sections = await compose("overview", OVERVIEW_SECTIONS, user_id)
+    rows = sections["trends"]
     query = (search or "").strip().lower()
     if category:
         rows = [row for row in rows if row["category"].lower() == category.lower()]
     if query:
         rows = [row for row in rows if query in row["keyword"].lower()]
-    quota = await _quota_summary(user_id)
+    quota = sections["quota"]
+    drafts = sections["recent_drafts"]
+    notifications = sections["notifications"]
+    tests = sections["ab_tests"]
 
-    async with get_session() as session:
-        drafts = (
-            await session.exec(
-                select(ListingDraft).order_by(ListingDraft.updated_at.desc()).limit(4)
-            )
-        ).all()
-        notifications = (
-            await session.exec(
-                select(Notification)
-                .where(Notification.user_id == user_id)
-                .order_by(Notification.created_at.desc())
-                .limit(4)
-            )
-        ).all()
-        tests = (
-            await session.exec(
-                select(ABTest).order_by(ABTest.created_at.desc()).limit(5)
-            )
-        ).all()
-
-    active_listings = await _table_count(Listing)
-    active_tests = len(
-        [test for test in tests if getattr(test, "status", "running") == "running"]
-    )
+    active_listings = quota["active_listings"]["used"]
+    active_tests = len([test for test in tests if test["status"] == "running"])
     digest_subscribers = 18652
 
     top_niches = [
@@ -791,7 +877,7 @@ async def get_overview_dashboard(
 
     return {
         "filters": filters,
-        "integration_status": await _integration_status(user_id),
+        "integration_status": sections["integration_status"],
         "actions_available": [
             _action("view_trends", "GET", "/api/trends/insights"),
             _action("open_niche", "GET", "/api/niches/suggestions"),
@@ -843,15 +929,7 @@ async def get_overview_dashboard(
         "top_rising_niches": top_niches,
         "popular_categories": categories,
         "seasonal_events": [_event_payload(item) for item in EVENT_FIXTURES[:5]],
-        "recent_drafts": [
-            {
-                "id": draft.id,
-                "title": draft.title,
-                "updated_at": draft.updated_at.isoformat(),
-                "language": draft.language,
-            }
-            for draft in drafts
-        ]
+        "recent_drafts": drafts
         or [
             {
                 "id": 0,
@@ -874,11 +952,11 @@ async def get_overview_dashboard(
         ],
         "ab_performance": [
             {
-                "test": test.name,
+                "test": test["name"],
                 "impressions": 12845 + index * 913,
                 "ctr": round(3.24 - index * 0.18, 2),
                 "lift": round(0.84 - index * 0.11, 2),
-                "status": getattr(test, "status", "running"),
+                "status": test["status"],
             }
             for index, test in enumerate(tests[:4])
         ]
@@ -898,16 +976,7 @@ async def get_overview_dashboard(
                 "status": "running",
             },
         ],
-        "notifications": [
-            {
-                "id": item.id,
-                "message": item.message,
-                "type": item.type,
-                "created_at": item.created_at.isoformat(),
-                "read_status": item.read_status,
-            }
-            for item in notifications
-        ]
+        "notifications": notifications
         or [
             {
                 "id": 0,
@@ -8,17 +8,30 @@ from pydantic import BaseModel
 from ..ab_tests.api import app as ab_app
 from ..analytics.api import router as analytics_router
 from ..analytics.middleware import AnalyticsMiddleware
+from ..analytics.sink import stop_event_sink
 from ..auth.api import app as auth_app
 from ..billing.api import app as billing_app
-from ..billing.service import STUB_MODE as BILLING_STUB_MODE
+from ..billing.service import (
+    STUB_MODE as BILLING_STUB_MODE,
+    start_reconciler,
+    stop_reconciler,
+)
 from ..bulk_create.api import BulkCreateResponse, bulk_create as bulk_create_handler
 from ..common.auth import require_user_id
-from ..common.cache import CACHE_TTL_TRENDS, cache_clear, cache_get, cache_key, cache_set
+from ..common.cache import (
+    CACHE_TAG_TRENDS,
+    CACHE_TTL_TRENDS,
+    cache_key,
+    cached,
+    invalidate_tags,
+)
+from ..common.counters import start_counter_reconciler, stop_counter_reconciler
 from ..common.errors import register_error_handlers
 from ..common.observability import register_observability
 from ..common.product_pipeline import assemble_products
-from ..common.quotas import check_quota, increment_quota, quota_exceeded_response
+from ..common.quotas import quota_exceeded_response, release_quota, reserve_quota
 from ..common.rate_limit import register_rate_limiting
+from ..common.retention import start_retention_scheduler, stop_retention_scheduler
 from ..common.time import utcnow
 from ..control_center.service import get_trend_insights
 from ..dashboard.api import app as dashboard_app
@@ -45,6 +58,7 @@ from ..trend_ingestion.service import (
     get_refresh_status,
     refresh_trends,
     start_scheduler,
+    stop_scheduler,
 )
 from ..trend_scraper.events import EVENTS
 from ..trend_scraper.service import (
@@ -60,7 +74,15 @@ from packages.integrations import openai as openai_integration
 @asynccontextmanager
 async def _gateway_lifespan(_: FastAPI):
     start_scheduler()
+    start_reconciler()
+    start_retention_scheduler()
+    start_counter_reconciler()
     yield
+    stop_counter_reconciler()
+    stop_retention_scheduler()
+    stop_reconciler()
+    await stop_scheduler()
+    await stop_event_sink()
 
 
 class ImageGenerateRequest(BaseModel):
@@ -244,19 +266,23 @@ async def generate_image_endpoint(
     payload: ImageGenerateRequest,
     user_id: int = Depends(require_user_id),
 ):
-    allowed, details = await check_quota(user_id, "images", 1)
-    if not allowed:
+    reservation, details = await reserve_quota(user_id, "images", 1)
+    if reservation is None:
         return quota_exceeded_response(details)
 
-    images = await generate_image_for_idea(
-        idea_id=payload.idea_id,
-        style=payload.style,
-        provider_override=payload.provider_override,
-    )
+    try:
+        images = await generate_image_for_idea(
+            idea_id=payload.idea_id,
+            style=payload.style,
+            provider_override=payload.provider_override,
+        )
+    except Exception:
+        await release_quota(reservation)
+        raise
     if not images:
+        await release_quota(reservation)
         raise HTTPException(status_code=404, detail="Idea not found")
 
-    await increment_quota(user_id, "images", 1)
     return images
 
 
@@ -286,13 +312,12 @@ async def bulk_create(request: Request):
 
 @app.get("/trends")
 async def list_trends(category: str | None = None):
-    ck = cache_key("trends", category or "all")
-    cached = cache_get(ck)
-    if cached is not None:
-        return cached
-    result = await fetch_trends(category)
-    cache_set(ck, result, CACHE_TTL_TRENDS)
-    return result
+    return await cached(
+        cache_key("trends", category or "all"),
+        lambda: fetch_trends(category),
+        ttl=CACHE_TTL_TRENDS,
+        tags=(CACHE_TAG_TRENDS,),
+    )
 
 
 @app.get("/events/{month}")
@@ -341,22 +366,22 @@ async def live_trends(
         sort_order,
         str(include_meta),
     )
-    cached = cache_get(ck)
-    if cached is not None:
-        return cached
-    result = await get_live_trends(
-        category=category,
-        source=source,
-        lookback_hours=lookback_hours,
-        per_group_limit=limit,
-        page=page,
-        page_size=page_size,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        include_meta=include_meta,
+    return await cached(
+        ck,
+        lambda: get_live_trends(
+            category=category,
+            source=source,
+            lookback_hours=lookback_hours,
+            per_group_limit=limit,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            include_meta=include_meta,
+        ),
+        ttl=CACHE_TTL_TRENDS,
+        tags=(CACHE_TAG_TRENDS,),
     )
-    cache_set(ck, result, CACHE_TTL_TRENDS)
-    return result
 
 
 @app.get("/api/trends/live/status")
@@ -367,7 +392,7 @@ async def live_trends_status():
 @app.post("/api/trends/refresh")
 async def refresh_trends_endpoint():
     result = await refresh_trends()
-    cache_clear()
+    await invalidate_tags(CACHE_TAG_TRENDS)
     return result
 
 
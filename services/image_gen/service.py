@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable, Dict, List, Union
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
 
 from sqlmodel import select
 
 from packages.integrations import openai
 
+from ..common.api_limiter import get_provider_limiter
 from ..common.database import get_session
 from ..models import Idea, Product, Trend
 
+logger = logging.getLogger(__name__)
+
 PLACEHOLDER_IMAGE_URL = "http://example.com/image.png"
+# Upper bound on provider calls in flight for one batch; the provider's
+# token bucket in ``api_limiter`` still paces the calls themselves.
+GENERATION_CONCURRENCY = max(1, int(os.getenv("IMAGE_GENERATION_CONCURRENCY", "4")))
 ImageProvider = Callable[[str], Awaitable[str]]
 
 
@@ -66,18 +75,24 @@ def _serialize_product_image(
     }
 
 
-async def _create_idea_record(description: str, category: str) -> int:
+async def _create_idea_records(items: List[Dict[str, Any]]) -> List[int]:
+    """Create a trend and idea row for each ``{description, category}`` item."""
     async with get_session() as session:
-        trend = Trend(term=description, category=category)
-        session.add(trend)
-        await session.commit()
-        await session.refresh(trend)
-
-        idea_rec = Idea(trend_id=trend.id, description=description)
-        session.add(idea_rec)
+        trends = [
+            Trend(term=item["description"], category=item.get("category", "general"))
+            for item in items
+        ]
+        session.add_all(trends)
+        await session.flush()
+        ideas = [
+            Idea(trend_id=trend.id, description=item["description"])
+            for trend, item in zip(trends, items)
+        ]
+        session.add_all(ideas)
+        await session.flush()
+        idea_ids = [int(idea.id) for idea in ideas]
         await session.commit()
-        await session.refresh(idea_rec)
-        return int(idea_rec.id)
+    return idea_ids
 
 
 async def _idea_category(idea_id: int) -> str | None:
@@ -91,47 +106,106 @@ async def _idea_category(idea_id: int) -> str | None:
         return trend.category
 
 
-async def generate_image_for_idea(
-    idea_id: int,
-    style: str = "default",
-    provider_override: str | None = None,
-    category: str | None = None,
-) -> List[Dict[str, Any]]:
-    provider = _provider_name(provider_override)
-    generator = _provider_for(provider_override)
-
+async def _load_ideas(idea_ids: List[int]) -> Dict[int, Tuple[Idea, str | None]]:
+    """Fetch ideas and their trend categories in one session."""
+    if not idea_ids:
+        return {}
     async with get_session() as session:
-        idea = await session.get(Idea, idea_id)
-        if not idea:
-            return []
-        resolved_category = category
-        if resolved_category is None:
-            trend = await session.get(Trend, idea.trend_id)
-            resolved_category = trend.category if trend else None
+        ideas = (await session.exec(select(Idea).where(Idea.id.in_(idea_ids)))).all()
+        trend_ids = {idea.trend_id for idea in ideas}
+        trends = (
+            (await session.exec(select(Trend).where(Trend.id.in_(trend_ids)))).all()
+            if trend_ids
+            else []
+        )
+    categories = {trend.id: trend.category for trend in trends}
+    return {int(idea.id): (idea, categories.get(idea.trend_id)) for idea in ideas}
 
-    style_name = (style or "default").strip()
-    prompt = idea.description if style_name == "default" else f"{idea.description} in {style_name} style"
 
+async def _render_image(prompt: str, provider: str, generator: ImageProvider) -> Tuple[str, str]:
+    """Return ``(image_url, generation_source)`` for one prompt."""
     try:
+        if provider != "stub":
+            await get_provider_limiter(provider).acquire()
         image_url = await generator(prompt)
         generation_source = "stub" if provider == "stub" else _classify_image_source(image_url)
     except Exception:
+        logger.warning("Image generation failed; using placeholder", exc_info=True)
         image_url = PLACEHOLDER_IMAGE_URL
         generation_source = "fallback"
+    return image_url, generation_source
+
+
+async def _generate_for_ideas(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Generate one image per request concurrently and persist them together.
+
+    Each request carries ``id``, ``style``, ``provider_override`` and an
+    optional ``category``. Unknown ideas are skipped; provider failures fall
+    back to the placeholder and are marked per idea via ``generation_source``.
+    Results keep the request order.
+    """
+    ideas = await _load_ideas([int(request["id"]) for request in requests])
+    semaphore = asyncio.Semaphore(GENERATION_CONCURRENCY)
+
+    async def render(request: Dict[str, Any]):
+        idea_id = int(request["id"])
+        loaded = ideas.get(idea_id)
+        if loaded is None:
+            return None
+        idea, trend_category = loaded
+        provider = _provider_name(request.get("provider_override"))
+        style_name = (request.get("style") or "default").strip()
+        prompt = (
+            idea.description
+            if style_name == "default"
+            else f"{idea.description} in {style_name} style"
+        )
+        async with semaphore:
+            image_url, generation_source = await _render_image(
+                prompt, provider, _provider_for(request.get("provider_override"))
+            )
+        category = request.get("category")
+        return (
+            Product(idea_id=idea_id, image_url=image_url),
+            trend_category if category is None else category,
+            provider,
+            generation_source,
+        )
+
+    rendered = [item for item in await asyncio.gather(*map(render, requests)) if item]
+    if not rendered:
+        return []
 
     async with get_session() as session:
-        product = Product(idea_id=idea_id, image_url=image_url)
-        session.add(product)
+        session.add_all([product for product, *_ in rendered])
         await session.commit()
-        await session.refresh(product)
-        return [
-            _serialize_product_image(
-                product,
-                category=resolved_category,
-                provider=provider,
-                generation_source=generation_source,
-            )
+    return [
+        _serialize_product_image(
+            product,
+            category=category,
+            provider=provider,
+            generation_source=generation_source,
+        )
+        for product, category, provider, generation_source in rendered
+    ]
+
+
+async def generate_image_for_idea(
+    idea_id: int,
+    style: str = "default",
+    provider_override: str | None = None,
+    category: str | None = None,
+) -> List[Dict[str, Any]]:
+    return await _generate_for_ideas(
+        [
+            {
+                "id": idea_id,
+                "style": style,
+                "provider_override": provider_override,
+                "category": category,
+            }
         ]
+    )
 
 
 async def list_images(idea_id: int) -> List[Dict[str, Any]]:
@@ -190,21 +264,8 @@ async def generate_images(ideas: List[Union[Dict, str]]) -> List[Dict]:
                 }
             )
 
-    products: List[Dict] = []
-    for item in normalized:
-        idea_id = item.get("id")
-        if idea_id is None:
-            idea_id = await _create_idea_record(
-                description=item["description"],
-                category=item.get("category", "general"),
-            )
+    missing = [item for item in normalized if item.get("id") is None]
+    if missing:
+        for item, idea_id in zip(missing, await _create_idea_records(missing)):
             item["id"] = idea_id
-
-        generated = await generate_image_for_idea(
-            idea_id=int(idea_id),
-            style=item.get("style", "default"),
-            provider_override=item.get("provider_override"),
-            category=item.get("category"),
-        )
-        products.extend(generated)
-    return products
+    return await _generate_for_ideas(normalized)
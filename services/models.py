@@ -2,9 +2,10 @@ from typing import Any, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
+from .common.text import normalize_text
 from .common.time import utcnow
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import BigInteger, Column, Index, JSON, UniqueConstraint, event
 from sqlmodel import Field, SQLModel
 
 
@@ -15,16 +16,72 @@ class Trend(SQLModel, table=True):
     created_at: datetime = Field(default_factory=utcnow, index=True)
 
 
+def _normalized_keyword_default(context) -> str:
+    """Fill ``normalized_keyword`` on Core inserts, which skip the ORM hook."""
+    return normalize_text(context.get_current_parameters().get("keyword") or "")
+
+
 class TrendSignal(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "uq_trendsignal_source_keyword_bucket",
+            "source",
+            "normalized_keyword",
+            "bucket_start",
+            unique=True,
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     source: str = Field(index=True)
     keyword: str = Field(index=True)
+    normalized_keyword: Optional[str] = Field(
+        default=None,
+        index=True,
+        sa_column_kwargs={"default": _normalized_keyword_default},
+    )
     timestamp: datetime = Field(default_factory=utcnow, index=True)
+    # Dedupe bucket for ``refresh_trends`` upserts; NULL rows are never merged.
+    bucket_start: Optional[datetime] = None
     engagement_score: int = 0
     category: str = Field(default="other", index=True)
     metadata_json: Dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
 
 
+@event.listens_for(TrendSignal, "before_insert")
+@event.listens_for(TrendSignal, "before_update")
+def _populate_normalized_keyword(_mapper, _connection, target: TrendSignal) -> None:
+    """Keep the stored dedupe key in sync with ``normalize_text(keyword)``."""
+    target.normalized_keyword = normalize_text(target.keyword or "")
+
+
+class TrendKeywordRollup(SQLModel, table=True):
+    """Hourly/daily keyword totals maintained alongside ``TrendSignal`` writes."""
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "keyword",
+            "source",
+            "category",
+            name="uq_trendkeywordrollup_bucket",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    granularity: str = Field(index=True)
+    bucket_start: datetime = Field(index=True)
+    keyword: str = Field(index=True)
+    source: str
+    category: str = "other"
+    signal_count: int = 0
+    engagement_total: int = 0
+    max_engagement: int = 0
+    last_seen_at: datetime = Field(default_factory=utcnow)
+    metadata_json: Dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+
+
 class Idea(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     trend_id: int
@@ -149,6 +206,55 @@ class AnalyticsEvent(SQLModel, table=True):
     created_at: datetime = Field(default_factory=utcnow, index=True)
 
 
+class AnalyticsEventRollup(SQLModel, table=True):
+    """Hourly/daily event counts kept after raw events pass retention."""
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "path",
+            "event_type",
+            name="uq_analyticseventrollup_bucket",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    granularity: str = Field(index=True)
+    bucket_start: datetime = Field(index=True)
+    path: str
+    event_type: str
+    event_count: int = 0
+
+
+class ResourceCounter(SQLModel, table=True):
+    """Row counts per owner and resource, maintained by ``services/common/counters``.
+
+    A count is the sum of its shard rows.
+    """
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "resource", "shard", name="uq_resourcecounter_owner_resource_shard"
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(index=True)
+    resource: str
+    shard: int = 0
+    count: int = 0
+    updated_at: datetime = Field(default_factory=utcnow)
+
+
+class LeaseFence(SQLModel, table=True):
+    """Newest fencing token that wrote under each lease, see ``distributed_lock``."""
+
+    name: str = Field(primary_key=True)
+    fencing_token: int = Field(sa_column=Column(BigInteger, nullable=False))
+    updated_at: datetime = Field(default_factory=utcnow)
+
+
 class OAuthProvider(str, Enum):
     ETSY = "etsy"
     PRINTIFY = "printify"
@@ -186,6 +292,20 @@ class UserSession(SQLModel, table=True):
     created_at: datetime = Field(default_factory=utcnow)
 
 
+class BillingSubscription(SQLModel, table=True):
+    """Stripe subscription state materialized from billing webhooks."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(index=True, unique=True)
+    stripe_customer_id: Optional[str] = Field(default=None, index=True)
+    stripe_subscription_id: Optional[str] = Field(default=None, index=True)
+    product_id: Optional[str] = None
+    plan_tier: str = "free"
+    status: str = "active"
+    current_period_end: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=utcnow)
+
+
 class Store(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(index=True)
@@ -336,3 +456,8 @@ class TeamMember(SQLModel, table=True):
     status: str = "active"
     last_active_at: datetime = Field(default_factory=utcnow, index=True)
     created_at: datetime = Field(default_factory=utcnow)
+
+
+# Registers the flush hook that keeps ``ResourceCounter`` rows in step with
+# counted inserts and deletes.
+from .common import counter_hook  # noqa: E402,F401
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import os
+import time
 from typing import Any
 from uuid import uuid4
 
@@ -9,6 +10,7 @@ import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from packages.broker import EventBroker
+from ..common.observability import Histogram
 from ..common.product_pipeline import assemble_products
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
@@ -16,6 +18,15 @@ IDEATION_URL = os.getenv("IDEATION_URL", "http://ideation:8002")
 IMAGE_URL = os.getenv("IMAGE_URL", "http://image_gen:8003")
 INTEGRATION_URL = os.getenv("INTEGRATION_URL", "http://integration:8004")
 NOTIFICATIONS_URL = os.getenv("NOTIFICATIONS_URL", "http://notifications:8005")
+HTTP_MAX_CONNECTIONS = int(os.getenv("ORCHESTRATOR_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("ORCHESTRATOR_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("ORCHESTRATOR_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_POOL_TIMEOUT = float(os.getenv("ORCHESTRATOR_HTTP_POOL_TIMEOUT", "5"))
+IMAGE_FANOUT_CONCURRENCY = max(1, int(os.getenv("ORCHESTRATOR_IMAGE_CONCURRENCY", "4")))
+CONSUMER_BATCH_SIZE = int(os.getenv("ORCHESTRATOR_CONSUMER_BATCH_SIZE", "10"))
+CONSUMER_CONCURRENCY = int(os.getenv("ORCHESTRATOR_CONSUMER_CONCURRENCY", "10"))
+CONSUMER_CLAIM_IDLE_MS = int(os.getenv("ORCHESTRATOR_CONSUMER_CLAIM_IDLE_MS", "60000"))
+CONSUMER_MAX_DELIVERIES = int(os.getenv("ORCHESTRATOR_CONSUMER_MAX_DELIVERIES", "5"))
 
 TREND_SIGNALS_STREAM = "trend_signals"
 IDEAS_READY_STREAM = "ideas_ready"
@@ -23,9 +34,31 @@ IMAGES_READY_STREAM = "images_ready"
 PRODUCTS_READY_STREAM = "products_ready"
 LISTINGS_READY_STREAM = "listings_ready"
 
-broker = EventBroker(REDIS_URL)
+# Downstream label and read timeout (seconds) per service base URL.
+DOWNSTREAM_TARGETS: dict[str, tuple[str, float]] = {
+    IDEATION_URL: ("ideation", float(os.getenv("IDEATION_TIMEOUT_SECONDS", "20"))),
+    IMAGE_URL: ("image_gen", float(os.getenv("IMAGE_TIMEOUT_SECONDS", "60"))),
+    INTEGRATION_URL: ("integration", float(os.getenv("INTEGRATION_TIMEOUT_SECONDS", "30"))),
+    NOTIFICATIONS_URL: ("notifications", float(os.getenv("NOTIFICATIONS_TIMEOUT_SECONDS", "5"))),
+}
+DEFAULT_TIMEOUT_SECONDS = 20.0
+
+DOWNSTREAM_LATENCY = Histogram(
+    "pod_orchestrator_downstream_latency_seconds",
+    "Orchestrator service-to-service call latency, including pool waits",
+    labelnames=("target", "status"),
+)
+
+broker = EventBroker(
+    REDIS_URL,
+    batch_size=CONSUMER_BATCH_SIZE,
+    concurrency=CONSUMER_CONCURRENCY,
+    claim_idle_ms=CONSUMER_CLAIM_IDLE_MS,
+    max_deliveries=CONSUMER_MAX_DELIVERIES,
+)
 scheduler = AsyncIOScheduler()
 _consumer_tasks: list[asyncio.Task[Any]] = []
+_http_client: httpx.AsyncClient | None = None
 _scheduled_jobs: dict[str, dict[str, Any]] = {}
 
 
@@ -37,6 +70,25 @@ def _service_url(base_url: str, path: str) -> str:
     return f"{base_url.rstrip('/')}{path}"
 
 
+def _build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(DEFAULT_TIMEOUT_SECONDS, pool=HTTP_POOL_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def _client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # Normally created by start(); handlers invoked directly get one lazily.
+        _http_client = _build_http_client()
+    return _http_client
+
+
 async def _post_json(
     base_url: str,
     path: str,
@@ -44,12 +96,21 @@ async def _post_json(
     *,
     headers: dict[str, str] | None = None,
 ) -> Any:
-    async with httpx.AsyncClient(timeout=20) as client:
-        response = await client.post(
+    target, read_timeout = DOWNSTREAM_TARGETS.get(
+        base_url, ("other", DEFAULT_TIMEOUT_SECONDS)
+    )
+    status = "error"
+    started = time.perf_counter()
+    try:
+        response = await _client().post(
             _service_url(base_url, path),
             json=payload,
             headers=headers,
+            timeout=httpx.Timeout(read_timeout, pool=HTTP_POOL_TIMEOUT),
         )
+        status = str(response.status_code)
+    finally:
+        DOWNSTREAM_LATENCY.labels(target, status).observe(time.perf_counter() - started)
     response.raise_for_status()
     return response.json()
 
@@ -190,25 +251,40 @@ async def handle_ideas(message: dict[str, Any]) -> None:
     if user_id is None or not isinstance(ideas, list) or not ideas:
         return
 
-    images: list[dict[str, Any]] = []
     headers = _auth_headers(user_id)
-    for idea in ideas:
-        if not isinstance(idea, dict) or idea.get("id") is None:
-            continue
-        generated = await _post_json(
-            IMAGE_URL,
-            "/generate",
-            {
-                "idea_id": int(idea["id"]),
-                "style": idea.get("style", "default"),
-                "provider_override": idea.get("provider_override"),
-            },
-            headers=headers,
-        )
-        if isinstance(generated, list):
-            images.extend(generated)
+    targets = [idea for idea in ideas if isinstance(idea, dict) and idea.get("id") is not None]
+    semaphore = asyncio.Semaphore(IMAGE_FANOUT_CONCURRENCY)
+
+    async def generate(idea: dict[str, Any]) -> Any:
+        async with semaphore:
+            return await _post_json(
+                IMAGE_URL,
+                "/generate",
+                {
+                    "idea_id": int(idea["id"]),
+                    "style": idea.get("style", "default"),
+                    "provider_override": idea.get("provider_override"),
+                },
+                headers=headers,
+            )
+
+    results = await asyncio.gather(*map(generate, targets), return_exceptions=True)
+    images: list[dict[str, Any]] = []
+    failed_ideas: list[dict[str, Any]] = []
+    for idea, result in zip(targets, results):
+        # Any failure of one idea is reported alongside the others' images;
+        # only cancellation and interpreter exits abort the whole message.
+        if isinstance(result, Exception):
+            failed_ideas.append({"idea_id": int(idea["id"]), "error": str(result) or type(result).__name__})
+        elif isinstance(result, BaseException):
+            raise result
+        elif isinstance(result, list):
+            images.extend(result)
 
     if not images:
+        if failed_ideas:
+            # Nothing to hand on; fail the message so the broker can redeliver it.
+            raise next(result for result in results if isinstance(result, BaseException))
         return
 
     await broker.publish(
@@ -220,9 +296,16 @@ async def handle_ideas(message: dict[str, Any]) -> None:
             "auto": bool(message.get("auto", False)),
             "ideas": ideas,
             "images": images,
+            "failed_ideas": failed_ideas,
         },
     )
-    await _notify(user_id, "Images generated")
+    if failed_ideas:
+        await _notify(
+            user_id,
+            f"Images generated for {len(targets) - len(failed_ideas)} of {len(targets)} ideas",
+        )
+    else:
+        await _notify(user_id, "Images generated")
 
 
 async def handle_images(message: dict[str, Any]) -> None:
@@ -290,6 +373,7 @@ async def handle_products(message: dict[str, Any]) -> None:
 async def start() -> None:
     if _consumer_tasks:
         return
+    _client()
     if not scheduler.running:
         scheduler.start()
     _consumer_tasks.extend(
@@ -311,7 +395,7 @@ async def start() -> None:
 
 
 async def stop() -> None:
-    global scheduler
+    global scheduler, _http_client
     while _consumer_tasks:
         task = _consumer_tasks.pop()
         task.cancel()
@@ -325,3 +409,6 @@ async def stop() -> None:
     _scheduled_jobs.clear()
     scheduler = AsyncIOScheduler()
     await broker.close()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -5,13 +5,20 @@ from fastapi import Depends, FastAPI, Query
 from ..common.auth import require_user_id
 from ..common.observability import register_observability
 from .circuit_breaker import scraper_circuit_breaker
-from .service import get_live_trends, get_refresh_status, refresh_trends, start_scheduler
+from .service import (
+    get_live_trends,
+    get_refresh_status,
+    refresh_trends,
+    start_scheduler,
+    stop_scheduler,
+)
 
 
 @asynccontextmanager
 async def _trend_ingestion_lifespan(_: FastAPI):
     start_scheduler()
     yield
+    await stop_scheduler()
 
 
 app = FastAPI(lifespan=_trend_ingestion_lifespan)
@@ -57,4 +64,4 @@ async def refresh_endpoint(_: int = Depends(require_user_id)):
 async def scraper_status():
     from .sources import PLATFORM_CONFIG
 
-    return {name: scraper_circuit_breaker.state(name).value for name in PLATFORM_CONFIG}
+    return await scraper_circuit_breaker.snapshot(PLATFORM_CONFIG)
@@ -0,0 +1,195 @@
+"""Warm Chromium pool for selector scraping.
+
+``_scrape_source`` used to launch and close a Chromium process per source and
+candidate URL. ``BrowserPool`` keeps ``TREND_BROWSER_POOL_SIZE`` browsers
+running for the life of the scheduler and hands out a fresh, isolated
+context per scrape so profiles (user agent, viewport, locale) never leak
+between sources. A browser is replaced after ``TREND_BROWSER_MAX_PAGES``
+contexts or once its processes exceed ``TREND_BROWSER_MAX_RSS_MB``; at most
+``TREND_BROWSER_MAX_CONCURRENCY`` contexts are open at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from ..common.observability import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("TREND_BROWSER_POOL_SIZE", "2"))
+MAX_CONCURRENCY = int(os.getenv("TREND_BROWSER_MAX_CONCURRENCY", "4"))
+MAX_PAGES_PER_BROWSER = int(os.getenv("TREND_BROWSER_MAX_PAGES", "50"))
+# 0 disables the memory check; it reads /proc, so it only applies on Linux.
+MAX_BROWSER_RSS_MB = int(os.getenv("TREND_BROWSER_MAX_RSS_MB", "0"))
+
+POOL_WAIT = Histogram(
+    "pod_trend_browser_pool_wait_seconds",
+    "Time scrapes wait for a browser context",
+    labelnames=("pool",),
+)
+BROWSER_RESTARTS = Counter(
+    "pod_trend_browser_restarts_total",
+    "Pooled browsers replaced, by reason (pages, memory, disconnected)",
+    labelnames=("reason",),
+)
+
+
+@dataclass(eq=False)
+class _BrowserSlot:
+    browser: Any = None
+    pages: int = 0
+    leases: int = 0
+    retired: bool = False
+
+
+async def _browser_rss_mb(browser: Any) -> float | None:
+    """Resident memory of every process behind ``browser``, when measurable."""
+    try:
+        session = await browser.new_browser_cdp_session()
+        try:
+            info = await session.send("SystemInfo.getProcessInfo")
+        finally:
+            await session.detach()
+    except Exception:
+        return None
+    total_kb = 0
+    for process in info.get("processInfo", []):
+        try:
+            with open(f"/proc/{int(process['id'])}/status", encoding="ascii") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, KeyError, ValueError):
+            continue
+    return total_kb / 1024 if total_kb else None
+
+
+class BrowserPool:
+    """Shares a few long-lived Chromium processes across scrapes."""
+
+    def __init__(
+        self,
+        playwright_factory: Callable[[], Any],
+        *,
+        size: int = POOL_SIZE,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_pages: int = MAX_PAGES_PER_BROWSER,
+        max_rss_mb: int = MAX_BROWSER_RSS_MB,
+        launch_options: Dict[str, Any] | None = None,
+        name: str = "chromium",
+    ) -> None:
+        self._factory = playwright_factory
+        self.size = max(1, size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pages = max(1, max_pages)
+        self.max_rss_mb = max(0, max_rss_mb)
+        self.launch_options = launch_options or {"headless": True}
+        self.name = name
+        self._playwright_cm: Any = None
+        self._playwright: Any = None
+        self._slots: List[_BrowserSlot] = []
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock: asyncio.Lock | None = None
+        self._users = 0
+        self._persistent = False
+
+    def keep_warm(self, enabled: bool = True) -> None:
+        """Keep browsers running between ``run()`` scopes (scheduler mode)."""
+        self._persistent = enabled
+
+    async def start(self) -> None:
+        if self._playwright is not None:
+            return
+        cm = self._factory()
+        self._playwright = await cm.__aenter__()
+        self._playwright_cm = cm
+        self._slots = [_BrowserSlot() for _ in range(self.size)]
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        """Close every pooled browser and the Playwright driver."""
+        slots, self._slots = self._slots, []
+        for slot in slots:
+            await self._close_browser(slot)
+        cm, self._playwright_cm, self._playwright = self._playwright_cm, None, None
+        if cm is not None:
+            with suppress(Exception):
+                await cm.__aexit__(None, None, None)
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator["BrowserPool"]:
+        """Scope one scrape run; browsers outlive it only when kept warm."""
+        await self.start()
+        self._users += 1
+        try:
+            yield self
+        finally:
+            self._users -= 1
+            if not self._users and not self._persistent:
+                await self.close()
+
+    @asynccontextmanager
+    async def context(self, **options: Any) -> AsyncIterator[Any]:
+        """Yield a new browser context from a pooled browser."""
+        assert self._semaphore is not None, "BrowserPool.run() must be entered first"
+        waited = time.perf_counter()
+        async with self._semaphore:
+            POOL_WAIT.labels(self.name).observe(time.perf_counter() - waited)
+            slot = await self._checkout()
+            context = None
+            try:
+                context = await slot.browser.new_context(**options)
+                yield context
+            finally:
+                if context is not None:
+                    with suppress(Exception):
+                        await context.close()
+                await self._checkin(slot)
+
+    async def _checkout(self) -> _BrowserSlot:
+        assert self._lock is not None
+        async with self._lock:
+            slot = min(self._slots, key=lambda item: item.leases)
+            if slot.browser is not None and not slot.browser.is_connected():
+                BROWSER_RESTARTS.labels("disconnected").inc()
+                slot.browser = None
+                slot.pages = 0
+            if slot.browser is None:
+                slot.browser = await self._playwright.chromium.launch(**self.launch_options)
+            slot.leases += 1
+            return slot
+
+    async def _checkin(self, slot: _BrowserSlot) -> None:
+        slot.leases -= 1
+        slot.pages += 1
+        reason = None
+        if slot.pages >= self.max_pages:
+            reason = "pages"
+        elif self.max_rss_mb and slot.browser is not None:
+            rss = await _browser_rss_mb(slot.browser)
+            if rss is not None and rss > self.max_rss_mb:
+                reason = "memory"
+        if reason and not slot.retired and slot in self._slots:
+            # New checkouts get a fresh slot; the old browser closes once idle.
+            self._slots[self._slots.index(slot)] = _BrowserSlot()
+            slot.retired = True
+            BROWSER_RESTARTS.labels(reason).inc()
+            logger.info("Recycling pooled browser reason=%s pages=%d", reason, slot.pages)
+        if slot.retired and not slot.leases:
+            await self._close_browser(slot)
+
+    @staticmethod
+    async def _close_browser(slot: _BrowserSlot) -> None:
+        browser, slot.browser = slot.browser, None
+        if browser is not None:
+            with suppress(Exception):
+                await browser.close()
@@ -3,18 +3,48 @@
 Implements a state machine (CLOSED -> OPEN -> HALF_OPEN) to prevent
 cascading failures when scraping platforms go down.
 
+Breaker state lives in a pluggable store. ``InMemoryCircuitStore`` keeps it
+per process; ``RedisCircuitStore`` shares it across replicas and survives
+restarts, applying every transition atomically in one Lua script so that
+only ``half_open_max_calls`` probes run cluster-wide. The singleton uses
+Redis when ``SCRAPER_BREAKER_REDIS_URL`` (default ``REDIS_URL``) is set and
+falls back to in-process state while Redis is unreachable. Breaker calls are
+awaitable and use ``redis.asyncio``, so they never block the event loop.
+
 Owner: Data-Seeder (per DS-06 Monitoring & Alerting)
 Reference: agents_data_seeder.md §6.1 - Scraper Failure handling
 """
 from __future__ import annotations
 
 import logging
+import os
+import threading
 import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Dict
+from typing import Any, Deque, Dict, Iterable, Tuple
+
+try:
+    from redis.asyncio import from_url as redis_from_url
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover - redis is an optional runtime dependency
+    redis_from_url = None
+    RedisError = Exception
 
 logger = logging.getLogger(__name__)
 
+SCRAPER_BREAKER_REDIS_URL = os.getenv(
+    "SCRAPER_BREAKER_REDIS_URL", os.getenv("REDIS_URL", "")
+)
+# After a Redis failure, stay on in-process state this long before retrying.
+SCRAPER_BREAKER_REDIS_RETRY_SECONDS = float(
+    os.getenv("SCRAPER_BREAKER_REDIS_RETRY_SECONDS", "30")
+)
+# Failure timestamps kept per platform for ``snapshot``.
+FAILURE_HISTORY = 10
+
 
 class CircuitState(str, Enum):
     CLOSED = "closed"
@@ -22,6 +52,258 @@ class CircuitState(str, Enum):
     HALF_OPEN = "half_open"
 
 
+@dataclass(frozen=True)
+class BreakerPolicy:
+    failure_threshold: int
+    recovery_timeout: float
+    half_open_max_calls: int
+
+
+def _isoformat(timestamp: float | None) -> str | None:
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@dataclass
+class _BreakerRecord:
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0
+    last_failure_at: float = 0.0
+    opened_at: float = 0.0
+    last_success_at: float = 0.0
+    probes: int = 0
+    probe_started_at: float = 0.0
+    failure_times: Deque[float] = field(default_factory=lambda: deque(maxlen=FAILURE_HISTORY))
+
+
+class InMemoryCircuitStore:
+    """Per-process breaker state; lost on restart."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._records: Dict[str, _BreakerRecord] = {}
+        self._lock = threading.Lock()
+
+    async def apply(
+        self, platform: str, op: str, policy: BreakerPolicy
+    ) -> Tuple[bool, CircuitState, CircuitState]:
+        """Apply ``op`` and return ``(allowed, previous_state, state)``.
+
+        ``op`` is ``state``, ``allow``, ``success`` or ``failure``; this mirrors
+        ``_TRANSITION_SCRIPT`` step for step.
+        """
+        now = time.time()
+        with self._lock:
+            record = self._records.setdefault(platform, _BreakerRecord())
+            previous = record.state
+            if (
+                record.state == CircuitState.OPEN
+                and now - record.last_failure_at >= policy.recovery_timeout
+            ):
+                record.state = CircuitState.HALF_OPEN
+                record.probes = 0
+            allowed = False
+            if op == "allow":
+                if record.state == CircuitState.CLOSED:
+                    allowed = True
+                elif record.state == CircuitState.HALF_OPEN:
+                    if (
+                        record.probes >= policy.half_open_max_calls
+                        and now - record.probe_started_at >= policy.recovery_timeout
+                    ):
+                        record.probes = 0
+                    if record.probes < policy.half_open_max_calls:
+                        record.probes += 1
+                        record.probe_started_at = now
+                        allowed = True
+            elif op == "success":
+                record.state = CircuitState.CLOSED
+                record.failures = 0
+                record.probes = 0
+                record.last_success_at = now
+            elif op == "failure":
+                record.failures += 1
+                record.last_failure_at = now
+                record.failure_times.appendleft(now)
+                if (
+                    record.state == CircuitState.HALF_OPEN
+                    or record.failures >= policy.failure_threshold
+                ):
+                    if record.state != CircuitState.OPEN:
+                        record.opened_at = now
+                    record.state = CircuitState.OPEN
+                    record.probes = 0
+            return allowed, previous, record.state
+
+    async def reset(self, platform: str) -> None:
+        with self._lock:
+            self._records.pop(platform, None)
+
+    async def snapshot(self, platform: str) -> Dict[str, Any]:
+        with self._lock:
+            record = self._records.get(platform) or _BreakerRecord()
+            return {
+                "failure_count": record.failures,
+                "last_failure_at": record.last_failure_at,
+                "opened_at": record.opened_at,
+                "last_success_at": record.last_success_at,
+                "probes_in_flight": record.probes,
+                "recent_failures": list(record.failure_times),
+            }
+
+
+# KEYS[1] breaker hash, KEYS[2] failure timestamp list.
+# ARGV: op, failure threshold, recovery ms, half-open max calls, history length.
+# Returns {allowed, previous_state, state}. Times are Redis server
+# milliseconds so every replica shares one clock.
+_TRANSITION_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local op = ARGV[1]
+local threshold = tonumber(ARGV[2])
+local recovery = tonumber(ARGV[3])
+local max_probes = tonumber(ARGV[4])
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+local previous = state
+if state == 'open' then
+  local last = tonumber(redis.call('HGET', KEYS[1], 'last_failure_at') or '0')
+  if now - last >= recovery then
+    state = 'half_open'
+    redis.call('HSET', KEYS[1], 'state', state, 'probes', 0)
+  end
+end
+local allowed = 0
+if op == 'allow' then
+  if state == 'closed' then
+    allowed = 1
+  elseif state == 'half_open' then
+    local probes = tonumber(redis.call('HGET', KEYS[1], 'probes') or '0')
+    local started = tonumber(redis.call('HGET', KEYS[1], 'probe_started_at') or '0')
+    -- Reclaim probe slots abandoned by a replica that died mid-probe.
+    if probes >= max_probes and now - started >= recovery then
+      probes = 0
+    end
+    if probes < max_probes then
+      redis.call('HSET', KEYS[1], 'probes', probes + 1, 'probe_started_at', now)
+      allowed = 1
+    end
+  end
+elseif op == 'success' then
+  state = 'closed'
+  redis.call('HSET', KEYS[1], 'state', state, 'failures', 0, 'probes', 0, 'last_success_at', now)
+elseif op == 'failure' then
+  local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+  redis.call('HSET', KEYS[1], 'last_failure_at', now)
+  redis.call('LPUSH', KEYS[2], now)
+  redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[5]) - 1)
+  if state == 'half_open' or failures >= threshold then
+    if state ~= 'open' then
+      redis.call('HSET', KEYS[1], 'opened_at', now)
+    end
+    state = 'open'
+    redis.call('HSET', KEYS[1], 'state', state, 'probes', 0)
+  end
+end
+return {allowed, previous, state}
+"""
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisCircuitStore:
+    """Breaker state shared by every replica through Redis.
+
+    Redis errors switch to ``fallback`` for ``retry_seconds`` instead of
+    failing the scrape.
+    """
+
+    def __init__(
+        self,
+        client,
+        fallback: InMemoryCircuitStore | None = None,
+        *,
+        prefix: str = "pod:breaker:",
+        retry_seconds: float = SCRAPER_BREAKER_REDIS_RETRY_SECONDS,
+    ):
+        self._client = client
+        self._script = client.register_script(_TRANSITION_SCRIPT)
+        self._fallback = fallback or InMemoryCircuitStore()
+        self._prefix = prefix
+        self._retry_seconds = retry_seconds
+        self._disabled_until = 0.0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._available() else "memory"
+
+    def _keys(self, platform: str) -> list[str]:
+        return [f"{self._prefix}{platform}", f"{self._prefix}{platform}:failures"]
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _disable(self, exc: Exception) -> None:
+        logger.warning("Redis circuit breaker store unavailable, using in-process state: %s", exc)
+        self._disabled_until = time.monotonic() + self._retry_seconds
+
+    async def apply(
+        self, platform: str, op: str, policy: BreakerPolicy
+    ) -> Tuple[bool, CircuitState, CircuitState]:
+        if self._available():
+            try:
+                allowed, previous, state = await self._script(
+                    keys=self._keys(platform),
+                    args=[
+                        op,
+                        policy.failure_threshold,
+                        int(policy.recovery_timeout * 1000),
+                        policy.half_open_max_calls,
+                        FAILURE_HISTORY,
+                    ],
+                )
+                return bool(int(allowed)), CircuitState(_text(previous)), CircuitState(_text(state))
+            except (RedisError, OSError) as exc:
+                self._disable(exc)
+        return await self._fallback.apply(platform, op, policy)
+
+    async def reset(self, platform: str) -> None:
+        await self._fallback.reset(platform)
+        if self._available():
+            try:
+                await self._client.delete(*self._keys(platform))
+            except (RedisError, OSError) as exc:
+                self._disable(exc)
+
+    async def snapshot(self, platform: str) -> Dict[str, Any]:
+        if self._available():
+            try:
+                hash_key, failures_key = self._keys(platform)
+                async with self._client.pipeline(transaction=False) as pipe:
+                    pipe.hgetall(hash_key)
+                    pipe.lrange(failures_key, 0, -1)
+                    fields, failures = await pipe.execute()
+                fields = {_text(key): _text(value) for key, value in fields.items()}
+
+                def _seconds(name: str) -> float:
+                    return int(fields.get(name, 0)) / 1000
+
+                return {
+                    "failure_count": int(fields.get("failures", 0)),
+                    "last_failure_at": _seconds("last_failure_at"),
+                    "opened_at": _seconds("opened_at"),
+                    "last_success_at": _seconds("last_success_at"),
+                    "probes_in_flight": int(fields.get("probes", 0)),
+                    "recent_failures": [int(_text(value)) / 1000 for value in failures],
+                }
+            except (RedisError, OSError) as exc:
+                self._disable(exc)
+        return await self._fallback.snapshot(platform)
+
+
 class CircuitBreaker:
     """Per-platform circuit breaker with configurable thresholds."""
 
@@ -30,77 +312,98 @@ class CircuitBreaker:
         failure_threshold: int = 3,
         recovery_timeout: float = 300.0,
         half_open_max_calls: int = 1,
+        store: InMemoryCircuitStore | RedisCircuitStore | None = None,
     ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.half_open_max_calls = half_open_max_calls
-        self._states: Dict[str, CircuitState] = {}
-        self._failure_counts: Dict[str, int] = {}
-        self._last_failure_time: Dict[str, float] = {}
-        self._half_open_calls: Dict[str, int] = {}
+        self.store = store or InMemoryCircuitStore()
+
+    @property
+    def policy(self) -> BreakerPolicy:
+        return BreakerPolicy(
+            failure_threshold=self.failure_threshold,
+            recovery_timeout=self.recovery_timeout,
+            half_open_max_calls=self.half_open_max_calls,
+        )
 
-    def state(self, platform: str) -> CircuitState:
+    async def _apply(self, platform: str, op: str) -> Tuple[bool, CircuitState]:
+        allowed, previous, current = await self.store.apply(platform, op, self.policy)
+        if previous == CircuitState.OPEN and current == CircuitState.HALF_OPEN:
+            logger.info("Circuit breaker HALF_OPEN for %s", platform)
+        return allowed, current
+
+    async def state(self, platform: str) -> CircuitState:
         """Return current circuit state for a platform."""
-        current = self._states.get(platform, CircuitState.CLOSED)
-        if current == CircuitState.OPEN:
-            last_failure = self._last_failure_time.get(platform, 0)
-            if time.monotonic() - last_failure >= self.recovery_timeout:
-                self._states[platform] = CircuitState.HALF_OPEN
-                self._half_open_calls[platform] = 0
-                logger.info("Circuit breaker HALF_OPEN for %s", platform)
-                return CircuitState.HALF_OPEN
-        return current
-
-    def allow_request(self, platform: str) -> bool:
-        """Check whether a scrape request is allowed for this platform."""
-        current = self.state(platform)
-        if current == CircuitState.CLOSED:
-            return True
-        if current == CircuitState.HALF_OPEN:
-            calls = self._half_open_calls.get(platform, 0)
-            if calls < self.half_open_max_calls:
-                self._half_open_calls[platform] = calls + 1
-                return True
-            return False
-        return False  # OPEN
-
-    def record_success(self, platform: str) -> None:
+        return (await self._apply(platform, "state"))[1]
+
+    async def allow_request(self, platform: str) -> bool:
+        """Check whether a scrape request is allowed for this platform.
+
+        While HALF_OPEN, at most ``half_open_max_calls`` callers sharing the
+        store are let through as probes.
+        """
+        return (await self._apply(platform, "allow"))[0]
+
+    async def record_success(self, platform: str) -> None:
         """Record a successful scrape — reset failure counter."""
-        previous = self._states.get(platform, CircuitState.CLOSED)
-        self._states[platform] = CircuitState.CLOSED
-        self._failure_counts[platform] = 0
-        self._half_open_calls.pop(platform, None)
+        _, previous, _ = await self.store.apply(platform, "success", self.policy)
         if previous != CircuitState.CLOSED:
             logger.info("Circuit breaker CLOSED for %s (recovered)", platform)
 
-    def record_failure(self, platform: str) -> None:
+    async def record_failure(self, platform: str) -> None:
         """Record a scrape failure — may trip the breaker to OPEN."""
-        count = self._failure_counts.get(platform, 0) + 1
-        self._failure_counts[platform] = count
-        self._last_failure_time[platform] = time.monotonic()
-
-        current = self.state(platform)
-        if current == CircuitState.HALF_OPEN:
-            self._states[platform] = CircuitState.OPEN
+        _, previous, current = await self.store.apply(platform, "failure", self.policy)
+        if current != CircuitState.OPEN or previous == CircuitState.OPEN:
+            return
+        if previous == CircuitState.HALF_OPEN:
             logger.warning(
                 "Circuit breaker OPEN for %s (half-open probe failed)", platform
             )
-        elif count >= self.failure_threshold:
-            self._states[platform] = CircuitState.OPEN
+        else:
             logger.warning(
-                "Circuit breaker OPEN for %s (failures=%d >= threshold=%d)",
+                "Circuit breaker OPEN for %s (failures >= threshold=%d)",
                 platform,
-                count,
                 self.failure_threshold,
             )
 
-    def reset(self, platform: str) -> None:
+    async def reset(self, platform: str) -> None:
         """Manually reset circuit state for a platform."""
-        self._states.pop(platform, None)
-        self._failure_counts.pop(platform, None)
-        self._last_failure_time.pop(platform, None)
-        self._half_open_calls.pop(platform, None)
+        await self.store.reset(platform)
+
+    async def snapshot(self, platforms: Iterable[str]) -> Dict[str, Any]:
+        """Return the shared state and failure timestamps for ``platforms``."""
+        sources: Dict[str, Any] = {}
+        for platform in platforms:
+            state = await self.state(platform)
+            details = await self.store.snapshot(platform)
+            retry_at = None
+            if state == CircuitState.OPEN and details["last_failure_at"]:
+                retry_at = details["last_failure_at"] + self.recovery_timeout
+            sources[platform] = {
+                "state": state.value,
+                "failure_count": details["failure_count"],
+                "probes_in_flight": details["probes_in_flight"],
+                "last_failure_at": _isoformat(details["last_failure_at"]),
+                "opened_at": _isoformat(details["opened_at"]),
+                "last_success_at": _isoformat(details["last_success_at"]),
+                "retry_at": _isoformat(retry_at),
+                "recent_failures": [
+                    _isoformat(timestamp) for timestamp in details["recent_failures"]
+                ],
+            }
+        return {"backend": self.store.backend, "sources": sources}
+
+
+def _default_store() -> InMemoryCircuitStore | RedisCircuitStore:
+    if SCRAPER_BREAKER_REDIS_URL and redis_from_url is not None:
+        return RedisCircuitStore(
+            redis_from_url(
+                SCRAPER_BREAKER_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        )
+    return InMemoryCircuitStore()
 
 
 # Singleton instance shared across the scraper service.
-scraper_circuit_breaker = CircuitBreaker()
+scraper_circuit_breaker = CircuitBreaker(store=_default_store())
@@ -0,0 +1,191 @@
+"""Single-pass keyword classifier for trend ingestion.
+
+``categorize`` and the POD/noise filters in ``service`` used to rescan each
+keyword once per vocabulary term. ``KeywordMatcher`` compiles those
+vocabularies once: substring vocabularies (category keys, non-POD markers
+and multi-word POD phrases) go into an Aho-Corasick automaton, and
+single-word vocabularies into a token flag table. One walk over the
+keyword plus one over its tokens then yields the category, POD signal
+strength and noise flags together, with the same answers as the per-term
+checks.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping
+
+POD = 1
+STRONG_POD = 2
+NON_POD_MARKER = 4
+NAVIGATION = 8
+RSS_NEWS_NOISE = 16
+
+_HEX_RE = re.compile(r"[a-f0-9]{6,8}")
+_CODE_RE = re.compile(r"[a-z]*\d+[a-z\d]*")
+
+
+@dataclass(frozen=True)
+class KeywordTraits:
+    category: str
+    pod_signal: bool
+    strong_pod_signal: bool
+    empty: bool
+    non_pod_marker: bool
+    code_like: bool
+    navigation_token: bool
+    stopword_only: bool
+    rss_news_noise: bool
+
+    def is_noise(self, *, method: str | None, requires_pod: bool) -> bool:
+        if (
+            self.empty
+            or self.non_pod_marker
+            or self.code_like
+            or self.navigation_token
+            or self.stopword_only
+        ):
+            return True
+        if method == "rss_fallback" and (
+            self.rss_news_noise or not self.strong_pod_signal
+        ):
+            return True
+        return requires_pod and not self.strong_pod_signal
+
+
+class KeywordMatcher:
+    """Classify normalized keywords against the ingestion vocabularies.
+
+    Category keys and non-POD markers match as raw substrings, POD terms
+    match as whole words or space-delimited phrases, and the earliest
+    category in ``categories`` wins regardless of where its key occurs.
+    """
+
+    def __init__(
+        self,
+        *,
+        categories: Mapping[str, Iterable[str]],
+        pod_terms: Iterable[str],
+        strong_pod_terms: Iterable[str],
+        non_pod_markers: Iterable[str],
+        navigation_tokens: Iterable[str],
+        rss_news_noise_terms: Iterable[str],
+        stopwords: Iterable[str],
+        default_category: str = "other",
+    ):
+        self._categories = [*categories, default_category]
+        self._no_category = len(categories)
+        self._stopwords = frozenset(stopwords)
+        self._token_flags: Dict[str, int] = {}
+        patterns: Dict[str, List[int]] = {}
+
+        def add_pattern(text: str, rank: int, flags: int) -> None:
+            current = patterns.setdefault(text, [self._no_category, 0])
+            current[0] = min(current[0], rank)
+            current[1] |= flags
+
+        def add_term(term: str, flags: int) -> None:
+            if " " in term:
+                # Same test as ``f" {term} " in f" {keyword} "``; the walk
+                # runs over the padded keyword.
+                add_pattern(f" {term} ", self._no_category, flags)
+            else:
+                self._token_flags[term] = self._token_flags.get(term, 0) | flags
+
+        for rank, keys in enumerate(categories.values()):
+            for key in keys:
+                add_pattern(key, rank, 0)
+        for marker in non_pod_markers:
+            add_pattern(marker, self._no_category, NON_POD_MARKER)
+        for term in pod_terms:
+            add_term(term, POD)
+        for term in strong_pod_terms:
+            add_term(term, STRONG_POD)
+        for token in navigation_tokens:
+            self._token_flags[token] = self._token_flags.get(token, 0) | NAVIGATION
+        for term in rss_news_noise_terms:
+            self._token_flags[term] = self._token_flags.get(term, 0) | RSS_NEWS_NOISE
+        self._compile(patterns)
+
+    def _compile(self, patterns: Mapping[str, List[int]]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        ranks = [self._no_category]
+        flags = [0]
+        for text, (rank, pattern_flags) in patterns.items():
+            state = 0
+            for char in text:
+                following = goto[state].get(char)
+                if following is None:
+                    goto.append({})
+                    ranks.append(self._no_category)
+                    flags.append(0)
+                    following = goto[state][char] = len(goto) - 1
+                state = following
+            ranks[state] = min(ranks[state], rank)
+            flags[state] |= pattern_flags
+
+        # Breadth-first failure links, folded into a full transition table so
+        # the scan does one dict lookup per character.
+        alphabet = {char for text in patterns for char in text}
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            ranks[state] = min(ranks[state], ranks[fail[state]])
+            flags[state] |= flags[fail[state]]
+            for char in alphabet:
+                following = goto[state].get(char)
+                if following is None:
+                    following = transitions[fail[state]].get(char, 0)
+                    if following:
+                        transitions[state][char] = following
+                    continue
+                fail[following] = transitions[fail[state]].get(char, 0)
+                transitions[state][char] = following
+                queue.append(following)
+        self._transitions = transitions
+        self._ranks = ranks
+        self._flags = flags
+
+    def _scan(self, text: str) -> tuple[int, int]:
+        transitions = self._transitions
+        ranks = self._ranks
+        flags = self._flags
+        state = 0
+        best = self._no_category
+        found = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if state:
+                found |= flags[state]
+                if ranks[state] < best:
+                    best = ranks[state]
+        return best, found
+
+    def category(self, keyword: str) -> str:
+        return self._categories[self._scan(keyword)[0]]
+
+    def classify(self, keyword: str) -> KeywordTraits:
+        rank, found = self._scan(f" {keyword} ")
+        words = keyword.split()
+        token_flags = self._token_flags
+        for word in words:
+            found |= token_flags.get(word, 0)
+        compact = "".join(words)
+        return KeywordTraits(
+            category=self._categories[rank],
+            pod_signal=bool(found & POD),
+            strong_pod_signal=bool(found & STRONG_POD),
+            empty=not words,
+            non_pod_marker=bool(found & NON_POD_MARKER),
+            code_like=bool(
+                _HEX_RE.fullmatch(compact)
+                or (len(words) <= 2 and _CODE_RE.fullmatch(compact))
+            ),
+            navigation_token=bool(found & NAVIGATION),
+            stopword_only=len(words) == 1 and words[0] in self._stopwords,
+            rss_news_noise=bool(found & RSS_NEWS_NOISE),
+        )
@@ -6,28 +6,45 @@ import re
 import time
 import xml.etree.ElementTree as ET
 from collections import defaultdict
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Sequence
 from urllib.parse import urljoin, urlparse
 from uuid import uuid4
 
 import httpx
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from playwright.async_api import async_playwright
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from ..common import database
 from ..common.database import get_session
+from ..common.distributed_lock import (
+    Lease,
+    build_lease_backend,
+    fence_writes,
+    held_leases,
+)
 from ..common.observability import Counter, Histogram
+from ..common.text import normalize_text
 from ..common.time import utcnow
+from ..common.trend_rollups import bucket_start, recompute_trend_rollups
 from ..models import TrendSignal
-from .circuit_breaker import scraper_circuit_breaker
+from .browser_pool import BrowserPool
+from .circuit_breaker import CircuitState, scraper_circuit_breaker
+from .keyword_matcher import KeywordMatcher, KeywordTraits
 from .scrapegraph_adapter import (
     PublicOnlyConfigError,
     scrape_with_scrapegraph,
     validate_public_only_config,
 )
+from .snapshots import PageSnapshot, snapshot_store
+from .source_scheduler import IN_FLIGHT_STATUS, AdaptiveSourceScheduler
 from .sources import PLATFORM_CONFIG, SourceConfig, SelectorSet
 
 logger = logging.getLogger(__name__)
@@ -62,6 +79,14 @@ SCRAPE_PERSISTED = Counter(
     "Trend signals persisted by source",
     labelnames=("source",),
 )
+SCRAPE_STAGE_DURATION = Histogram(
+    "pod_scrape_stage_duration_seconds",
+    "Duration of trend ingestion stages (fetch, extract, normalize, persist) by platform",
+    labelnames=("platform", "stage"),
+)
+
+# Callables receiving (platform, stage, seconds); used by the ingestion benchmark.
+stage_observers: List[Callable[[str, str, float], None]] = []
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
@@ -69,8 +94,7 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/118.0",
 ]
 
-STOPWORDS = {"the", "and", "a", "of", "to", "in"}
-EMOJI_RE = re.compile(r"[\U00010000-\U0010FFFF]", flags=re.UNICODE)
+NUMERIC_KEYWORD_RE = re.compile(r"\d+(?:\.\d+)?[km]?")
 TEXT_FALLBACK_STOPWORDS = {
     "about",
     "access",
@@ -244,6 +268,11 @@ BLOCKED_PAGE_MARKERS = (
 SCRAPE_INTERVAL_HOURS = int(os.getenv("SCRAPE_INTERVAL_HOURS", "6"))
 PLAYWRIGHT_PROXY = os.getenv("PLAYWRIGHT_PROXY")
 TOP_K = int(os.getenv("TREND_INGESTION_TOP_K", "5"))
+# Refreshes inside one bucket upsert a single row per (source, keyword); the
+# 0011 migration backfills existing rows with the same hour buckets. Hour
+# buckets keep the hourly keyword rollups meaningful: each hour keeps the last
+# refresh of that hour instead of the whole day collapsing onto one timestamp.
+SIGNAL_BUCKET_GRANULARITY = "hour"
 SCRAPER_TIMEOUT_MS = int(os.getenv("TREND_INGESTION_TIMEOUT_MS", "15000"))
 STUB_ONLY = os.getenv("TREND_INGESTION_STUB", "0").lower() in {"1", "true", "yes"}
 TREND_RSS_URL = os.getenv(
@@ -265,6 +294,21 @@ DEFAULT_LOOKBACK_HOURS = int(os.getenv("TREND_INGESTION_LOOKBACK_HOURS", "72"))
 MAX_LIVE_TRENDS_PER_GROUP = int(os.getenv("TREND_INGESTION_MAX_LIVE_PER_GROUP", "50"))
 MAX_SOURCE_URLS = int(os.getenv("TREND_INGESTION_MAX_SOURCE_URLS", "2"))
 RANDOM_SEED = os.getenv("TREND_INGESTION_RANDOM_SEED")
+ADAPTIVE_SCHEDULING = os.getenv("TREND_ADAPTIVE_SCHEDULING", "1").lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+SOURCE_MIN_INTERVAL_MINUTES = int(os.getenv("TREND_SOURCE_MIN_INTERVAL_MINUTES", "30"))
+SOURCE_MAX_INTERVAL_HOURS = int(os.getenv("TREND_SOURCE_MAX_INTERVAL_HOURS", "24"))
+SOURCE_TARGET_NEW_KEYWORDS = int(os.getenv("TREND_SOURCE_TARGET_NEW_KEYWORDS", "3"))
+SCHEDULER_TICK_SECONDS = int(os.getenv("TREND_SCHEDULER_TICK_SECONDS", "60"))
+RSS_SOURCE_NAME = "google_trends_rss"
+TREND_REFRESH_LOCK_REDIS_URL = os.getenv(
+    "TREND_REFRESH_LOCK_REDIS_URL", os.getenv("REDIS_URL", "")
+)
+TREND_REFRESH_LOCK_TTL_SECONDS = float(os.getenv("TREND_REFRESH_LOCK_TTL_SECONDS", "60"))
 
 
 @dataclass(frozen=True)
@@ -280,6 +324,28 @@ class ScrapeProfile:
 
 
 scheduler = AsyncIOScheduler()
+source_scheduler = AdaptiveSourceScheduler(
+    [*PLATFORM_CONFIG, RSS_SOURCE_NAME],
+    base_interval=SCRAPE_INTERVAL_HOURS * 3600,
+    min_interval=SOURCE_MIN_INTERVAL_MINUTES * 60,
+    max_interval=SOURCE_MAX_INTERVAL_HOURS * 3600,
+    target_new_keywords=SOURCE_TARGET_NEW_KEYWORDS,
+)
+_source_refresh_tasks: set[asyncio.Task] = set()
+# One scrape per source at a time across every replica; see ``refresh_trends``.
+refresh_lease_backend = build_lease_backend(
+    redis_url=TREND_REFRESH_LOCK_REDIS_URL,
+    database_url=database.DATABASE_URL,
+    engine_factory=lambda: database.engine,
+)
+# The factory looks ``async_playwright`` up per start so tests can swap it.
+browser_pool = BrowserPool(
+    lambda: async_playwright(),
+    launch_options={
+        "headless": True,
+        "proxy": {"server": PLAYWRIGHT_PROXY} if PLAYWRIGHT_PROXY else None,
+    },
+)
 
 _refresh_status: Dict[str, Any] = {
     "last_started_at": None,
@@ -304,53 +370,54 @@ class SourceBlockedError(RuntimeError):
     """Raised when a public page is login, bot, captcha, or access gated."""
 
 
-def normalize_text(text: str) -> str:
-    """Lowercase text, remove emojis and stopwords."""
-    text = EMOJI_RE.sub("", text).lower()
-    words = [word for word in re.split(r"\W+", text) if word and word not in STOPWORDS]
-    return " ".join(words)
+def _observe_stage(platform: str, stage: str, elapsed: float) -> None:
+    SCRAPE_STAGE_DURATION.labels(platform, stage).observe(elapsed)
+    for observer in stage_observers:
+        observer(platform, stage, elapsed)
+
 
+@contextmanager
+def _timed_stage(platform: str, stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe_stage(platform, stage, time.perf_counter() - started)
 
-def _contains_term(keyword: str, term: str) -> bool:
-    if " " in term:
-        return f" {term} " in f" {keyword} "
-    return term in keyword.split()
+
+@contextmanager
+def _timed_batch_stage(stage: str, rows_by_source: Dict[str, int]) -> Iterator[None]:
+    """Time a stage that runs once for several sources.
+
+    The elapsed time is split across sources by their share of the rows, so
+    per-source stage totals still add up. ``rows_by_source`` may be filled
+    in inside the block.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        total = sum(rows_by_source.values())
+        for platform, rows in rows_by_source.items():
+            if rows:
+                _observe_stage(platform, stage, elapsed * rows / total)
 
 
 def _contains_pod_signal(keyword: str) -> bool:
-    return any(_contains_term(keyword, term) for term in POD_ORIENTED_TERMS)
+    return keyword_matcher.classify(keyword).pod_signal
 
 
 def _contains_strong_pod_signal(keyword: str) -> bool:
-    return any(_contains_term(keyword, term) for term in STRONG_POD_TERMS)
+    return keyword_matcher.classify(keyword).strong_pod_signal
 
 
 def _looks_like_noise_keyword(
     keyword: str, *, method: str | None = None, source: str | None = None
 ) -> bool:
-    words = keyword.split()
-    if not words:
-        return True
-    compact = "".join(words)
-    if any(marker in keyword for marker in NON_POD_KEYWORD_MARKERS):
-        return True
-    if re.fullmatch(r"[a-f0-9]{6,8}", compact):
-        return True
-    if re.fullmatch(r"[a-z]*\d+[a-z\d]*", compact) and len(words) <= 2:
-        return True
-    if any(word in NAVIGATION_OR_TECH_TOKENS for word in words):
-        return True
-    if len(words) == 1 and words[0] in TEXT_FALLBACK_STOPWORDS:
-        return True
-    if method == "rss_fallback":
-        if any(term in words for term in RSS_NEWS_NOISE_TERMS):
-            return True
-        if not _contains_strong_pod_signal(keyword):
-            return True
-    if source in WEAK_PUBLIC_SOURCES_REQUIRE_POD:
-        if not _contains_strong_pod_signal(keyword):
-            return True
-    return False
+    return keyword_matcher.classify(keyword).is_noise(
+        method=method, requires_pod=source in WEAK_PUBLIC_SOURCES_REQUIRE_POD
+    )
 
 
 def _condense_keyword(keyword: str, source: str) -> str:
@@ -434,21 +501,31 @@ CATEGORY_ALIASES = {
 }
 
 
+keyword_matcher = KeywordMatcher(
+    categories=CATEGORIES,
+    pod_terms=POD_ORIENTED_TERMS,
+    strong_pod_terms=STRONG_POD_TERMS,
+    non_pod_markers=NON_POD_KEYWORD_MARKERS,
+    navigation_tokens=NAVIGATION_OR_TECH_TOKENS,
+    rss_news_noise_terms=RSS_NEWS_NOISE_TERMS,
+    stopwords=TEXT_FALLBACK_STOPWORDS,
+)
+
+
 def categorize(keyword: str) -> str:
-    for category, keys in CATEGORIES.items():
-        if any(key in keyword for key in keys):
-            return category
-    return "other"
+    return keyword_matcher.category(keyword)
 
 
-def normalize_category(raw_category: str | None, keyword: str) -> str:
+def normalize_category(
+    raw_category: str | None, keyword: str, *, inferred: str | None = None
+) -> str:
     cleaned = normalize_text(str(raw_category or "")).replace(" ", "_")
     alias = CATEGORY_ALIASES.get(cleaned.replace("_", " "))
     if alias:
         return alias
     if cleaned in CATEGORIES:
         return cleaned
-    inferred = categorize(keyword)
+    inferred = inferred or categorize(keyword)
     return inferred if inferred != "other" else "uncategorized"
 
 
@@ -488,6 +565,7 @@ def _market_example_from_signal(
     title: str | None = None,
     source_url: str | None = None,
     image_url: str | None = None,
+    updated_at: str | None = None,
 ) -> Dict[str, Any] | None:
     source = str(signal.get("source") or "unknown")
     keyword = str(signal.get("keyword") or signal.get("term") or "").strip()
@@ -507,16 +585,31 @@ def _market_example_from_signal(
         "provenance": {
             "source": source,
             "is_estimated": False,
-            "updated_at": utcnow().isoformat(),
+            "updated_at": updated_at or utcnow().isoformat(),
             "confidence": min(0.94, max(0.6, confidence)),
         },
     }
 
 
+def _cached_asset_url(
+    value: str | None,
+    base_url: str,
+    cache: Dict[tuple[str | None, str], str | None] | None,
+) -> str | None:
+    if cache is None:
+        return _valid_public_asset_url(value, base_url)
+    key = (value, base_url)
+    if key not in cache:
+        cache[key] = _valid_public_asset_url(value, base_url)
+    return cache[key]
+
+
 def _normalize_market_examples(
     value: Any,
     *,
     fallback_signal: Dict[str, Any] | None = None,
+    updated_at: str | None = None,
+    asset_urls: Dict[tuple[str | None, str], str | None] | None = None,
 ) -> List[Dict[str, Any]]:
     examples = value if isinstance(value, list) else []
     normalized: List[Dict[str, Any]] = []
@@ -529,12 +622,12 @@ def _normalize_market_examples(
             continue
         source = str(raw.get("source") or (fallback_signal or {}).get("source") or "unknown")
         source_url = (
-            _valid_public_asset_url(raw.get("source_url"), str(raw.get("source_url") or ""))
+            _cached_asset_url(raw.get("source_url"), str(raw.get("source_url") or ""), asset_urls)
             if isinstance(raw.get("source_url"), str)
             else None
         )
         image_url = (
-            _valid_public_asset_url(raw.get("image_url"), source_url or str(raw.get("image_url") or ""))
+            _cached_asset_url(raw.get("image_url"), source_url or str(raw.get("image_url") or ""), asset_urls)
             if isinstance(raw.get("image_url"), str)
             else None
         )
@@ -555,7 +648,7 @@ def _normalize_market_examples(
                 "provenance": {
                     "source": str(provenance.get("source") or source),
                     "is_estimated": bool(provenance.get("is_estimated", False)),
-                    "updated_at": str(provenance.get("updated_at") or utcnow().isoformat()),
+                    "updated_at": str(provenance.get("updated_at") or updated_at or utcnow().isoformat()),
                     "confidence": float(provenance.get("confidence") or 0.78),
                 },
             }
@@ -564,10 +657,69 @@ def _normalize_market_examples(
             break
     if normalized or not fallback_signal:
         return normalized
-    fallback = _market_example_from_signal(fallback_signal)
+    fallback = _market_example_from_signal(fallback_signal, updated_at=updated_at)
     return [fallback] if fallback else []
 
 
+class NormalizedSignal(dict):
+    """Signal dict returned by the normalizers.
+
+    ``normalize_signal_batch`` passes these through unchanged, so signals
+    normalized at extraction time are not normalized again downstream.
+    """
+
+
+def _coerce_score(raw_score: Any) -> int:
+    if isinstance(raw_score, str):
+        engagement_score = _parse_metric(raw_score)
+    else:
+        try:
+            engagement_score = int(raw_score)
+        except (TypeError, ValueError):
+            engagement_score = 0
+    return max(0, engagement_score)
+
+
+def _normalized_signal(
+    signal: Dict[str, Any],
+    *,
+    source: str,
+    keyword: str,
+    method: str,
+    engagement_score: int,
+    category: str,
+    updated_at: str,
+    asset_urls: Dict[tuple[str | None, str], str | None] | None = None,
+) -> NormalizedSignal:
+    confidence = float(
+        signal.get("confidence")
+        or _signal_confidence(method, keyword, engagement_score)
+    )
+    market_examples = _normalize_market_examples(
+        signal.get("market_examples"),
+        fallback_signal={**signal, "source": source, "keyword": keyword, "engagement_score": engagement_score},
+        updated_at=updated_at,
+        asset_urls=asset_urls,
+    )
+    return NormalizedSignal(
+        {
+            **signal,
+            "source": source,
+            "keyword": keyword,
+            "engagement_score": engagement_score,
+            "category": category,
+            "method": method,
+            "market_examples": market_examples,
+            "provenance": {
+                "source": source,
+                "is_estimated": method in {"rss_fallback", "stub", "unknown"},
+                "updated_at": updated_at,
+                "confidence": confidence,
+            },
+        }
+    )
+
+
 def normalize_signal(
     signal: Dict[str, Any],
     *,
@@ -580,43 +732,132 @@ def normalize_signal(
     keyword = _condense_keyword(keyword, source)
     if len(keyword) < 3:
         return None
-    if re.fullmatch(r"\d+(?:\.\d+)?[km]?", keyword):
+    if NUMERIC_KEYWORD_RE.fullmatch(keyword):
         return None
     if _looks_like_noise_keyword(keyword, method=method, source=source):
         return None
-    raw_score = signal.get("engagement_score") or signal.get("score") or 0
-    if isinstance(raw_score, str):
-        engagement_score = _parse_metric(raw_score)
-    else:
-        try:
-            engagement_score = int(raw_score)
-        except (TypeError, ValueError):
-            engagement_score = 0
-    engagement_score = max(0, engagement_score)
-    category = normalize_category(str(signal.get("category") or ""), keyword)
-    confidence = float(
-        signal.get("confidence")
-        or _signal_confidence(method, keyword, engagement_score)
+    engagement_score = _coerce_score(
+        signal.get("engagement_score") or signal.get("score") or 0
     )
-    market_examples = _normalize_market_examples(
-        signal.get("market_examples"),
-        fallback_signal={**signal, "source": source, "keyword": keyword, "engagement_score": engagement_score},
+    return _normalized_signal(
+        signal,
+        source=source,
+        keyword=keyword,
+        method=method,
+        engagement_score=engagement_score,
+        category=normalize_category(str(signal.get("category") or ""), keyword),
+        updated_at=utcnow().isoformat(),
     )
-    return {
-        **signal,
-        "source": source,
-        "keyword": keyword,
-        "engagement_score": engagement_score,
-        "category": category,
-        "method": method,
-        "market_examples": market_examples,
-        "provenance": {
-            "source": source,
-            "is_estimated": method in {"rss_fallback", "stub", "unknown"},
-            "updated_at": utcnow().isoformat(),
-            "confidence": confidence,
-        },
-    }
+
+
+@dataclass
+class SignalBatch:
+    """Raw signals as aligned columns, one list per field."""
+
+    keywords: List[str]
+    scores: List[Any]
+    sources: List[str]
+    methods: List[str]
+    rows: List[Dict[str, Any]]
+
+    @classmethod
+    def from_signals(
+        cls,
+        signals: Sequence[Dict[str, Any]],
+        *,
+        default_source: str | None = None,
+        default_method: str | None = None,
+    ) -> "SignalBatch":
+        return cls(
+            keywords=[str(s.get("keyword") or s.get("term") or "") for s in signals],
+            scores=[s.get("engagement_score") or s.get("score") or 0 for s in signals],
+            sources=[str(s.get("source") or default_source or "unknown") for s in signals],
+            methods=[str(s.get("method") or default_method or "unknown") for s in signals],
+            rows=list(signals),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def normalize_signal_batch(
+    signals: SignalBatch | Sequence[Dict[str, Any]],
+    *,
+    default_source: str | None = None,
+    default_method: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Normalize a batch of signals, matching ``normalize_signal`` row for row.
+
+    Text normalization, keyword classification, metric parsing, category
+    inference and asset URL checks run once per distinct value in the batch,
+    every row shares one ``updated_at``, and rows that are already a
+    ``NormalizedSignal`` are kept as they are.
+    """
+    batch = (
+        signals
+        if isinstance(signals, SignalBatch)
+        else SignalBatch.from_signals(
+            signals, default_source=default_source, default_method=default_method
+        )
+    )
+    updated_at = utcnow().isoformat()
+    texts: Dict[str, str] = {}
+    keywords: Dict[tuple[str, str], str | None] = {}
+    traits: Dict[str, KeywordTraits] = {}
+    scores: Dict[str, int] = {}
+    categories: Dict[tuple[str, str], str] = {}
+    asset_urls: Dict[tuple[str | None, str], str | None] = {}
+    normalized: List[Dict[str, Any]] = []
+    for raw_keyword, raw_score, source, method, signal in zip(
+        batch.keywords, batch.scores, batch.sources, batch.methods, batch.rows
+    ):
+        if isinstance(signal, NormalizedSignal):
+            normalized.append(signal)
+            continue
+        text = texts.get(raw_keyword)
+        if text is None:
+            text = texts[raw_keyword] = normalize_text(raw_keyword)
+        if (text, source) in keywords:
+            keyword = keywords[(text, source)]
+        else:
+            keyword = _condense_keyword(text, source)
+            if len(keyword) < 3 or NUMERIC_KEYWORD_RE.fullmatch(keyword):
+                keyword = None
+            keywords[(text, source)] = keyword
+        if keyword is None:
+            continue
+        keyword_traits = traits.get(keyword)
+        if keyword_traits is None:
+            keyword_traits = traits[keyword] = keyword_matcher.classify(keyword)
+        if keyword_traits.is_noise(
+            method=method, requires_pod=source in WEAK_PUBLIC_SOURCES_REQUIRE_POD
+        ):
+            continue
+        if isinstance(raw_score, str):
+            if raw_score not in scores:
+                scores[raw_score] = _coerce_score(raw_score)
+            engagement_score = scores[raw_score]
+        else:
+            engagement_score = _coerce_score(raw_score)
+        raw_category = str(signal.get("category") or "")
+        category = categories.get((raw_category, keyword))
+        if category is None:
+            category = categories[(raw_category, keyword)] = normalize_category(
+                raw_category, keyword, inferred=keyword_traits.category
+            )
+        normalized.append(
+            _normalized_signal(
+                signal,
+                source=source,
+                keyword=keyword,
+                method=method,
+                engagement_score=engagement_score,
+                category=category,
+                updated_at=updated_at,
+                asset_urls=asset_urls,
+            )
+        )
+    return normalized
 
 
 def _stub_signals() -> List[Dict[str, Any]]:
@@ -732,12 +973,12 @@ async def _collect_texts(handle, selectors: Sequence[str]) -> List[str]:
     return values
 
 
-async def _first_attr(
+async def _attr_values(
     handle,
     selectors: Sequence[str],
     attributes: Sequence[str],
-    base_url: str,
-) -> str | None:
+) -> List[str]:
+    values: List[str] = []
     for selector in selectors:
         try:
             nodes = await handle.query_selector_all(selector)
@@ -749,9 +990,16 @@ async def _first_attr(
                     value = await node.get_attribute(attribute)
                 except Exception:
                     value = None
-                normalized = _valid_public_asset_url(value, base_url)
-                if normalized:
-                    return normalized
+                if value is not None:
+                    values.append(value)
+    return values
+
+
+def _first_public_url(values: Sequence[str], base_url: str) -> str | None:
+    for value in values:
+        normalized = _valid_public_asset_url(value, base_url)
+        if normalized:
+            return normalized
     return None
 
 
@@ -863,12 +1111,10 @@ async def _extract_text_fallback_signals(page, source: str) -> List[Dict[str, An
         except Exception:
             values = []
         texts.extend(value for value in values if value)
-    signals: List[Dict[str, Any]] = []
-    for candidate in _keyword_candidates_from_text("\n".join(texts), source):
-        signal = normalize_signal(candidate, default_method="selector_text_fallback")
-        if signal:
-            signals.append(signal)
-    return signals
+    return normalize_signal_batch(
+        _keyword_candidates_from_text("\n".join(texts), source),
+        default_method="selector_text_fallback",
+    )
 
 
 async def _collect_items(page, selectors: SelectorSet) -> List[Any]:
@@ -888,16 +1134,139 @@ async def _collect_items(page, selectors: SelectorSet) -> List[Any]:
     return collected
 
 
+# Mirrors the handle-based helpers above (_first_text, _collect_texts,
+# _attr_values, _readable_node_text) so a page costs one CDP round trip.
+_ITEM_EXTRACTION_SCRIPT = """
+({ selectors, limit }) => {
+  const query = (root, selector, all) => {
+    try {
+      return all ? Array.from(root.querySelectorAll(selector)) : root.querySelector(selector);
+    } catch (error) {
+      return all ? [] : null;
+    }
+  };
+  const readable = (node) => {
+    const text = (node.innerText || "").trim();
+    if (text) return text;
+    for (const name of ["aria-label", "title", "alt"]) {
+      const value = node.getAttribute(name);
+      if (value && value.trim()) return value.trim();
+    }
+    return "";
+  };
+  const firstText = (root, list) => {
+    for (const selector of list) {
+      const node = query(root, selector, false);
+      const text = node ? readable(node) : "";
+      if (text) return text;
+    }
+    return "";
+  };
+  const texts = (root, list) =>
+    list.flatMap((selector) => query(root, selector, true).map(readable).filter(Boolean));
+  const attrs = (root, list, names) =>
+    list.flatMap((selector) =>
+      query(root, selector, true).flatMap((node) =>
+        names.map((name) => node.getAttribute(name)).filter((value) => value !== null)
+      )
+    );
+  return selectors.item
+    .flatMap((selector) => query(document, selector, true))
+    .slice(0, limit)
+    .map((item) => ({
+      title: firstText(item, selectors.title),
+      hashtags: texts(item, selectors.hashtags),
+      likes: firstText(item, selectors.likes),
+      shares: firstText(item, selectors.shares),
+      comments: firstText(item, selectors.comments),
+      images: attrs(item, selectors.image, ["src", "data-src"]),
+      links: attrs(item, selectors.link, ["href"]),
+    }));
+}
+"""
+
+
+async def _extract_item_records_with_handles(
+    page, selectors: SelectorSet, limit: int
+) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    for handle in (await _collect_items(page, selectors))[:limit]:
+        records.append(
+            {
+                "title": await _first_text(handle, selectors.title),
+                "hashtags": await _collect_texts(handle, selectors.hashtags),
+                "likes": await _first_text(handle, selectors.likes),
+                "shares": await _first_text(handle, selectors.shares),
+                "comments": await _first_text(handle, selectors.comments),
+                "images": await _attr_values(handle, selectors.image, ("src", "data-src")),
+                "links": await _attr_values(handle, selectors.link, ("href",)),
+            }
+        )
+    return records
+
+
+async def _extract_item_records(
+    page, selectors: SelectorSet, limit: int
+) -> List[Dict[str, Any]]:
+    """Read up to ``limit`` raw item records with a single ``page.evaluate``.
+
+    Falls back to per-handle queries when the evaluation fails, e.g. because
+    the page navigated mid-call.
+    """
+    try:
+        records = await page.evaluate(
+            _ITEM_EXTRACTION_SCRIPT,
+            {"selectors": asdict(selectors), "limit": limit},
+        )
+    except Exception as exc:
+        logger.info(
+            "Batched item extraction failed, reading handles: %s",
+            _sanitize_reason(exc),
+        )
+        return await _extract_item_records_with_handles(page, selectors, limit)
+    return records if isinstance(records, list) else []
+
+
+def _signals_from_item_records(
+    records: Sequence[Dict[str, Any]], name: str, page_url: str
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for record in records:
+        title = record.get("title") or ""
+        hashtags = record.get("hashtags") or []
+        keyword = normalize_text(" ".join(filter(None, [title, " ".join(hashtags)])))
+        if not keyword:
+            continue
+        engagement = compute_engagement(
+            _parse_metric(record.get("likes") or ""),
+            _parse_metric(record.get("shares") or ""),
+            _parse_metric(record.get("comments") or ""),
+        )
+        example = _market_example_from_signal(
+            {"source": name, "keyword": keyword, "engagement_score": engagement},
+            title=title or keyword,
+            source_url=_first_public_url(record.get("links") or [], page_url) or page_url,
+            image_url=_first_public_url(record.get("images") or [], page_url),
+        )
+        results.append(
+            {
+                "source": name,
+                "keyword": keyword,
+                "engagement_score": engagement,
+                "market_examples": [example] if example else [],
+            }
+        )
+    return normalize_signal_batch(results, default_method="selector_fallback")
+
+
 async def _scrape_source(
-    playwright,
+    pool: BrowserPool,
     name: str,
     config: SourceConfig,
     profile: ScrapeProfile | None = None,
 ) -> List[Dict[str, Any]]:
     active_profile = profile or build_scrape_profile(config)
-    proxy_settings = {"server": PLAYWRIGHT_PROXY} if PLAYWRIGHT_PROXY else None
-    browser = await playwright.chromium.launch(headless=True, proxy=proxy_settings)
-    context = await browser.new_context(
+    async with pool.context(
         user_agent=active_profile.user_agent,
         viewport={
             "width": active_profile.viewport_width,
@@ -905,11 +1274,22 @@ async def _scrape_source(
         },
         locale=active_profile.locale,
         timezone_id=active_profile.timezone_id,
-    )
-    page = await context.new_page()
-    results: List[Dict[str, Any]] = []
-    try:
-        await page.wait_for_timeout(active_profile.delay_ms)
+    ) as context:
+        await snapshot_store.attach(context)
+        page = await context.new_page()
+        return await _scrape_page(page, name, config, active_profile)
+
+
+async def _scrape_page(
+    page,
+    name: str,
+    config: SourceConfig,
+    active_profile: ScrapeProfile,
+) -> List[Dict[str, Any]]:
+    # Human-like pacing only matters against live sites.
+    pacing_ms = 0 if snapshot_store.replaying else active_profile.delay_ms
+    with _timed_stage(name, "fetch"):
+        await page.wait_for_timeout(pacing_ms)
         response = await page.goto(
             config.url,
             wait_until="domcontentloaded",
@@ -940,81 +1320,43 @@ async def _scrape_source(
             )
         for _ in range(active_profile.scroll_iterations):
             await page.mouse.wheel(0, active_profile.scroll_pixels)
-            await page.wait_for_timeout(active_profile.delay_ms)
-        items = await _collect_items(page, config.selectors)
-        for handle in items[: TOP_K * 2]:
-            title = await _first_text(handle, config.selectors.title)
-            hashtags = await _collect_texts(handle, config.selectors.hashtags)
-            likes_text = await _first_text(handle, config.selectors.likes)
-            shares_text = await _first_text(handle, config.selectors.shares)
-            comments_text = await _first_text(handle, config.selectors.comments)
-            image_url = await _first_attr(
-                handle, config.selectors.image, ("src", "data-src"), page.url
-            )
-            source_url = await _first_attr(
-                handle, config.selectors.link, ("href",), page.url
-            )
-            keyword = normalize_text(
-                " ".join(filter(None, [title, " ".join(hashtags)]))
-            )
-            if not keyword:
-                continue
-            engagement = compute_engagement(
-                _parse_metric(likes_text),
-                _parse_metric(shares_text),
-                _parse_metric(comments_text),
-            )
-            signal = normalize_signal(
-                {
-                    "source": name,
-                    "keyword": keyword,
-                    "engagement_score": engagement,
-                    "market_examples": [
-                        example
-                        for example in [
-                            _market_example_from_signal(
-                                {
-                                    "source": name,
-                                    "keyword": keyword,
-                                    "engagement_score": engagement,
-                                },
-                                title=title or keyword,
-                                source_url=source_url or page.url,
-                                image_url=image_url,
-                            )
-                        ]
-                        if example
-                    ],
-                },
-                default_method="selector_fallback",
+            await page.wait_for_timeout(pacing_ms)
+        if snapshot_store.recording:
+            snapshot_store.save(
+                PageSnapshot(
+                    url=config.url,
+                    body=await page.content(),
+                    status=status,
+                    final_url=page.url,
+                )
             )
-            if signal:
-                results.append(signal)
-        if not results:
-            results.extend(await _extract_text_fallback_signals(page, name))
-    finally:
-        await context.close()
-        await browser.close()
+    with _timed_stage(name, "extract"):
+        records = await _extract_item_records(page, config.selectors, TOP_K * 2)
+    with _timed_stage(name, "normalize"):
+        results = _signals_from_item_records(records, name, page.url)
+    if not results:
+        with _timed_stage(name, "extract"):
+            results = await _extract_text_fallback_signals(page, name)
     return results
 
 
 async def _call_selector_scraper(
-    playwright,
+    pool: BrowserPool,
     name: str,
     config: SourceConfig,
     profile: ScrapeProfile,
 ) -> List[Dict[str, Any]]:
     try:
-        return await _scrape_source(playwright, name, config, profile)
+        return await _scrape_source(pool, name, config, profile)
     except TypeError as exc:
         # Some tests monkeypatch _scrape_source with the older 3-argument shape.
         if "argument" not in str(exc) and "positional" not in str(exc):
             raise
-        return await _scrape_source(playwright, name, config)  # type: ignore[misc]
+        return await _scrape_source(pool, name, config)  # type: ignore[misc]
 
 
 async def _scrape_with_circuit_breaker(
-    playwright,
+    pool: BrowserPool,
     name: str,
     config: SourceConfig,
     profile: ScrapeProfile | None = None,
@@ -1023,7 +1365,7 @@ async def _scrape_with_circuit_breaker(
     active_profile = profile or build_scrape_profile(config)
     started = time.monotonic()
     try:
-        results = await _call_selector_scraper(playwright, name, config, active_profile)
+        results = await _call_selector_scraper(pool, name, config, active_profile)
     except Exception as exc:
         duration = time.monotonic() - started
         SCRAPE_DURATION.labels(name).observe(duration)
@@ -1087,7 +1429,7 @@ async def _scrape_with_scrapegraph_method(
 
 
 async def _scrape_source_chain(
-    playwright,
+    pool: BrowserPool,
     name: str,
     config: SourceConfig,
     profile: ScrapeProfile,
@@ -1098,6 +1440,9 @@ async def _scrape_source_chain(
         candidate_config = replace(config, url=url, candidate_urls=None)
         scrapegraph_error: str | None = None
         try:
+            if snapshot_store.replaying:
+                # ScrapeGraphAI fetches pages itself, outside the snapshots.
+                raise RuntimeError("ScrapeGraphAI skipped during snapshot replay")
             results = await _scrape_with_scrapegraph_method(
                 name, candidate_config, run_id
             )
@@ -1114,7 +1459,7 @@ async def _scrape_source_chain(
         SCRAPE_FALLBACK_TOTAL.labels(name, "scrapegraph", "selector_fallback").inc()
         try:
             selector_results = await _scrape_with_circuit_breaker(
-                playwright, name, candidate_config, profile
+                pool, name, candidate_config, profile
             )
             if selector_results:
                 for result in selector_results:
@@ -1148,24 +1493,42 @@ def _extract_rss_signals(xml_text: str) -> List[Dict[str, Any]]:
         if not keyword:
             continue
         score = max(10, 100 - (index * 3))
-        signal = normalize_signal(
+        signals.append(
             {
                 "source": "google_trends_rss",
                 "keyword": keyword,
                 "engagement_score": score,
-            },
-            default_method="rss_fallback",
+            }
         )
-        if signal:
-            signals.append(signal)
-    return signals
+    return normalize_signal_batch(signals, default_method="rss_fallback")
 
 
 async def _fetch_rss_signals() -> List[Dict[str, Any]]:
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        response = await client.get(TREND_RSS_URL)
-        response.raise_for_status()
-    return _extract_rss_signals(response.text)
+    with _timed_stage("google_trends_rss", "fetch"):
+        if snapshot_store.replaying:
+            snapshot = snapshot_store.load(TREND_RSS_URL)
+            if snapshot is None:
+                raise RuntimeError("No RSS snapshot recorded")
+            xml_text = snapshot.body
+        else:
+            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+                response = await client.get(TREND_RSS_URL)
+                response.raise_for_status()
+            xml_text = response.text
+            if snapshot_store.recording:
+                snapshot_store.save(
+                    PageSnapshot(
+                        url=TREND_RSS_URL,
+                        body=xml_text,
+                        status=response.status_code,
+                        final_url=str(response.url),
+                        content_type=response.headers.get(
+                            "content-type", "application/rss+xml"
+                        ),
+                    )
+                )
+    with _timed_stage("google_trends_rss", "extract"):
+        return _extract_rss_signals(xml_text)
 
 
 def _diagnostic(
@@ -1190,16 +1553,10 @@ def _diagnostic(
     }
 
 
-def _normalize_signal_batch(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    normalized: List[Dict[str, Any]] = []
-    for signal in signals:
-        normalized_signal = normalize_signal(signal)
-        if normalized_signal:
-            normalized.append(normalized_signal)
-    return normalized
-
-
-async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+async def _gather_trends(
+    source_names: Sequence[str] | None = None,
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Scrape ``source_names`` (every platform plus the RSS feed when None)."""
     if STUB_ONLY:
         signals = _stub_signals()
         return signals, {
@@ -1235,38 +1592,45 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
     allowed_source_names: List[str] = []
     fallback_count = 0
 
+    selector_names = (
+        list(PLATFORM_CONFIG)
+        if source_names is None
+        else [name for name in source_names if name in PLATFORM_CONFIG]
+    )
+    results: List[Any] = []
     try:
-        async with async_playwright() as pw:
-            tasks = []
-            for name in build_scrape_plan(rng=rng):
-                config = PLATFORM_CONFIG[name]
-                if not scraper_circuit_breaker.allow_request(name):
-                    logger.warning(
-                        "Circuit breaker OPEN for %s - skipping scrape", name
-                    )
-                    SCRAPE_TOTAL.labels(name, "circuit_open").inc()
-                    SCRAPE_METHOD_TOTAL.labels(name, "circuit", "skipped").inc()
-                    sources_failed[name] = "Circuit breaker open"
-                    source_methods[name] = "skipped"
-                    sources_skipped.append(name)
-                    sources_blocked.append(name)
-                    source_diagnostics[name] = _diagnostic(
-                        status="skipped",
-                        method="circuit",
-                        reason="Circuit breaker open",
-                    )
-                    continue
-                allowed_source_names.append(name)
-                profile = build_scrape_profile(config, rng)
-                tasks.append(_scrape_source_chain(pw, name, config, profile, run_id))
-            results = (
-                await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
-            )
+        if selector_names:
+            async with browser_pool.run() as pool:
+                tasks = []
+                for name in build_scrape_plan(selector_names, rng=rng):
+                    config = PLATFORM_CONFIG[name]
+                    if not await scraper_circuit_breaker.allow_request(name):
+                        logger.warning(
+                            "Circuit breaker OPEN for %s - skipping scrape", name
+                        )
+                        SCRAPE_TOTAL.labels(name, "circuit_open").inc()
+                        SCRAPE_METHOD_TOTAL.labels(name, "circuit", "skipped").inc()
+                        sources_failed[name] = "Circuit breaker open"
+                        source_methods[name] = "skipped"
+                        sources_skipped.append(name)
+                        sources_blocked.append(name)
+                        source_diagnostics[name] = _diagnostic(
+                            status="skipped",
+                            method="circuit",
+                            reason="Circuit breaker open",
+                        )
+                        continue
+                    allowed_source_names.append(name)
+                    profile = build_scrape_profile(config, rng)
+                    tasks.append(_scrape_source_chain(pool, name, config, profile, run_id))
+                results = (
+                    await asyncio.gather(*tasks, return_exceptions=True) if tasks else []
+                )
     except PublicOnlyConfigError:
         raise
     except Exception as exc:
         for name in allowed_source_names:
-            scraper_circuit_breaker.record_failure(name)
+            await scraper_circuit_breaker.record_failure(name)
         sources_failed["playwright"] = _sanitize_reason(exc)
         source_methods["playwright"] = "failed"
         source_diagnostics["playwright"] = _diagnostic(
@@ -1278,7 +1642,7 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
     else:
         for name, result in zip(allowed_source_names, results):
             if isinstance(result, Exception):
-                scraper_circuit_breaker.record_failure(name)
+                await scraper_circuit_breaker.record_failure(name)
                 sources_failed[name] = _sanitize_reason(result)
                 source_methods[name] = "failed"
                 source_diagnostics[name] = _diagnostic(
@@ -1294,7 +1658,7 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
             if upstream_error:
                 fallback_count += 1
             if method == "blocked":
-                scraper_circuit_breaker.record_failure(name)
+                await scraper_circuit_breaker.record_failure(name)
                 source_methods[name] = "skipped"
                 sources_failed[name] = (
                     upstream_error or "Public page blocked or login gated"
@@ -1308,9 +1672,10 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
                 )
                 continue
             if source_results and method:
-                source_results = _normalize_signal_batch(source_results)
+                with _timed_stage(name, "normalize"):
+                    source_results = normalize_signal_batch(source_results)
                 if not source_results:
-                    scraper_circuit_breaker.record_failure(name)
+                    await scraper_circuit_breaker.record_failure(name)
                     source_methods[name] = "failed"
                     sources_failed[name] = (
                         upstream_error or "No viable POD-oriented trend items collected"
@@ -1321,7 +1686,7 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
                         reason=sources_failed[name],
                     )
                     continue
-                scraper_circuit_breaker.record_success(name)
+                await scraper_circuit_breaker.record_success(name)
                 aggregated.extend(source_results)
                 sources_succeeded.append(name)
                 source_methods[name] = method
@@ -1334,7 +1699,7 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
                     reason=upstream_error,
                 )
                 continue
-            scraper_circuit_breaker.record_failure(name)
+            await scraper_circuit_breaker.record_failure(name)
             SCRAPE_TOTAL.labels(name, "failure").inc()
             SCRAPE_METHOD_TOTAL.labels(name, "selector_fallback", "failure").inc()
             source_methods[name] = "failed"
@@ -1345,11 +1710,13 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
                 reason=upstream_error or "No trend items collected",
             )
 
-    if RSS_FALLBACK_ENABLED:
+    include_rss = source_names is None or "google_trends_rss" in source_names
+    if RSS_FALLBACK_ENABLED and include_rss:
         try:
             rss_signals = await _fetch_rss_signals()
             if rss_signals:
-                rss_signals = _normalize_signal_batch(rss_signals)
+                with _timed_stage("google_trends_rss", "normalize"):
+                    rss_signals = normalize_signal_batch(rss_signals)
                 for signal in rss_signals:
                     signal.setdefault("method", "rss_fallback")
                 aggregated.extend(rss_signals)
@@ -1395,7 +1762,7 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
             SCRAPE_METHOD_TOTAL.labels(
                 "google_trends_rss", "rss_fallback", "failure"
             ).inc()
-    else:
+    elif include_rss:
         source_methods["google_trends_rss"] = "skipped"
         sources_skipped.append("google_trends_rss")
         source_diagnostics["google_trends_rss"] = _diagnostic(
@@ -1450,10 +1817,130 @@ async def _gather_trends() -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
     }
 
 
-async def refresh_trends() -> Dict[str, Any]:
-    """Scrape all platforms and persist top signals."""
+async def upsert_trend_signals(
+    session: AsyncSession, rows: Sequence[TrendSignal]
+) -> int:
+    """Write ``rows`` with one ``INSERT ... ON CONFLICT DO UPDATE``, uncommitted.
+
+    Rows sharing ``(source, normalized_keyword, bucket_start)`` with a stored
+    signal replace its keyword, score, category, timestamp and metadata, so
+    repeated refreshes inside a bucket keep one row per keyword and source.
+    Returns the number of rows written.
+    """
+    values: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        # Core inserts skip the ORM hook, so the dedupe key is derived here.
+        normalized_keyword = normalize_text(row.keyword or "")
+        key = (row.source, normalized_keyword, row.bucket_start)
+        # Duplicates within the batch keep the highest-scored row.
+        existing = values.get(key)
+        if existing is not None and existing["engagement_score"] >= row.engagement_score:
+            continue
+        values[key] = {
+            "source": row.source,
+            "keyword": row.keyword,
+            "normalized_keyword": normalized_keyword,
+            "timestamp": row.timestamp,
+            "bucket_start": row.bucket_start,
+            "engagement_score": row.engagement_score,
+            "category": row.category,
+            "metadata_json": row.metadata_json,
+        }
+    if not values:
+        return 0
+    dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(TrendSignal.__table__).values(list(values.values()))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "normalized_keyword", "bucket_start"],
+        set_={
+            "keyword": excluded.keyword,
+            "timestamp": excluded.timestamp,
+            "engagement_score": excluded.engagement_score,
+            "category": excluded.category,
+            "metadata_json": excluded.metadata_json,
+        },
+    )
+    await session.exec(stmt)
+    return len(values)
+
+
+async def _known_keywords(
+    session: AsyncSession, rows: Sequence[TrendSignal]
+) -> set[tuple[str, str]]:
+    """Return the ``(source, normalized_keyword)`` pairs of ``rows`` already stored."""
+    keywords = {row.normalized_keyword for row in rows if row.normalized_keyword}
+    if not keywords:
+        return set()
+    result = await session.exec(
+        select(TrendSignal.source, TrendSignal.normalized_keyword)
+        .where(
+            TrendSignal.source.in_({row.source for row in rows}),
+            TrendSignal.normalized_keyword.in_(keywords),
+        )
+        .distinct()
+    )
+    return {(source, keyword) for source, keyword in result.all()}
+
+
+def source_lease_name(source: str) -> str:
+    """Name of the lease a refresh holds while it scrapes ``source``."""
+    return f"trends:source:{source}"
+
+
+async def refresh_trends(source_names: Sequence[str] | None = None) -> Dict[str, Any]:
+    """Scrape ``source_names`` (all platforms when None) and persist top signals.
+
+    Each source is scraped by at most one refresh at a time cluster-wide,
+    whether it came from the API or any replica's scheduler: a refresh takes
+    one lease per requested source and skips sources whose lease another
+    refresh holds, listing them in ``sources_in_flight``. ``refresh_lock``
+    reports the backend and the fencing token of each source it scraped.
+    Each persisted source's diagnostic gains ``new_keywords``: how many of
+    its keywords were not stored for that source before this refresh.
+    """
+    requested = (
+        [*PLATFORM_CONFIG, RSS_SOURCE_NAME]
+        if source_names is None
+        else list(dict.fromkeys(source_names))
+    )
+    async with held_leases(
+        refresh_lease_backend,
+        [source_lease_name(name) for name in requested],
+        ttl_seconds=TREND_REFRESH_LOCK_TTL_SECONDS,
+    ) as taken:
+        leases = {
+            name: taken[source_lease_name(name)]
+            for name in requested
+            if source_lease_name(name) in taken
+        }
+        in_flight = [name for name in requested if name not in leases]
+        if in_flight:
+            logger.info("Trend sources already being refreshed elsewhere: %s", in_flight)
+        if not leases:
+            result = get_refresh_status()
+        else:
+            result = await _refresh_trends(
+                list(leases) if in_flight else source_names, list(leases.values())
+            )
+    return {
+        **result,
+        "sources_in_flight": in_flight,
+        "refresh_lock": {
+            "backend": refresh_lease_backend.name,
+            "fencing_tokens": {name: lease.fencing_token for name, lease in leases.items()},
+        },
+    }
+
+
+async def _refresh_trends(
+    source_names: Sequence[str] | None, leases: List[Lease]
+) -> Dict[str, Any]:
     started_at = utcnow()
-    signals, gather_meta = await _gather_trends()
+    if source_names is None:
+        signals, gather_meta = await _gather_trends()
+    else:
+        signals, gather_meta = await _gather_trends(source_names)
     mode = str(gather_meta.get("mode") or ("stub" if STUB_ONLY else "live"))
 
     if not signals:
@@ -1479,48 +1966,78 @@ async def refresh_trends() -> Dict[str, Any]:
         return get_refresh_status()
 
     persisted = 0
+    persisted_rows: List[TrendSignal] = []
+    persisted_by_source: Dict[str, int] = {}
     diagnostics = dict(gather_meta.get("source_diagnostics", {}))
-    async with get_session() as session:
-        for source in {signal["source"] for signal in signals}:
-            top_candidates = sorted(
-                [signal for signal in signals if signal["source"] == source],
-                key=lambda signal: signal["engagement_score"],
-                reverse=True,
-            )
-            seen_keywords: set[str] = set()
-            top_signals: List[Dict[str, Any]] = []
-            for signal in top_candidates:
-                normalized_signal = normalize_signal(signal)
-                if not normalized_signal:
-                    continue
-                dedupe_key = normalized_signal["keyword"]
-                if not dedupe_key or dedupe_key in seen_keywords:
-                    continue
-                seen_keywords.add(dedupe_key)
-                top_signals.append(normalized_signal)
-                if len(top_signals) >= TOP_K:
-                    break
-
-            for signal in top_signals:
-                session.add(
-                    TrendSignal(
-                        source=signal["source"],
-                        keyword=signal["keyword"],
-                        engagement_score=signal["engagement_score"],
-                        category=signal["category"],
-                        timestamp=utcnow(),
-                        metadata_json={
-                            "method": signal.get("method"),
-                            "provenance": signal.get("provenance"),
-                            "market_examples": signal.get("market_examples", []),
-                        },
-                    )
+    normalized_rows: Dict[str, int] = {}
+    with _timed_batch_stage("normalize", normalized_rows):
+        by_source: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for signal in normalize_signal_batch(signals):
+            by_source[signal["source"]].append(signal)
+        normalized_rows.update({source: len(rows) for source, rows in by_source.items()})
+    persisted_at = utcnow()
+    signal_bucket = bucket_start(persisted_at, SIGNAL_BUCKET_GRANULARITY)
+    for source, candidates in by_source.items():
+        top_candidates = sorted(
+            candidates,
+            key=lambda signal: signal["engagement_score"],
+            reverse=True,
+        )
+        seen_keywords: set[str] = set()
+        top_signals: List[Dict[str, Any]] = []
+        for signal in top_candidates:
+            dedupe_key = signal["keyword"]
+            if not dedupe_key or dedupe_key in seen_keywords:
+                continue
+            seen_keywords.add(dedupe_key)
+            top_signals.append(signal)
+            if len(top_signals) >= TOP_K:
+                break
+
+        for signal in top_signals:
+            persisted_rows.append(
+                TrendSignal(
+                    source=signal["source"],
+                    keyword=signal["keyword"],
+                    normalized_keyword=normalize_text(signal["keyword"]),
+                    engagement_score=signal["engagement_score"],
+                    category=signal["category"],
+                    timestamp=persisted_at,
+                    bucket_start=signal_bucket,
+                    metadata_json={
+                        "method": signal.get("method"),
+                        "provenance": signal.get("provenance"),
+                        "market_examples": signal.get("market_examples", []),
+                    },
                 )
-                SCRAPE_PERSISTED.labels(signal["source"]).inc()
-                persisted += 1
-            if source in diagnostics:
-                diagnostics[source]["persisted"] = len(top_signals)
-        await session.commit()
+            )
+            SCRAPE_PERSISTED.labels(signal["source"]).inc()
+            persisted += 1
+        persisted_by_source[source] = len(top_signals)
+        if source in diagnostics:
+            diagnostics[source]["persisted"] = len(top_signals)
+            diagnostics[source]["new_keywords"] = 0
+    # One transaction writes every source's rows.
+    with _timed_batch_stage("persist", persisted_by_source):
+        async with get_session() as session:
+            # A refresh whose source lease expired mid-scrape must not
+            # overwrite a newer run of that source.
+            for lease in sorted(leases, key=lambda lease: lease.name):
+                await lease.ensure_held()
+                await fence_writes(session, lease)
+            known = await _known_keywords(session, persisted_rows)
+            for row in persisted_rows:
+                if row.source in diagnostics and (row.source, row.normalized_keyword) not in known:
+                    diagnostics[row.source]["new_keywords"] += 1
+            await upsert_trend_signals(session, persisted_rows)
+            await recompute_trend_rollups(
+                session,
+                {
+                    (row.source, row.normalized_keyword or row.keyword, row.timestamp)
+                    for row in persisted_rows
+                },
+            )
+            await session.commit()
 
     _refresh_status.update(
         {
@@ -1544,6 +2061,42 @@ async def refresh_trends() -> Dict[str, Any]:
     return get_refresh_status()
 
 
+def _live_trend_payload(row: Any) -> Dict[str, Any]:
+    metadata = row.metadata_json or {}
+    return {
+        "source": row.source,
+        "keyword": row.keyword,
+        "category": row.category,
+        "engagement_score": row.engagement_score,
+        "timestamp": row.timestamp.isoformat(),
+        "market_examples": metadata.get("market_examples", []),
+        "method": metadata.get("method"),
+        "provenance": {
+            "source": row.source,
+            "is_estimated": row.source in {"google_trends_rss", "stub_seed"},
+            "updated_at": row.timestamp.isoformat(),
+            "confidence": float(
+                (metadata.get("provenance") or {}).get(
+                    "confidence",
+                    0.72 if row.source == "google_trends_rss" else 0.86,
+                )
+            ),
+        },
+    }
+
+
+def _live_trend_sort_expression(column: Any, sort_by: str, dialect_name: str) -> Any:
+    if sort_by == "timestamp":
+        return column.timestamp
+    if sort_by == "keyword":
+        expression = func.lower(column.keyword)
+        if dialect_name == "postgresql":
+            # Match Python's code-point ordering instead of the database locale.
+            expression = expression.collate("C")
+        return expression
+    return column.engagement_score
+
+
 async def get_live_trends(
     category: str | None = None,
     source: str | None = None,
@@ -1555,86 +2108,111 @@ async def get_live_trends(
     sort_order: str = "desc",
     include_meta: bool = False,
 ) -> Dict[str, Any]:
+    """Return deduped live trends grouped by category.
+
+    Dedupe, ordering and per-category paging run in SQL with window functions
+    so only the requested page leaves the database. Duplicate
+    ``(category, source, normalized_keyword)`` rows keep the highest score,
+    then the newest timestamp; ties in the requested sort keep insertion order.
+    """
     lookback_hours = max(1, lookback_hours)
     per_group_limit = min(max(1, per_group_limit), MAX_LIVE_TRENDS_PER_GROUP)
     page = max(1, page)
     page_size = min(max(1, page_size or per_group_limit), MAX_LIVE_TRENDS_PER_GROUP)
     cutoff = utcnow() - timedelta(hours=lookback_hours)
-
-    async with get_session() as session:
-        stmt = select(TrendSignal).where(TrendSignal.timestamp >= cutoff)
-        if category:
-            stmt = stmt.where(TrendSignal.category == category)
-        if source:
-            stmt = stmt.where(TrendSignal.source == source)
-        result = await session.exec(stmt)
-        rows = result.all()
-
-    deduped_rows: dict[tuple[str, str, str], TrendSignal] = {}
-    for row in rows:
-        keyword = normalize_text(row.keyword)
-        if not keyword:
-            continue
-        key = (row.category, row.source, keyword)
-        existing = deduped_rows.get(key)
-        if (
-            existing is None
-            or row.engagement_score > existing.engagement_score
-            or (
-                row.engagement_score == existing.engagement_score
-                and row.timestamp > existing.timestamp
-            )
-        ):
-            deduped_rows[key] = row
-
     reverse = sort_order.lower() != "asc"
-    if sort_by == "timestamp":
-        sorted_rows = sorted(
-            deduped_rows.values(), key=lambda row: row.timestamp, reverse=reverse
+    offset = (page - 1) * page_size
+    group_limit = min(per_group_limit, page_size)
+
+    dedupe_partition = (
+        TrendSignal.category,
+        TrendSignal.source,
+        TrendSignal.normalized_keyword,
+    )
+    candidates_stmt = select(
+        TrendSignal.id,
+        TrendSignal.keyword,
+        TrendSignal.category,
+        TrendSignal.engagement_score,
+        TrendSignal.timestamp,
+        func.row_number()
+        .over(
+            partition_by=dedupe_partition,
+            order_by=(
+                TrendSignal.engagement_score.desc(),
+                TrendSignal.timestamp.desc(),
+                TrendSignal.id,
+            ),
         )
-    elif sort_by == "keyword":
-        sorted_rows = sorted(
-            deduped_rows.values(), key=lambda row: row.keyword.lower(), reverse=reverse
+        .label("dedupe_rank"),
+        func.min(TrendSignal.id)
+        .over(partition_by=dedupe_partition)
+        .label("first_seen"),
+    ).where(
+        TrendSignal.timestamp >= cutoff,
+        TrendSignal.normalized_keyword.is_not(None),
+        TrendSignal.normalized_keyword != "",
+    )
+    if category:
+        candidates_stmt = candidates_stmt.where(TrendSignal.category == category)
+    if source:
+        candidates_stmt = candidates_stmt.where(TrendSignal.source == source)
+    candidates = candidates_stmt.subquery("candidates")
+
+    async with get_session() as session:
+        dialect_name = session.bind.dialect.name
+        sort_expression = _live_trend_sort_expression(candidates.c, sort_by, dialect_name)
+        ordering = (
+            sort_expression.desc() if reverse else sort_expression.asc(),
+            candidates.c.first_seen,
         )
-    else:
-        sorted_rows = sorted(
-            deduped_rows.values(),
-            key=lambda row: row.engagement_score,
-            reverse=reverse,
+        ranked = (
+            select(
+                candidates.c.id,
+                (
+                    func.row_number().over(
+                        partition_by=candidates.c.category, order_by=ordering
+                    )
+                    - 1
+                ).label("category_rank"),
+                func.count(literal_column("*"))
+                .over(partition_by=candidates.c.category)
+                .label("category_total"),
+                func.row_number().over(order_by=ordering).label("global_rank"),
+            )
+            .where(candidates.c.dedupe_rank == 1)
+            .subquery("ranked")
         )
+        # Rank 0 rows are fetched as well so per-category totals keep the
+        # order in which categories first appear in the sorted result.
+        page_filter = ranked.c.category_rank.between(offset, offset + group_limit - 1)
+        if include_meta:
+            page_filter = or_(page_filter, ranked.c.category_rank == 0)
+        page_rows = (
+            await session.exec(
+                select(
+                    TrendSignal.source,
+                    TrendSignal.keyword,
+                    TrendSignal.category,
+                    TrendSignal.engagement_score,
+                    TrendSignal.timestamp,
+                    TrendSignal.metadata_json,
+                    ranked.c.category_rank,
+                    ranked.c.category_total,
+                )
+                .join(ranked, ranked.c.id == TrendSignal.id)
+                .where(page_filter)
+                .order_by(ranked.c.global_rank)
+            )
+        ).all()
 
     grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    total_by_category: Dict[str, int] = defaultdict(int)
-    offset = (page - 1) * page_size
-    for row in sorted_rows:
-        total_by_category[row.category] += 1
-        category_index = total_by_category[row.category] - 1
-        if category_index < offset:
-            continue
-        if len(grouped[row.category]) >= min(per_group_limit, page_size):
-            continue
-        grouped[row.category].append(
-            {
-                "source": row.source,
-                "keyword": row.keyword,
-                "category": row.category,
-                "engagement_score": row.engagement_score,
-                "timestamp": row.timestamp.isoformat(),
-                "market_examples": (row.metadata_json or {}).get("market_examples", []),
-                "method": (row.metadata_json or {}).get("method"),
-                "provenance": {
-                    "source": row.source,
-                    "is_estimated": row.source in {"google_trends_rss", "stub_seed"},
-                    "updated_at": row.timestamp.isoformat(),
-                    "confidence": float(
-                        ((row.metadata_json or {}).get("provenance") or {}).get(
-                            "confidence",
-                            0.72 if row.source == "google_trends_rss" else 0.86,
-                        )
-                    ),
-                },
-            }
-        )
+    total_by_category: Dict[str, int] = {}
+    for row in page_rows:
+        if row.category_rank == 0:
+            total_by_category[row.category] = int(row.category_total)
+        if offset <= row.category_rank < offset + group_limit:
+            grouped[row.category].append(_live_trend_payload(row))
     if not include_meta:
         return grouped
     return {
@@ -1644,7 +2222,7 @@ async def get_live_trends(
             "page_size": page_size,
             "per_group_limit": per_group_limit,
             "total": sum(total_by_category.values()),
-            "total_by_category": dict(total_by_category),
+            "total_by_category": total_by_category,
             "sort_by": sort_by,
             "sort_order": "desc" if reverse else "asc",
         },
@@ -1664,15 +2242,83 @@ async def _periodic_refresh_wrapper() -> None:
         logger.error("Scheduled trend refresh failed: %s", exc)
 
 
+async def refresh_due_sources(sources: Sequence[str]) -> Dict[str, Any]:
+    """Refresh ``sources`` and feed each outcome back into ``source_scheduler``."""
+    diagnostics: Dict[str, Any] = {}
+    in_flight: set[str] = set()
+    failed = False
+    try:
+        result = await refresh_trends(sources)
+        diagnostics = result.get("source_diagnostics", {})
+        in_flight = set(result.get("sources_in_flight", ()))
+        return result
+    except Exception as exc:
+        failed = True
+        logger.error("Scheduled trend refresh failed sources=%s: %s", list(sources), exc)
+        return {}
+    finally:
+        # A source another refresh was scraping waits one interval; any other
+        # source missing from the diagnostics was not scraped and is retried
+        # on the next tick.
+        for name in sources:
+            source_diag = diagnostics.get(name) or {}
+            if name in in_flight:
+                status = IN_FLIGHT_STATUS
+            else:
+                status = source_diag.get("status") or ("failed" if failed else None)
+            source_scheduler.complete(
+                name,
+                status=status,
+                new_keywords=int(source_diag.get("new_keywords", 0)),
+                breaker_open=await scraper_circuit_breaker.state(name) == CircuitState.OPEN,
+                retry_after=scraper_circuit_breaker.recovery_timeout,
+            )
+
+
+def _dispatch_due_sources() -> None:
+    # Each claimed source stays "running" until its refresh completes, so this
+    # replica does not dispatch a slow scrape twice; other sources keep their
+    # own pace. Overlap with other callers is prevented by the source leases.
+    due = source_scheduler.claim_due()
+    if not due:
+        return
+    task = asyncio.get_running_loop().create_task(refresh_due_sources(due))
+    _source_refresh_tasks.add(task)
+    task.add_done_callback(_source_refresh_tasks.discard)
+
+
 def start_scheduler() -> None:
     if scheduler.running:
         return
-    scheduler.add_job(
-        _periodic_refresh_wrapper, "interval", hours=SCRAPE_INTERVAL_HOURS
-    )
+    browser_pool.keep_warm()
+    if ADAPTIVE_SCHEDULING:
+        source_scheduler.reset()
+        scheduler.add_job(
+            _dispatch_due_sources,
+            "interval",
+            seconds=max(1, SCHEDULER_TICK_SECONDS),
+            max_instances=1,
+            coalesce=True,
+        )
+    else:
+        scheduler.add_job(
+            _periodic_refresh_wrapper, "interval", hours=SCRAPE_INTERVAL_HOURS
+        )
     scheduler.start()
     logger.info(
-        "Trend ingestion scheduler started interval_hours=%s stub=%s",
+        "Trend ingestion scheduler started interval_hours=%s adaptive=%s stub=%s",
         SCRAPE_INTERVAL_HOURS,
+        ADAPTIVE_SCHEDULING,
         STUB_ONLY,
     )
+
+
+async def stop_scheduler() -> None:
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    for task in list(_source_refresh_tasks):
+        task.cancel()
+    if _source_refresh_tasks:
+        await asyncio.gather(*_source_refresh_tasks, return_exceptions=True)
+    browser_pool.keep_warm(False)
+    await browser_pool.close()
@@ -0,0 +1,130 @@
+"""Record/replay store for pages fetched during trend ingestion.
+
+With ``TREND_INGESTION_SNAPSHOT_MODE=record`` every page the selector
+scraper loads (rendered HTML, status and URL) and the Google Trends RSS
+feed are written under ``TREND_INGESTION_SNAPSHOT_DIR/<version>/``. With
+``replay``, browser contexts serve those snapshots through route
+interception and abort every other request, the RSS fetch reads the stored
+XML, and ScrapeGraphAI is skipped, so ``_gather_trends`` runs offline
+against a fixed corpus. A ``manifest.json`` per version lists what was
+captured.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+from ..common.time import utcnow
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MODE = os.getenv("TREND_INGESTION_SNAPSHOT_MODE", "off").lower()
+SNAPSHOT_DIR = os.getenv("TREND_INGESTION_SNAPSHOT_DIR", "snapshots/trend_ingestion")
+SNAPSHOT_VERSION = os.getenv("TREND_INGESTION_SNAPSHOT_VERSION", "v1")
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MODES = {"off", "record", "replay"}
+
+_MISSING_PAGE = "<html><head><title>snapshot missing</title></head><body></body></html>"
+
+
+@dataclass
+class PageSnapshot:
+    url: str
+    body: str
+    status: int | None = 200
+    final_url: str | None = None
+    content_type: str = "text/html"
+    recorded_at: str = field(default_factory=lambda: utcnow().isoformat())
+
+
+class SnapshotStore:
+    """Versioned directory of ``PageSnapshot`` JSON files keyed by URL."""
+
+    def __init__(self, root: str | Path, version: str = SNAPSHOT_VERSION, mode: str = "off"):
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode {mode!r}")
+        self.root = Path(root)
+        self.version = version
+        self.mode = mode
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def directory(self) -> Path:
+        return self.root / self.version
+
+    def _relative_path(self, url: str) -> str:
+        host = urlparse(url).netloc.replace(":", "_") or "local"
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return f"{host}/{digest}.json"
+
+    def save(self, snapshot: PageSnapshot) -> Path:
+        relative = self._relative_path(snapshot.url)
+        path = self.directory / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(snapshot), ensure_ascii=False), encoding="utf-8")
+        manifest = self.manifest()
+        manifest["entries"][snapshot.url] = {
+            "path": relative,
+            "status": snapshot.status,
+            "content_type": snapshot.content_type,
+            "recorded_at": snapshot.recorded_at,
+        }
+        manifest["updated_at"] = utcnow().isoformat()
+        (self.directory / "manifest.json").write_text(
+            json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+        )
+        return path
+
+    def load(self, url: str) -> PageSnapshot | None:
+        path = self.directory / self._relative_path(url)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return PageSnapshot(**payload)
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.directory / "manifest.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {"format": SNAPSHOT_FORMAT, "version": self.version, "entries": {}}
+
+    async def attach(self, context: Any) -> None:
+        """Serve snapshots to ``context`` instead of the network when replaying."""
+        if not self.replaying:
+            return
+
+        async def handle(route: Any) -> None:
+            request = route.request
+            if request.resource_type != "document":
+                await route.abort()
+                return
+            snapshot = self.load(request.url)
+            if snapshot is None:
+                logger.info("No snapshot recorded for %s", request.url)
+                await route.fulfill(status=404, content_type="text/html", body=_MISSING_PAGE)
+                return
+            await route.fulfill(
+                status=snapshot.status or 200,
+                content_type=snapshot.content_type,
+                body=snapshot.body,
+            )
+
+        await context.route("**/*", handle)
+
+
+snapshot_store = SnapshotStore(SNAPSHOT_DIR, SNAPSHOT_VERSION, SNAPSHOT_MODE)
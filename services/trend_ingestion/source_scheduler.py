@@ -0,0 +1,160 @@
+"""Per-source adaptive scheduling for trend scrapes.
+
+Each source keeps its own polling interval, starting at
+``SCRAPE_INTERVAL_HOURS``. After every run the interval shrinks when the
+source produced at least ``target_new_keywords`` keywords it had not seen
+before, grows when it produced none, and backs off exponentially while the
+source fails or its circuit breaker is open. Intervals stay within
+``[min_interval, max_interval]``. A source that is running is never claimed
+again by this scheduler until its run completes. That is only bookkeeping:
+runs of one source are kept from overlapping across the API and every
+replica by the per-source leases ``refresh_trends`` takes.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+from ..common.observability import Gauge
+
+logger = logging.getLogger(__name__)
+
+SOURCE_INTERVAL = Gauge(
+    "pod_trend_source_interval_seconds",
+    "Current adaptive scrape interval per trend source",
+    labelnames=("source",),
+)
+
+FAILED_STATUSES = {"failed", "skipped"}
+# Another caller held the source's lease, so it was just scraped elsewhere.
+IN_FLIGHT_STATUS = "in_flight"
+
+
+@dataclass
+class SourceSchedule:
+    name: str
+    interval: float
+    next_run_at: float = 0.0
+    running: bool = False
+    runs: int = 0
+    last_status: str | None = None
+    last_new_keywords: int | None = None
+
+
+class AdaptiveSourceScheduler:
+    """Track due times and intervals for a fixed set of sources."""
+
+    def __init__(
+        self,
+        sources: Iterable[str],
+        *,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        target_new_keywords: int = 3,
+        speedup: float = 0.5,
+        slowdown: float = 1.5,
+        failure_backoff: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_interval = max(1.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.base_interval = self._clamp(base_interval)
+        self.target_new_keywords = max(1, target_new_keywords)
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.failure_backoff = failure_backoff
+        self._clock = clock
+        self._schedules: Dict[str, SourceSchedule] = {
+            name: SourceSchedule(name=name, interval=self.base_interval) for name in sources
+        }
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def reset(self, *, run_now: bool = False) -> None:
+        """Restart every schedule at the base interval."""
+        now = self._clock()
+        for schedule in self._schedules.values():
+            schedule.interval = self.base_interval
+            schedule.next_run_at = now if run_now else now + self.base_interval
+            schedule.running = False
+            SOURCE_INTERVAL.labels(schedule.name).set(schedule.interval)
+
+    def claim_due(self) -> List[str]:
+        """Mark due, idle sources as running and return their names."""
+        now = self._clock()
+        due = [
+            schedule
+            for schedule in self._schedules.values()
+            if not schedule.running and schedule.next_run_at <= now
+        ]
+        for schedule in due:
+            schedule.running = True
+        return [schedule.name for schedule in due]
+
+    def complete(
+        self,
+        name: str,
+        *,
+        status: str | None,
+        new_keywords: int = 0,
+        breaker_open: bool = False,
+        retry_after: float = 0.0,
+    ) -> float:
+        """Release ``name`` after a run and return its next interval.
+
+        ``status=None`` means the source was not scraped; its interval is kept
+        and it is due again on the next tick. ``IN_FLIGHT_STATUS`` means
+        another caller was scraping it; its interval is kept and it is due
+        again after one interval.
+        """
+        schedule = self._schedules[name]
+        now = self._clock()
+        if breaker_open or status in FAILED_STATUSES:
+            interval = schedule.interval * self.failure_backoff
+        elif status is None or status == IN_FLIGHT_STATUS:
+            interval = schedule.interval
+        elif new_keywords >= self.target_new_keywords:
+            interval = schedule.interval * self.speedup
+        elif new_keywords <= 0:
+            interval = schedule.interval * self.slowdown
+        else:
+            interval = schedule.interval
+        schedule.interval = self._clamp(interval)
+        if status is None and not breaker_open:
+            delay = 0.0
+        else:
+            delay = max(schedule.interval, retry_after if breaker_open else 0.0)
+        schedule.next_run_at = now + delay
+        schedule.running = False
+        schedule.runs += 1
+        schedule.last_status = status
+        schedule.last_new_keywords = new_keywords
+        SOURCE_INTERVAL.labels(name).set(schedule.interval)
+        logger.info(
+            "Trend source %s next run in %.0fs (status=%s new_keywords=%d breaker_open=%s)",
+            name,
+            delay,
+            status,
+            new_keywords,
+            breaker_open,
+        )
+        return schedule.interval
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        now = self._clock()
+        return {
+            name: {
+                "interval_seconds": round(schedule.interval, 1),
+                "due_in_seconds": round(max(0.0, schedule.next_run_at - now), 1),
+                "running": schedule.running,
+                "runs": schedule.runs,
+                "last_status": schedule.last_status,
+                "last_new_keywords": schedule.last_new_keywords,
+            }
+            for name, schedule in self._schedules.items()
+        }
@@ -5,7 +5,9 @@ from httpx import ASGITransport, AsyncClient
 
 from services.analytics.api import app as analytics_app
 from services.analytics.service import list_events, log_event
+from services.analytics.sink import SINK_EVENTS, AnalyticsEventSink, flush_events
 from services.common.database import get_session, init_db
+from services.common.trend_rollups import rebuild_trend_rollups
 from services.models import Trend, TrendSignal
 
 
@@ -23,6 +25,7 @@ async def test_keywords_endpoint_aggregates_live_trend_signals():
             TrendSignal(source="etsy", keyword="dog mom", engagement_score=2, category="animals")
         )
         await session.commit()
+    await rebuild_trend_rollups()
 
     transport = ASGITransport(app=analytics_app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -90,6 +93,7 @@ async def test_middleware_logs_page_view():
     transport = ASGITransport(app=analytics_app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         await client.get("/notfound")
+    await flush_events()
     events = await list_events("page_view")
     assert any(e.path == "/notfound" for e in events)
 
@@ -110,3 +114,64 @@ async def test_conversion_triggers_stripe(monkeypatch):
     await log_event("conversion", "/checkout")
     await asyncio.sleep(0)
     assert called
+
+
+@pytest.mark.asyncio
+async def test_sink_batches_events_into_multi_row_inserts(monkeypatch):
+    await init_db()
+    batches = []
+    from services.analytics import sink as sink_module
+
+    original = sink_module.create_events
+
+    async def recording_create_events(session, rows):
+        batches.append(len(rows))
+        return await original(session, rows)
+
+    monkeypatch.setattr(sink_module, "create_events", recording_create_events)
+    sink = AnalyticsEventSink(batch_size=50, flush_ms=1000)
+    for index in range(120):
+        assert await sink.enqueue("page_view", f"/p/{index}")
+    await sink.stop()
+
+    assert sum(batches) == 120
+    assert max(batches) == 50
+    events = await list_events("page_view")
+    assert {e.path for e in events} == {f"/p/{index}" for index in range(120)}
+
+
+@pytest.mark.asyncio
+async def test_sink_drops_when_full_and_counts_outcomes():
+    await init_db()
+    dropped = SINK_EVENTS.labels("dropped")
+    before = dropped._value.get() if hasattr(dropped, "_value") else None
+    sink = AnalyticsEventSink(max_queue=2, flush_ms=1000)
+    results = [await sink.enqueue("page_view", f"/full/{i}") for i in range(5)]
+    await sink.stop()
+
+    # The writer may pull one event before the queue fills.
+    assert results[:2] == [True, True]
+    assert results.count(False) >= 2
+    if before is not None:
+        assert dropped._value.get() - before == results.count(False)
+    events = await list_events("page_view")
+    assert len(events) == results.count(True)
+
+
+@pytest.mark.asyncio
+async def test_sink_reports_conversions_after_flush(monkeypatch):
+    await init_db()
+    quantities = []
+
+    async def fake_report(quantity: int = 1) -> None:
+        quantities.append(quantity)
+
+    monkeypatch.setattr(
+        "services.analytics.service._report_conversion_to_stripe", fake_report
+    )
+    sink = AnalyticsEventSink(flush_ms=10)
+    await sink.enqueue("conversion", "/checkout", meta={"quantity": 3})
+    await sink.flush()
+    await asyncio.sleep(0)
+    assert quantities == [3]
+    await sink.stop()
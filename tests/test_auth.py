@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import pytest
 from datetime import timedelta
 from httpx import ASGITransport, AsyncClient
@@ -6,10 +9,11 @@ from sqlmodel import select
 from services.auth.api import app as auth_app
 from services.auth import service as auth_service
 from services.auth.service import create_authorization_url, exchange_code
+from services.common import cache
 from services.integration import service as integration_service
 from services.common.database import get_session, init_db
 from services.common.time import utcnow
-from services.models import OAuthCredential, OAuthProvider, OAuthState
+from services.models import OAuthCredential, OAuthProvider, OAuthState, UserSession
 
 
 class DummyResponse:
@@ -96,6 +100,98 @@ async def test_session_roundtrip():
     assert await auth_service.resolve_session_token(token) is None
 
 
+@pytest.mark.asyncio
+async def test_session_resolution_is_cached_until_expiry(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(auth_service, "invalidation_listener_live", lambda: True)
+    token, expires_at = await auth_service.create_session(78)
+    assert await auth_service.resolve_session_token(token) == 78
+
+    def no_database():
+        raise AssertionError("cached token should not hit the database")
+
+    monkeypatch.setattr(auth_service, "get_session", no_database)
+    assert await auth_service.resolve_session_token(token) == 78
+
+    token_hash = auth_service._hash_sha256(token)
+    auth_service._session_cache.set(token_hash, (78, utcnow() - timedelta(seconds=1)), ttl=60)
+    monkeypatch.setattr(auth_service, "get_session", get_session)
+    async with get_session() as session:
+        record = (
+            await session.exec(select(UserSession).where(UserSession.token_hash == token_hash))
+        ).first()
+        record.expires_at = utcnow() - timedelta(seconds=1)
+        session.add(record)
+        await session.commit()
+    assert await auth_service.resolve_session_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_revocation_from_another_worker_drops_cached_session(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(auth_service, "invalidation_listener_live", lambda: True)
+    token, _ = await auth_service.create_session(79)
+    assert await auth_service.resolve_session_token(token) == 79
+    token_hash = auth_service._hash_sha256(token)
+    assert auth_service._session_cache.get(token_hash) is not None
+
+    cache._on_invalidation_message(
+        {
+            "data": json.dumps(
+                {"namespace": "session", "key": token_hash, "origin": "other-worker"}
+            )
+        }
+    )
+    assert auth_service._session_cache.get(token_hash) is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_overtaken_by_revoke_does_not_cache_session(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(auth_service, "invalidation_listener_live", lambda: True)
+    token, _ = await auth_service.create_session(80)
+    token_hash = auth_service._hash_sha256(token)
+    row_read = asyncio.Event()
+    revoked = asyncio.Event()
+    remember = auth_service._remember_session
+
+    async def remember_after_revoke(*args, **kwargs):
+        row_read.set()
+        await revoked.wait()
+        await remember(*args, **kwargs)
+
+    monkeypatch.setattr(auth_service, "_remember_session", remember_after_revoke)
+    resolving = asyncio.create_task(auth_service.resolve_session_token(token))
+    await row_read.wait()
+    await auth_service.revoke_session(token)
+    revoked.set()
+
+    assert await resolving == 80
+    assert auth_service._session_cache.get(token_hash) is None
+    monkeypatch.setattr(auth_service, "_remember_session", remember)
+    assert await auth_service.resolve_session_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_not_cached_locally_without_the_invalidation_listener(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(auth_service, "invalidation_listener_live", lambda: False)
+    token, _ = await auth_service.create_session(81)
+    token_hash = auth_service._hash_sha256(token)
+
+    assert await auth_service.resolve_session_token(token) == 81
+    assert auth_service._session_cache.get(token_hash) is None
+
+    # Another worker deletes the row; nothing local keeps resolving it.
+    async with get_session() as session:
+        record = (
+            await session.exec(select(UserSession).where(UserSession.token_hash == token_hash))
+        ).first()
+        await session.delete(record)
+        await session.commit()
+    assert await auth_service.resolve_session_token(token) is None
+
+
 @pytest.mark.asyncio
 async def test_auth_api_authorize_flow(monkeypatch):
     await init_db()
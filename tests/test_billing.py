@@ -1,9 +1,12 @@
 """Tests for billing service."""
 
+import asyncio
+
 import pytest
 from unittest.mock import patch
 
 from services.billing.plans import PlanTier, get_plan_limits, get_tier_from_stripe_product
+from services.common.database import init_db
 
 
 class TestPlanTiers:
@@ -111,6 +114,7 @@ class TestBillingService:
     @pytest.mark.asyncio
     async def test_update_user_quotas_from_subscription(self):
         """Test quota update from subscription."""
+        await init_db()
         from services.billing.service import update_user_quotas_from_subscription
 
         with patch.dict('os.environ', {'STRIPE_PRODUCT_STARTER': 'prod_starter'}):
@@ -169,6 +173,7 @@ class TestBillingService:
 
     @pytest.mark.asyncio
     async def test_handle_subscription_created_stub_uses_customer_id_suffix(self):
+        await init_db()
         from services.billing import service
 
         service.STUB_MODE = True
@@ -183,6 +188,7 @@ class TestBillingService:
 
     @pytest.mark.asyncio
     async def test_handle_subscription_created_stub_uses_metadata_user_id(self):
+        await init_db()
         from services.billing import service
 
         service.STUB_MODE = True
@@ -336,3 +342,257 @@ class TestBillingAPI:
             response = await client.post("/portal")
             # Should fail without X-User-Id header
             assert response.status_code in [400, 401, 422]
+
+
+class TestLocalPlanTier:
+    """Plan tiers come from webhook-materialized state, never from Stripe."""
+
+    @staticmethod
+    def _forbid_stripe(monkeypatch, service):
+        def fail(*_args, **_kwargs):
+            raise AssertionError("Stripe must not be called on the request path")
+
+        monkeypatch.setattr(service.stripe.Customer, "search", fail)
+        monkeypatch.setattr(service.stripe.Subscription, "list", fail)
+
+    @pytest.mark.asyncio
+    async def test_webhook_state_drives_cached_plan_tier(self, monkeypatch):
+        from services.billing import service
+
+        await init_db()
+        service._plan_tier_cache.clear()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        self._forbid_stripe(monkeypatch, service)
+
+        assert await service.get_user_plan_tier(501) == PlanTier.FREE
+
+        await service.handle_subscription_created(
+            {
+                "id": "sub_501",
+                "customer": "cus_501",
+                "status": "active",
+                "current_period_end": 1893456000,
+                "metadata": {"user_id": "501"},
+                "items": {"data": [{"price": {"product": "prod_professional"}}]},
+            }
+        )
+        assert await service.get_user_plan_tier(501) == PlanTier.PROFESSIONAL
+
+        async def no_database(_user_id):
+            raise AssertionError("cached tier should not hit the database")
+
+        monkeypatch.setattr(service, "get_subscription_state", no_database)
+        assert await service.get_user_plan_tier(501) == PlanTier.PROFESSIONAL
+        monkeypatch.undo()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+
+        await service.handle_subscription_deleted(
+            {"id": "sub_501", "customer": "cus_501", "metadata": {"user_id": "501"}}
+        )
+        assert await service.get_user_plan_tier(501) == PlanTier.FREE
+        record = await service.get_subscription_state(501)
+        assert record.status == "canceled"
+        assert record.stripe_customer_id == "cus_501"
+
+    @pytest.mark.asyncio
+    async def test_stale_delete_event_does_not_downgrade_replacement(self, monkeypatch):
+        from services.billing import service
+
+        await init_db()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        await service.update_user_quotas_from_subscription(
+            502, "sub_new", "prod_starter", customer_id="cus_502"
+        )
+        await service.handle_subscription_deleted(
+            {"id": "sub_old", "customer": "cus_502", "metadata": {"user_id": "502"}}
+        )
+        assert await service.get_user_plan_tier(502) == PlanTier.STARTER
+
+    @pytest.mark.asyncio
+    async def test_reconciler_repairs_drift(self, monkeypatch):
+        from services.billing import service
+
+        await init_db()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        # Missed cancellation: local row says active, Stripe has nothing.
+        await service.update_user_quotas_from_subscription(
+            601, "sub_gone", "prod_enterprise", customer_id="cus_601"
+        )
+        # Missed upgrade: local row says starter, Stripe says professional.
+        await service.update_user_quotas_from_subscription(
+            602, "sub_602", "prod_starter", customer_id="cus_602"
+        )
+
+        class Listing:
+            def auto_paging_iter(self):
+                return iter(
+                    [
+                        {
+                            "id": "sub_602",
+                            "customer": "cus_602",
+                            "status": "active",
+                            "created": 2,
+                            "items": {"data": [{"price": {"product": "prod_professional"}}]},
+                        },
+                        {
+                            "id": "sub_603",
+                            "customer": "cus_603",
+                            "status": "active",
+                            "created": 3,
+                            "metadata": {"user_id": "603"},
+                            "items": {"data": [{"price": {"product": "prod_starter"}}]},
+                        },
+                    ]
+                )
+
+        monkeypatch.setattr(service.stripe.Subscription, "list", lambda **_kwargs: Listing())
+
+        assert await service.reconcile_subscriptions() == 3
+        assert await service.get_user_plan_tier(601) == PlanTier.FREE
+        assert await service.get_user_plan_tier(602) == PlanTier.PROFESSIONAL
+        assert await service.get_user_plan_tier(603) == PlanTier.STARTER
+        assert await service.reconcile_subscriptions() == 0
+
+    @pytest.mark.asyncio
+    async def test_reconciler_skips_rows_written_after_the_stripe_listing(self, monkeypatch):
+        from datetime import timedelta
+
+        from sqlmodel import select
+
+        from services.billing import service
+        from services.common.database import get_session
+        from services.common.time import utcnow
+        from services.models import BillingSubscription
+
+        await init_db()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        await service.update_user_quotas_from_subscription(
+            611, "sub_611", "prod_professional", customer_id="cus_611"
+        )
+        # A webhook upgraded user 612 while the listing was being paged.
+        await service.update_user_quotas_from_subscription(
+            612, "sub_612_new", "prod_enterprise", customer_id="cus_612"
+        )
+        async with get_session() as session:
+            record = (
+                await session.exec(
+                    select(BillingSubscription).where(BillingSubscription.user_id.in_([611, 612]))
+                )
+            ).all()
+            for row in record:
+                row.updated_at = utcnow() + timedelta(minutes=1)
+                session.add(row)
+            await session.commit()
+
+        class Listing:
+            def auto_paging_iter(self):
+                return iter(
+                    [
+                        {
+                            "id": "sub_612_old",
+                            "customer": "cus_612",
+                            "status": "active",
+                            "created": 1,
+                            "items": {"data": [{"price": {"product": "prod_starter"}}]},
+                        },
+                    ]
+                )
+
+        monkeypatch.setattr(service.stripe.Subscription, "list", lambda **_kwargs: Listing())
+
+        assert await service.reconcile_subscriptions() == 0
+        assert await service.get_user_plan_tier(611) == PlanTier.PROFESSIONAL
+        assert await service.get_user_plan_tier(612) == PlanTier.ENTERPRISE
+
+    @pytest.mark.asyncio
+    async def test_replicas_share_one_reconciliation(self, monkeypatch):
+        import time
+
+        from services.billing import service
+        from services.common.distributed_lock import DistributedSingleFlight, LocalLeaseBackend
+
+        await init_db()
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        backend = LocalLeaseBackend()
+        monkeypatch.setattr(
+            service,
+            "reconcile_flight",
+            DistributedSingleFlight("billing-reconcile", backend, poll_seconds=0.01),
+        )
+        other_replica = DistributedSingleFlight("billing-reconcile", backend, poll_seconds=0.01)
+        listings = []
+
+        class Listing:
+            def auto_paging_iter(self):
+                time.sleep(0.2)
+                return iter([])
+
+        def list_subscriptions(**_kwargs):
+            listings.append(1)
+            return Listing()
+
+        monkeypatch.setattr(service.stripe.Subscription, "list", list_subscriptions)
+
+        ours, theirs = await asyncio.gather(
+            service.reconcile_subscriptions(),
+            other_replica.run(service._reconcile_subscriptions_once),
+        )
+
+        assert len(listings) == 1
+        assert ours == 0
+        assert theirs.value in (0, None)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_writes_share_one_row(self):
+        from sqlmodel import select
+
+        from services.billing import service
+        from services.common.database import get_session
+        from services.models import BillingSubscription
+
+        await init_db()
+        await asyncio.gather(
+            *(
+                service.store_subscription_state(
+                    604,
+                    plan_tier=PlanTier.STARTER,
+                    status="active",
+                    customer_id="cus_604",
+                    subscription_id=f"sub_604_{n}",
+                    product_id="prod_starter",
+                    current_period_end=None,
+                )
+                for n in range(2)
+            )
+        )
+        async with get_session() as session:
+            rows = (
+                await session.exec(
+                    select(BillingSubscription).where(BillingSubscription.user_id == 604)
+                )
+            ).all()
+        assert len(rows) == 1
+
+    @pytest.mark.asyncio
+    async def test_reconciler_runs_at_startup(self, monkeypatch):
+        from datetime import datetime, timezone
+
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        from services.billing import service
+
+        monkeypatch.setattr(service, "STUB_MODE", False)
+        monkeypatch.setattr(service, "_reconcile_scheduler", AsyncIOScheduler())
+        ran = asyncio.Event()
+
+        async def reconcile():
+            ran.set()
+
+        monkeypatch.setattr(service, "reconcile_subscriptions", reconcile)
+        service.start_reconciler()
+        try:
+            (job,) = service._reconcile_scheduler.get_jobs()
+            assert job.next_run_time <= datetime.now(timezone.utc)
+            await asyncio.wait_for(ran.wait(), timeout=2)
+        finally:
+            service.stop_reconciler()
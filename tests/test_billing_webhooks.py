@@ -8,6 +8,7 @@ from services.billing.webhooks import (
     process_webhook_event,
     HANDLED_EVENTS,
 )
+from services.common.database import init_db
 
 
 class TestWebhookSignatureVerification:
@@ -41,6 +42,7 @@ class TestWebhookEventProcessing:
     @pytest.mark.asyncio
     async def test_subscription_created_event(self):
         """Test processing subscription.created event."""
+        await init_db()
         from services.billing import service
         service.STUB_MODE = True
 
@@ -67,6 +69,7 @@ class TestWebhookEventProcessing:
     @pytest.mark.asyncio
     async def test_subscription_updated_event(self):
         """Test processing subscription.updated event."""
+        await init_db()
         from services.billing import service
         service.STUB_MODE = True
 
@@ -93,6 +96,7 @@ class TestWebhookEventProcessing:
     @pytest.mark.asyncio
     async def test_subscription_deleted_event(self):
         """Test processing subscription.deleted event."""
+        await init_db()
         from services.billing import service
         service.STUB_MODE = True
 
@@ -0,0 +1,388 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from services.common import cache
+from services.common.cache import (
+    InMemoryCache,
+    TwoTierCache,
+    cache_get,
+    cache_set,
+    cached,
+    decode,
+    encode,
+    invalidate_tags,
+)
+
+
+async def _drain_background_refreshes():
+    while cache._background_refreshes:
+        await asyncio.gather(*cache._background_refreshes)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"calls": calls}
+
+    results = await asyncio.gather(
+        *(cached("test:coalesce", loader, ttl=60) for _ in range(10))
+    )
+
+    assert calls == 1
+    assert results == [{"calls": 1}] * 10
+    assert await cached("test:coalesce", loader, ttl=60, beta=0) == {"calls": 1}
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_served_stale_while_one_refresh_runs():
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await cached("test:stale", loader, ttl=0, stale_ttl=60) == 1
+
+    stale = await asyncio.gather(
+        *(cached("test:stale", loader, ttl=0, stale_ttl=60) for _ in range(5))
+    )
+    await _drain_background_refreshes()
+
+    assert stale == [1] * 5
+    assert calls == 2
+    assert await cached("test:stale", loader, ttl=60, stale_ttl=60) == 2
+
+
+@pytest.mark.asyncio
+async def test_hot_entry_is_refreshed_early():
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.001)
+        return calls
+
+    await cached("test:early", loader, ttl=60)
+    assert await cached("test:early", loader, ttl=60, beta=0) == 1
+    assert await cached("test:early", loader, ttl=60, beta=1e9) == 1
+    await _drain_background_refreshes()
+
+    assert calls == 2
+    assert await cached("test:early", loader, ttl=60, beta=0) == 2
+
+
+@pytest.mark.asyncio
+async def test_loader_errors_reach_every_waiter_and_are_not_cached():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        *(cached("test:error", failing, ttl=60) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await cache_get("test:error") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_drops_only_tagged_entries():
+    await cache_set("test:tag:a", 1, ttl=60, tags=("trends",))
+    await cache_set("test:tag:b", 2, ttl=60, tags=("trends", "user:7"))
+    await cache_set("test:tag:c", 3, ttl=60, tags=("user:7",))
+    await cache_set("test:tag:d", 4, ttl=60)
+
+    assert await invalidate_tags("trends") == 2
+
+    assert await cache_get("test:tag:a") is None
+    assert await cache_get("test:tag:b") is None
+    assert await cache_get("test:tag:c") == 3
+    assert await cache_get("test:tag:d") == 4
+    assert await invalidate_tags("user:7") == 1
+    await cache.cache_delete("test:tag:d")
+
+
+async def _fill_overtaken_by(invalidate, key):
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def loader():
+        loading.set()
+        await release.wait()
+        return "read before the invalidation"
+
+    fill = asyncio.create_task(cached(key, loader, ttl=60, tags=("trends",)))
+    await loading.wait()
+    await invalidate()
+    release.set()
+    return await fill
+
+
+@pytest.mark.asyncio
+async def test_fill_overtaken_by_invalidation_is_not_stored():
+    value = await _fill_overtaken_by(lambda: invalidate_tags("trends"), "test:overtaken")
+
+    assert value == "read before the invalidation"
+    assert await cache_get("test:overtaken") is None
+
+
+def test_in_memory_tag_index_follows_eviction():
+    lru = InMemoryCache(max_size=2)
+    lru.set("a", 1, tags=("t",))
+    lru.set("b", 2, tags=("t",))
+    lru.set("c", 3)
+
+    assert lru._tags == {"t": {"b"}}
+    assert lru.delete_tags(["t"]) == 1
+    assert lru._tags == {}
+    assert lru.get("c") == 3
+
+
+def _two_tier(monkeypatch, **kwargs):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis()
+    tiers = TwoTierCache(InMemoryCache(max_bytes=1 << 20, name="test"), client, **kwargs)
+    monkeypatch.setattr(cache, "_response_cache", tiers)
+    return tiers, client
+
+
+@pytest.mark.asyncio
+async def test_redis_tag_index_invalidates_without_scanning(monkeypatch):
+    tiers, client = _two_tier(monkeypatch)
+
+    await cache_set("pod:one", {"v": 1}, ttl=60, tags=("trends",))
+    await cache_set("pod:two", {"v": 2}, ttl=60, tags=("trends",))
+    await cache_set("pod:three", {"v": 3}, ttl=60)
+    tiers.l1.clear()
+    assert await cache_get("pod:one") == {"v": 1}  # refilled into L1 untagged
+    monkeypatch.setattr(
+        client, "scan_iter", lambda *_args, **_kwargs: pytest.fail("invalidation scanned keys")
+    )
+
+    assert await invalidate_tags("trends") == 2
+    assert await client.get("pod:one") is None
+    assert await client.exists("pod:tag:trends") == 0
+    assert await cache_get("pod:one") is None
+    assert await cache_get("pod:three") == {"v": 3}
+
+
+@pytest.mark.asyncio
+async def test_fill_overtaken_by_another_workers_invalidation_is_not_stored(monkeypatch):
+    tiers, client = _two_tier(monkeypatch)
+    other_worker = TwoTierCache(InMemoryCache(name="other"), client)
+
+    value = await _fill_overtaken_by(
+        lambda: other_worker.delete_tags(["trends"]), "pod:overtaken"
+    )
+
+    assert value == "read before the invalidation"
+    assert await client.get("pod:overtaken") is None
+    assert await cache_get("pod:overtaken") is None
+
+    async def fresh():
+        return "fresh"
+
+    assert await cached("pod:overtaken", fresh, ttl=60, tags=("trends",)) == "fresh"
+    assert await client.get("pod:overtaken") is not None
+
+
+@pytest.mark.asyncio
+async def test_l2_hit_fills_l1_for_at_most_the_local_ttl(monkeypatch):
+    tiers, client = _two_tier(monkeypatch, l1_ttl=5)
+    await client.set("pod:remote", encode({"from": "other worker"}), px=60_000)
+
+    assert await cache_get("pod:remote") == {"from": "other worker"}
+    await client.delete("pod:remote")
+    assert await cache_get("pod:remote") == {"from": "other worker"}
+    assert 0 < tiers.l1._store["pod:remote"].expires_at - time.time() <= 5
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_serves_from_l1(monkeypatch):
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    class _DownPipeline:
+        def __getattr__(self, _name):
+            return lambda *_args, **_kwargs: None
+
+        async def execute(self):
+            raise RedisConnectionError("down")
+
+    class _DownRedis:
+        def pipeline(self, **_kwargs):
+            return _DownPipeline()
+
+    tiers = TwoTierCache(InMemoryCache(name="test"), _DownRedis())
+    monkeypatch.setattr(cache, "_response_cache", tiers)
+
+    await cache_set("pod:local", [1, 2], ttl=60)
+    assert await cache_get("pod:local") == [1, 2]
+    assert await cache_get("pod:missing") is None
+
+
+def test_l1_byte_budget_evicts_least_recently_used():
+    lru = InMemoryCache(max_size=100, max_bytes=10)
+    lru.set("a", b"12345")
+    lru.set("b", b"12345")
+    assert lru.get("a") == b"12345"
+    lru.set("c", b"123")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == b"12345"
+    assert lru.nbytes == 8
+    lru.set("huge", b"x" * 11)
+    assert lru.get("huge") is None
+
+
+def test_l1_expired_entries_are_evicted_from_the_ttl_heap():
+    lru = InMemoryCache(max_size=100, max_bytes=100)
+    lru.set("short", b"x" * 40, ttl=0.01)
+    lru.set("long", b"y" * 40, ttl=60)
+    time.sleep(0.02)
+    lru.set("next", b"z" * 40, ttl=60)
+
+    assert "short" not in lru._store
+    assert lru.nbytes == 80
+    assert lru.get("long") == b"y" * 40
+
+
+def test_codec_round_trips_responses():
+    value = {"items": [{"keyword": "cat mug", "score": 1.5}], 7: None}
+    assert decode(encode(value)) == {"items": [{"keyword": "cat mug", "score": 1.5}], "7": None}
+
+
+def _replicas(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis()
+    published = []
+
+    async def capture(_channel, message):
+        published.append(json.loads(message))
+
+    monkeypatch.setattr(client, "publish", capture)
+    replica_a = TwoTierCache(InMemoryCache(name="a"), client)
+    replica_b = TwoTierCache(InMemoryCache(name="b"), client)
+    return replica_a, replica_b, published
+
+
+@pytest.mark.asyncio
+async def test_writes_and_deletes_evict_other_replicas_l1(monkeypatch):
+    replica_a, replica_b, published = _replicas(monkeypatch)
+    await replica_a.set("pod:item", "v1", ttl=60, tags=("trends",))
+    assert await replica_b.get("pod:item") == "v1"
+
+    await replica_a.set("pod:item", "v2", ttl=60)
+    replica_b.apply_invalidation(published[-1])
+    assert await replica_b.get("pod:item") == "v2"
+
+    await replica_a.delete("pod:item")
+    replica_b.apply_invalidation(published[-1])
+    assert await replica_b.get("pod:item") is None
+
+    await replica_a.set("pod:tagged", "t", ttl=60, tags=("trends",))
+    assert await replica_b.get("pod:tagged") == "t"
+    await replica_a.delete_tags(["trends"])
+    assert "pod:tagged" in published[-1]["keys"]
+    assert replica_b.apply_invalidation(published[-1]) == 1
+
+    await replica_a.set("pod:cleared", "c", ttl=60)
+    assert await replica_b.get("pod:cleared") == "c"
+    await replica_a.clear()
+    replica_b.apply_invalidation(published[-1])
+    assert await replica_b.get("pod:cleared") is None
+    assert {message["origin"] for message in published} == {cache._INSTANCE_ID}
+
+
+@pytest.mark.asyncio
+async def test_version_stamps_ignore_late_messages_and_stale_reads(monkeypatch):
+    replica_a, replica_b, published = _replicas(monkeypatch)
+    await replica_a.set("pod:item", "old", ttl=60)
+    stale_write = published[-1]
+    await replica_a.set("pod:item", "new", ttl=60)
+    assert await replica_b.get("pod:item") == "new"
+
+    # A message for an older write must not evict the newer copy.
+    assert replica_b.apply_invalidation(stale_write) == 0
+    assert replica_b.l1.get("pod:item") is not None
+
+    await replica_a.delete("pod:item")
+    delete = published[-1]
+    replica_b.apply_invalidation(delete)
+    # A read that raced the delete arrives after its invalidation.
+    replica_b.l1.set("pod:item", encode("new"), ttl=60, version=delete["version"] - 1)
+    assert await replica_b.get("pod:item") is None
+
+
+def test_tombstones_are_bounded_by_a_floor_version():
+    lru = InMemoryCache(max_size=2)
+    lru.invalidate(["a"], (), 5)
+    lru.invalidate(["b"], (), 6)
+    lru.invalidate(["c"], (), 7)
+
+    assert list(lru._tombstones) == ["b", "c"]
+    lru.set("a", 1, version=4)
+    assert lru.get("a") is None
+    lru.set("a", 1, version=5)
+    assert lru.get("a") == 1
+
+
+def test_listener_routes_response_invalidations(monkeypatch):
+    tiers = TwoTierCache(InMemoryCache(name="test"))
+    monkeypatch.setattr(cache, "_response_cache", tiers)
+    tiers.l1.set("pod:key", b"1", version=3)
+
+    cache._on_invalidation_message(
+        {
+            "data": json.dumps(
+                {"namespace": "response", "keys": ["pod:key"], "version": 4, "origin": "other"}
+            )
+        }
+    )
+
+    assert tiers.l1.get("pod:key") is None
+
+
+@pytest.mark.asyncio
+async def test_live_listener_lifts_the_l1_ttl_cap(monkeypatch):
+    tiers, _client = _two_tier(monkeypatch, l1_ttl=5)
+    monkeypatch.setattr(cache, "invalidation_listener_live", lambda: True)
+
+    await cache_set("pod:long", "v", ttl=600)
+
+    assert tiers.l1._store["pod:long"].expires_at - time.time() > 500
+
+
+@pytest.mark.asyncio
+async def test_publish_invalidation_uses_the_asyncio_client(monkeypatch):
+    published = []
+
+    class _AsyncRedis:
+        async def publish(self, channel, message):
+            published.append((channel, json.loads(message)))
+
+    class _BlockingRedis:
+        def publish(self, *_args):
+            raise AssertionError("published through the blocking client")
+
+    monkeypatch.setattr(cache, "_async_redis_client", _AsyncRedis())
+    monkeypatch.setattr(cache, "_redis_client", _BlockingRedis())
+
+    await cache.publish_invalidation("session", "abc")
+
+    assert published == [
+        (
+            cache.INVALIDATION_CHANNEL,
+            {"namespace": "session", "key": "abc", "origin": cache._INSTANCE_ID},
+        )
+    ]
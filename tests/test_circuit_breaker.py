@@ -3,7 +3,9 @@
 Owner: Unit-Tester (per UT-01, UT-03)
 Reference: DS-06 Monitoring & Alerting
 """
-import time
+import asyncio
+
+import pytest
 
 from services.trend_ingestion.circuit_breaker import (
     CircuitBreaker,
@@ -12,84 +14,181 @@ from services.trend_ingestion.circuit_breaker import (
 )
 
 
-def test_initial_state_is_closed():
+@pytest.mark.asyncio
+async def test_initial_state_is_closed():
     cb = CircuitBreaker()
-    assert cb.state("tiktok") == CircuitState.CLOSED
+    assert await cb.state("tiktok") == CircuitState.CLOSED
 
 
-def test_allow_request_when_closed():
+@pytest.mark.asyncio
+async def test_allow_request_when_closed():
     cb = CircuitBreaker()
-    assert cb.allow_request("tiktok") is True
+    assert await cb.allow_request("tiktok") is True
 
 
-def test_opens_after_threshold_failures():
+@pytest.mark.asyncio
+async def test_opens_after_threshold_failures():
     cb = CircuitBreaker(failure_threshold=3)
     for _ in range(3):
-        cb.record_failure("instagram")
-    assert cb.state("instagram") == CircuitState.OPEN
-    assert cb.allow_request("instagram") is False
+        await cb.record_failure("instagram")
+    assert await cb.state("instagram") == CircuitState.OPEN
+    assert await cb.allow_request("instagram") is False
 
 
-def test_success_resets_failure_count():
+@pytest.mark.asyncio
+async def test_success_resets_failure_count():
     cb = CircuitBreaker(failure_threshold=3)
-    cb.record_failure("twitter")
-    cb.record_failure("twitter")
-    cb.record_success("twitter")
-    assert cb.state("twitter") == CircuitState.CLOSED
+    await cb.record_failure("twitter")
+    await cb.record_failure("twitter")
+    await cb.record_success("twitter")
+    assert await cb.state("twitter") == CircuitState.CLOSED
     # Should not open even after one more failure
-    cb.record_failure("twitter")
-    assert cb.state("twitter") == CircuitState.CLOSED
+    await cb.record_failure("twitter")
+    assert await cb.state("twitter") == CircuitState.CLOSED
 
 
-def test_half_open_after_recovery_timeout():
+@pytest.mark.asyncio
+async def test_half_open_after_recovery_timeout():
     cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
-    cb.record_failure("etsy")
-    assert cb.state("etsy") == CircuitState.OPEN
-    time.sleep(0.02)
-    assert cb.state("etsy") == CircuitState.HALF_OPEN
+    await cb.record_failure("etsy")
+    assert await cb.state("etsy") == CircuitState.OPEN
+    await asyncio.sleep(0.02)
+    assert await cb.state("etsy") == CircuitState.HALF_OPEN
 
 
-def test_half_open_allows_limited_calls():
+@pytest.mark.asyncio
+async def test_half_open_allows_limited_calls():
     cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
-    cb.record_failure("pinterest")
-    time.sleep(0.02)
-    assert cb.allow_request("pinterest") is True
-    assert cb.allow_request("pinterest") is False
+    await cb.record_failure("pinterest")
+    await asyncio.sleep(0.02)
+    assert await cb.allow_request("pinterest") is True
+    assert await cb.allow_request("pinterest") is False
 
 
-def test_half_open_success_closes_circuit():
+@pytest.mark.asyncio
+async def test_half_open_success_closes_circuit():
     cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
-    cb.record_failure("tiktok")
-    time.sleep(0.02)
-    cb.record_success("tiktok")
-    assert cb.state("tiktok") == CircuitState.CLOSED
+    await cb.record_failure("tiktok")
+    await asyncio.sleep(0.02)
+    await cb.record_success("tiktok")
+    assert await cb.state("tiktok") == CircuitState.CLOSED
 
 
-def test_half_open_failure_reopens_circuit():
+@pytest.mark.asyncio
+async def test_half_open_failure_reopens_circuit():
     cb = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
-    cb.record_failure("tiktok")
-    time.sleep(0.02)
-    assert cb.state("tiktok") == CircuitState.HALF_OPEN
-    cb.record_failure("tiktok")
-    assert cb.state("tiktok") == CircuitState.OPEN
+    await cb.record_failure("tiktok")
+    await asyncio.sleep(0.02)
+    assert await cb.state("tiktok") == CircuitState.HALF_OPEN
+    await cb.record_failure("tiktok")
+    assert await cb.state("tiktok") == CircuitState.OPEN
 
 
-def test_reset_clears_state():
+@pytest.mark.asyncio
+async def test_reset_clears_state():
     cb = CircuitBreaker(failure_threshold=1)
-    cb.record_failure("twitter")
-    assert cb.state("twitter") == CircuitState.OPEN
-    cb.reset("twitter")
-    assert cb.state("twitter") == CircuitState.CLOSED
+    await cb.record_failure("twitter")
+    assert await cb.state("twitter") == CircuitState.OPEN
+    await cb.reset("twitter")
+    assert await cb.state("twitter") == CircuitState.CLOSED
 
 
-def test_independent_platform_states():
+@pytest.mark.asyncio
+async def test_independent_platform_states():
     cb = CircuitBreaker(failure_threshold=2)
-    cb.record_failure("tiktok")
-    cb.record_failure("tiktok")
-    assert cb.state("tiktok") == CircuitState.OPEN
-    assert cb.state("instagram") == CircuitState.CLOSED
+    await cb.record_failure("tiktok")
+    await cb.record_failure("tiktok")
+    assert await cb.state("tiktok") == CircuitState.OPEN
+    assert await cb.state("instagram") == CircuitState.CLOSED
 
 
 def test_singleton_instance_exists():
     assert scraper_circuit_breaker is not None
     assert isinstance(scraper_circuit_breaker, CircuitBreaker)
+
+
+def _redis_breakers(count, **kwargs):
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+    from services.trend_ingestion.circuit_breaker import RedisCircuitStore
+
+    server = fakeredis.FakeServer()
+    return [
+        CircuitBreaker(store=RedisCircuitStore(fakeredis.aioredis.FakeRedis(server=server)), **kwargs)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_redis_store_shares_open_state_across_replicas():
+    replica_a, replica_b = _redis_breakers(2, failure_threshold=2)
+    await replica_a.record_failure("etsy")
+    await replica_b.record_failure("etsy")
+
+    assert await replica_a.state("etsy") == CircuitState.OPEN
+    assert await replica_b.allow_request("etsy") is False
+    await replica_b.record_success("etsy")
+    assert await replica_a.state("etsy") == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_redis_store_lets_one_half_open_probe_through_cluster_wide():
+    replicas = _redis_breakers(3, failure_threshold=1, recovery_timeout=0.2)
+    await replicas[0].record_failure("pinterest")
+    await asyncio.sleep(0.25)
+
+    allowed = [await breaker.allow_request("pinterest") for breaker in replicas]
+
+    assert allowed == [True, False, False]
+    await replicas[0].record_failure("pinterest")
+    assert await replicas[2].state("pinterest") == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_shared_state_and_failure_timestamps():
+    replica_a, replica_b = _redis_breakers(2, failure_threshold=2, recovery_timeout=60)
+    await replica_a.record_failure("tiktok")
+    await replica_a.record_failure("tiktok")
+
+    snapshot = await replica_b.snapshot(["tiktok", "etsy"])
+
+    assert snapshot["backend"] == "redis"
+    tiktok = snapshot["sources"]["tiktok"]
+    assert tiktok["state"] == "open"
+    assert tiktok["failure_count"] == 2
+    assert len(tiktok["recent_failures"]) == 2
+    assert tiktok["opened_at"] == tiktok["last_failure_at"] == tiktok["recent_failures"][0]
+    assert tiktok["retry_at"] > tiktok["opened_at"]
+    assert snapshot["sources"]["etsy"]["state"] == "closed"
+    assert snapshot["sources"]["etsy"]["last_failure_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_in_process_state():
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    from services.trend_ingestion.circuit_breaker import RedisCircuitStore
+
+    class _DownRedis:
+        def register_script(self, _script):
+            async def _call(**_kwargs):
+                raise RedisConnectionError("down")
+
+            return _call
+
+    cb = CircuitBreaker(failure_threshold=1, store=RedisCircuitStore(_DownRedis()))
+    await cb.record_failure("twitter")
+
+    assert await cb.state("twitter") == CircuitState.OPEN
+    assert (await cb.snapshot(["twitter"]))["backend"] == "memory"
+
+
+def test_redis_store_uses_the_asyncio_client(monkeypatch):
+    redis_asyncio = pytest.importorskip("redis.asyncio")
+    from services.trend_ingestion import circuit_breaker
+
+    monkeypatch.setattr(circuit_breaker, "SCRAPER_BREAKER_REDIS_URL", "redis://localhost:6379/0")
+    store = circuit_breaker._default_store()
+
+    assert isinstance(store, circuit_breaker.RedisCircuitStore)
+    assert isinstance(store._client, redis_asyncio.Redis)
@@ -4,6 +4,7 @@ from sqlmodel import select
 
 from services.common.database import get_session, init_db
 from services.common.time import utcnow
+from services.common.trend_rollups import rebuild_trend_rollups
 from services.gateway.api import app as gateway_app
 from services.models import BrandProfile, TrendSignal
 
@@ -42,6 +43,7 @@ async def test_overview_and_trend_insights_include_provenance():
             )
         )
         await session.commit()
+    await rebuild_trend_rollups()
 
     transport = ASGITransport(app=gateway_app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from sqlmodel import update
+
+from services.common import database
+from services.common.database import get_session, init_db, watch_table_commits
+from services.control_center import service
+from services.control_center.dashboard import DashboardSection, compose
+from services.models import Notification
+
+
+@pytest.mark.asyncio
+async def test_sections_load_concurrently_and_are_cached_separately():
+    started = 0
+    both_started = asyncio.Event()
+    calls = {"slow": 0, "fast": 0}
+
+    def loader(name):
+        async def load(user_id):
+            nonlocal started
+            calls[name] += 1
+            started += 1
+            if started == 2:
+                both_started.set()
+            # Serial loading would never see the other section start.
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return {"section": name, "user": user_id}
+
+        return load
+
+    sections = [
+        DashboardSection("slow", loader("slow"), ttl=60),
+        DashboardSection("fast", loader("fast"), ttl=60, per_user=False),
+    ]
+
+    first = await compose("test-concurrency", sections, 5)
+    second = await compose("test-concurrency", sections, 5)
+
+    assert first == second == {
+        "slow": {"section": "slow", "user": 5},
+        "fast": {"section": "fast", "user": 5},
+    }
+    assert calls == {"slow": 1, "fast": 1}
+
+
+@pytest.mark.asyncio
+async def test_commit_hook_reports_orm_and_bulk_writes_but_not_rollbacks(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(database, "_commit_watchers", {})
+    seen = []
+
+    async def watcher(tables):
+        seen.append(tables)
+
+    watch_table_commits([Notification.__tablename__], watcher)
+
+    async with get_session() as session:
+        session.add(Notification(user_id=3, message="added"))
+        await session.commit()
+    assert seen == [{"notification"}]
+
+    async with get_session() as session:
+        await session.exec(update(Notification).values(read_status=True))
+        await session.commit()
+    assert len(seen) == 2
+
+    async with get_session() as session:
+        session.add(Notification(user_id=3, message="discarded"))
+        await session.flush()
+        await session.rollback()
+    assert len(seen) == 2
+
+
+@pytest.mark.asyncio
+async def test_overview_section_refreshes_after_source_table_commit():
+    await init_db()
+    user_id = 9301
+    before = await service.get_overview_dashboard(user_id)
+    assert all(item["id"] == 0 for item in before["notifications"])
+
+    async with get_session() as session:
+        session.add(Notification(user_id=user_id, message="Fresh alert"))
+        await session.commit()
+
+    after = await service.get_overview_dashboard(user_id)
+    assert after["notifications"][0]["message"] == "Fresh alert"
+
+
+@pytest.mark.asyncio
+async def test_quota_section_ignores_hot_tables_and_refreshes_on_plan_change(monkeypatch):
+    from services.billing import service as billing
+    from services.billing.plans import PlanTier
+    from services.models import ResourceCounter, User
+
+    await init_db()
+    monkeypatch.setattr(billing, "STUB_MODE", False)
+    # Quota reservations and counter upserts must not fan out invalidations.
+    assert User.__tablename__ not in database._commit_watchers
+    assert ResourceCounter.__tablename__ not in database._commit_watchers
+
+    user_id = 9302
+    before = await service.get_overview_dashboard(user_id)
+    assert before["quota"]["plan_tier"] == PlanTier.FREE.value
+
+    await billing.store_subscription_state(
+        user_id, plan_tier=PlanTier.PROFESSIONAL, status="active"
+    )
+    after = await service.get_overview_dashboard(user_id)
+    assert after["quota"]["plan_tier"] == PlanTier.PROFESSIONAL.value
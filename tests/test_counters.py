@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlmodel import delete, select
+
+from services.common import counters
+from services.common.counters import get_counts, reconcile_counters
+from services.common.distributed_lock import DistributedSingleFlight, LocalLeaseBackend
+from services.common.database import get_session, init_db
+from services.control_center import service
+from services.models import ABTest, ExperimentType, Listing, ResourceCounter
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_inserts_deletes_and_rollbacks():
+    await init_db()
+    async with get_session() as session:
+        session.add_all([Listing(product_id=1), Listing(product_id=2)])
+        session.add(ABTest(name="hero", experiment_type=ExperimentType.IMAGE))
+        await session.commit()
+    assert await get_counts("listings", "ab_tests", "ideas") == {
+        "listings": 2,
+        "ab_tests": 1,
+        "ideas": 0,
+    }
+
+    async with get_session() as session:
+        listing = (await session.exec(select(Listing))).first()
+        await session.delete(listing)
+        await session.commit()
+
+    async with get_session() as session:
+        session.add(Listing(product_id=3))
+        await session.flush()
+        await session.rollback()
+
+    assert (await get_counts("listings"))["listings"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_repairs_drift_from_bulk_statements():
+    await init_db()
+    async with get_session() as session:
+        session.add_all([Listing(product_id=n) for n in range(3)])
+        await session.commit()
+    async with get_session() as session:
+        await session.exec(delete(Listing).where(Listing.product_id == 0))
+        await session.commit()
+    assert (await get_counts("listings"))["listings"] == 3
+
+    corrections = await reconcile_counters()
+
+    assert corrections["listings"] == 1
+    assert (await get_counts("listings"))["listings"] == 2
+    assert (await reconcile_counters())["listings"] == 0
+
+
+@pytest.mark.asyncio
+async def test_quota_summary_reads_counters_not_tables():
+    await init_db()
+    async with get_session() as session:
+        session.add(ResourceCounter(user_id=0, resource="listings", count=41))
+        await session.commit()
+
+    quota = await service._quota_summary(1)
+
+    assert quota["active_listings"]["used"] == 41
+    assert quota["ab_tests"]["used"] == 0
+
+
+@pytest.mark.asyncio
+async def test_counts_sum_shards_and_reconcile_against_the_sum(monkeypatch):
+    from services.common import counter_hook
+
+    await init_db()
+    monkeypatch.setattr(counter_hook, "COUNTER_SHARDS", 4)
+    for shard in range(4):
+        monkeypatch.setattr(counter_hook.random, "randrange", lambda _n, shard=shard: shard)
+        async with get_session() as session:
+            session.add(Listing(product_id=100 + shard))
+            await session.commit()
+    async with get_session() as session:
+        shards = (
+            await session.exec(
+                select(ResourceCounter.shard).where(ResourceCounter.resource == "listings")
+            )
+        ).all()
+    assert sorted(shards) == [0, 1, 2, 3]
+    assert (await get_counts("listings"))["listings"] == 4
+
+    assert (await reconcile_counters())["listings"] == 0
+    async with get_session() as session:
+        await session.exec(delete(Listing).where(Listing.product_id >= 102))
+        await session.commit()
+    assert (await reconcile_counters())["listings"] == 2
+    assert (await get_counts("listings"))["listings"] == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduled_reconciliation_runs_once_across_replicas(monkeypatch):
+    backend = LocalLeaseBackend()
+    monkeypatch.setattr(
+        counters,
+        "counter_flight",
+        DistributedSingleFlight("counter-reconcile", backend, poll_seconds=0.01),
+    )
+    other_replica = DistributedSingleFlight("counter-reconcile", backend, poll_seconds=0.01)
+    runs = []
+
+    async def slow_reconcile():
+        runs.append(1)
+        await asyncio.sleep(0.2)
+        return {"listings": 0}
+
+    monkeypatch.setattr(counters, "reconcile_counters", slow_reconcile)
+
+    await asyncio.gather(
+        counters._run_reconciliation(),
+        other_replica.run(counters._reconcile_counters_once),
+    )
+
+    assert len(runs) == 1
+
+
+def test_database_module_does_not_import_counter_reconciliation():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, services.common.database; "
+        "assert 'services.common.counters' not in sys.modules; "
+        "assert 'apscheduler' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
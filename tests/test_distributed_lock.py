@@ -0,0 +1,228 @@
+import asyncio
+
+import pytest
+
+from services.common.database import get_session, init_db
+from services.common.distributed_lock import (
+    DistributedSingleFlight,
+    FailoverLeaseBackend,
+    Lease,
+    LeaseLost,
+    LeaseUnavailable,
+    LocalLeaseBackend,
+    RedisLeaseBackend,
+    fence_writes,
+    held_leases,
+)
+from services.trend_ingestion import service
+
+
+def _redis_backend(client):
+    pytest.importorskip("lupa")
+    return RedisLeaseBackend(client)
+
+
+@pytest.mark.asyncio
+async def test_local_callers_share_one_in_flight_run():
+    flight = DistributedSingleFlight("job", LocalLeaseBackend())
+    calls = 0
+    release = asyncio.Event()
+
+    async def job(lease):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"calls": calls, "token": lease.fencing_token}
+
+    first = asyncio.create_task(flight.run(job))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.run(job))
+    await asyncio.sleep(0)
+    release.set()
+    leader, joined = await asyncio.gather(first, second)
+
+    assert calls == 1
+    assert leader.value == joined.value == {"calls": 1, "token": 1}
+    assert (leader.role, joined.role) == ("leader", "joined")
+    assert (await flight.run(job)).fencing_token == 2
+
+
+@pytest.mark.asyncio
+async def test_replicas_wait_for_the_leader_and_read_its_result():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis()
+    replica_a = DistributedSingleFlight("refresh", _redis_backend(client), poll_seconds=0.01)
+    replica_b = DistributedSingleFlight("refresh", _redis_backend(client), poll_seconds=0.01)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_job(lease):
+        started.set()
+        await release.wait()
+        await lease.ensure_held()
+        return {"persisted": 5}
+
+    async def must_not_run(_lease):
+        raise AssertionError("second replica started its own run")
+
+    leader = asyncio.create_task(replica_a.run(slow_job))
+    await started.wait()
+    follower = asyncio.create_task(replica_b.run(must_not_run))
+    await asyncio.sleep(0.05)
+    assert not follower.done()
+    release.set()
+
+    leader_result, follower_result = await asyncio.gather(leader, follower)
+    assert follower_result.value == leader_result.value == {"persisted": 5}
+    assert follower_result.role == "joined"
+    assert follower_result.fencing_token == leader_result.fencing_token > 0
+    assert not await client.exists("pod:lock:refresh")
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_fenced_out():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis()
+    backend = _redis_backend(client)
+
+    stale = await backend.acquire("refresh", 60_000)
+    await client.delete("pod:lock:refresh")
+    fresh = await backend.acquire("refresh", 60_000)
+
+    assert fresh.fencing_token > stale.fencing_token
+    with pytest.raises(LeaseLost):
+        await stale.ensure_held()
+    await backend.release(stale)
+    assert await backend.is_held("refresh")
+    await backend.publish_result(stale, {"stale": True}, 60_000)
+    assert await backend.read_result("refresh", 0) is None
+
+
+@pytest.mark.asyncio
+async def test_fencing_counter_survives_redis_data_loss():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis()
+    backend = _redis_backend(client)
+
+    before = await backend.acquire("refresh", 60_000)
+    await client.flushall()
+    after = await backend.acquire("refresh", 60_000)
+
+    assert after.fencing_token > before.fencing_token
+
+
+@pytest.mark.asyncio
+async def test_unavailable_backend_fails_without_granting_a_lease():
+    class _BrokenBackend(LocalLeaseBackend):
+        name = "broken"
+
+        async def acquire(self, name, ttl_ms):
+            raise OSError("connection refused")
+
+    flight = DistributedSingleFlight("job", _BrokenBackend())
+
+    async def job(_lease):
+        raise AssertionError("job ran without a lease")
+
+    with pytest.raises(LeaseUnavailable):
+        await flight.run(job)
+
+
+@pytest.mark.asyncio
+async def test_superseded_leader_cannot_write():
+    await init_db()
+
+    class _FencedBackend(LocalLeaseBackend):
+        fenced = True
+
+    backend = _FencedBackend()
+    stale = Lease(name="fence-test", owner="a", fencing_token=7, backend=backend)
+    fresh = Lease(name="fence-test", owner="b", fencing_token=8, backend=backend)
+
+    async with get_session() as session:
+        await fence_writes(session, fresh)
+        await session.commit()
+    async with get_session() as session:
+        with pytest.raises(LeaseLost):
+            await fence_writes(session, stale)
+        await session.rollback()
+    assert stale.lost
+    async with get_session() as session:
+        await fence_writes(session, fresh)
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_the_database_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    server.connected = False
+    backend = FailoverLeaseBackend(
+        _redis_backend(fakeredis.aioredis.FakeRedis(server=server)), LocalLeaseBackend()
+    )
+    flight = DistributedSingleFlight("retention", backend)
+
+    async def job(lease):
+        return lease.backend.name
+
+    result = await flight.run(job)
+
+    assert (result.value, result.role, result.backend) == ("local", "leader", "local")
+    assert backend.name == "local"
+    async with held_leases(backend, ["trends:source:etsy"]) as leases:
+        assert leases["trends:source:etsy"].backend is backend.fallback
+
+
+@pytest.mark.asyncio
+async def test_concurrent_trend_refreshes_scrape_each_source_once(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(service, "refresh_lease_backend", LocalLeaseBackend())
+    gathers = 0
+
+    async def fake_gather(source_names=None):
+        nonlocal gathers
+        gathers += 1
+        await asyncio.sleep(0.01)
+        return [], {"mode": "live", "source_diagnostics": {}}
+
+    monkeypatch.setattr(service, "_gather_trends", fake_gather)
+
+    results = await asyncio.gather(*(service.refresh_trends() for _ in range(3)))
+
+    everything = [*service.PLATFORM_CONFIG, service.RSS_SOURCE_NAME]
+    assert gathers == 1
+    assert sorted(len(result["sources_in_flight"]) for result in results) == [
+        0,
+        len(everything),
+        len(everything),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_api_and_scheduler_refreshes_share_per_source_leases(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(service, "refresh_lease_backend", LocalLeaseBackend())
+    scraped = []
+    release = asyncio.Event()
+
+    async def fake_gather(source_names=None):
+        scraped.append(source_names)
+        await release.wait()
+        return [], {"mode": "live", "source_diagnostics": {}}
+
+    monkeypatch.setattr(service, "_gather_trends", fake_gather)
+
+    etsy = asyncio.create_task(service.refresh_trends(["etsy"]))
+    await asyncio.sleep(0)
+    full = asyncio.create_task(service.refresh_trends())
+    await asyncio.sleep(0)
+    overlapping = await service.refresh_trends(["etsy", "tiktok"])
+    release.set()
+    etsy_result, full_result = await asyncio.gather(etsy, full)
+
+    assert scraped[0] == ["etsy"]
+    assert "etsy" not in scraped[1] and "tiktok" in scraped[1]
+    assert len(scraped) == 2
+    assert overlapping["sources_in_flight"] == ["etsy", "tiktok"]
+    assert full_result["sources_in_flight"] == ["etsy"]
+    assert list(etsy_result["refresh_lock"]["fencing_tokens"]) == ["etsy"]
@@ -7,6 +7,7 @@ import time
 from unittest.mock import MagicMock
 
 import httpx
+import pytest
 
 # ---------------------------------------------------------------
 # Error handling tests
@@ -261,18 +262,20 @@ class TestExternalAPILimiter:
 class TestCache:
     """Test the caching layer."""
 
-    def test_cache_set_and_get(self):
+    @pytest.mark.asyncio
+    async def test_cache_set_and_get(self):
         from services.common.cache import cache_set, cache_get, cache_delete
 
-        cache_set("test:key1", {"data": "hello"}, ttl=60)
-        result = cache_get("test:key1")
+        await cache_set("test:key1", {"data": "hello"}, ttl=60)
+        result = await cache_get("test:key1")
         assert result == {"data": "hello"}
-        cache_delete("test:key1")
+        await cache_delete("test:key1")
 
-    def test_cache_miss_returns_none(self):
+    @pytest.mark.asyncio
+    async def test_cache_miss_returns_none(self):
         from services.common.cache import cache_get
 
-        result = cache_get("test:nonexistent")
+        result = await cache_get("test:nonexistent")
         assert result is None
 
     def test_cache_ttl_expiry(self):
@@ -314,13 +317,14 @@ class TestCache:
         assert _mem_cache.get("test:clear1") is None
         assert _mem_cache.get("test:clear2") is None
 
-    def test_cache_delete(self):
+    @pytest.mark.asyncio
+    async def test_cache_delete(self):
         from services.common.cache import cache_set, cache_get, cache_delete
 
-        cache_set("test:del", "val", ttl=60)
-        assert cache_get("test:del") == "val"
-        cache_delete("test:del")
-        assert cache_get("test:del") is None
+        await cache_set("test:del", "val", ttl=60)
+        assert await cache_get("test:del") == "val"
+        await cache_delete("test:del")
+        assert await cache_get("test:del") is None
 
     def test_default_ttls_configured(self):
         from services.common.cache import CACHE_TTL_TRENDS, CACHE_TTL_IDEAS, CACHE_TTL_USER_QUOTA
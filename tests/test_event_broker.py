@@ -12,15 +12,19 @@ from packages.broker.broker import EventBroker
 class FakeRedis:
     def __init__(self) -> None:
         self._streams: dict[str, list[tuple[str, dict[str, str]]]] = {}
-        self._groups: set[tuple[str, str]] = set()
+        self._groups: dict[tuple[str, str], int] = {}
+        self._pending: dict[tuple[str, str], dict[str, tuple[str, float]]] = {}
+        self._deliveries: dict[str, int] = {}
         self._acked: list[tuple[str, str, str]] = []
+        self._ack_calls = 0
         self._sequence = 0
 
     async def xgroup_create(self, stream: str, group: str, id: str = "0", mkstream: bool = True) -> None:
         key = (stream, group)
         if key in self._groups:
             raise ResponseError("BUSYGROUP Consumer Group name already exists")
-        self._groups.add(key)
+        self._groups[key] = 0
+        self._pending[key] = {}
         if mkstream:
             self._streams.setdefault(stream, [])
 
@@ -36,26 +40,90 @@ class FakeRedis:
         consumer: str,
         streams: dict[str, str],
         count: int = 1,
-        block: int = 1000,
+        block: int | None = 1000,
     ):
-        del consumer, block
+        del block
         for stream in streams:
-            if (stream, group) not in self._groups:
+            key = (stream, group)
+            if key not in self._groups:
                 raise ResponseError("NOGROUP No such consumer group")
             messages = self._streams.get(stream, [])
-            if messages:
-                message = messages.pop(0)
-                return [(stream, [message])]
+            offset = self._groups[key]
+            batch = messages[offset:offset + count]
+            if batch:
+                self._groups[key] = offset + len(batch)
+                now = asyncio.get_running_loop().time()
+                for message_id, _payload in batch:
+                    self._pending[key][message_id] = (consumer, now)
+                    self._deliveries[message_id] = 1
+                return [(stream, batch)]
         return []
 
-    async def xack(self, stream: str, group: str, message_id: str) -> int:
-        self._acked.append((stream, group, message_id))
-        return 1
+    async def xautoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        min_idle_time: int,
+        start_id: str = "0-0",
+        count: int | None = None,
+    ):
+        pending = self._pending[(stream, group)]
+        payloads = dict(self._streams.get(stream, []))
+        now = asyncio.get_running_loop().time()
+        claimed = []
+        for message_id, (_owner, delivered_at) in list(pending.items()):
+            if (now - delivered_at) * 1000 < min_idle_time:
+                continue
+            pending[message_id] = (consumer, now)
+            self._deliveries[message_id] += 1
+            claimed.append((message_id, payloads[message_id]))
+            if count is not None and len(claimed) >= count:
+                break
+        return ["0-0", claimed, []]
+
+    async def xclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        min_idle_time: int,
+        message_ids: list[str],
+        justid: bool = False,
+    ):
+        assert justid
+        pending = self._pending[(stream, group)]
+        now = asyncio.get_running_loop().time()
+        for message_id in message_ids:
+            if message_id in pending:
+                pending[message_id] = (consumer, now)
+        return message_ids
+
+    async def xpending_range(self, stream: str, group: str, min: str, max: str, count: int):
+        pending = self._pending[(stream, group)]
+        return [
+            {"message_id": message_id, "times_delivered": self._deliveries[message_id]}
+            for message_id in pending
+            if message_id == min == max
+        ][:count]
+
+    async def xack(self, stream: str, group: str, *message_ids: str) -> int:
+        self._ack_calls += 1
+        for message_id in message_ids:
+            self._pending[(stream, group)].pop(message_id, None)
+            self._acked.append((stream, group, message_id))
+        return len(message_ids)
 
     async def close(self) -> None:
         return None
 
 
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
 @pytest.mark.asyncio
 async def test_publish_and_consume_round_trips_json_payload() -> None:
     redis = FakeRedis()
@@ -109,3 +177,133 @@ async def test_broker_constructs_client_without_await(monkeypatch: pytest.Monkey
     assert conn is dummy
     assert calls == [("redis://example:6379/0", True)]
     await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_consume_runs_handlers_concurrently_and_batches_acks() -> None:
+    redis = FakeRedis()
+    broker = EventBroker(redis=redis, block_ms=10, batch_size=8, concurrency=4)
+    for index in range(8):
+        await broker.publish("ideas_ready", {"n": index})
+
+    running = 0
+    peak = 0
+    seen: list[int] = []
+    release = asyncio.Event()
+
+    async def handler(message: dict[str, object]) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        seen.append(message["n"])  # type: ignore[arg-type]
+        running -= 1
+
+    task = asyncio.create_task(broker.consume("ideas_ready", "g1", "c1", handler))
+    for _ in range(50):
+        await asyncio.sleep(0)
+        if running == 4:
+            break
+    assert peak == 4
+    release.set()
+    for _ in range(200):
+        await asyncio.sleep(0.001)
+        if len(redis._acked) == 8:
+            break
+    await _cancel(task)
+
+    assert sorted(seen) == list(range(8))
+    assert len(redis._acked) == 8
+    assert redis._ack_calls < 8
+
+
+@pytest.mark.asyncio
+async def test_failed_message_is_recovered_by_another_consumer() -> None:
+    redis = FakeRedis()
+    crashed = EventBroker(redis=redis, block_ms=10, claim_idle_ms=None)
+    await crashed.publish("trend_signals", {"trend": "cats"})
+
+    attempted = asyncio.Event()
+
+    async def failing(_message: dict[str, object]) -> None:
+        attempted.set()
+        raise RuntimeError("worker crashed")
+
+    task = asyncio.create_task(crashed.consume("trend_signals", "g1", "c1", failing))
+    await asyncio.wait_for(attempted.wait(), timeout=1)
+    await _cancel(task)
+    assert redis._acked == []
+
+    survivor = EventBroker(redis=redis, block_ms=10, claim_idle_ms=0)
+    recovered: list[dict[str, object]] = []
+    delivered = asyncio.Event()
+
+    async def handler(message: dict[str, object]) -> None:
+        recovered.append(message)
+        delivered.set()
+
+    task = asyncio.create_task(survivor.consume("trend_signals", "g1", "c2", handler))
+    await asyncio.wait_for(delivered.wait(), timeout=1)
+    for _ in range(50):
+        await asyncio.sleep(0.001)
+        if redis._acked:
+            break
+    await _cancel(task)
+
+    assert recovered == [{"trend": "cats"}]
+    assert [message_id for _s, _g, message_id in redis._acked] == ["1-0"]
+
+
+@pytest.mark.asyncio
+async def test_poison_message_moves_to_dead_letter_stream() -> None:
+    redis = FakeRedis()
+    broker = EventBroker(redis=redis, block_ms=10, claim_idle_ms=0, max_deliveries=2)
+    message_id = await broker.publish("trend_signals", {"trend": "cats"})
+    attempts = 0
+
+    async def failing(_message: dict[str, object]) -> None:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("bad payload")
+
+    task = asyncio.create_task(broker.consume("trend_signals", "g1", "c1", failing))
+    for _ in range(300):
+        await asyncio.sleep(0.01)
+        if redis._acked:
+            break
+    await _cancel(task)
+
+    assert attempts == 2
+    assert [acked for _s, _g, acked in redis._acked] == [message_id]
+    (dead_id, dead), = redis._streams["trend_signals:dead"]
+    assert dead["trend"] == '"cats"'
+    assert dead["_source_id"] == f'"{message_id}"'
+    assert dead["_deliveries"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_long_running_handler_is_not_claimed_again() -> None:
+    redis = FakeRedis()
+    broker = EventBroker(redis=redis, block_ms=10, claim_idle_ms=50)
+    await broker.publish("trend_signals", {"trend": "cats"})
+    calls = 0
+    release = asyncio.Event()
+
+    async def slow(_message: dict[str, object]) -> None:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+
+    task = asyncio.create_task(broker.consume("trend_signals", "g1", "c1", slow))
+    # Longer than the idle window and the one second between claim passes.
+    await asyncio.sleep(1.2)
+    release.set()
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if redis._acked:
+            break
+    await _cancel(task)
+
+    assert calls == 1
+    assert len(redis._acked) == 1
+    assert redis._deliveries == {"1-0": 1}
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+
+import httpx
 import pytest
 from httpx import ASGITransport, AsyncClient
 
@@ -250,3 +253,118 @@ async def test_enqueue_endpoint_uses_authenticated_user_id(monkeypatch: pytest.M
 
     assert resp.status_code == 200
     assert captured == [{"user_id": 17, "trend": "cats", "source": "manual", "auto": False}]
+
+
+@pytest.mark.asyncio
+async def test_post_json_reuses_pooled_client_with_per_target_timeouts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen: list[tuple[str, float]] = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.host, request.extensions["timeout"]["read"]))
+        return httpx.Response(200, json={"ok": True})
+
+    class ParkedBroker:
+        async def consume(self, *args, **kwargs) -> None:
+            await asyncio.Event().wait()
+
+        async def close(self) -> None:
+            return None
+
+    monkeypatch.setattr(workers, "broker", ParkedBroker())
+    monkeypatch.setattr(workers, "scheduler", FakeScheduler())
+    monkeypatch.setattr(workers, "_consumer_tasks", [])
+    monkeypatch.setattr(
+        workers,
+        "_build_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(respond)),
+    )
+    monkeypatch.setattr(
+        workers,
+        "DOWNSTREAM_TARGETS",
+        {
+            "http://ideation.test": ("ideation", 7.0),
+            "http://images.test": ("image_gen", 45.0),
+        },
+    )
+
+    await workers.start()
+    client = workers._http_client
+    assert client is not None
+
+    assert await workers._post_json("http://ideation.test", "/ideas", {}) == {"ok": True}
+    assert await workers._post_json("http://images.test", "/generate", {}) == {"ok": True}
+    assert await workers._post_json("http://other.test", "/", {}) == {"ok": True}
+    assert workers._http_client is client
+    assert seen == [
+        ("ideation.test", 7.0),
+        ("images.test", 45.0),
+        ("other.test", workers.DEFAULT_TIMEOUT_SECONDS),
+    ]
+
+    await workers.stop()
+    assert client.is_closed
+    assert workers._http_client is None
+
+
+@pytest.mark.asyncio
+async def test_handle_ideas_fans_out_and_publishes_partial_results(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dummy_broker = DummyBroker()
+    monkeypatch.setattr(workers, "broker", dummy_broker)
+    monkeypatch.setattr(workers, "IMAGE_FANOUT_CONCURRENCY", 2)
+    in_flight = 0
+    peak = 0
+    notes: list[str] = []
+
+    async def fake_post_json(base_url, path, payload, *, headers=None):
+        nonlocal in_flight, peak
+        if base_url == workers.NOTIFICATIONS_URL:
+            notes.append(payload["message"])
+            return {"id": 1}
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if payload["idea_id"] == 2:
+            raise httpx.HTTPStatusError(
+                "boom",
+                request=httpx.Request("POST", "http://image/generate"),
+                response=httpx.Response(502),
+            )
+        if payload["idea_id"] == 4:
+            raise ValueError("bad payload")
+        return [{"id": payload["idea_id"] * 10, "idea_id": payload["idea_id"]}]
+
+    monkeypatch.setattr(workers, "_post_json", fake_post_json)
+
+    await workers.handle_ideas(
+        {"user_id": 3, "trend": "cats", "ideas": [{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}]}
+    )
+
+    assert peak == 2
+    stream, event = dummy_broker.messages[0]
+    assert stream == workers.IMAGES_READY_STREAM
+    assert [image["idea_id"] for image in event["images"]] == [1, 3]
+    assert event["failed_ideas"] == [
+        {"idea_id": 2, "error": "boom"},
+        {"idea_id": 4, "error": "bad payload"},
+    ]
+    assert notes == ["Images generated for 2 of 4 ideas"]
+
+
+@pytest.mark.asyncio
+async def test_handle_ideas_raises_when_every_idea_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    dummy_broker = DummyBroker()
+    monkeypatch.setattr(workers, "broker", dummy_broker)
+
+    async def failing_post_json(base_url, path, payload, *, headers=None):
+        raise httpx.ConnectError("image service down")
+
+    monkeypatch.setattr(workers, "_post_json", failing_post_json)
+
+    with pytest.raises(httpx.ConnectError):
+        await workers.handle_ideas({"user_id": 3, "ideas": [{"id": 1}]})
+    assert dummy_broker.messages == []
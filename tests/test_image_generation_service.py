@@ -1,7 +1,15 @@
+import asyncio
+
 import pytest
 
 from services.common.database import get_session, init_db
-from services.image_gen.service import delete_image, generate_image_for_idea, list_images
+from services.image_gen.service import (
+    PLACEHOLDER_IMAGE_URL,
+    delete_image,
+    generate_image_for_idea,
+    generate_images,
+    list_images,
+)
 from services.models import Idea, Trend
 
 
@@ -64,3 +72,36 @@ async def test_generate_image_for_idea_supports_stub_provider_and_delete():
     deleted = await delete_image(images[0]["id"])
     assert deleted == {"status": "deleted"}
     assert await list_images(idea_id) == []
+
+
+@pytest.mark.asyncio
+async def test_generate_images_fans_out_and_reports_partial_failures(monkeypatch):
+    await init_db()
+    idea_ids = [await _seed_idea(f"design {index}") for index in range(5)]
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate_image(prompt: str) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if prompt == "design 3":
+            raise RuntimeError("provider outage")
+        return f"https://example.com/{prompt.replace(' ', '-')}.png"
+
+    monkeypatch.setattr("services.image_gen.service.openai.generate_image", fake_generate_image)
+    monkeypatch.setattr("services.image_gen.service.GENERATION_CONCURRENCY", 3)
+
+    images = await generate_images([{"id": idea_id} for idea_id in idea_ids] + [{"id": 9999}])
+
+    assert 1 < peak <= 3
+    assert [image["idea_id"] for image in images] == idea_ids
+    failed = images[3]
+    assert failed["generation_source"] == "fallback"
+    assert failed["image_url"] == PLACEHOLDER_IMAGE_URL
+    assert all(image["generation_source"] == "openai" for i, image in enumerate(images) if i != 3)
+    assert all(image["id"] for image in images)
+    listed = await list_images(idea_ids[0])
+    assert listed[0]["image_url"] == "https://example.com/design-0.png"
@@ -13,20 +13,25 @@ except ImportError:  # pragma: no cover - Alembic not installed
 
 ROOT = Path(__file__).resolve().parents[1]
 MIGRATION_DB = ROOT / 'alembic_validation.db'
-EXPECTED_HEAD = "0006_wireframe_control_center"
+EXPECTED_HEAD = "0016_trend_normalized_backfill"
 EXPECTED_TABLES = {
     "abtest",
     "abvariant",
     "analyticsevent",
+    "analyticseventrollup",
+    "billingsubscription",
     "idea",
+    "leasefence",
     "listing",
     "listingdraft",
     "notification",
     "oauthcredential",
     "oauthstate",
     "product",
+    "resourcecounter",
     "schedulednotification",
     "trend",
+    "trendkeywordrollup",
     "trendsignal",
     "user",
     "usersession",
@@ -50,6 +55,15 @@ EXPECTED_INDEXES = {
         "ix_analyticsevent_event_type",
         "ix_analyticsevent_user_id",
     },
+    "analyticseventrollup": {
+        "ix_analyticseventrollup_bucket_start",
+        "ix_analyticseventrollup_granularity",
+    },
+    "billingsubscription": {
+        "ix_billingsubscription_stripe_customer_id",
+        "ix_billingsubscription_stripe_subscription_id",
+        "ix_billingsubscription_user_id",
+    },
     "notification": {
         "ix_notification_created_at",
         "ix_notification_user_id",
@@ -59,6 +73,7 @@ EXPECTED_INDEXES = {
         "ix_product_idea_id",
         "ix_product_sku",
     },
+    "resourcecounter": {"ix_resourcecounter_user_id"},
     "schedulednotification": {"ix_schedulednotification_scheduled_for"},
     "trend": {
         "ix_trend_category",
@@ -68,8 +83,15 @@ EXPECTED_INDEXES = {
     "trendsignal": {
         "ix_trendsignal_category",
         "ix_trendsignal_keyword",
+        "ix_trendsignal_normalized_keyword",
         "ix_trendsignal_source",
         "ix_trendsignal_timestamp",
+        "uq_trendsignal_source_keyword_bucket",
+    },
+    "trendkeywordrollup": {
+        "ix_trendkeywordrollup_bucket_start",
+        "ix_trendkeywordrollup_granularity",
+        "ix_trendkeywordrollup_keyword",
     },
     "usersession": {"ix_usersession_token_hash"},
     "brandprofile": {"ix_brandprofile_user_id", "ix_brandprofile_updated_at"},
@@ -92,12 +114,12 @@ EXPECTED_INDEXES = {
 }
 
 
-def _run_upgrade(db_url: str) -> None:
+def _run_upgrade(db_url: str, revision: str = 'head') -> None:
     config = Config(str(ROOT / 'alembic.ini'))
     previous = os.environ.get('DATABASE_URL')
     os.environ['DATABASE_URL'] = db_url
     try:
-        command.upgrade(config, 'head')
+        command.upgrade(config, revision)
     finally:
         if previous is None:
             os.environ.pop('DATABASE_URL', None)
@@ -150,3 +172,97 @@ def test_alembic_upgrade_repeatability():
             conn.close()
     finally:
         _drop_db(MIGRATION_DB)
+
+
+def test_trend_signal_bucket_migration_keeps_newest_row_per_hour():
+    db_url = f"sqlite:///{MIGRATION_DB.as_posix()}"
+    _drop_db(MIGRATION_DB)
+    try:
+        _run_upgrade(db_url, "0008_trend_normalized_keyword")
+        conn = sqlite3.connect(MIGRATION_DB)
+        try:
+            conn.executemany(
+                "INSERT INTO trendsignal (source, keyword, normalized_keyword, timestamp, engagement_score, category) "
+                "VALUES (?, ?, ?, ?, ?, 'animals')",
+                [
+                    ("etsy", "cat mug", "cat mug", "2026-10-01 06:00:00.000000", 5),
+                    ("etsy", "cat mug", "cat mug", "2026-10-01 06:30:00.000000", 9),
+                    ("etsy", "cat mug", "cat mug", "2026-10-01 18:00:00.000000", 4),
+                    ("etsy", "cat mug", "cat mug", "2026-10-02 06:00:00.000000", 3),
+                    ("amazon", "cat mug", "cat mug", "2026-10-01 06:15:00.000000", 7),
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        # 0009 backfills rollups that still count the 06:00 duplicate.
+        _run_upgrade(db_url)
+
+        conn = sqlite3.connect(MIGRATION_DB)
+        try:
+            rows = conn.execute(
+                "SELECT source, engagement_score, bucket_start FROM trendsignal ORDER BY source, timestamp"
+            ).fetchall()
+            rollups = conn.execute(
+                "SELECT granularity, source, substr(bucket_start, 1, 13), signal_count, engagement_total "
+                "FROM trendkeywordrollup ORDER BY granularity, source, bucket_start"
+            ).fetchall()
+        finally:
+            conn.close()
+        assert [(source, score) for source, score, _bucket in rows] == [
+            ("amazon", 7),
+            ("etsy", 9),
+            ("etsy", 4),
+            ("etsy", 3),
+        ]
+        assert [bucket[:13] for _source, _score, bucket in rows] == [
+            "2026-10-01 06",
+            "2026-10-01 06",
+            "2026-10-01 18",
+            "2026-10-02 06",
+        ]
+        assert rollups == [
+            ("day", "amazon", "2026-10-01 00", 1, 7),
+            ("day", "etsy", "2026-10-01 00", 2, 13),
+            ("day", "etsy", "2026-10-02 00", 1, 3),
+            ("hour", "amazon", "2026-10-01 06", 1, 7),
+            ("hour", "etsy", "2026-10-01 06", 1, 9),
+            ("hour", "etsy", "2026-10-01 18", 1, 4),
+            ("hour", "etsy", "2026-10-02 06", 1, 3),
+        ]
+    finally:
+        _drop_db(MIGRATION_DB)
+
+
+def test_normalized_keyword_backfill_fills_core_written_rows():
+    db_url = f"sqlite:///{MIGRATION_DB.as_posix()}"
+    _drop_db(MIGRATION_DB)
+    try:
+        _run_upgrade(db_url, "0015_resource_counter_shards")
+        conn = sqlite3.connect(MIGRATION_DB)
+        try:
+            conn.executemany(
+                "INSERT INTO trendsignal (source, keyword, normalized_keyword, timestamp, engagement_score, category) "
+                "VALUES (?, ?, ?, '2026-10-01 06:00:00.000000', 1, 'other')",
+                [
+                    ("etsy", "The Été Mug 🐱", None),
+                    ("etsy", "cat mug", "cat mug"),
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        _run_upgrade(db_url)
+
+        conn = sqlite3.connect(MIGRATION_DB)
+        try:
+            rows = conn.execute(
+                "SELECT normalized_keyword FROM trendsignal ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        assert rows == [("été mug",), ("cat mug",)]
+    finally:
+        _drop_db(MIGRATION_DB)
@@ -1,8 +1,14 @@
+import asyncio
+from datetime import timedelta
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 
 from services.auth.service import create_session
 from services.common.database import get_session, init_db
+from services.common.quotas import release_quota, reserve_quota
+from services.common.time import utcnow
+from services.image_gen import api as image_api
 from services.image_gen.api import app as image_app
 from services.models import Idea, Trend, User
 
@@ -169,3 +175,81 @@ async def test_quota_enforcement_on_generate_endpoint():
                 assert resp.status_code == 200
             else:
                 assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_never_overshoot_quota():
+    await init_db()
+    transport = ASGITransport(app=image_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *[
+                client.post(
+                    "/images",
+                    json={"ideas": ["idea"]},
+                    headers={"X-User-Id": "41"},
+                )
+                for _ in range(100)
+            ]
+        )
+
+    statuses = [resp.status_code for resp in responses]
+    assert statuses.count(200) == 20
+    assert statuses.count(403) == 80
+    async with get_session() as session:
+        user = await session.get(User, 41)
+        assert user.quota_used == 20
+
+
+@pytest.mark.asyncio
+async def test_failed_request_refunds_reservation(monkeypatch):
+    await init_db()
+
+    async def failing_generate(_ideas):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(image_api, "generate_images", failing_generate)
+    transport = ASGITransport(app=image_app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post(
+            "/images",
+            json={"ideas": ["a", "b", "c"]},
+            headers={"X-User-Id": "42"},
+        )
+        assert resp.status_code == 500
+
+        missing = await client.post(
+            "/generate",
+            json={"idea_id": 999999},
+            headers={"X-User-Id": "42"},
+        )
+        assert missing.status_code == 404
+
+    async with get_session() as session:
+        user = await session.get(User, 42)
+        assert user.quota_used == 0
+
+
+@pytest.mark.asyncio
+async def test_reservation_resets_stale_month_window():
+    await init_db()
+    async with get_session() as session:
+        session.add(
+            User(
+                id=43,
+                quota_used=20,
+                quota_limit=20,
+                last_reset=utcnow() - timedelta(days=40),
+            )
+        )
+        await session.commit()
+
+    reservation, details = await reserve_quota(43, "images", 2)
+    assert reservation is not None
+    assert details["used"] == 2
+    assert details["remaining"] == 18
+
+    await release_quota(reservation)
+    async with get_session() as session:
+        user = await session.get(User, 43)
+        assert user.quota_used == 0
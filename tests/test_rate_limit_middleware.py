@@ -1,14 +1,46 @@
+import time
+
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
 
 from services.auth.service import create_session
+from services.common import rate_limit
 from services.common.database import init_db
-from services.common.rate_limit import PLAN_RATE_LIMITS, _limiter, register_rate_limiting
+from services.common.rate_limit import (
+    PLAN_RATE_LIMITS,
+    RateLimiter,
+    RedisRateLimiter,
+    _limiter,
+    register_rate_limiting,
+)
+
+
+class FakeScriptClient:
+    """Stands in for a Redis client; replays canned GCRA script results."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+        self.sources = []
+
+    def register_script(self, source):
+        self.sources.append(source)
+
+        async def script(keys, args):
+            self.calls.append((keys, args))
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return script
 
 
 @pytest.fixture(autouse=True)
-def _reset_limiter():
+def _reset_limiter(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_shared_limiter", None)
     _limiter._buckets.clear()
     yield
     _limiter._buckets.clear()
@@ -63,3 +95,70 @@ async def test_rate_limit_rejects_malformed_authorization_header():
     assert resp.status_code == 401
     assert resp.json()["code"] == "UNAUTHORIZED"
     assert resp.json()["message"] == "Invalid Authorization header"
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_enforces_shared_bucket(monkeypatch):
+    client = FakeScriptClient([[1, 1, 0, 30000], [1, 0, 0, 60000], [0, 0, 30000, 60000]])
+    monkeypatch.setattr(
+        rate_limit, "_shared_limiter", RedisRateLimiter(client, RateLimiter())
+    )
+
+    app = FastAPI()
+    register_rate_limiting(app)
+
+    @app.get("/limited")
+    async def limited():
+        return {"ok": True}
+
+    monkeypatch.setitem(PLAN_RATE_LIMITS, "free", 2)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client_:
+        responses = [
+            await client_.get("/limited", headers={"X-User-Id": "9"}) for _ in range(3)
+        ]
+
+    assert [resp.status_code for resp in responses] == [200, 200, 429]
+    assert responses[0].headers["X-RateLimit-Remaining"] == "1"
+    assert responses[2].headers["Retry-After"] == "30"
+    assert client.calls[0] == (["ratelimit:user:9"], [2, 30000])
+    assert not _limiter._buckets
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_falls_back_when_redis_is_down():
+    client = FakeScriptClient([RedisConnectionError("refused")])
+    fallback = RateLimiter()
+    limiter = RedisRateLimiter(client, fallback, retry_seconds=60)
+
+    first = await limiter.check("ip:1.2.3.4", 1)
+    second = await limiter.check("ip:1.2.3.4", 1)
+
+    assert first[0] is True
+    assert second[0] is False
+    # The retry window keeps later checks off Redis entirely.
+    assert len(client.calls) == 1
+    assert "ip:1.2.3.4" in fallback._buckets
+
+
+def test_in_process_limiter_expires_idle_buckets():
+    limiter = RateLimiter()
+    limiter.check("user:1", 5)
+    limiter.check("user:2", 5)
+    limiter._buckets["user:1"].last_refill = time.monotonic() - 301
+
+    limiter.check("user:2", 5)
+
+    assert list(limiter._buckets) == ["user:2"]
+
+
+@pytest.mark.asyncio
+async def test_gcra_script_runs_on_redis():
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+    limiter = RedisRateLimiter(fakeredis.aioredis.FakeRedis(), RateLimiter())
+
+    results = [await limiter.check("user:5", 3) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [headers["X-RateLimit-Remaining"] for _, headers in results[:3]] == ["2", "1", "0"]
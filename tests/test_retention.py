@@ -0,0 +1,199 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from services.analytics.repository import aggregate_metrics
+from services.common import retention
+from services.common.database import get_session, init_db
+from services.models import (
+    AnalyticsEvent,
+    AnalyticsEventRollup,
+    EventType,
+    TrendKeywordRollup,
+    TrendSignal,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def _read_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+@pytest.mark.asyncio
+async def test_retention_archives_downsamples_and_deletes_in_batches(tmp_path, monkeypatch):
+    await init_db()
+    monkeypatch.setattr(retention, "TREND_SIGNAL_RETENTION_DAYS", 30)
+    monkeypatch.setattr(retention, "ANALYTICS_EVENT_RETENTION_DAYS", 90)
+    old_event = NOW - timedelta(days=120)
+    async with get_session() as session:
+        for age in (40, 35, 31, 5):
+            session.add(
+                TrendSignal(
+                    source="etsy",
+                    keyword=f"cat mug {age}",
+                    timestamp=NOW - timedelta(days=age),
+                    engagement_score=age,
+                )
+            )
+        for offset, event_type in enumerate(
+            [EventType.page_view, EventType.page_view, EventType.click, EventType.conversion]
+        ):
+            session.add(
+                AnalyticsEvent(
+                    event_type=event_type,
+                    path="/trends",
+                    created_at=old_event + timedelta(minutes=offset),
+                    meta={"offset": offset},
+                )
+            )
+        session.add(AnalyticsEvent(event_type=EventType.page_view, path="/trends", created_at=NOW))
+        await session.commit()
+    async with get_session() as session:
+        before = await aggregate_metrics(session)
+
+    reports = await retention.apply_retention(NOW, archive_dir=tmp_path, batch_size=2)
+
+    by_table = {report.table: report for report in reports}
+    assert by_table["trendsignal"].rows_deleted == 3
+    assert by_table["trendsignal"].batches == 2
+    assert by_table["analyticsevent"].rows_deleted == 4
+    assert by_table["analyticsevent"].rollups_touched > 0
+    assert all(report.seconds >= 0 for report in reports)
+
+    archived = _read_archive(by_table["trendsignal"].archives[0])
+    assert sorted(row["engagement_score"] for row in archived) == [31, 35, 40]
+    events = _read_archive(by_table["analyticsevent"].archives[0])
+    assert [row["metadata"]["offset"] for row in events] == [0, 1, 2, 3]
+    assert events[0]["event_type"] == "page_view"
+
+    async with get_session() as session:
+        signals = (await session.exec(select(TrendSignal))).all()
+        rollups = (
+            await session.exec(
+                select(AnalyticsEventRollup).where(AnalyticsEventRollup.granularity == "day")
+            )
+        ).all()
+        after = await aggregate_metrics(session)
+    assert [signal.engagement_score for signal in signals] == [5]
+    assert {rollup.event_type: rollup.event_count for rollup in rollups} == {
+        "page_view": 2,
+        "click": 1,
+        "conversion": 1,
+    }
+    assert after == before == [("/trends", 3, 1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_retention_skips_tables_with_disabled_windows(tmp_path, monkeypatch):
+    await init_db()
+    monkeypatch.setattr(retention, "TREND_SIGNAL_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "ANALYTICS_EVENT_RETENTION_DAYS", 1)
+    monkeypatch.setattr(retention, "ROLLUP_HOURLY_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "ROLLUP_DAILY_RETENTION_DAYS", 0)
+
+    reports = await retention.apply_retention(NOW, archive_dir=tmp_path)
+
+    assert [(report.table, report.rows_deleted, report.archives) for report in reports] == [
+        ("analyticsevent", 0, [])
+    ]
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_overlapping_runs_fold_each_event_once(tmp_path, monkeypatch):
+    await init_db()
+    monkeypatch.setattr(retention, "TREND_SIGNAL_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "ANALYTICS_EVENT_RETENTION_DAYS", 90)
+    path = "/retention-overlap"
+    async with get_session() as session:
+        for offset in range(5):
+            session.add(
+                AnalyticsEvent(
+                    event_type=EventType.click,
+                    path=path,
+                    created_at=NOW - timedelta(days=100, minutes=offset),
+                )
+            )
+        await session.commit()
+
+    reports = await asyncio.gather(
+        retention.apply_retention(NOW, archive_dir=tmp_path / "a", batch_size=2),
+        retention.apply_retention(NOW, archive_dir=tmp_path / "b", batch_size=2),
+    )
+
+    deleted = sum(
+        report.rows_deleted
+        for run in reports
+        for report in run
+        if report.table == "analyticsevent"
+    )
+    async with get_session() as session:
+        rollups = (
+            await session.exec(
+                select(AnalyticsEventRollup).where(
+                    AnalyticsEventRollup.path == path,
+                    AnalyticsEventRollup.granularity == "day",
+                )
+            )
+        ).all()
+    assert deleted == 5
+    assert sum(rollup.event_count for rollup in rollups) == 5
+
+
+@pytest.mark.asyncio
+async def test_rollup_rows_expire_per_granularity(tmp_path, monkeypatch):
+    await init_db()
+    monkeypatch.setattr(retention, "TREND_SIGNAL_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "ANALYTICS_EVENT_RETENTION_DAYS", 0)
+    monkeypatch.setattr(retention, "ROLLUP_HOURLY_RETENTION_DAYS", 30)
+    monkeypatch.setattr(retention, "ROLLUP_DAILY_RETENTION_DAYS", 365)
+    async with get_session() as session:
+        for granularity, age in (("hour", 40), ("hour", 5), ("day", 40), ("day", 400)):
+            bucket = NOW - timedelta(days=age)
+            session.add(
+                TrendKeywordRollup(
+                    granularity=granularity,
+                    bucket_start=bucket,
+                    keyword="retention rollup",
+                    source="etsy",
+                )
+            )
+            session.add(
+                AnalyticsEventRollup(
+                    granularity=granularity,
+                    bucket_start=bucket,
+                    path="/retention-rollup",
+                    event_type="click",
+                    event_count=1,
+                )
+            )
+        await session.commit()
+
+    reports = await retention.apply_retention(NOW, archive_dir=tmp_path)
+
+    by_table = {report.table: report for report in reports}
+    assert by_table["trendkeywordrollup.hour"].rows_deleted >= 1
+    assert by_table["analyticseventrollup.day"].rows_deleted >= 1
+    async with get_session() as session:
+        trend_left = (
+            await session.exec(
+                select(TrendKeywordRollup.granularity, TrendKeywordRollup.bucket_start).where(
+                    TrendKeywordRollup.keyword == "retention rollup"
+                )
+            )
+        ).all()
+        event_left = (
+            await session.exec(
+                select(AnalyticsEventRollup.granularity, AnalyticsEventRollup.bucket_start).where(
+                    AnalyticsEventRollup.path == "/retention-rollup"
+                )
+            )
+        ).all()
+    expected = {("hour", NOW - timedelta(days=5)), ("day", NOW - timedelta(days=40))}
+    assert set(trend_left) == set(event_left) == expected
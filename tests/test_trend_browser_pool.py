@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from services.trend_ingestion import service
+from services.trend_ingestion.browser_pool import BrowserPool
+from services.trend_ingestion.sources import SelectorSet, SourceConfig
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed = True
+        self.browser.open_contexts -= 1
+
+
+class FakeBrowser:
+    def __init__(self, options):
+        self.options = options
+        self.contexts = []
+        self.open_contexts = 0
+        self.max_open_contexts = 0
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        self.open_contexts += 1
+        self.max_open_contexts = max(self.max_open_contexts, self.open_contexts)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser(options)
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.stopped = True
+        return False
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_browsers_and_isolates_contexts():
+    playwright = FakePlaywright()
+    pool = BrowserPool(lambda: playwright, size=2, max_concurrency=4, max_pages=100)
+
+    async with pool.run():
+        for locale in ("en-US", "en-GB", "en-US", "en-GB", "en-US"):
+            async with pool.context(locale=locale) as context:
+                assert context.options == {"locale": locale}
+
+    launched = playwright.chromium.launched
+    assert len(launched) == 1
+    assert all(context.closed for context in launched[0].contexts)
+    assert launched[0].closed
+    assert playwright.stopped
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_browser_after_max_pages():
+    playwright = FakePlaywright()
+    pool = BrowserPool(lambda: playwright, size=1, max_pages=2)
+
+    async with pool.run():
+        for _ in range(5):
+            async with pool.context():
+                pass
+
+    launched = playwright.chromium.launched
+    assert len(launched) == 3
+    assert [len(browser.contexts) for browser in launched] == [2, 2, 1]
+    assert all(browser.closed for browser in launched)
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_concurrent_contexts():
+    playwright = FakePlaywright()
+    pool = BrowserPool(lambda: playwright, size=1, max_concurrency=2, max_pages=100)
+    open_now = 0
+    peak = 0
+
+    async def scrape():
+        nonlocal open_now, peak
+        async with pool.context():
+            open_now += 1
+            peak = max(peak, open_now)
+            await asyncio.sleep(0.01)
+            open_now -= 1
+
+    async with pool.run():
+        await asyncio.gather(*[scrape() for _ in range(8)])
+
+    assert peak == 2
+    assert playwright.chromium.launched[0].max_open_contexts == 2
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_outlives_runs_until_closed():
+    playwright = FakePlaywright()
+    pool = BrowserPool(lambda: playwright, size=1, max_pages=100)
+    pool.keep_warm()
+
+    for _ in range(3):
+        async with pool.run():
+            async with pool.context():
+                pass
+
+    assert len(playwright.chromium.launched) == 1
+    assert not playwright.stopped
+
+    await pool.close()
+    assert playwright.chromium.launched[0].closed
+    assert playwright.stopped
+
+
+@pytest.mark.asyncio
+async def test_scrape_source_uses_pooled_context(monkeypatch):
+    playwright = FakePlaywright()
+    pool = BrowserPool(lambda: playwright, size=1)
+    config = SourceConfig(
+        url="https://example.com/trends",
+        selectors=SelectorSet(
+            item=["article"],
+            title=["h1"],
+            hashtags=[],
+            likes=[],
+            shares=[],
+            comments=[],
+        ),
+        wait_for_selector="article",
+    )
+    profile = service.build_scrape_profile(config)
+
+    async def fake_scrape_page(_page, name, _config, _profile):
+        return [{"source": name, "keyword": "pooled"}]
+
+    monkeypatch.setattr(service, "_scrape_page", fake_scrape_page)
+
+    async with pool.run():
+        results = await service._scrape_source(pool, "public", config, profile)
+
+    browser = playwright.chromium.launched[0]
+    assert results == [{"source": "public", "keyword": "pooled"}]
+    assert browser.contexts[0].options["user_agent"] == profile.user_agent
+    assert browser.contexts[0].closed
@@ -184,3 +184,24 @@ async def test_refresh_and_status_endpoint(monkeypatch):
         live = await client.get("/api/trends/live", params={"lookback_hours": 240})
         data = live.json()
         assert "other" in data
+
+
+@pytest.mark.asyncio
+async def test_scraper_status_reports_breaker_snapshot(monkeypatch):
+    from services.trend_ingestion import api as ingestion_api
+    from services.trend_ingestion.circuit_breaker import CircuitBreaker
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    await breaker.record_failure("etsy")
+    monkeypatch.setattr(ingestion_api, "scraper_circuit_breaker", breaker)
+
+    transport = ASGITransport(app=ingestion_api.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/trends/scraper-status")
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["backend"] == "memory"
+    assert body["sources"]["etsy"]["state"] == "open"
+    assert body["sources"]["etsy"]["last_failure_at"] is not None
+    assert body["sources"]["tiktok"]["state"] == "closed"
@@ -4,7 +4,8 @@ import pytest
 from sqlmodel import select
 
 from services.common.database import get_session, init_db
-from services.models import TrendSignal
+from services.common.trend_rollups import rebuild_trend_rollups
+from services.models import TrendKeywordRollup, TrendSignal
 from services.trend_ingestion import service
 from services.trend_ingestion import scrapegraph_adapter
 from services.trend_ingestion.scrapegraph_adapter import (
@@ -185,6 +186,120 @@ async def test_refresh_trends_persists_and_updates_status(monkeypatch):
     assert rows[0].metadata_json
     assert rows[0].metadata_json["market_examples"][0]["title"] == "Funny Cat Mug Bestseller"
 
+    async with get_session() as session:
+        rollups = (await session.exec(select(TrendKeywordRollup))).all()
+    assert {rollup.granularity for rollup in rollups} == {"hour", "day"}
+    assert all(rollup.keyword == "funny cat mug" for rollup in rollups)
+    assert all(rollup.engagement_total == 42 for rollup in rollups)
+
+
+@pytest.mark.asyncio
+async def test_refresh_trends_upserts_one_row_per_keyword_and_bucket(monkeypatch):
+    await init_db()
+    scores = iter([42, 17])
+
+    async def fake_gather():
+        score = next(scores)
+        return [
+            {"source": "etsy", "keyword": "Funny Cat Mug", "engagement_score": score},
+            {"source": "etsy", "keyword": "funny cat mug", "engagement_score": 1},
+            {"source": "amazon", "keyword": "funny cat mug", "engagement_score": score},
+        ], {"mode": "live", "source_diagnostics": {}}
+
+    monkeypatch.setattr(service, "_gather_trends", fake_gather)
+    # Both refreshes land in the same hour bucket.
+    refreshed_at = service.utcnow().replace(minute=30)
+    monkeypatch.setattr(service, "utcnow", lambda: refreshed_at)
+
+    await service.refresh_trends()
+    await service.refresh_trends()
+
+    async with get_session() as session:
+        rows = (await session.exec(select(TrendSignal).order_by(TrendSignal.source))).all()
+        rollups = (
+            await session.exec(
+                select(TrendKeywordRollup).where(TrendKeywordRollup.granularity == "day")
+            )
+        ).all()
+    assert [(row.source, row.normalized_keyword, row.engagement_score) for row in rows] == [
+        ("amazon", "funny cat mug", 17),
+        ("etsy", "funny cat mug", 17),
+    ]
+    assert all(row.bucket_start == row.timestamp.replace(minute=0, second=0, microsecond=0) for row in rows)
+    # Replaced raw rows leave the rollups as a full rebuild would build them.
+    assert sorted((rollup.signal_count, rollup.engagement_total) for rollup in rollups) == [
+        (1, 17),
+        (1, 17),
+    ]
+    incremental = await _rollup_snapshot()
+    await rebuild_trend_rollups()
+    assert await _rollup_snapshot() == incremental
+
+
+@pytest.mark.asyncio
+async def test_refresh_trends_splits_batch_stage_timings_across_sources(monkeypatch):
+    await init_db()
+
+    async def fake_gather():
+        return [
+            {"source": "etsy", "keyword": "retro mug", "engagement_score": 3},
+            {"source": "etsy", "keyword": "cat poster", "engagement_score": 2},
+            {"source": "amazon", "keyword": "dog mom shirt", "engagement_score": 1},
+        ], {"mode": "live", "source_diagnostics": {}}
+
+    timings = {}
+    monkeypatch.setattr(service, "_gather_trends", fake_gather)
+    monkeypatch.setattr(
+        service,
+        "stage_observers",
+        [lambda platform, stage, seconds: timings.__setitem__((platform, stage), seconds)],
+    )
+
+    await service.refresh_trends()
+
+    assert {platform for platform, _stage in timings} == {"etsy", "amazon"}
+    for stage in ("normalize", "persist"):
+        assert timings[("etsy", stage)] == pytest.approx(2 * timings[("amazon", stage)])
+
+
+async def _rollup_snapshot():
+    async with get_session() as session:
+        rollups = (await session.exec(select(TrendKeywordRollup))).all()
+    return sorted(
+        (
+            rollup.granularity,
+            rollup.bucket_start,
+            rollup.keyword,
+            rollup.source,
+            rollup.signal_count,
+            rollup.engagement_total,
+            rollup.max_engagement,
+        )
+        for rollup in rollups
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_trend_signals_keeps_the_strongest_duplicate():
+    await init_db()
+    bucket = datetime(2026, 3, 6)
+    rows = [
+        TrendSignal(
+            source="etsy",
+            keyword=keyword,
+            normalized_keyword="funny cat mug",
+            engagement_score=score,
+            timestamp=bucket,
+            bucket_start=bucket,
+        )
+        for keyword, score in (("Funny Cat Mug", 42), ("funny cat mug", 1), ("FUNNY CAT MUG", 7))
+    ]
+    async with get_session() as session:
+        assert await service.upsert_trend_signals(session, rows) == 1
+        await session.commit()
+        stored = (await session.exec(select(TrendSignal))).all()
+    assert [(row.keyword, row.engagement_score) for row in stored] == [("Funny Cat Mug", 42)]
+
 
 def test_get_refresh_status_formats_timestamps(monkeypatch):
     monkeypatch.setitem(service._refresh_status, "last_started_at", datetime(2026, 3, 6, 10, 0, 0))
@@ -1,6 +1,9 @@
+﻿import random
 from datetime import timedelta
 
 import pytest
+from sqlalchemy import insert
+from sqlmodel import select
 
 from services.common.database import get_session, init_db
 from services.common.time import utcnow
@@ -304,6 +307,128 @@ async def test_get_live_trends_applies_source_dedup_recency_and_limit():
     assert paged["items_by_category"]["animals"][0]["keyword"] == "Funny Cat"
 
 
+@pytest.mark.asyncio
+async def test_core_inserts_store_the_normalized_keyword():
+    await init_db()
+    async with get_session() as session:
+        # Core inserts bypass the ORM hook; the column default fills the key.
+        await session.exec(
+            insert(TrendSignal).values(
+                source="core-writer",
+                keyword="The Été Mug",
+                engagement_score=5,
+                category="drinkware",
+                timestamp=utcnow(),
+            )
+        )
+        await session.commit()
+        stored = (
+            await session.exec(
+                select(TrendSignal.normalized_keyword).where(TrendSignal.source == "core-writer")
+            )
+        ).all()
+
+    trends = await get_live_trends(source="core-writer", lookback_hours=1)
+
+    assert stored == [normalize_text("The Été Mug")] == ["été mug"]
+    assert [item["keyword"] for item in trends["drinkware"]] == ["The Été Mug"]
+
+
+def _reference_live_trends(rows, *, offset, group_limit, sort_by, reverse):
+    """Previous in-Python dedupe/sort/paging, kept as the equivalence oracle."""
+    deduped = {}
+    for row in rows:
+        keyword = normalize_text(row.keyword)
+        if not keyword:
+            continue
+        key = (row.category, row.source, keyword)
+        existing = deduped.get(key)
+        if (
+            existing is None
+            or row.engagement_score > existing.engagement_score
+            or (
+                row.engagement_score == existing.engagement_score
+                and row.timestamp > existing.timestamp
+            )
+        ):
+            deduped[key] = row
+    sort_keys = {
+        "timestamp": lambda row: row.timestamp,
+        "keyword": lambda row: row.keyword.lower(),
+    }
+    ordered = sorted(
+        deduped.values(),
+        key=sort_keys.get(sort_by, lambda row: row.engagement_score),
+        reverse=reverse,
+    )
+    grouped = {}
+    totals = {}
+    for row in ordered:
+        totals[row.category] = totals.get(row.category, 0) + 1
+        if totals[row.category] - 1 < offset:
+            continue
+        items = grouped.setdefault(row.category, [])
+        if len(items) < group_limit:
+            items.append((row.source, row.keyword, row.engagement_score))
+    return grouped, totals
+
+
+@pytest.mark.asyncio
+async def test_get_live_trends_sql_path_matches_reference_ordering():
+    await init_db()
+    rng = random.Random(7)
+    now = utcnow()
+    async with get_session() as session:
+        for index in range(300):
+            session.add(
+                TrendSignal(
+                    source=rng.choice(["tiktok", "etsy", "amazon"]),
+                    keyword=rng.choice(
+                        ["Funny Cat", "funny  cat", "Dog Mom", "dog mom", "Retro Mug", "the"]
+                    )
+                    + rng.choice(["", " Shirt", " Poster"]),
+                    engagement_score=rng.randint(0, 20),
+                    category=rng.choice(["animals", "drinkware", "apparel"]),
+                    timestamp=now - timedelta(minutes=rng.randint(0, 30), hours=index % 3),
+                )
+            )
+        await session.commit()
+        rows = (
+            await session.exec(select(TrendSignal).order_by(TrendSignal.id))
+        ).all()
+
+    for sort_by in ("engagement_score", "timestamp", "keyword"):
+        for sort_order in ("asc", "desc"):
+            for page in (1, 2, 3):
+                result = await get_live_trends(
+                    lookback_hours=72,
+                    per_group_limit=4,
+                    page=page,
+                    page_size=3,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    include_meta=True,
+                )
+                expected, totals = _reference_live_trends(
+                    rows,
+                    offset=(page - 1) * 3,
+                    group_limit=3,
+                    sort_by=sort_by,
+                    reverse=sort_order == "desc",
+                )
+                actual = {
+                    category: [
+                        (item["source"], item["keyword"], item["engagement_score"])
+                        for item in items
+                    ]
+                    for category, items in result["items_by_category"].items()
+                }
+                assert actual == expected
+                assert list(actual) == list(expected)
+                assert result["pagination"]["total_by_category"] == totals
+                assert list(result["pagination"]["total_by_category"]) == list(totals)
+
+
 @pytest.mark.asyncio
 async def test_gather_trends_skips_open_circuit(monkeypatch):
     class _DummyPlaywrightCtx:
@@ -314,8 +439,8 @@ async def test_gather_trends_skips_open_circuit(monkeypatch):
             return False
 
     breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60.0)
-    breaker.record_failure("blocked")
-    assert breaker.state("blocked") == CircuitState.OPEN
+    await breaker.record_failure("blocked")
+    assert await breaker.state("blocked") == CircuitState.OPEN
 
     called = {"scrape": 0}
 
@@ -473,5 +598,5 @@ async def test_gather_trends_records_scrape_failures_into_circuit_breaker(monkey
 
     assert "selector_fallback: boom" in metadata["sources_failed"]["failing"]
     assert "healthy" in metadata["sources_succeeded"]
-    assert breaker.state("failing") == CircuitState.OPEN
-    assert breaker.state("healthy") == CircuitState.CLOSED
+    assert await breaker.state("failing") == CircuitState.OPEN
+    assert await breaker.state("healthy") == CircuitState.CLOSED
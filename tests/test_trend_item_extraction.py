@@ -0,0 +1,174 @@
+from pathlib import Path
+
+import pytest
+
+from services.trend_ingestion import service
+from services.trend_ingestion.sources import PLATFORM_CONFIG, SelectorSet
+
+FIXTURES = Path(__file__).parent / "fixtures" / "trend_pages"
+FIXTURE_URLS = {
+    "etsy": "https://www.etsy.com/market/trending_products",
+    "amazon": "https://www.amazon.com/gp/movers-and-shakers/arts-crafts",
+    "pinterest": "https://www.pinterest.com/today/",
+}
+
+SELECTORS = SelectorSet(
+    item=["article"],
+    title=["h3"],
+    hashtags=["a.tag"],
+    likes=["span.likes"],
+    shares=["span.shares"],
+    comments=["span.comments"],
+    image=["img"],
+    link=["a.link"],
+)
+
+
+class _Node:
+    def __init__(self, text="", attrs=None):
+        self.text = text
+        self.attrs = attrs or {}
+
+    async def inner_text(self):
+        return self.text
+
+    async def get_attribute(self, name):
+        return self.attrs.get(name)
+
+
+class _Handle:
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    async def query_selector(self, selector):
+        found = self.nodes.get(selector, [])
+        return found[0] if found else None
+
+    async def query_selector_all(self, selector):
+        return self.nodes.get(selector, [])
+
+
+class _Page:
+    url = "https://example.com/trends"
+
+    def __init__(self, records=None, error=None, handles=None):
+        self.records = records
+        self.error = error
+        self.handles = handles or []
+        self.evaluate_calls = 0
+        self.handle_queries = 0
+
+    async def evaluate(self, _script, arg):
+        self.evaluate_calls += 1
+        assert arg["limit"] == 4
+        assert arg["selectors"]["title"] == ["h3"]
+        if self.error:
+            raise self.error
+        return self.records
+
+    async def query_selector_all(self, _selector):
+        self.handle_queries += 1
+        return self.handles
+
+
+@pytest.mark.asyncio
+async def test_item_records_come_from_one_evaluate_call():
+    records = [
+        {
+            "title": "Retro Cat Mom Shirt",
+            "hashtags": ["cat mom"],
+            "likes": "1.2k",
+            "shares": "",
+            "comments": "34",
+            "images": ["data:image/gif;base64,AA", "/img/cat.jpg"],
+            "links": ["javascript:void(0)", "/listing/1"],
+        }
+    ]
+    page = _Page(records=records)
+
+    extracted = await service._extract_item_records(page, SELECTORS, 4)
+    signals = service._signals_from_item_records(extracted, "etsy", page.url)
+
+    assert page.evaluate_calls == 1
+    assert page.handle_queries == 0
+    assert signals[0]["keyword"] == "retro cat mom shirt cat mom"
+    assert signals[0]["engagement_score"] == service.compute_engagement(1200, 0, 34)
+    example = signals[0]["market_examples"][0]
+    assert example["source_url"] == "https://example.com/listing/1"
+    assert example["image_url"] == "https://example.com/img/cat.jpg"
+
+
+@pytest.mark.asyncio
+async def test_item_records_fall_back_to_handles_when_evaluate_fails():
+    handle = _Handle(
+        {
+            "h3": [_Node("")],
+            "a.tag": [_Node("#boho"), _Node("", {"aria-label": "nursery"})],
+            "span.likes": [_Node("3.4K")],
+            "img": [_Node(attrs={"alt": "x", "data-src": "/a.jpg"})],
+            "a.link": [_Node("Pin", {"href": "/pin/5/"})],
+        }
+    )
+    page = _Page(error=RuntimeError("Execution context was destroyed"), handles=[handle])
+
+    records = await service._extract_item_records(page, SELECTORS, 4)
+
+    assert page.evaluate_calls == 1
+    assert records == [
+        {
+            "title": "",
+            "hashtags": ["#boho", "nursery"],
+            "likes": "3.4K",
+            "shares": "",
+            "comments": "",
+            "images": ["/a.jpg"],
+            "links": ["/pin/5/"],
+        }
+    ]
+
+
+def _summaries(signals):
+    return [
+        (
+            signal["keyword"],
+            signal["engagement_score"],
+            signal["category"],
+            [(item["source_url"], item["image_url"]) for item in signal["market_examples"]],
+        )
+        for signal in signals
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("source", sorted(FIXTURE_URLS))
+async def test_evaluate_extraction_matches_handle_extraction(source):
+    async_playwright = pytest.importorskip("playwright.async_api").async_playwright
+    html = (FIXTURES / f"{source}.html").read_text(encoding="utf-8")
+    selectors = PLATFORM_CONFIG[source].selectors
+    limit = service.TOP_K * 2
+
+    async def serve_fixture(route):
+        await route.fulfill(status=200, content_type="text/html", body=html)
+
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch(headless=True)
+        except Exception as exc:
+            pytest.skip(f"Chromium unavailable: {service._sanitize_reason(exc)}")
+        try:
+            page = await browser.new_page()
+            await page.route("**/*", serve_fixture)
+            await page.goto(FIXTURE_URLS[source])
+            batched = await service._extract_item_records(page, selectors, limit)
+            per_handle = await service._extract_item_records_with_handles(
+                page, selectors, limit
+            )
+            page_url = page.url
+        finally:
+            await browser.close()
+
+    assert batched
+    assert batched == per_handle
+    assert _summaries(
+        service._signals_from_item_records(batched, source, page_url)
+    ) == _summaries(service._signals_from_item_records(per_handle, source, page_url))
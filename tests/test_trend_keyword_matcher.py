@@ -0,0 +1,125 @@
+import random
+import re
+
+from services.trend_ingestion import service
+from services.trend_ingestion.keyword_matcher import KeywordMatcher
+
+METHODS = (None, "rss_fallback", "selector_fallback", "scrapegraph")
+SOURCES = (None, "amazon", "etsy", "google_trends_rss", "pinterest", "tiktok")
+
+
+def _legacy_contains_term(keyword, term):
+    if " " in term:
+        return f" {term} " in f" {keyword} "
+    return term in keyword.split()
+
+
+def _legacy_strong(keyword):
+    return any(_legacy_contains_term(keyword, t) for t in service.STRONG_POD_TERMS)
+
+
+def _legacy_pod(keyword):
+    return any(_legacy_contains_term(keyword, t) for t in service.POD_ORIENTED_TERMS)
+
+
+def _legacy_noise(keyword, method, source):
+    words = keyword.split()
+    if not words:
+        return True
+    compact = "".join(words)
+    if any(marker in keyword for marker in service.NON_POD_KEYWORD_MARKERS):
+        return True
+    if re.fullmatch(r"[a-f0-9]{6,8}", compact):
+        return True
+    if re.fullmatch(r"[a-z]*\d+[a-z\d]*", compact) and len(words) <= 2:
+        return True
+    if any(word in service.NAVIGATION_OR_TECH_TOKENS for word in words):
+        return True
+    if len(words) == 1 and words[0] in service.TEXT_FALLBACK_STOPWORDS:
+        return True
+    if method == "rss_fallback":
+        if any(term in words for term in service.RSS_NEWS_NOISE_TERMS):
+            return True
+        if not _legacy_strong(keyword):
+            return True
+    if source in service.WEAK_PUBLIC_SOURCES_REQUIRE_POD:
+        if not _legacy_strong(keyword):
+            return True
+    return False
+
+
+def _legacy_categorize(keyword):
+    for category, keys in service.CATEGORIES.items():
+        if any(key in keyword for key in keys):
+            return category
+    return "other"
+
+
+def _keywords(count=3000):
+    vocabulary = sorted(
+        {
+            *(key for keys in service.CATEGORIES.values() for key in keys),
+            *service.POD_ORIENTED_TERMS,
+            *service.STRONG_POD_TERMS,
+            *service.NON_POD_KEYWORD_MARKERS,
+            *service.NAVIGATION_OR_TECH_TOKENS,
+            *service.RSS_NEWS_NOISE_TERMS,
+            *service.TEXT_FALLBACK_STOPWORDS,
+            "category",
+            "education",
+            "representative",
+            "retro",
+            "boho",
+            "a1b2c3",
+            "deadbeef",
+            "2026",
+        }
+    )
+    rng = random.Random(14)
+    keywords = [
+        "",
+        "   ",
+        "wall  art",
+        "wall\tart mug",
+        "cat\tshirt",
+        "decaf coffee",
+        "sun wall art",
+        "capybara",
+    ]
+    for _ in range(count):
+        keywords.append(" ".join(rng.choices(vocabulary, k=rng.randint(1, 5))))
+    return keywords
+
+
+def test_matcher_matches_per_term_checks():
+    matcher = service.keyword_matcher
+    for keyword in _keywords():
+        traits = matcher.classify(keyword)
+        assert traits.category == _legacy_categorize(keyword), keyword
+        assert matcher.category(keyword) == traits.category
+        assert traits.pod_signal == _legacy_pod(keyword), keyword
+        assert traits.strong_pod_signal == _legacy_strong(keyword), keyword
+        for method in METHODS:
+            for source in SOURCES:
+                assert service._looks_like_noise_keyword(
+                    keyword, method=method, source=source
+                ) == _legacy_noise(keyword, method, source), (keyword, method, source)
+
+
+def test_earliest_category_wins_over_earliest_position():
+    matcher = KeywordMatcher(
+        categories={"first": ["zebra"], "second": ["ant", "antelope"]},
+        pod_terms=[],
+        strong_pod_terms=["wall art"],
+        non_pod_markers=["tel"],
+        navigation_tokens=[],
+        rss_news_noise_terms=[],
+        stopwords=[],
+    )
+
+    traits = matcher.classify("antelope zebra hotel wall art")
+
+    assert traits.category == "first"
+    assert matcher.category("antelope") == "second"
+    assert matcher.category("lion") == "other"
+    assert traits.strong_pod_signal and traits.non_pod_marker
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from services.analytics.service import get_trending_keywords
+from services.common.database import get_session, init_db
+from services.common import trend_rollups
+from services.common.time import utcnow
+from services.common.trend_rollups import (
+    bucket_start,
+    rebuild_trend_rollups,
+    top_rollup_signals,
+    upsert_trend_rollups,
+)
+from services.models import TrendKeywordRollup, TrendSignal
+
+
+def test_bucket_start_truncates_to_hour_and_day():
+    value = datetime(2026, 3, 6, 10, 42, 17, 5)
+    assert bucket_start(value, "hour") == datetime(2026, 3, 6, 10)
+    assert bucket_start(value, "day") == datetime(2026, 3, 6)
+
+
+@pytest.mark.asyncio
+async def test_upsert_accumulates_buckets_across_refreshes():
+    await init_db()
+    now = utcnow()
+    for score in (10, 30):
+        async with get_session() as session:
+            await upsert_trend_rollups(
+                session,
+                [
+                    TrendSignal(
+                        source="etsy",
+                        keyword="retro mug",
+                        normalized_keyword="retro mug",
+                        engagement_score=score,
+                        category="drinkware",
+                        timestamp=now,
+                        metadata_json={"method": f"run-{score}"},
+                    )
+                ],
+            )
+            await session.commit()
+
+    async with get_session() as session:
+        rows = (
+            await session.exec(
+                select(TrendKeywordRollup).where(TrendKeywordRollup.granularity == "day")
+            )
+        ).all()
+        strongest = await top_rollup_signals(session, now - timedelta(days=1), 10)
+    assert len(rows) == 1
+    assert rows[0].signal_count == 2
+    assert rows[0].engagement_total == 40
+    assert rows[0].max_engagement == 30
+    assert rows[0].metadata_json == {"method": "run-30"}
+    assert [(row.keyword, row.max_engagement) for row in strongest] == [("retro mug", 30)]
+
+
+@pytest.mark.asyncio
+async def test_trending_keywords_read_rollups_within_lookback():
+    await init_db()
+    now = utcnow()
+    async with get_session() as session:
+        session.add(
+            TrendSignal(source="etsy", keyword="dog mom", engagement_score=5, timestamp=now)
+        )
+        session.add(
+            TrendSignal(
+                source="etsy",
+                keyword="dog mom",
+                engagement_score=50,
+                timestamp=now - timedelta(days=10),
+            )
+        )
+        session.add(
+            TrendSignal(source="tiktok", keyword="cat dad", engagement_score=0, timestamp=now)
+        )
+        await session.commit()
+    await rebuild_trend_rollups()
+
+    recent = await get_trending_keywords(limit=5, lookback_hours=48)
+    assert recent == [{"term": "dog mom", "clicks": 5}, {"term": "cat dad", "clicks": 1}]
+
+    extended = await get_trending_keywords(limit=5, lookback_hours=24 * 14)
+    assert extended[0] == {"term": "dog mom", "clicks": 55}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_rollups_older_than_raw_retention(monkeypatch):
+    await init_db()
+    monkeypatch.setattr(trend_rollups, "TREND_SIGNAL_RETENTION_DAYS", 30)
+    now = utcnow()
+    archived_day = bucket_start(now - timedelta(days=200), "day")
+    async with get_session() as session:
+        # Raw signals behind this rollup were archived by retention long ago.
+        session.add(
+            TrendKeywordRollup(
+                granularity="day",
+                bucket_start=archived_day,
+                keyword="archived llama",
+                source="etsy",
+                category="animals",
+                signal_count=4,
+                engagement_total=80,
+                max_engagement=30,
+                last_seen_at=archived_day,
+            )
+        )
+        session.add(
+            TrendSignal(
+                source="etsy",
+                keyword="archived llama",
+                normalized_keyword="archived llama",
+                engagement_score=7,
+                category="animals",
+                timestamp=now,
+            )
+        )
+        await session.commit()
+
+    await rebuild_trend_rollups()
+
+    async with get_session() as session:
+        rows = (
+            await session.exec(
+                select(TrendKeywordRollup)
+                .where(
+                    TrendKeywordRollup.keyword == "archived llama",
+                    TrendKeywordRollup.granularity == "day",
+                )
+                .order_by(TrendKeywordRollup.bucket_start)
+            )
+        ).all()
+    assert [(row.bucket_start, row.engagement_total) for row in rows] == [
+        (archived_day, 80),
+        (bucket_start(now, "day"), 7),
+    ]
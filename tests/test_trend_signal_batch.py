@@ -0,0 +1,78 @@
+import random
+from datetime import datetime
+
+from services.trend_ingestion import service
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+WORDS = (
+    "Funny", "cat", "MOM", "retro", "mug", "vintage", "poster", "wall", "art",
+    "hoodie", "teacher", "gift", "tote", "sticker", "coffee", "shirt", "men's",
+    "near", "me", "2026", "schedule", "the", "and", "😀", "#boho",
+)
+
+
+def _signals(count=1500):
+    rng = random.Random(15)
+    signals = []
+    for index in range(count):
+        signal = {
+            "source": rng.choice(["etsy", "amazon", "tiktok", "pinterest", "google_trends_rss", None]),
+            "keyword": " ".join(rng.choices(WORDS, k=rng.randint(1, 11))),
+            "engagement_score": rng.choice(["1.2k", "3,400", "2M", "n/a", 57, -4, None, "7"]),
+        }
+        if index % 3 == 0:
+            signal["method"] = rng.choice(["rss_fallback", "scrapegraph", "selector_fallback"])
+        if index % 4 == 0:
+            signal["category"] = rng.choice(["Home Decor", "pets", "gifts", "mystery"])
+        if index % 5 == 0:
+            signal["market_examples"] = [
+                {"title": "Retro Cat Shirt", "source_url": "https://www.etsy.com/listing/1", "image_url": "/a.jpg"},
+                {"title": "retro cat shirt", "source_url": "https://www.etsy.com/listing/1"},
+                {"title": "Blob", "image_url": "blob:abc"},
+            ]
+        if index % 7 == 0:
+            signal["term"] = signal.pop("keyword")
+        if index % 11 == 0:
+            signal["confidence"] = 0.5
+        signals.append(signal)
+    return signals
+
+
+def test_batch_matches_per_signal_normalization(monkeypatch):
+    monkeypatch.setattr(service, "utcnow", lambda: NOW)
+    signals = _signals()
+
+    expected = [
+        normalized
+        for normalized in (
+            service.normalize_signal(signal, default_method="selector_fallback")
+            for signal in signals
+        )
+        if normalized
+    ]
+    batched = service.normalize_signal_batch(signals, default_method="selector_fallback")
+
+    assert expected
+    assert batched == expected
+    assert all(isinstance(signal, service.NormalizedSignal) for signal in batched)
+
+
+def test_batch_accepts_columns_and_skips_normalized_rows(monkeypatch):
+    monkeypatch.setattr(service, "utcnow", lambda: NOW)
+    ready = service.normalize_signal({"source": "etsy", "keyword": "retro cat mug", "engagement_score": 5})
+    batch = service.SignalBatch(
+        keywords=["ignored", "Boho Wall Art Poster"],
+        scores=[0, "2k"],
+        sources=["etsy", "etsy"],
+        methods=["unknown", "scrapegraph"],
+        rows=[ready, {"keyword": "unused column source"}],
+    )
+
+    normalized = service.normalize_signal_batch(batch)
+
+    assert normalized[0] is ready
+    assert normalized[1]["keyword"] == "boho wall art poster"
+    assert normalized[1]["engagement_score"] == 2000
+    assert normalized[1]["method"] == "scrapegraph"
+    assert normalized[1]["category"] == "home_decor"
+    assert normalized[1]["provenance"]["updated_at"] == NOW.isoformat()
@@ -0,0 +1,134 @@
+import httpx
+import pytest
+
+from services.trend_ingestion import service
+from services.trend_ingestion.snapshots import PageSnapshot, SnapshotStore
+
+RSS = """
+<rss><channel>
+  <item><title>Funny Cat Shirt</title></item>
+  <item><title>Retro Dog Mom Mug</title></item>
+</channel></rss>
+"""
+
+
+class _Request:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class _Route:
+    def __init__(self, url, resource_type="document"):
+        self.request = _Request(url, resource_type)
+        self.fulfilled = None
+        self.aborted = False
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    async def abort(self):
+        self.aborted = True
+
+
+class _Context:
+    def __init__(self):
+        self.handler = None
+
+    async def route(self, pattern, handler):
+        assert pattern == "**/*"
+        self.handler = handler
+
+
+def test_snapshot_store_round_trips_pages_per_version(tmp_path):
+    store = SnapshotStore(tmp_path, "2026-10", "record")
+    store.save(PageSnapshot(url="https://example.com/trends", body="<p>hi</p>", status=203))
+
+    loaded = store.load("https://example.com/trends")
+    assert loaded.body == "<p>hi</p>"
+    assert loaded.status == 203
+    manifest = store.manifest()
+    assert manifest["version"] == "2026-10"
+    assert manifest["entries"]["https://example.com/trends"]["status"] == 203
+    assert SnapshotStore(tmp_path, "2026-11").load("https://example.com/trends") is None
+
+
+@pytest.mark.asyncio
+async def test_replay_routes_serve_snapshots_and_block_the_network(tmp_path):
+    store = SnapshotStore(tmp_path, "v1", "replay")
+    store.save(PageSnapshot(url="https://example.com/trends", body="<html>ok</html>"))
+    context = _Context()
+    await store.attach(context)
+
+    page = _Route("https://example.com/trends")
+    missing = _Route("https://example.com/other")
+    image = _Route("https://cdn.example.com/a.jpg", "image")
+    for route in (page, missing, image):
+        await context.handler(route)
+
+    assert page.fulfilled == {"status": 200, "content_type": "text/html", "body": "<html>ok</html>"}
+    assert missing.fulfilled["status"] == 404
+    assert image.aborted and image.fulfilled is None
+
+
+@pytest.mark.asyncio
+async def test_attach_is_a_no_op_outside_replay(tmp_path):
+    context = _Context()
+    await SnapshotStore(tmp_path, "v1", "record").attach(context)
+    assert context.handler is None
+
+
+@pytest.mark.asyncio
+async def test_rss_is_recorded_then_replayed_offline(tmp_path, monkeypatch):
+    real_client = httpx.AsyncClient
+
+    def recording_client(**kwargs):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200, text=RSS, headers={"content-type": "application/rss+xml"}
+            )
+        )
+        return real_client(transport=transport, **kwargs)
+
+    monkeypatch.setattr(service.httpx, "AsyncClient", recording_client)
+    monkeypatch.setattr(service, "snapshot_store", SnapshotStore(tmp_path, "v1", "record"))
+    recorded = await service._fetch_rss_signals()
+
+    def offline_client(**_kwargs):
+        raise AssertionError("replay must not touch the network")
+
+    monkeypatch.setattr(service.httpx, "AsyncClient", offline_client)
+    monkeypatch.setattr(service, "snapshot_store", SnapshotStore(tmp_path, "v1", "replay"))
+    timings = []
+    monkeypatch.setattr(
+        service, "stage_observers", [lambda *args: timings.append(args[:2])]
+    )
+    replayed = await service._fetch_rss_signals()
+
+    assert [signal["keyword"] for signal in replayed] == [
+        signal["keyword"] for signal in recorded
+    ]
+    assert ("google_trends_rss", "fetch") in timings
+    assert ("google_trends_rss", "extract") in timings
+
+
+@pytest.mark.asyncio
+async def test_replay_skips_scrapegraph_and_uses_recorded_pages(tmp_path, monkeypatch):
+    async def _scrapegraph_should_not_run(*_args):
+        raise AssertionError("ScrapeGraphAI fetches outside the snapshot store")
+
+    async def _fake_selector(_pool, name, _config, _profile):
+        return [{"source": name, "keyword": "funny cat shirt", "engagement_score": 5}]
+
+    config = service.PLATFORM_CONFIG["etsy"]
+    monkeypatch.setattr(service, "snapshot_store", SnapshotStore(tmp_path, "v1", "replay"))
+    monkeypatch.setattr(service, "scrape_with_scrapegraph", _scrapegraph_should_not_run)
+    monkeypatch.setattr(service, "_scrape_source", _fake_selector)
+
+    results, method, error = await service._scrape_source_chain(
+        object(), "etsy", config, service.build_scrape_profile(config), "run"
+    )
+
+    assert method == "selector_fallback"
+    assert results[0]["keyword"] == "funny cat shirt"
+    assert "skipped during snapshot replay" in error
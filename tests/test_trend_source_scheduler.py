@@ -0,0 +1,178 @@
+import pytest
+
+from services.common.database import init_db
+from services.common.distributed_lock import LocalLeaseBackend
+from services.trend_ingestion import service
+from services.trend_ingestion.circuit_breaker import CircuitBreaker
+from services.trend_ingestion.source_scheduler import IN_FLIGHT_STATUS, AdaptiveSourceScheduler
+from services.trend_ingestion.sources import SelectorSet, SourceConfig
+
+
+class _DummyPlaywrightCtx:
+    async def __aenter__(self):
+        return object()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock, sources=("tiktok", "etsy")):
+    return AdaptiveSourceScheduler(
+        sources,
+        base_interval=3600,
+        min_interval=600,
+        max_interval=4 * 3600,
+        target_new_keywords=3,
+        clock=clock,
+    )
+
+
+def test_intervals_adapt_to_new_keywords_and_stay_clamped():
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    scheduler.reset(run_now=True)
+    assert sorted(scheduler.claim_due()) == ["etsy", "tiktok"]
+
+    assert scheduler.complete("tiktok", status="success", new_keywords=5) == 1800
+    assert scheduler.complete("etsy", status="success", new_keywords=0) == 5400
+
+    for _ in range(5):
+        clock.now += 4 * 3600
+        scheduler.claim_due()
+        scheduler.complete("tiktok", status="success", new_keywords=5)
+        scheduler.complete("etsy", status="success", new_keywords=0)
+    snapshot = scheduler.snapshot()
+    assert snapshot["tiktok"]["interval_seconds"] == 600
+    assert snapshot["etsy"]["interval_seconds"] == 4 * 3600
+    assert snapshot["tiktok"]["runs"] == 6
+
+
+def test_running_source_is_not_claimed_again_until_complete():
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    scheduler.reset(run_now=True)
+
+    assert sorted(scheduler.claim_due()) == ["etsy", "tiktok"]
+    clock.now += 10 * 3600
+    assert scheduler.claim_due() == []
+
+    scheduler.complete("etsy", status="success", new_keywords=1)
+    assert scheduler.claim_due() == []
+    clock.now += 3600
+    assert scheduler.claim_due() == ["etsy"]
+
+
+def test_unscraped_source_is_due_again_on_the_next_tick():
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    scheduler.reset(run_now=True)
+    scheduler.claim_due()
+
+    assert scheduler.complete("etsy", status=None) == 3600
+    assert scheduler.claim_due() == ["etsy"]
+
+
+def test_failures_and_open_breaker_back_off():
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    scheduler.reset(run_now=True)
+    scheduler.claim_due()
+
+    assert scheduler.complete("tiktok", status="failed") == 7200
+    assert scheduler.complete("etsy", status="success", breaker_open=True, retry_after=9000) == 7200
+    clock.now += 7200
+    assert scheduler.claim_due() == ["tiktok"]
+    clock.now += 1800
+    assert scheduler.claim_due() == ["etsy"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_due_sources_scrapes_only_due_sources(monkeypatch):
+    await init_db()
+    clock = _Clock()
+    scheduler = _scheduler(clock, sources=("tiktok", "etsy", "google_trends_rss"))
+    scheduler.reset(run_now=True)
+    scraped = []
+
+    async def fake_scrapegraph(name, _config):
+        scraped.append(name)
+        return [
+            {"source": name, "keyword": keyword, "engagement_score": 50 + index}
+            for index, keyword in enumerate(
+                ["cat mom shirt", "retro sunset sticker", "dog dad mug", "plant lady tote bag"]
+            )
+        ]
+
+    async def rss_should_not_run():
+        raise AssertionError("RSS was not due")
+
+    monkeypatch.setattr(service, "STUB_ONLY", False)
+    monkeypatch.setattr(service, "ALLOW_STUB_FALLBACK", False)
+    config = SourceConfig(
+        url="https://example.com/trends",
+        selectors=SelectorSet(
+            item=["article"],
+            title=["h1"],
+            hashtags=["a"],
+            likes=["span"],
+            shares=["span"],
+            comments=["span"],
+        ),
+        wait_for_selector="article",
+    )
+    monkeypatch.setattr(service, "PLATFORM_CONFIG", {"tiktok": config, "etsy": config})
+    monkeypatch.setattr(service, "async_playwright", lambda: _DummyPlaywrightCtx())
+    monkeypatch.setattr(service, "scrape_with_scrapegraph", fake_scrapegraph)
+    monkeypatch.setattr(service, "_fetch_rss_signals", rss_should_not_run)
+    monkeypatch.setattr(service, "scraper_circuit_breaker", CircuitBreaker())
+    monkeypatch.setattr(service, "source_scheduler", scheduler)
+
+    due = [name for name in scheduler.claim_due() if name == "tiktok"]
+    result = await service.refresh_due_sources(due)
+
+    assert scraped == ["tiktok"]
+    assert result["source_diagnostics"]["tiktok"]["new_keywords"] == 4
+    snapshot = scheduler.snapshot()
+    assert snapshot["tiktok"]["interval_seconds"] == 1800
+    assert snapshot["tiktok"]["last_new_keywords"] == 4
+
+    scheduler.claim_due()
+    clock.now += 1800
+    await service.refresh_due_sources(["tiktok"])
+    assert scheduler.snapshot()["tiktok"]["last_new_keywords"] == 0
+    assert scheduler.snapshot()["tiktok"]["interval_seconds"] == 2700
+
+
+@pytest.mark.asyncio
+async def test_source_scraped_by_another_refresh_waits_one_interval(monkeypatch):
+    await init_db()
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+    scheduler.reset(run_now=True)
+    backend = LocalLeaseBackend()
+
+    async def gather_should_not_run(_source_names=None):
+        raise AssertionError("source leased elsewhere was scraped again")
+
+    monkeypatch.setattr(service, "refresh_lease_backend", backend)
+    monkeypatch.setattr(service, "_gather_trends", gather_should_not_run)
+    monkeypatch.setattr(service, "scraper_circuit_breaker", CircuitBreaker())
+    monkeypatch.setattr(service, "source_scheduler", scheduler)
+
+    # An API refresh on this or another replica is scraping tiktok.
+    await backend.acquire(service.source_lease_name("tiktok"), 60_000)
+    due = [name for name in scheduler.claim_due() if name == "tiktok"]
+    result = await service.refresh_due_sources(due)
+
+    assert result["sources_in_flight"] == ["tiktok"]
+    snapshot = scheduler.snapshot()["tiktok"]
+    assert snapshot["last_status"] == IN_FLIGHT_STATUS
+    assert (snapshot["interval_seconds"], snapshot["due_in_seconds"]) == (3600, 3600)